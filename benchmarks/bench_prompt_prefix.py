@@ -0,0 +1,104 @@
+# bench_prompt_prefix.py
+"""
+Benchmark : tokens de prompt réellement évalués (prompt_eval_count) par Ollama
+pendant l'étape MAP, en mode 'generate' (prompt brut) puis 'chat' (instruction
+en message système, préfixe stable réutilisable par le cache KV).
+
+Usage :
+    python benchmarks/bench_prompt_prefix.py [--file texte.txt] [--chunks 8]
+
+Nécessite un serveur Ollama lancé avec le modèle OLLAMA_MODEL disponible.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+try:
+    from localsumm.config import OLLAMA_MODEL, PROMPT_TEMPLATE_MAP
+    from localsumm.exceptions import LocalSummError
+    from localsumm.llm_interaction import (
+        generate_summary_with_ollama,
+        warmup_ollama_model,
+    )
+    from localsumm.utils import chunk_text
+except ImportError as e:
+    print(f"Erreur d'importation. Structure src/localsumm/ correcte ? Détail: {e}")
+    sys.exit(1)
+
+SAMPLE_SENTENCES = (
+    "L'équipe a présenté l'avancement du projet et les risques identifiés. ",
+    "Le budget du trimestre a été revu à la baisse de dix pour cent. ",
+    "Deux recrutements sont prévus pour renforcer l'équipe infrastructure. ",
+    "La date de livraison de la version 2 est maintenue à fin juin. ",
+    "Un audit de sécurité externe sera lancé le mois prochain. ",
+)
+
+
+def _run_mode(chunks: list[str], api_mode: str) -> dict[str, float]:
+    """Résume chaque chunk séquentiellement et cumule les statistiques Ollama."""
+    totals = {"calls": 0, "prompt_eval_count": 0, "prompt_eval_s": 0.0, "wall_s": 0.0}
+    for chunk in chunks:
+        stats: dict = {}
+        start = time.perf_counter()
+        generate_summary_with_ollama(
+            chunk, PROMPT_TEMPLATE_MAP, api_mode=api_mode, stats=stats
+        )
+        totals["wall_s"] += time.perf_counter() - start
+        totals["calls"] += 1
+        totals["prompt_eval_count"] += stats.get("prompt_eval_count", 0)
+        totals["prompt_eval_s"] += stats.get("prompt_eval_duration", 0) / 1e9
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--file", type=Path, help="Fichier texte source (optionnel).")
+    parser.add_argument("--chunks", type=int, default=8, help="Nombre de chunks MAP.")
+    parser.add_argument(
+        "--chunk-tokens", type=int, default=1024, help="Taille des chunks en tokens."
+    )
+    args = parser.parse_args()
+
+    if args.file:
+        text = args.file.read_text(encoding="utf-8")
+    else:
+        text = "".join(SAMPLE_SENTENCES[i % 5] for i in range(2000))
+
+    chunks = chunk_text(text, args.chunk_tokens, 0)[: args.chunks]
+    print(
+        f"Modèle : {OLLAMA_MODEL} | {len(chunks)} chunks de ~{args.chunk_tokens} tokens"
+    )
+    warmup_ollama_model()
+
+    results = {mode: _run_mode(chunks, mode) for mode in ("generate", "chat")}
+
+    print(
+        f"\n{'mode':>10} | {'appels':>6} | {'prompt_eval_count':>17} | "
+        f"{'prefill (s)':>11} | {'total (s)':>9}"
+    )
+    for mode, totals in results.items():
+        print(
+            f"{mode:>10} | {totals['calls']:>6} | {totals['prompt_eval_count']:>17} | "
+            f"{totals['prompt_eval_s']:>11.2f} | {totals['wall_s']:>9.2f}"
+        )
+    before = results["generate"]["prompt_eval_count"]
+    after = results["chat"]["prompt_eval_count"]
+    if before:
+        print(
+            f"\nTokens de prompt évalués : {before} -> {after} "
+            f"({100 * (before - after) / before:.1f} % économisés)"
+        )
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except LocalSummError as e:
+        print(f"\nErreur : {type(e).__name__} - {e}")
+        sys.exit(1)
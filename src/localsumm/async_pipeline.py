@@ -0,0 +1,1282 @@
+# src/localsumm/async_pipeline.py
+
+import asyncio
+import json
+import sys
+import threading
+import time
+import uuid
+from collections.abc import AsyncIterator, Awaitable, Iterator, Sequence
+from contextlib import asynccontextmanager
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Optional, TypeVar
+
+from .audio_preprocessing import (
+    PreprocessedAudio,
+    finish_preprocessing,
+    preprocessing_enabled,
+)
+from .config import (
+    ASYNC_DOWNLOAD_TIMEOUT,
+    ASYNC_SUMMARY_TIMEOUT,
+    ASYNC_TRANSCRIPTION_TIMEOUT,
+    DOWNLOAD_DIR,
+)
+from .endpoints import EndpointPool, OllamaEndpoint, get_endpoint_pool
+from .exceptions import (
+    ConfigurationError,
+    FileProcessingError,
+    LocalSummError,
+    OllamaError,
+    OllamaTimeoutError,
+    StageTimeoutError,
+    TranscriptionError,
+    YoutubeDownloadError,
+)
+from .file_processor import detect_mime_type, is_large_text_file, process_file
+from .fingerprint import AudioFingerprint, find_transcript
+from .key_points import map_prompt_template
+from .llm_backends import get_llm_backend
+from .llm_interaction import start_background_warmup
+from .main import (
+    SummaryResult,
+    _map_output_budget,
+    check_no_window,
+    combine_map_summaries,
+    effective_map_concurrency,
+    empty_result,
+    iter_batches,
+    make_job_key,
+    map_cache,
+    map_cache_key,
+    plan_map_stage,
+    prepare_text,
+    record_llm_stats,
+    record_map_failure,
+    record_transcription_stats,
+    select_question_chunks,
+    select_streamed_chunks,
+    shared_result,
+    stream_chunks,
+    validate_request,
+)
+from .map_retry import (
+    attempt_settings,
+    check_map_error_budget,
+    job_deadline,
+    retry_delay,
+    should_split,
+)
+from .media_window import (
+    Chapter,
+    MediaWindow,
+    chapters_from_info,
+    media_chapters,
+    record_window,
+    resolve_window,
+    window_requested,
+)
+from .metrics import PipelineMetrics
+from .relevance import focus_on_question
+from .remote_media import is_direct_media_url, stream_remote_media_to_wav
+from .resources import (
+    ffmpeg_threads,
+    get_host_scheduler,
+    whisper_threads,
+)
+from .settings import Settings, get_default_settings
+from .singleflight import AsyncSingleFlight
+from .transcript import Transcript, is_transcript_file
+from .transcription import (
+    check_whisper_cpp_paths,
+    finish_transcript,
+    parse_whisper_cpp_output,
+    transcribe_audio,
+    whisper_cpp_command,
+)
+from .transcription_policy import plan_transcription
+from .utils import count_tokens, is_wav_mono16k, split_in_half, wav_mono16k_command
+
+try:
+    import httpx
+except ImportError:  # Dépendance optionnelle : pip install localsumm[async]
+    httpx = None  # type: ignore[assignment]
+
+# from loguru import logger
+
+T = TypeVar("T")
+
+# Intervalle entre deux tentatives de réservation (slot Ollama, threads CPU)
+_ACQUIRE_POLL_INTERVAL: float = 0.05
+
+# Jobs identiques en cours (voir main._jobs_in_flight)
+_jobs_in_flight = AsyncSingleFlight()
+
+
+# --- Outils asyncio ---
+
+
+async def _with_timeout(awaitable: Awaitable[T], timeout: float, stage: str) -> T:
+    """
+    Attend une étape avec un délai maximal (0 = illimité). À l'expiration, la
+    tâche est annulée (les sous-processus en cours sont tués).
+
+    Raises:
+        StageTimeoutError: Si le délai est dépassé.
+    """
+    if timeout <= 0:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError as e:
+        raise StageTimeoutError(
+            f"L'étape '{stage}' a dépassé son délai maximal ({timeout:g}s)."
+        ) from e
+
+
+@asynccontextmanager
+async def _reserve_threads(threads: int) -> AsyncIterator[int]:
+    """
+    Équivalent asynchrone de ResourceScheduler.reserve : attend son tour dans la
+    file sans bloquer la boucle, et rend le ticket si la tâche est annulée.
+    """
+    scheduler = get_host_scheduler()
+    if not scheduler.enabled or threads <= 0:
+        yield 0
+        return
+    ticket = scheduler.enqueue(threads)
+    try:
+        granted = scheduler.try_admit(ticket)
+        while granted is None:
+            await asyncio.sleep(_ACQUIRE_POLL_INTERVAL)
+            granted = scheduler.try_admit(ticket)
+    except BaseException:
+        scheduler.withdraw(ticket)
+        raise
+    try:
+        yield granted
+    finally:
+        scheduler.release(granted)
+
+
+async def _run_subprocess(command: list[str]) -> tuple[int, str, str]:
+    """
+    Exécute une commande sans bloquer la boucle d'événements.
+
+    Si la tâche est annulée (annulation explicite ou délai dépassé), le processus
+    est tué avant que l'annulation ne soit propagée.
+
+    Returns:
+        (code de retour, stdout, stderr).
+
+    Raises:
+        FileNotFoundError: Si l'exécutable est introuvable.
+    """
+    # logger.debug(
+    #     f"Exécution (async): {' '.join(shlex.quote(arg) for arg in command)}"
+    # )
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await process.communicate()
+    except BaseException:
+        if process.returncode is None:
+            # logger.warning(
+            #     f"Annulation : arrêt du processus {command[0]} (pid {process.pid})."
+            # )
+            process.kill()
+            await process.wait()
+        raise
+    return (
+        process.returncode if process.returncode is not None else -1,
+        stdout.decode("utf-8", errors="replace"),
+        stderr.decode("utf-8", errors="replace"),
+    )
+
+
+def _unlink_quietly(path: Path) -> None:
+    try:
+        path.unlink(missing_ok=True)
+    except OSError:
+        # logger.warning(f"Impossible de supprimer le fichier temporaire {path}: {e}")
+        pass
+
+
+async def _unlink_quietly_async(*paths: Path) -> None:
+    """Supprime des fichiers temporaires hors de la boucle d'événements."""
+
+    def unlink_all() -> None:
+        for path in paths:
+            _unlink_quietly(path)
+
+    await asyncio.to_thread(unlink_all)
+
+
+def _downloaded_files(unique_id: uuid.UUID) -> list[Path]:
+    return list(DOWNLOAD_DIR.glob(f"youtube_{unique_id}*"))
+
+
+# --- Acquisition : téléchargement, conversion, transcription ---
+
+
+async def _youtube_chapters_async(url: str) -> list[Chapter]:
+    """Chapitres de la vidéo (métadonnées yt-dlp, sans téléchargement)."""
+    returncode, stdout, stderr = await _run_subprocess(
+        [sys.executable, "-m", "yt_dlp", "--dump-single-json", "--no-playlist", url]
+    )
+    if returncode != 0:
+        raise YoutubeDownloadError(
+            f"Impossible de lire les métadonnées de {url}: {stderr.strip()}"
+        )
+    try:
+        return chapters_from_info(json.loads(stdout))
+    except ValueError as e:
+        raise YoutubeDownloadError(
+            f"Métadonnées yt-dlp illisibles pour {url}: {e}"
+        ) from e
+
+
+async def _resolve_youtube_window_async(
+    url: str, settings: Settings
+) -> Optional[MediaWindow]:
+    if not window_requested(settings):
+        return None
+    chapters: list[Chapter] = (
+        await _youtube_chapters_async(url) if settings.media_chapter else []
+    )
+    return resolve_window(settings, lambda: chapters)
+
+
+async def download_youtube_audio_async(
+    url: str,
+    settings: Optional[Settings] = None,
+    stats: Optional[dict[str, Any]] = None,
+) -> Path:
+    """
+    Version asynchrone de download_youtube_audio : yt-dlp est lancé en
+    sous-processus, ce qui permet d'interrompre réellement le téléchargement.
+    Une fenêtre temporelle (settings.media_*) est passée à yt-dlp
+    (--download-sections) : seule cette portion est téléchargée.
+
+    Raises:
+        YoutubeDownloadError: Si le téléchargement échoue.
+        ValueError: Si la fenêtre demandée est invalide ou le chapitre introuvable.
+    """
+    # logger.info(f"Téléchargement (async) de l'audio depuis l'URL YouTube : {url}")
+    settings = settings or get_default_settings()
+    window = await _resolve_youtube_window_async(url, settings)
+    section_args: list[str] = []
+    if window is not None:
+        end = f"{window.end:.3f}" if window.end is not None else "inf"
+        section_args = ["--download-sections", f"*{window.start:.3f}-{end}"]
+    unique_id = uuid.uuid4()
+    output_path_template = DOWNLOAD_DIR / f"youtube_{unique_id}.%(ext)s"
+    command: list[str] = [
+        sys.executable,
+        "-m",
+        "yt_dlp",
+        "--format",
+        "bestaudio/best",
+        "--output",
+        str(output_path_template),
+        "--no-playlist",
+        "--extract-audio",
+        "--audio-format",
+        "wav",
+        "--audio-quality",
+        "128",
+        "--quiet",
+        "--no-progress",
+        *section_args,
+        url,
+    ]
+    try:
+        returncode, _, stderr = await _run_subprocess(command)
+    except BaseException:
+        # Annulation : ne pas laisser de fichiers partiels
+        partial_files = await asyncio.to_thread(_downloaded_files, unique_id)
+        await _unlink_quietly_async(*partial_files)
+        raise
+
+    if returncode != 0:
+        raise YoutubeDownloadError(
+            f"Échec du téléchargement audio depuis {url}: {stderr.strip()}"
+        )
+    potential_files = await asyncio.to_thread(_downloaded_files, unique_id)
+    if not potential_files:
+        # logger.error(
+        #     f"Aucun fichier audio trouvé après téléchargement pour l'ID {unique_id}"
+        # )
+        raise YoutubeDownloadError(
+            f"Impossible de trouver le fichier audio téléchargé pour l'URL {url}"
+        )
+    record_window(window, stats)
+    # logger.success(
+    #     f"Audio téléchargé et extrait avec succès vers : {potential_files[0]}"
+    # )
+    return potential_files[0]
+
+
+async def stream_remote_media_to_wav_async(
+    url: str,
+    output_wav_path: Path,
+    settings: Optional[Settings] = None,
+    stats: Optional[dict[str, Any]] = None,
+) -> None:
+    """
+    Version asynchrone de stream_remote_media_to_wav (lecture réseau et ffmpeg
+    dans un thread). En cas d'annulation, le téléchargement est interrompu et
+    ffmpeg tué.
+
+    Raises:
+        FileProcessingError: Si le téléchargement ou la conversion échoue.
+        ValueError: Si la fenêtre demandée est invalide.
+    """
+    cancel = threading.Event()
+    try:
+        await asyncio.to_thread(
+            stream_remote_media_to_wav, url, output_wav_path, settings, stats, cancel
+        )
+    except BaseException:
+        cancel.set()
+        raise
+
+
+async def convert_audio_to_wav_async(
+    input_path: Path,
+    output_wav_path: Path,
+    tempo: float = 1.0,
+    window: Optional[MediaWindow] = None,
+) -> None:
+    """
+    Version asynchrone de la conversion en WAV 16kHz Mono (ffmpeg en sous-processus),
+    accélérée d'un facteur `tempo` si différent de 1, limitée à `window` si fournie.
+
+    Raises:
+        FileProcessingError: Si ffmpeg est absent ou échoue.
+        FileNotFoundError: Si le fichier d'entrée n'existe pas.
+    """
+    if not await asyncio.to_thread(input_path.is_file):
+        raise FileNotFoundError(
+            f"Fichier audio d'entrée pour conversion introuvable: {input_path}"
+        )
+    threads = ffmpeg_threads()
+    try:
+        async with _reserve_threads(threads):
+            returncode, _, stderr = await _run_subprocess(
+                wav_mono16k_command(input_path, output_wav_path, threads, tempo, window)
+            )
+    except FileNotFoundError:
+        raise FileProcessingError(
+            "ffmpeg n'est pas installé ou n'est pas dans le PATH système."
+        ) from None
+    if returncode != 0:
+        # logger.error(
+        #     f"ffmpeg a échoué (code {returncode}) lors de la conversion en WAV..."
+        # )
+        raise FileProcessingError(
+            f"ffmpeg a échoué lors de la conversion en WAV de {input_path.name}: "
+            f"{stderr}"
+        )
+
+
+async def _transcribe_with_whisper_cpp_async(
+    audio_path: Path, settings: Settings
+) -> tuple[Transcript, float]:
+    """
+    whisper.cpp en sous-processus (conversion WAV préalable, elle aussi async).
+
+    Returns:
+        (segments horodatés, durée de l'exécution de whisper.cpp en secondes).
+    """
+    exec_path, model_path = check_whisper_cpp_paths(settings)
+    # Un WAV 16kHz Mono (ex: sortie du prétraitement) est transcrit tel quel
+    needs_conversion = not await asyncio.to_thread(is_wav_mono16k, audio_path)
+    temp_wav_path = DOWNLOAD_DIR / f"whisper_{uuid.uuid4().hex}.wav"
+    try:
+        if needs_conversion:
+            try:
+                await convert_audio_to_wav_async(audio_path, temp_wav_path)
+            except FileProcessingError as e:
+                raise TranscriptionError(
+                    f"Échec de la préparation audio pour whisper.cpp: {e}"
+                ) from e
+        wav_path = temp_wav_path if needs_conversion else audio_path
+
+        async with _reserve_threads(whisper_threads(settings)):
+            start_time = time.perf_counter()
+            returncode, stdout, stderr = await _run_subprocess(
+                whisper_cpp_command(exec_path, model_path, wav_path, settings)
+            )
+            decode_seconds = time.perf_counter() - start_time
+        if returncode != 0:
+            # logger.error(
+            #     f"whisper.cpp a échoué (code {returncode}). Stderr: {stderr.strip()}"
+            # )
+            raise TranscriptionError(
+                f"whisper.cpp a échoué (code {returncode}): {stderr.strip()}"
+            )
+        # logger.success(
+        #     f"Transcription whisper.cpp (async) réussie en {decode_seconds:.2f}s."
+        # )
+        return parse_whisper_cpp_output(stdout), decode_seconds
+    finally:
+        await _unlink_quietly_async(temp_wav_path)
+
+
+async def transcribe_audio_async(
+    audio_path: Path,
+    settings: Optional[Settings] = None,
+    stats: Optional[dict[str, Any]] = None,
+) -> str:
+    """
+    Version asynchrone de transcribe_audio.
+
+    Avec 'whisper-cpp', ffmpeg et whisper.cpp tournent en sous-processus et sont
+    tués en cas d'annulation. Avec 'faster-whisper' (calcul dans le processus), la
+    transcription tourne dans un thread : l'annulation libère l'appelant, mais le
+    calcul en cours se termine en arrière-plan.
+
+    Raises:
+        ConfigurationError: Si le backend configuré est invalide ou mal configuré.
+        TranscriptionError: Si la transcription échoue.
+        FileNotFoundError: Si le fichier audio n'existe pas.
+    """
+    if not await asyncio.to_thread(audio_path.is_file):
+        raise FileNotFoundError(
+            f"Le fichier audio spécifié n'a pas été trouvé : {audio_path}"
+        )
+    settings = settings or get_default_settings()
+    if settings.transcription_backend != "whisper-cpp":
+        # 'faster-whisper' (ou backend invalide : l'erreur vient de transcribe_audio)
+        return await asyncio.to_thread(transcribe_audio, audio_path, settings, stats)
+
+    fingerprint: Optional[AudioFingerprint] = None
+    if settings.fingerprint_enabled:
+        found, match = await asyncio.to_thread(
+            find_transcript, audio_path, settings, stats
+        )
+        fingerprint = found
+        if match is not None:
+            gaps = match.gaps(found.duration)
+            parts = [
+                (start, await _transcribe_gap_async(audio_path, start, end, settings))
+                for start, end in gaps
+            ]
+            transcript = match.merged(parts)
+            finish_transcript(
+                transcript, None, stats, found if gaps else None, settings, match
+            )
+            return transcript.text
+
+    preprocessed = await _preprocess_audio_async(audio_path, settings)
+    try:
+        source_path = preprocessed.path if preprocessed else audio_path
+        # Choix du modèle selon la durée (ffprobe) hors de la boucle
+        plan = await asyncio.to_thread(plan_transcription, source_path, settings)
+        transcript, decode_seconds = await _transcribe_with_whisper_cpp_async(
+            source_path, plan.settings
+        )
+        plan.report(decode_seconds, stats)
+        finish_transcript(transcript, preprocessed, stats, fingerprint, settings)
+        return transcript.text
+    finally:
+        if preprocessed is not None:
+            await _unlink_quietly_async(preprocessed.path)
+
+
+async def _transcribe_gap_async(
+    audio_path: Path, start: float, end: float, settings: Settings
+) -> Transcript:
+    """Version asynchrone de transcription._transcribe_gap."""
+    gap_path = DOWNLOAD_DIR / f"gap_{uuid.uuid4().hex}.wav"
+    gap_stats: dict[str, Any] = {}
+    try:
+        await convert_audio_to_wav_async(
+            audio_path, gap_path, window=MediaWindow(start=start, end=end)
+        )
+        await transcribe_audio_async(
+            gap_path, settings.replace(fingerprint_enabled=False), gap_stats
+        )
+    finally:
+        await _unlink_quietly_async(gap_path)
+    transcript: Transcript = gap_stats["transcript"]
+    return transcript
+
+
+async def _preprocess_audio_async(
+    audio_path: Path, settings: Settings
+) -> Optional[PreprocessedAudio]:
+    """Version asynchrone de preprocess_audio (ffmpeg en sous-processus annulable)."""
+    if not preprocessing_enabled(settings):
+        return None
+    converted_wav = DOWNLOAD_DIR / f"preprocessed_{uuid.uuid4().hex}.wav"
+    try:
+        await convert_audio_to_wav_async(
+            audio_path, converted_wav, settings.audio_tempo
+        )
+    except BaseException:
+        await _unlink_quietly_async(converted_wav)
+        raise
+    return await asyncio.to_thread(finish_preprocessing, converted_wav, settings)
+
+
+async def _transcribe_window_async(
+    file_path: Path,
+    window: MediaWindow,
+    settings: Settings,
+    stats: Optional[dict[str, Any]],
+) -> str:
+    """Version asynchrone de file_processor._transcribe_window."""
+    temp_audio_path = DOWNLOAD_DIR / f"window_{file_path.stem}_{uuid.uuid4().hex}.wav"
+    try:
+        await convert_audio_to_wav_async(file_path, temp_audio_path, window=window)
+        record_window(window, stats)
+        return await transcribe_audio_async(temp_audio_path, settings, stats)
+    finally:
+        await _unlink_quietly_async(temp_audio_path)
+
+
+async def process_file_async(
+    file_path: Path,
+    settings: Optional[Settings] = None,
+    stats: Optional[dict[str, Any]] = None,
+) -> str:
+    """
+    Version asynchrone de process_file (texte lu dans un thread, audio/vidéo
+    convertis et transcrits en sous-processus).
+
+    Raises:
+        FileNotFoundError, FileProcessingError, TranscriptionError, ConfigurationError:
+        voir process_file.
+    """
+    if not await asyncio.to_thread(file_path.is_file):
+        raise FileNotFoundError(
+            f"Le fichier d'entrée spécifié n'a pas été trouvé : {file_path}"
+        )
+    settings = settings or get_default_settings()
+    if is_transcript_file(file_path):
+        return await asyncio.to_thread(process_file, file_path, settings, stats)
+    mime_type = await asyncio.to_thread(detect_mime_type, file_path)
+    if window_requested(settings) and mime_type.startswith(("audio/", "video/")):
+        window = await asyncio.to_thread(
+            resolve_window, settings, lambda: media_chapters(file_path)
+        )
+        if window is not None:
+            return await _transcribe_window_async(file_path, window, settings, stats)
+
+    if mime_type.startswith("text/"):
+        return await asyncio.to_thread(process_file, file_path, settings)
+    if mime_type.startswith("audio/"):
+        return await transcribe_audio_async(file_path, settings, stats)
+    if mime_type.startswith("video/"):
+        temp_audio_path = (
+            DOWNLOAD_DIR / f"extracted_audio_{file_path.stem}_{uuid.uuid4().hex}.wav"
+        )
+        try:
+            await convert_audio_to_wav_async(file_path, temp_audio_path)
+            return await transcribe_audio_async(temp_audio_path, settings, stats)
+        finally:
+            await _unlink_quietly_async(temp_audio_path)
+
+    raise FileProcessingError(
+        f"Type de fichier non supporté '{mime_type}' pour le fichier {file_path.name}"
+    )
+
+
+# --- LLM (backend des paramètres, via httpx) ---
+
+
+def _require_httpx() -> None:
+    if httpx is None:
+        raise ConfigurationError(
+            "Bibliothèque 'httpx' non installée (requise pour l'API asynchrone). "
+            "Installez-la avec 'pip install httpx'."
+        )
+
+
+async def _acquire_endpoint(pool: EndpointPool) -> OllamaEndpoint:
+    """Réserve un slot sur le pool d'endpoints sans bloquer la boucle d'événements."""
+    while True:
+        # Sondes de santé (requêtes réseau bloquantes) exécutées hors de la boucle
+        await asyncio.to_thread(pool.refresh_health)
+        endpoint = pool.acquire(blocking=False)
+        if endpoint is not None:
+            return endpoint
+        await asyncio.sleep(_ACQUIRE_POLL_INTERVAL)
+
+
+async def generate_summary_async(
+    text: str,
+    prompt_template: str,
+    *,
+    client: "httpx.AsyncClient",
+    api_mode: Optional[str] = None,
+    stats: Optional[dict[str, Any]] = None,
+    num_predict: Optional[int] = None,
+    settings: Optional[Settings] = None,
+    stage: Optional[str] = None,
+) -> str:
+    """
+    Version asynchrone de generate_summary_with_ollama (mêmes payloads, même
+    répartition entre les serveurs des paramètres, sans hedging).
+
+    Args:
+        client: Client httpx partagé (connexions réutilisées entre les appels).
+        Autres arguments : voir generate_summary_with_ollama.
+
+    Raises:
+        OllamaError: Si la requête API échoue ou si Ollama retourne une erreur.
+        ConfigurationError: Si le mode d'API configuré est invalide.
+    """
+    settings = settings or get_default_settings()
+    backend = get_llm_backend(settings)
+    path, payload = backend.build_request(
+        text,
+        prompt_template,
+        api_mode or settings.ollama_api_mode,
+        num_predict,
+        settings,
+    )
+    pool = get_endpoint_pool(settings)
+    endpoint = await _acquire_endpoint(pool)
+    url = f"{endpoint.base_url}{path}"
+    latency: Optional[float] = None
+    connection_failed = False
+    try:
+        async with _reserve_threads(backend.request_threads(endpoint, settings)):
+            start = time.perf_counter()
+            response = await client.post(
+                url,
+                json=payload,
+                timeout=settings.ollama_timeout,
+                headers=backend.headers(settings),
+            )
+            response.raise_for_status()
+            response_data: dict[str, Any] = response.json()
+            latency = time.perf_counter() - start
+    except httpx.ConnectError as e:
+        connection_failed = True
+        raise OllamaError(f"Impossible de contacter l'API LLM à {url}: {e}") from e
+    except httpx.TimeoutException as e:
+        raise OllamaTimeoutError(
+            f"Pas de réponse de l'API LLM à {url} "
+            f"en {settings.ollama_timeout:.0f}s : {e}"
+        ) from e
+    except httpx.HTTPError as e:
+        raise OllamaError(f"Impossible de contacter l'API LLM à {url}: {e}") from e
+    except ValueError as e:
+        raise OllamaError(f"Réponse JSON invalide reçue du serveur LLM : {e}") from e
+    finally:
+        # Toujours rendre le slot, y compris en cas d'annulation
+        pool.release(
+            endpoint, latency=latency, connection_failed=connection_failed, stage=stage
+        )
+
+    summary, response_stats = backend.parse_response(payload, response_data)
+    if stats is not None:
+        stats.update(response_stats)
+        stats["endpoint"] = endpoint.base_url
+    return summary
+
+
+async def _generate_async(
+    text: str,
+    prompt_template: str,
+    client: "httpx.AsyncClient",
+    metrics: PipelineMetrics,
+    stage: str,
+    num_predict: Optional[int],
+    settings: Settings,
+) -> str:
+    stats: dict[str, Any] = {}
+    summary = await generate_summary_async(
+        text,
+        prompt_template,
+        client=client,
+        stats=stats,
+        num_predict=num_predict,
+        settings=settings,
+        stage=stage,
+    )
+    record_llm_stats(metrics, stage, stats)
+    return summary
+
+
+async def _attempt_map_async(
+    chunk: str,
+    num_predict: int,
+    client: "httpx.AsyncClient",
+    metrics: PipelineMetrics,
+    semaphore: asyncio.Semaphore,
+    settings: Settings,
+    deadline: Optional[float],
+    depth: int,
+) -> tuple[Optional[str], int]:
+    """Équivalent asynchrone de main._attempt_map (slot libéré pendant l'attente)."""
+    timeouts = 0
+    attempts = 0
+    while (call_settings := attempt_settings(settings, deadline)) is not None:
+        attempts += 1
+        try:
+            async with semaphore:
+                summary = await _generate_async(
+                    chunk,
+                    map_prompt_template(settings),
+                    client,
+                    metrics,
+                    "map",
+                    num_predict,
+                    call_settings,
+                )
+            return summary, timeouts
+        except (ConfigurationError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            # logger.warning(f"Échec de l'appel MAP (tentative {attempts}) : {e}")
+            if isinstance(e, OllamaTimeoutError):
+                timeouts += 1
+                metrics.increment("map_timeouts")
+            metrics.set("map_last_error", f"{type(e).__name__}: {e}")
+        if should_split(timeouts, depth, settings):
+            break
+        delay = retry_delay(attempts, settings, deadline)
+        if delay is None:
+            break
+        metrics.increment("map_retries")
+        await asyncio.sleep(delay)
+    return None, timeouts
+
+
+async def _map_halves_async(
+    chunk: str,
+    client: "httpx.AsyncClient",
+    metrics: PipelineMetrics,
+    semaphore: asyncio.Semaphore,
+    settings: Settings,
+    deadline: Optional[float],
+    depth: int,
+) -> Optional[str]:
+    """Équivalent asynchrone de main._map_halves."""
+    halves = split_in_half(chunk)
+    if len(halves) < 2:
+        return None
+    metrics.increment("map_split_chunks")
+    summaries: list[str] = []
+    for half in halves:
+        tokens = await asyncio.to_thread(count_tokens, half, settings)
+        summary, timeouts = await _attempt_map_async(
+            half,
+            _map_output_budget(tokens, settings),
+            client,
+            metrics,
+            semaphore,
+            settings,
+            deadline,
+            depth,
+        )
+        if summary is None and should_split(timeouts, depth, settings):
+            summary = await _map_halves_async(
+                half, client, metrics, semaphore, settings, deadline, depth + 1
+            )
+        if summary:
+            summaries.append(summary)
+    if len(summaries) < len(halves):
+        metrics.increment("map_incomplete_chunks")
+    return "\n\n".join(summaries) or None
+
+
+async def _map_chunk_async(
+    index: int,
+    chunk: str,
+    num_predict: int,
+    client: "httpx.AsyncClient",
+    metrics: PipelineMetrics,
+    semaphore: asyncio.Semaphore,
+    settings: Settings,
+    deadline: Optional[float] = None,
+) -> Optional[str]:
+    """Équivalent asynchrone de main._map_chunk (None si le chunk est en échec)."""
+    cache_key = (
+        map_cache_key(chunk, num_predict, settings)
+        if settings.map_cache_enabled
+        else None
+    )
+    cached_summary = map_cache.get(cache_key) if cache_key else None
+    if isinstance(cached_summary, str):
+        metrics.increment("map_cache_hits")
+        return cached_summary
+    chunk_summary, timeouts = await _attempt_map_async(
+        chunk, num_predict, client, metrics, semaphore, settings, deadline, depth=0
+    )
+    if chunk_summary is not None:
+        if cache_key:
+            map_cache.set(cache_key, chunk_summary)
+        return chunk_summary
+    if should_split(timeouts, 0, settings):
+        chunk_summary = await _map_halves_async(
+            chunk, client, metrics, semaphore, settings, deadline, depth=1
+        )
+    if chunk_summary is None:
+        record_map_failure(metrics, settings, deadline)
+    return chunk_summary
+
+
+async def _run_map_stage_async(
+    chunks: list[str],
+    client: "httpx.AsyncClient",
+    metrics: PipelineMetrics,
+    settings: Settings,
+    deadline: Optional[float] = None,
+) -> list[str]:
+    """
+    Étape MAP asynchrone (même dédup, cache, budgets, tentatives et budget
+    d'erreurs que _run_map_stage).
+    """
+    settings = settings.for_stage("map")
+    metrics.set("map_model", settings.ollama_model)
+    _, budgets = await asyncio.to_thread(plan_map_stage, chunks, metrics, settings)
+    semaphore = asyncio.Semaphore(effective_map_concurrency(settings))
+    unique_indices = list(budgets)
+    results = await asyncio.gather(
+        *(
+            _map_chunk_async(
+                i,
+                chunks[i],
+                budgets[i],
+                client,
+                metrics,
+                semaphore,
+                settings,
+                deadline,
+            )
+            for i in unique_indices
+        )
+    )
+    check_map_error_budget(metrics, settings)
+    # Un résumé par groupe de chunks, dans l'ordre du texte
+    return [summary for summary in results if summary is not None]
+
+
+async def _run_for_formats_async(
+    text: str,
+    prompt_templates: dict[str, str],
+    client: "httpx.AsyncClient",
+    metrics: PipelineMetrics,
+    stage: str,
+    settings: Settings,
+) -> dict[str, str]:
+    """Équivalent asynchrone de main._run_for_formats (un appel par format)."""
+    settings = settings.for_stage(stage)
+    metrics.set(f"{stage}_model", settings.ollama_model)
+
+    async def generate(format_name: str) -> str:
+        with metrics.timer(f"{stage}:{format_name}"):
+            return await _generate_async(
+                text,
+                prompt_templates[format_name],
+                client,
+                metrics,
+                stage,
+                settings.final_output_budget(format_name),
+                settings,
+            )
+
+    results = await asyncio.gather(*(generate(name) for name in prompt_templates))
+    return dict(zip(prompt_templates, results))
+
+
+async def _summarize_async(
+    text_to_summarize: str,
+    chunks: Optional[list[str]],
+    prompt_templates: dict[str, str],
+    client: "httpx.AsyncClient",
+    metrics: PipelineMetrics,
+    settings: Settings,
+    deadline: Optional[float] = None,
+) -> dict[str, str]:
+    if chunks is None:
+        return await _run_for_formats_async(
+            text_to_summarize,
+            prompt_templates,
+            client,
+            metrics,
+            stage="direct",
+            settings=settings,
+        )
+    with metrics.timer("map"):
+        chunk_summaries = await _run_map_stage_async(
+            chunks, client, metrics, settings, deadline
+        )
+    combined = await asyncio.to_thread(
+        combine_map_summaries, chunk_summaries, metrics, settings
+    )
+    return await _run_for_formats_async(
+        combined, prompt_templates, client, metrics, stage="reduce", settings=settings
+    )
+
+
+async def _summarize_stream_async(
+    chunks: Iterator[str],
+    prompt_templates: dict[str, str],
+    client: "httpx.AsyncClient",
+    metrics: PipelineMetrics,
+    settings: Settings,
+    deadline: Optional[float] = None,
+) -> dict[str, str]:
+    """Équivalent asynchrone de main._summarize_stream_formats."""
+    batches = iter_batches(chunks, settings.stream_map_batch_chunks)
+    chunk_summaries: list[str] = []
+    with metrics.timer("map"):
+        # Lecture et découpage du lot suivant hors de la boucle d'événements
+        while batch := await asyncio.to_thread(next, batches, None):
+            chunk_summaries.extend(
+                await _run_map_stage_async(batch, client, metrics, settings, deadline)
+            )
+    combined = await asyncio.to_thread(
+        combine_map_summaries, chunk_summaries, metrics, settings
+    )
+    return await _run_for_formats_async(
+        combined, prompt_templates, client, metrics, stage="reduce", settings=settings
+    )
+
+
+# --- Pipeline complet ---
+
+
+async def _is_direct_media_url_async(url: str) -> bool:
+    # Requête HEAD éventuelle hors de la boucle
+    return await asyncio.to_thread(is_direct_media_url, url)
+
+
+async def _transcribe_remote_media_async(
+    url: str, settings: Settings, stats: dict[str, Any]
+) -> str:
+    """Équivalent asynchrone de transcribe_remote_media, avec délai par étape."""
+    wav_path = DOWNLOAD_DIR / f"remote_{uuid.uuid4().hex}.wav"
+    try:
+        await _with_timeout(
+            stream_remote_media_to_wav_async(url, wav_path, settings, stats),
+            ASYNC_DOWNLOAD_TIMEOUT,
+            "téléchargement",
+        )
+        return await _with_timeout(
+            transcribe_audio_async(wav_path, settings, stats),
+            ASYNC_TRANSCRIPTION_TIMEOUT,
+            "transcription",
+        )
+    finally:
+        await _unlink_quietly_async(wav_path)
+
+
+async def _acquire_text_async(
+    text_input: Optional[str],
+    file_input: Optional[Path],
+    url_input: Optional[str],
+    metrics: PipelineMetrics,
+    settings: Settings,
+) -> tuple[str, str, Optional[Transcript]]:
+    """Équivalent asynchrone de main._acquire_text, avec délai par étape."""
+    text_to_summarize: str = ""
+    source_description: str = ""
+    transcription_stats: dict[str, Any] = {}
+    if settings.ollama_warmup_enabled and not text_input:
+        # Charger les modèles LLM pendant le téléchargement / la transcription
+        for stage_settings in settings.stage_settings():
+            start_background_warmup(settings=stage_settings)
+    try:
+        acquisition_start = time.perf_counter()
+        if text_input:
+            source_description = "texte direct"
+            text_to_summarize = text_input
+            check_no_window(settings)
+        elif url_input and await _is_direct_media_url_async(url_input):
+            source_description = f"URL: {url_input}"
+            text_to_summarize = await _transcribe_remote_media_async(
+                url_input, settings, transcription_stats
+            )
+        elif url_input:
+            source_description = f"URL YouTube: {url_input}"
+            downloaded_file_path = await _with_timeout(
+                download_youtube_audio_async(url_input, settings, transcription_stats),
+                ASYNC_DOWNLOAD_TIMEOUT,
+                "téléchargement",
+            )
+            text_to_summarize = await _with_timeout(
+                transcribe_audio_async(
+                    downloaded_file_path, settings, transcription_stats
+                ),
+                ASYNC_TRANSCRIPTION_TIMEOUT,
+                "transcription",
+            )
+        elif file_input:
+            source_description = f"fichier local: {file_input.name}"
+            text_to_summarize = await _with_timeout(
+                process_file_async(file_input, settings, transcription_stats),
+                ASYNC_TRANSCRIPTION_TIMEOUT,
+                "transcription",
+            )
+        metrics.add_time("acquisition", time.perf_counter() - acquisition_start)
+        record_transcription_stats(metrics, transcription_stats)
+    except (ValueError, LocalSummError):
+        raise
+    except Exception as e:
+        raise LocalSummError(
+            "Erreur inattendue lors du traitement de l'entrée "
+            f"{source_description}: {e}"
+        ) from e
+    return (
+        text_to_summarize,
+        source_description,
+        transcription_stats.get("transcript"),
+    )
+
+
+async def process_input_formats_async(
+    *,
+    text_input: Optional[str] = None,
+    file_input: Optional[Path] = None,
+    url_input: Optional[str] = None,
+    formats: Sequence[str] = ("short",),
+    compression_ratio: Optional[float] = None,
+    metrics: Optional[PipelineMetrics] = None,
+    client: Optional["httpx.AsyncClient"] = None,
+    settings: Optional[Settings] = None,
+    coalesce: bool = True,
+) -> SummaryResult:
+    """
+    Version asynchrone de process_input_formats, pour une intégration dans un
+    service asyncio : une même boucle d'événements peut piloter de nombreux jobs.
+
+    - Ollama est appelé via httpx (dépendance optionnelle) ;
+    - ffmpeg, whisper.cpp et yt-dlp tournent en sous-processus asynchrones ;
+    - les étapes CPU (pré-compression, tokenisation, découpage) et faster-whisper
+      tournent dans des threads.
+
+    Chaque étape a un délai maximal (ASYNC_DOWNLOAD_TIMEOUT,
+    ASYNC_TRANSCRIPTION_TIMEOUT, ASYNC_SUMMARY_TIMEOUT). L'annulation de la tâche
+    (task.cancel()) interrompt le job : sous-processus tués, slots Ollama rendus.
+
+    Les jobs identiques simultanés sont regroupés comme dans process_input ; un
+    job partagé n'est interrompu que si tous ses appelants sont annulés.
+
+    Args:
+        client: Client httpx à réutiliser entre les jobs (défaut: un client par job).
+        Autres arguments : voir process_input_formats.
+
+    Returns:
+        Un SummaryResult contenant un résumé par format demandé.
+
+    Raises:
+        ValueError: Si la source est invalide ou si un format est inconnu.
+        StageTimeoutError: Si une étape dépasse son délai.
+        LocalSummError: (et sous-classes) en cas d'échec d'une étape.
+    """
+    _require_httpx()
+    settings = settings or get_default_settings()
+    prompt_templates = validate_request(text_input, file_input, url_input, formats)
+    settings, prompt_templates = focus_on_question(settings, prompt_templates)
+
+    async def run() -> SummaryResult:
+        job_metrics = metrics if metrics is not None else PipelineMetrics()
+        if client is not None:
+            return await _run_job_async(
+                text_input,
+                file_input,
+                url_input,
+                prompt_templates,
+                compression_ratio,
+                job_metrics,
+                client,
+                settings,
+            )
+        async with httpx.AsyncClient(timeout=settings.ollama_timeout) as own_client:
+            return await _run_job_async(
+                text_input,
+                file_input,
+                url_input,
+                prompt_templates,
+                compression_ratio,
+                job_metrics,
+                own_client,
+                settings,
+            )
+
+    if not coalesce:
+        return await run()
+    # Empreinte du fichier (lecture complète) calculée hors de la boucle
+    job_key = await asyncio.to_thread(
+        make_job_key,
+        text_input,
+        file_input,
+        url_input,
+        formats,
+        compression_ratio,
+        settings,
+    )
+    result, shared = await _jobs_in_flight.do(job_key, run)
+    return shared_result(result, metrics) if shared else result
+
+
+async def _run_job_async(
+    text_input: Optional[str],
+    file_input: Optional[Path],
+    url_input: Optional[str],
+    prompt_templates: dict[str, str],
+    compression_ratio: Optional[float],
+    metrics: PipelineMetrics,
+    client: "httpx.AsyncClient",
+    settings: Settings,
+) -> SummaryResult:
+    """Équivalent asynchrone de main._run_job."""
+    deadline = job_deadline(settings)
+    if file_input is not None and await asyncio.to_thread(
+        is_large_text_file, file_input, settings
+    ):
+        return await _run_streaming_job_async(
+            file_input,
+            prompt_templates,
+            compression_ratio,
+            metrics,
+            client,
+            settings,
+            deadline,
+        )
+    text_to_summarize, source_description, transcript = await _acquire_text_async(
+        text_input, file_input, url_input, metrics, settings
+    )
+    if not text_to_summarize or text_to_summarize.isspace():
+        return empty_result(prompt_templates, source_description, metrics)
+
+    try:
+        text_to_summarize, chunks = await asyncio.to_thread(
+            prepare_text,
+            text_to_summarize,
+            compression_ratio,
+            metrics,
+            settings,
+            transcript,
+        )
+        if chunks is not None and settings.question:
+            # Classement (et embeddings éventuels) hors de la boucle d'événements
+            chunks = await asyncio.to_thread(
+                select_question_chunks, chunks, metrics, settings
+            )
+        summaries = await _with_timeout(
+            _summarize_async(
+                text_to_summarize,
+                chunks,
+                prompt_templates,
+                client,
+                metrics,
+                settings,
+                deadline,
+            ),
+            ASYNC_SUMMARY_TIMEOUT,
+            "résumé",
+        )
+        return SummaryResult(
+            summaries=summaries,
+            source_description=source_description,
+            metrics=metrics,
+            transcript=transcript,
+        )
+    except (ValueError, LocalSummError):
+        raise
+    except Exception as e:
+        raise LocalSummError(
+            f"Erreur inattendue lors de la génération du résumé: {e}"
+        ) from e
+
+
+async def _run_streaming_job_async(
+    file_input: Path,
+    prompt_templates: dict[str, str],
+    compression_ratio: Optional[float],
+    metrics: PipelineMetrics,
+    client: "httpx.AsyncClient",
+    settings: Settings,
+    deadline: Optional[float] = None,
+) -> SummaryResult:
+    """Équivalent asynchrone de main._run_streaming_job."""
+    source_description = f"fichier local: {file_input.name}"
+    check_no_window(settings)
+    metrics.set("streamed", True)
+    chunks: Iterator[str] = (
+        iter(
+            await asyncio.to_thread(
+                select_streamed_chunks, file_input, compression_ratio, metrics, settings
+            )
+        )
+        if settings.question
+        else stream_chunks(file_input, compression_ratio, settings)
+    )
+    try:
+        first_chunks = await asyncio.to_thread(list, islice(chunks, 2))
+        if not first_chunks:
+            return empty_result(prompt_templates, source_description, metrics)
+        if len(first_chunks) == 1:
+            summarize = _run_for_formats_async(
+                first_chunks[0],
+                prompt_templates,
+                client,
+                metrics,
+                stage="direct",
+                settings=settings,
+            )
+        else:
+            summarize = _summarize_stream_async(
+                chain(first_chunks, chunks),
+                prompt_templates,
+                client,
+                metrics,
+                settings,
+                deadline,
+            )
+        summaries = await _with_timeout(summarize, ASYNC_SUMMARY_TIMEOUT, "résumé")
+    except (ValueError, LocalSummError):
+        raise
+    except Exception as e:
+        raise LocalSummError(
+            f"Erreur inattendue lors de la génération du résumé: {e}"
+        ) from e
+    return SummaryResult(
+        summaries=summaries, source_description=source_description, metrics=metrics
+    )
+
+
+async def process_input_async(
+    *,
+    text_input: Optional[str] = None,
+    file_input: Optional[Path] = None,
+    url_input: Optional[str] = None,
+    detailed: bool = False,
+    compression_ratio: Optional[float] = None,
+    metrics: Optional[PipelineMetrics] = None,
+    client: Optional["httpx.AsyncClient"] = None,
+    settings: Optional[Settings] = None,
+    coalesce: bool = True,
+) -> str:
+    """
+    Version asynchrone de process_input (voir process_input_formats_async).
+
+    Returns:
+        Le résumé généré (court ou détaillé).
+    """
+    format_name = "detailed" if detailed else "short"
+    result = await process_input_formats_async(
+        text_input=text_input,
+        file_input=file_input,
+        url_input=url_input,
+        formats=(format_name,),
+        compression_ratio=compression_ratio,
+        metrics=metrics,
+        client=client,
+        settings=settings,
+        coalesce=coalesce,
+    )
+    return result.summaries[format_name]
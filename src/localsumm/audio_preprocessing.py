@@ -0,0 +1,284 @@
+# src/localsumm/audio_preprocessing.py
+
+import tempfile
+import wave
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .config import DOWNLOAD_DIR
+from .exceptions import ConfigurationError, FileProcessingError
+from .settings import Settings
+from .utils import _convert_audio_to_wav_mono16k
+
+# from loguru import logger
+
+# Durée d'une trame d'analyse de l'énergie
+_FRAME_SECONDS: float = 0.03
+# Trames lues par bloc (≈ 30 s) : la mémoire reste bornée quelle que soit la durée
+_BLOCK_FRAMES: int = 1000
+# Marge conservée de chaque côté d'un silence supprimé (évite de couper les mots)
+_SILENCE_KEEP_SECONDS: float = 0.2
+# Plage acceptée par un seul filtre ffmpeg atempo
+_TEMPO_RANGE: tuple[float, float] = (0.5, 2.0)
+
+
+@dataclass
+class TimestampMap:
+    """
+    Correspondance entre les instants de l'audio prétraité et ceux de l'original.
+
+    kept: Plages conservées, (début dans l'audio traité, début dans l'original,
+          durée dans l'audio traité), en secondes, triées.
+    tempo: Accélération appliquée (1 s traitée = tempo s d'original).
+    """
+
+    kept: list[tuple[float, float, float]]
+    tempo: float
+    original_seconds: float
+    removed_seconds: float
+    _starts: list[float] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._starts = [start for start, _, _ in self.kept]
+
+    @property
+    def processed_seconds(self) -> float:
+        return sum(length for _, _, length in self.kept)
+
+    def to_original(self, processed_time: float) -> float:
+        """Instant de l'original correspondant à un instant de l'audio traité."""
+        if not self.kept:
+            return processed_time * self.tempo
+        index = max(0, bisect_right(self._starts, processed_time) - 1)
+        start, original_start, length = self.kept[index]
+        offset = min(max(0.0, processed_time - start), length)
+        return original_start + offset * self.tempo
+
+
+@dataclass
+class PreprocessedAudio:
+    """WAV 16 kHz mono prêt pour Whisper, et sa correspondance avec l'original."""
+
+    path: Path
+    timestamp_map: TimestampMap
+
+
+def _frame_energies_db(wav_file: wave.Wave_read, frame_length: int) -> np.ndarray:
+    """Énergie RMS (dBFS) de chaque trame, calculée bloc par bloc."""
+    energies: list[np.ndarray] = []
+    while True:
+        data = wav_file.readframes(frame_length * _BLOCK_FRAMES)
+        if not data:
+            break
+        samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+        padding = (-len(samples)) % frame_length
+        if padding:
+            samples = np.pad(samples, (0, padding))
+        frames = samples.reshape(-1, frame_length)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        energies.append(20.0 * np.log10(rms + 1e-10))
+    return np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)
+
+
+def _kept_frame_ranges(
+    energies_db: np.ndarray, threshold_db: float, min_frames: int, keep_frames: int
+) -> list[tuple[int, int]]:
+    """Plages de trames [début, fin) à conserver, silences longs retirés."""
+    silent = np.concatenate(([0], (energies_db < threshold_db).astype(np.int8), [0]))
+    edges = np.diff(silent)
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+
+    kept: list[tuple[int, int]] = []
+    position = 0
+    for run_start, run_end in zip(run_starts, run_ends):
+        if run_end - run_start < min_frames:
+            continue
+        cut_start, cut_end = run_start + keep_frames, run_end - keep_frames
+        if cut_start >= cut_end:
+            continue
+        if cut_start > position:
+            kept.append((position, int(cut_start)))
+        position = int(cut_end)
+    if position < len(energies_db):
+        kept.append((position, len(energies_db)))
+    return kept
+
+
+def trim_silence(
+    wav_path: Path,
+    output_path: Path,
+    min_silence_seconds: float,
+    threshold_db: float,
+    tempo: float = 1.0,
+) -> TimestampMap:
+    """
+    Supprime les silences longs d'un WAV PCM 16 bits mono (analyse d'énergie
+    en deux passes, lecture par blocs : adapté aux enregistrements de plusieurs
+    heures).
+
+    Args:
+        wav_path: WAV d'entrée (sortie de la conversion ffmpeg, déjà accéléré
+                  d'un facteur `tempo` le cas échéant).
+        output_path: WAV de sortie, sans les silences.
+        min_silence_seconds: Durée minimale d'un silence pour être supprimé.
+        threshold_db: Énergie (dBFS) sous laquelle une trame est silencieuse.
+        tempo: Accélération déjà appliquée, pour exprimer les instants dans
+               l'original.
+
+    Returns:
+        La correspondance des instants avec l'original.
+
+    Raises:
+        FileProcessingError: Si le fichier n'est pas un WAV PCM 16 bits mono.
+    """
+    try:
+        with wave.open(str(wav_path), "rb") as source:
+            if source.getsampwidth() != 2 or source.getnchannels() != 1:
+                raise FileProcessingError(
+                    "Suppression des silences : WAV PCM 16 bits mono attendu "
+                    f"({wav_path.name})."
+                )
+            rate = source.getframerate()
+            total_samples = source.getnframes()
+            frame_length = max(1, int(rate * _FRAME_SECONDS))
+            energies_db = _frame_energies_db(source, frame_length)
+
+            frame_seconds = frame_length / rate
+            kept_frames = _kept_frame_ranges(
+                energies_db,
+                threshold_db,
+                min_frames=max(1, round(min_silence_seconds / frame_seconds)),
+                keep_frames=round(_SILENCE_KEEP_SECONDS / frame_seconds),
+            )
+
+            kept: list[tuple[float, float, float]] = []
+            processed_samples = 0
+            with wave.open(str(output_path), "wb") as target:
+                target.setparams(source.getparams())
+                for first_frame, end_frame in kept_frames:
+                    first_sample = first_frame * frame_length
+                    end_sample = min(end_frame * frame_length, total_samples)
+                    if end_sample <= first_sample:
+                        continue
+                    kept.append(
+                        (
+                            processed_samples / rate,
+                            first_sample / rate * tempo,
+                            (end_sample - first_sample) / rate,
+                        )
+                    )
+                    source.setpos(first_sample)
+                    remaining = end_sample - first_sample
+                    while remaining > 0:
+                        block = min(remaining, frame_length * _BLOCK_FRAMES)
+                        target.writeframes(source.readframes(block))
+                        remaining -= block
+                    processed_samples += end_sample - first_sample
+    except (wave.Error, EOFError, OSError) as e:
+        raise FileProcessingError(
+            f"Impossible de lire ou d'écrire le WAV {wav_path.name}: {e}"
+        ) from e
+
+    original_seconds = total_samples / rate * tempo
+    return TimestampMap(
+        kept=kept,
+        tempo=tempo,
+        original_seconds=original_seconds,
+        removed_seconds=original_seconds - processed_samples / rate * tempo,
+    )
+
+
+def identity_map(wav_path: Path, tempo: float) -> TimestampMap:
+    """Correspondance d'un WAV seulement accéléré (aucune plage retirée)."""
+    try:
+        with wave.open(str(wav_path), "rb") as wav_file:
+            seconds = wav_file.getnframes() / float(wav_file.getframerate())
+    except (wave.Error, EOFError, OSError) as e:
+        raise FileProcessingError(f"WAV illisible {wav_path.name}: {e}") from e
+    return TimestampMap(
+        kept=[(0.0, 0.0, seconds)],
+        tempo=tempo,
+        original_seconds=seconds * tempo,
+        removed_seconds=0.0,
+    )
+
+
+def preprocessing_enabled(settings: Settings) -> bool:
+    """
+    Vrai si un prétraitement (silences, accélération) est demandé.
+
+    Raises:
+        ConfigurationError: Si le facteur d'accélération est hors plage.
+    """
+    low, high = _TEMPO_RANGE
+    if not low <= settings.audio_tempo <= high:
+        raise ConfigurationError(
+            f"AUDIO_TEMPO doit être compris entre {low} et {high} "
+            f"(valeur: {settings.audio_tempo})."
+        )
+    return settings.silence_trim_enabled or settings.audio_tempo != 1.0
+
+
+def _temp_wav_path(prefix: str) -> Path:
+    with tempfile.NamedTemporaryFile(
+        prefix=prefix, suffix=".wav", delete=False, dir=str(DOWNLOAD_DIR)
+    ) as tmp_file:
+        return Path(tmp_file.name)
+
+
+def finish_preprocessing(converted_wav: Path, settings: Settings) -> PreprocessedAudio:
+    """
+    Étape CPU après la conversion (éventuellement accélérée) : suppression des
+    silences si demandée. Le WAV converti est supprimé s'il est remplacé.
+    """
+    if not settings.silence_trim_enabled:
+        return PreprocessedAudio(
+            converted_wav, identity_map(converted_wav, settings.audio_tempo)
+        )
+    trimmed_wav = _temp_wav_path("trimmed_")
+    try:
+        timestamp_map = trim_silence(
+            converted_wav,
+            trimmed_wav,
+            settings.silence_min_seconds,
+            settings.silence_threshold_db,
+            tempo=settings.audio_tempo,
+        )
+    except BaseException:
+        trimmed_wav.unlink(missing_ok=True)
+        raise
+    finally:
+        converted_wav.unlink(missing_ok=True)
+    # logger.info(f"Silences supprimés : {timestamp_map.removed_seconds:.1f}s")
+    return PreprocessedAudio(trimmed_wav, timestamp_map)
+
+
+def preprocess_audio(
+    audio_path: Path, settings: Settings
+) -> Optional[PreprocessedAudio]:
+    """
+    Prépare l'audio avant transcription : conversion WAV 16 kHz mono accélérée
+    (AUDIO_TEMPO), puis suppression des silences longs (SILENCE_TRIM_ENABLED).
+
+    Returns:
+        Le WAV prétraité (fichier temporaire à supprimer par l'appelant) et sa
+        correspondance avec l'original, ou None si aucun prétraitement n'est demandé.
+
+    Raises:
+        ConfigurationError: Si AUDIO_TEMPO est hors plage.
+        FileProcessingError: Si la conversion ou l'analyse échoue.
+    """
+    if not preprocessing_enabled(settings):
+        return None
+    converted_wav = _temp_wav_path("preprocessed_")
+    try:
+        _convert_audio_to_wav_mono16k(audio_path, converted_wav, settings.audio_tempo)
+    except BaseException:
+        converted_wav.unlink(missing_ok=True)
+        raise
+    return finish_preprocessing(converted_wav, settings)
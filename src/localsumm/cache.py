@@ -0,0 +1,72 @@
+# src/localsumm/cache.py
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+from .config import CACHE_DIR
+
+# from loguru import logger
+
+
+def make_cache_key(*parts: str) -> str:
+    """
+    Construit une clé de cache stable (SHA-256) à partir de plusieurs éléments.
+
+    Les éléments sont séparés par un octet nul pour éviter les collisions du type
+    ("ab", "c") / ("a", "bc").
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    Petit cache clé -> valeur JSON persistant sur disque (un fichier par clé).
+
+    Les écritures sont atomiques (fichier temporaire puis os.replace), ce qui permet
+    à plusieurs processus de partager le même dossier sans verrou.
+    """
+
+    def __init__(self, namespace: str, base_dir: Optional[Path] = None) -> None:
+        self.directory: Path = (base_dir or CACHE_DIR) / namespace
+
+    def _path_for(self, key: str) -> Path:
+        # Sous-dossier sur 2 caractères pour éviter des dossiers trop volumineux
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retourne la valeur associée à la clé, ou None si absente/illisible."""
+        path = self._path_for(key)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                return json.load(f)["value"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError):
+            # logger.warning(f"Entrée de cache corrompue ignorée : {path}")
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Enregistre une valeur (sérialisable en JSON). Les erreurs d'E/S sont
+        ignorées.
+        """
+        path = self._path_for(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=str(path.parent), delete=False
+            ) as tmp:
+                json.dump({"value": value}, tmp, ensure_ascii=False)
+                tmp_path = tmp.name
+            os.replace(tmp_path, path)
+        except OSError:
+            # logger.warning(f"Impossible d'écrire l'entrée de cache {path}")
+            pass
@@ -2,15 +2,25 @@
 
 import pathlib
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import Annotated, Optional
 
 import typer
 from rich.console import Console  # Pour afficher des erreurs formatées
+from rich.status import Status
 
-from .exceptions import LocalSummError
+from .config import PROMPT_TEMPLATES
+from .exceptions import LocalSummError, OllamaError
+from .llm_interaction import warmup_ollama_model
 
 # Importer la fonction principale et les exceptions
-from .main import process_input
+from .main import SummaryResult, process_input_formats
+from .media_window import parse_timestamp
+from .metrics import PipelineMetrics
+from .progress import FRAGMENT, MAP, PREVIEW, ProgressEvent
+from .settings import Settings, get_default_settings
+from .text_reader import spool_stdin
 
 try:
     from . import __version__
@@ -34,6 +44,147 @@ def version_callback(value: bool) -> None:
         raise typer.Exit()
 
 
+def _print_metrics(metrics: PipelineMetrics) -> None:
+    """Affiche les mesures collectées pendant le traitement."""
+    data = metrics.as_dict()
+    console.print("\n📊 [bold]Mesures[/]")
+    for key, value in data["values"].items():
+        console.print(f"  {key} : {value}")
+    for stage, seconds in data["timings"].items():
+        console.print(f"  durée {stage} : {seconds:.2f}s")
+    # Débit de l'étape MAP (comparaison des modèles de la cascade)
+    map_tokens = data["values"].get("map_prompt_eval_tokens", 0) + data["values"].get(
+        "map_eval_tokens", 0
+    )
+    if map_tokens and data["timings"].get("map"):
+        console.print(
+            f"  débit map : {map_tokens / data['timings']['map']:.0f} tokens/s"
+        )
+
+
+def _with_window(
+    settings: Settings,
+    start: Optional[str],
+    end: Optional[str],
+    chapter: Optional[str],
+) -> Settings:
+    """Applique --start / --end / --chapter aux paramètres du job."""
+    try:
+        return settings.replace(
+            media_start=parse_timestamp(start) if start else 0.0,
+            media_end=parse_timestamp(end) if end else None,
+            media_chapter=chapter or None,
+        )
+    except ValueError as e:
+        print(f"Erreur : {e}")
+        raise typer.Exit(code=1) from e
+
+
+def _with_question(
+    settings: Settings, question: Optional[str], top_k: Optional[int]
+) -> Settings:
+    """Applique --question / --top-k aux paramètres du job."""
+    if question and question.strip():
+        settings = settings.replace(question=question.strip())
+    if top_k is not None:
+        settings = settings.replace(question_top_k=top_k)
+    return settings
+
+
+def _summary_title(settings: Settings, format_name: Optional[str]) -> str:
+    """Bandeau d'un résumé final (format_name : None si un seul format demandé)."""
+    label = " Réponse" if settings.question else " Résumé"
+    title = f"{label} " if format_name is None else f"{label} ({format_name}) "
+    return "\n" + "=" * 10 + title + "=" * 10
+
+
+def _print_summaries(
+    summaries: dict[str, str],
+    settings: Settings,
+    several_formats: bool,
+    streamed: set[str],
+) -> None:
+    """Affiche les résumés finaux (ceux déjà affichés en flux sont seulement clos)."""
+    for format_name, summary in summaries.items():
+        if format_name in streamed:
+            console.print("\n" + "=" * 37)
+            continue
+        console.print(
+            _summary_title(settings, format_name if several_formats else None)
+        )
+        console.print(summary)
+        console.print("=" * 37)
+
+
+class _LiveProgress:
+    """
+    Affiche les résultats intermédiaires au fil du traitement (--live) : aperçu
+    extractif, résumés partiels (MAP), puis résumé final en flux.
+
+    Un seul format est affiché en flux (stream_format) ; avec plusieurs formats,
+    les résumés finaux sont affichés à la fin, comme sans --live.
+    """
+
+    def __init__(
+        self, status: Status, settings: Settings, stream_format: Optional[str]
+    ) -> None:
+        self.status: Status = status
+        self.settings: Settings = settings
+        self.stream_format: Optional[str] = stream_format
+        self.streamed: set[str] = set()
+        self.map_done: int = 0
+
+    def __call__(self, event: ProgressEvent) -> None:
+        if event.kind == PREVIEW:
+            console.print("\n👀 [bold]Aperçu (extraits du texte source)[/]")
+            console.print(event.text, markup=False, highlight=False)
+        elif event.kind == MAP:
+            self.map_done += 1
+            self.status.update(f"🔄 Résumés partiels : {self.map_done} terminé(s)...")
+            console.print(
+                f"\n[dim]• Partie {(event.index or 0) + 1}/{event.total} :[/]"
+            )
+            console.print(event.text, style="dim", markup=False, highlight=False)
+        elif event.kind == FRAGMENT and event.format_name == self.stream_format:
+            if event.format_name not in self.streamed:
+                # Le spinner réécrit sa ligne : il est arrêté avant le flux
+                self.status.stop()
+                console.print(_summary_title(self.settings, None))
+                self.streamed.add(event.format_name or "")
+            console.print(event.text, end="", markup=False, highlight=False)
+
+
+@contextmanager
+def _stdin_as_file(
+    text_input: Optional[str], file_input: Optional[pathlib.Path]
+) -> Iterator[tuple[Optional[str], Optional[pathlib.Path]]]:
+    """
+    '--text -' : l'entrée standard est copiée dans un fichier temporaire, traité
+    comme un fichier texte (lecture en flux s'il est volumineux), puis supprimé.
+    """
+    if text_input != "-":
+        yield text_input, file_input
+        return
+    spooled = spool_stdin()
+    try:
+        yield None, spooled
+    finally:
+        spooled.unlink(missing_ok=True)
+
+
+def _save_transcript(result: SummaryResult, path: Optional[pathlib.Path]) -> None:
+    """Enregistre la transcription horodatée du résultat (--save-transcript)."""
+    if path is None:
+        return
+    if result.transcript is None:
+        console.print(
+            "⚠️ Aucune transcription à enregistrer (la source n'est pas audio/vidéo)."
+        )
+        return
+    result.transcript.save(path)
+    console.print(f"💾 Transcription enregistrée : {path}")
+
+
 # Fonction principale (anciennement la commande 'summarize')
 # Elle est maintenant attachée au callback principal de l'application
 @app.callback()
@@ -45,7 +196,8 @@ def main(
         typer.Option(
             "--text",
             "-t",
-            help="Texte direct à résumer (alternative à --file ou --url).",
+            help="Texte direct à résumer (alternative à --file ou --url). "
+            "'-' lit le texte sur l'entrée standard.",
         ),
     ] = None,
     file_input: Annotated[
@@ -62,7 +214,12 @@ def main(
         ),
     ] = None,
     url_input: Annotated[
-        Optional[str], typer.Option("--url", "-u", help="URL YouTube à résumer.")
+        Optional[str],
+        typer.Option(
+            "--url",
+            "-u",
+            help="URL YouTube, ou lien direct HTTP(S) vers un fichier audio/vidéo.",
+        ),
     ] = None,
     # --- Options de sortie ---
     detailed: Annotated[
@@ -73,6 +230,102 @@ def main(
             help="Génère un résumé détaillé (points clés) au lieu d'un résumé court.",
         ),
     ] = False,
+    formats: Annotated[
+        Optional[str],
+        typer.Option(
+            "--formats",
+            help="Formats à produire en une seule passe, séparés par des virgules "
+            "(ex: 'short,detailed'). Remplace --detailed.",
+        ),
+    ] = None,
+    compress: Annotated[
+        Optional[float],
+        typer.Option(
+            "--compress",
+            "-c",
+            min=0.0,
+            max=1.0,
+            help="Pré-compression extractive : fraction du texte conservée avant le "
+            "LLM (ex: 0.4). 0 désactive toute pré-compression, y compris le "
+            "budget EXTRACTIVE_MAX_TOKENS.",
+        ),
+    ] = None,
+    deadline: Annotated[
+        Optional[float],
+        typer.Option(
+            "--deadline",
+            min=0.0,
+            help="Délai cible de transcription en secondes : le modèle Whisper et le "
+            "décodage sont choisis selon la durée du média (0 = modèle configuré).",
+        ),
+    ] = None,
+    start: Annotated[
+        Optional[str],
+        typer.Option(
+            "--start",
+            help="Début de la portion à traiter (SS, MM:SS ou HH:MM:SS), pour un "
+            "média (--file) ou une URL : seule cette portion est téléchargée et "
+            "transcrite.",
+        ),
+    ] = None,
+    end: Annotated[
+        Optional[str],
+        typer.Option(
+            "--end", help="Fin de la portion à traiter (SS, MM:SS ou HH:MM:SS)."
+        ),
+    ] = None,
+    chapter: Annotated[
+        Optional[str],
+        typer.Option(
+            "--chapter",
+            help="Titre (ou partie du titre) du chapitre à traiter, d'après les "
+            "métadonnées du média ou de la vidéo.",
+        ),
+    ] = None,
+    question: Annotated[
+        Optional[str],
+        typer.Option(
+            "--question",
+            "-q",
+            help="Question posée sur la source (ex: 'Qu'a-t-on décidé pour le "
+            "budget ?') : seuls les passages les plus pertinents passent par le "
+            "LLM, qui y répond au lieu de résumer.",
+        ),
+    ] = None,
+    top_k: Annotated[
+        Optional[int],
+        typer.Option(
+            "--top-k",
+            min=1,
+            help="Nombre de passages retenus pour --question (défaut: QUESTION_TOP_K).",
+        ),
+    ] = None,
+    save_transcript: Annotated[
+        Optional[pathlib.Path],
+        typer.Option(
+            "--save-transcript",
+            help="Enregistre la transcription horodatée (audio/vidéo) dans ce "
+            "fichier, ex: 'cours.transcript.jsonl.gz' (réutilisable avec --file).",
+            dir_okay=False,
+            resolve_path=True,
+        ),
+    ] = None,
+    live: Annotated[
+        bool,
+        typer.Option(
+            "--live/--no-live",
+            help="Affiche les résultats intermédiaires au fil du traitement : aperçu "
+            "extractif, résumés partiels, puis résumé final en flux.",
+        ),
+    ] = True,
+    stats: Annotated[
+        bool,
+        typer.Option(
+            "--stats",
+            help="Affiche les mesures du traitement (durées par étape, chunks, "
+            "déduplication...).",
+        ),
+    ] = False,
     # --- Option Version (doit être dans le callback principal) ---
     version: Optional[bool] = typer.Option(
         None,
@@ -113,28 +366,62 @@ def main(
         )
         raise typer.Exit(code=1)
 
+    requested_formats: list[str] = (
+        [name.strip() for name in formats.split(",") if name.strip()]
+        if formats
+        else ["detailed" if detailed else "short"]
+    )
+    unknown_formats = [
+        name for name in requested_formats if name not in PROMPT_TEMPLATES
+    ]
+    if not requested_formats or unknown_formats:
+        unknown = ", ".join(unknown_formats) or "(aucun)"
+        print(
+            f"Erreur : Format(s) inconnu(s) : {unknown}. "
+            f"Formats disponibles : {', '.join(PROMPT_TEMPLATES)}."
+        )
+        raise typer.Exit(code=1)
+
     console.print("🚀 [bold green]Démarrage de LocalSumm...[/]")
-    summary: str = ""
+    summaries: dict[str, str] = {}
     exit_code: int = 0
+    metrics = PipelineMetrics()
+    settings = get_default_settings()
+    if deadline is not None:
+        settings = settings.replace(transcription_deadline=deadline)
+    settings = _with_window(settings, start, end, chapter)
+    settings = _with_question(settings, question, top_k)
 
     # rich.spinner.Spinner("Traitement en cours..."): # Pour un indicateur visuel
 
     try:
-        with console.status(
-            "🔄 Résumé en cours...", spinner="dots", spinner_style="bold green"
-        ):
-            summary = process_input(
-                text_input=text_input,
-                file_input=file_input,
-                url_input=url_input,
-                detailed=detailed,
-                # Si on ajoutait le choix du backend :
-                # transcriber_backend=transcriber_backend
-            )
+        with _stdin_as_file(text_input, file_input) as (job_text, job_file):
+            with console.status(
+                "🔄 Résumé en cours...", spinner="dots", spinner_style="bold green"
+            ) as status:
+                progress = _LiveProgress(
+                    status,
+                    settings,
+                    requested_formats[0] if formats is None else None,
+                )
+                result = process_input_formats(
+                    text_input=job_text,
+                    file_input=job_file,
+                    url_input=url_input,
+                    formats=requested_formats,
+                    compression_ratio=compress,
+                    metrics=metrics,
+                    settings=settings,
+                    on_event=progress if live else None,
+                    # Si on ajoutait le choix du backend :
+                    # transcriber_backend=transcriber_backend
+                )
+                summaries = result.summaries
 
-        console.print("\n" + "=" * 10 + " Résumé " + "=" * 10)
-        console.print(summary)
-        console.print("=" * 37)
+        _print_summaries(summaries, settings, formats is not None, progress.streamed)
+        _save_transcript(result, save_transcript)
+        if stats:
+            _print_metrics(metrics)
         console.print("✅ Terminé !")
 
     except LocalSummError as e:
@@ -154,4 +441,32 @@ def main(
             raise typer.Exit(code=exit_code)
 
 
+@app.command("warmup")
+def warmup(
+    model: Annotated[
+        Optional[str],
+        typer.Option(
+            "--model",
+            "-m",
+            help="Modèle Ollama à précharger (défaut: les modèles de chaque étape).",
+        ),
+    ] = None,
+) -> None:
+    """
+    Précharge le modèle Ollama et le garde en mémoire (OLLAMA_KEEP_ALIVE).
+    Utile au démarrage d'un serveur ou dans une tâche cron.
+    """
+    try:
+        with console.status("🔥 Préchargement du modèle...", spinner="dots"):
+            if model:
+                warmup_ollama_model(model)
+            else:
+                for stage_settings in get_default_settings().stage_settings():
+                    warmup_ollama_model(settings=stage_settings)
+        console.print("✅ Modèle chargé et maintenu en mémoire.")
+    except OllamaError as e:
+        error_console.print(f"\nErreur de l'application : {e}")
+        raise typer.Exit(code=1) from e
+
+
 # Pas besoin de if __name__ == "__main__": app() ici, car c'est géré par le point d'entrée
@@ -9,17 +9,74 @@ from dotenv import load_dotenv
 # Charger les variables d'environnement (.env)
 load_dotenv()
 
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Lit un booléen depuis l'environnement ('1', 'true', 'yes' -> True)."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 # --- Configuration Ollama ---
+# Backend LLM : 'ollama' (API native) ou 'openai' (API compatible OpenAI :
+# serveur de llama.cpp, vLLM...). Les serveurs sont ceux de OLLAMA_BASE_URLS.
+LLM_BACKEND: str = os.getenv("LLM_BACKEND", "ollama").strip().lower()
+# Clé envoyée en 'Authorization: Bearer' au backend 'openai' (vide = aucune)
+LLM_API_KEY: str = os.getenv("LLM_API_KEY", "")
 OLLAMA_BASE_URL: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 # Défaut : mistral, surchargeable via .env
 OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "mistral:7b-instruct")
 OLLAMA_API_GENERATE_URL: str = f"{OLLAMA_BASE_URL}/api/generate"
+OLLAMA_API_CHAT_URL: str = f"{OLLAMA_BASE_URL}/api/chat"
+# 'chat' : instruction en message système (préfixe stable, réutilisé par le cache
+# KV d'Ollama d'un chunk à l'autre) ; 'generate' : prompt brut (ancien comportement)
+OLLAMA_API_MODE: str = os.getenv("OLLAMA_API_MODE", "chat")
 OLLAMA_TIMEOUT: int = 300
+# Durée pendant laquelle Ollama garde le modèle chargé après une requête
+# (ex: "30m", "2h", "-1" = indéfiniment, "0" = déchargement immédiat)
+OLLAMA_KEEP_ALIVE: str = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# Précharger le modèle en arrière-plan pendant le téléchargement/la transcription
+OLLAMA_WARMUP_ENABLED: bool = _env_flag("OLLAMA_WARMUP_ENABLED", True)
+
+# -- Plusieurs serveurs Ollama (répartition de charge) --
+# Liste séparée par des virgules ; défaut : OLLAMA_BASE_URL seul
+OLLAMA_BASE_URLS: list[str] = [
+    url.strip()
+    for url in os.getenv("OLLAMA_BASE_URLS", OLLAMA_BASE_URL).split(",")
+    if url.strip()
+]
+# Requêtes simultanées admises par serveur (cf. OLLAMA_NUM_PARALLEL côté serveur)
+OLLAMA_MAX_CONCURRENCY_PER_ENDPOINT: int = int(
+    os.getenv("OLLAMA_MAX_CONCURRENCY_PER_ENDPOINT", "1")
+)
+# Intervalle (secondes) entre deux sondes de santé d'un serveur
+OLLAMA_HEALTH_CHECK_INTERVAL: float = float(
+    os.getenv("OLLAMA_HEALTH_CHECK_INTERVAL", "30")
+)
+# "Hedging" : relancer un appel MAP lent sur un autre serveur après le percentile
+# de latence OLLAMA_HEDGE_PERCENTILE (calculé sur au moins MIN_SAMPLES mesures)
+OLLAMA_HEDGE_ENABLED: bool = _env_flag("OLLAMA_HEDGE_ENABLED", False)
+OLLAMA_HEDGE_PERCENTILE: float = float(os.getenv("OLLAMA_HEDGE_PERCENTILE", "95"))
+OLLAMA_HEDGE_MIN_SAMPLES: int = int(os.getenv("OLLAMA_HEDGE_MIN_SAMPLES", "5"))
 
 # --- Configuration Chemins ---
 BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
 DOWNLOAD_DIR: Path = BASE_DIR / "downloads"
 DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+# Cache disque (résumés intermédiaires, etc.), réutilisé d'un job à l'autre
+CACHE_DIR: Path = Path(os.getenv("LOCALSUMM_CACHE_DIR", str(BASE_DIR / "cache")))
+
+# --- Médias distants (--url vers un fichier audio/vidéo, hors YouTube) ---
+# Le flux HTTP(S) est décodé par ffmpeg au fil du téléchargement. Sur coupure de
+# connexion, la lecture reprend à l'octet près (en-tête Range), au plus
+# REMOTE_MEDIA_MAX_RETRIES fois de suite sans progression, après
+# REMOTE_MEDIA_RETRY_BACKOFF secondes (doublées à chaque tentative).
+REMOTE_MEDIA_TIMEOUT: float = float(os.getenv("REMOTE_MEDIA_TIMEOUT", "30"))
+REMOTE_MEDIA_MAX_RETRIES: int = int(os.getenv("REMOTE_MEDIA_MAX_RETRIES", "5"))
+REMOTE_MEDIA_RETRY_BACKOFF: float = float(
+    os.getenv("REMOTE_MEDIA_RETRY_BACKOFF", "1.0")
+)
 
 # --- Configuration Whisper (Général et Backends) ---
 
@@ -40,16 +97,143 @@ WHISPER_CPP_EXECUTABLE_PATH: Optional[str] = os.getenv("WHISPER_CPP_EXECUTABLE_P
 WHISPER_CPP_MODEL_PATH: Optional[str] = os.getenv("WHISPER_CPP_MODEL_PATH")
 WHISPER_CPP_LANGUAGE: str = os.getenv("WHISPER_CPP_LANGUAGE", "auto")
 WHISPER_CPP_THREADS: str = os.getenv("WHISPER_CPP_THREADS", "4")
+# Taille du faisceau de décodage (5 = beam search précis, 1 = glouton, plus rapide)
+WHISPER_BEAM_SIZE: int = int(os.getenv("WHISPER_BEAM_SIZE", "5"))
+
+# -- Prétraitement audio avant transcription --
+# Supprimer les silences plus longs que SILENCE_MIN_SECONDS (énergie sous
+# SILENCE_THRESHOLD_DB, en dBFS) ; une marge est conservée de part et d'autre.
+SILENCE_TRIM_ENABLED: bool = _env_flag("SILENCE_TRIM_ENABLED", False)
+SILENCE_MIN_SECONDS: float = float(os.getenv("SILENCE_MIN_SECONDS", "1.0"))
+SILENCE_THRESHOLD_DB: float = float(os.getenv("SILENCE_THRESHOLD_DB", "-40"))
+# Accélération de l'audio (filtre ffmpeg atempo, entre 0.5 et 2.0). 1.0 = désactivé.
+AUDIO_TEMPO: float = float(os.getenv("AUDIO_TEMPO", "1.0"))
+# Empreintes audio : un enregistrement déjà transcrit (même réencodé, dans un
+# autre conteneur, ou seulement en partie) reprend la transcription mémorisée.
+# Seuil : part des paires de pics spectraux retrouvées dans la zone commune ;
+# zone commune d'au moins FINGERPRINT_MIN_OVERLAP secondes.
+FINGERPRINT_ENABLED: bool = _env_flag("FINGERPRINT_ENABLED", False)
+FINGERPRINT_MATCH_THRESHOLD: float = float(
+    os.getenv("FINGERPRINT_MATCH_THRESHOLD", "0.1")
+)
+FINGERPRINT_MIN_OVERLAP: float = float(os.getenv("FINGERPRINT_MIN_OVERLAP", "30"))
+# Taille de l'index : au-delà de FINGERPRINT_INDEX_MAX_ENTRIES entrées ou de
+# FINGERPRINT_INDEX_MAX_BYTES octets sur disque, les entrées les plus anciennes
+# sont supprimées (0 = pas de limite).
+FINGERPRINT_INDEX_MAX_ENTRIES: int = int(
+    os.getenv("FINGERPRINT_INDEX_MAX_ENTRIES", "1000")
+)
+FINGERPRINT_INDEX_MAX_BYTES: int = int(
+    os.getenv("FINGERPRINT_INDEX_MAX_BYTES", str(512 * 1024 * 1024))
+)
+
+# -- Choix du modèle selon la durée du média et le délai cible --
+# Délai cible de transcription en secondes (0 = modèle configuré, toujours).
+# Sinon, le plus grand modèle (au plus celui configuré) qui tient dans le délai.
+TRANSCRIPTION_DEADLINE: float = float(os.getenv("TRANSCRIPTION_DEADLINE", "0"))
+# Facteurs temps réel (temps de calcul / durée audio) supposés par modèle, tant
+# qu'aucune mesure n'a été faite sur cette machine (format "modèle:rtf,...")
+WHISPER_RTF_DEFAULTS: dict[str, float] = {
+    name.strip(): float(rtf)
+    for name, rtf in (
+        item.split(":")
+        for item in os.getenv(
+            "WHISPER_RTF_DEFAULTS",
+            "tiny:0.04,base:0.07,small:0.15,medium:0.4,large:0.8",
+        ).split(",")
+        if ":" in item
+    )
+}
+
+# --- Ordonnancement des Ressources de la Machine ---
+# Budget total de threads CPU partagé par whisper, ffmpeg et un Ollama local
+# (0 = nombre de cœurs). Chaque étape réserve ses threads avant de démarrer.
+HOST_CPU_THREADS: int = int(os.getenv("HOST_CPU_THREADS", "0")) or os.cpu_count() or 4
+HOST_SCHEDULER_ENABLED: bool = _env_flag("HOST_SCHEDULER_ENABLED", True)
+# Threads de décodage ffmpeg (option -threads)
+FFMPEG_THREADS: int = int(os.getenv("FFMPEG_THREADS", "2"))
+# Threads d'un Ollama local par requête, envoyés en option 'num_thread'.
+# 0 = laissé au choix d'Ollama (compté comme HOST_CPU_THREADS // 2).
+OLLAMA_NUM_THREAD: int = int(os.getenv("OLLAMA_NUM_THREAD", "0"))
 
 # --- Configuration Chunking (Textes Longs) ---
-LLM_MAX_CONTEXT_TOKENS: int = 8192  # Fenêtre Llama3/Mistral standard
+# Fenêtre de contexte (Llama3/Mistral standard), envoyée à Ollama en 'num_ctx'
+LLM_MAX_CONTEXT_TOKENS: int = int(os.getenv("LLM_MAX_CONTEXT_TOKENS", "8192"))
 # Taille cible des chunks en tokens, laissant marge pour prompt/réponse (~75%)
 CHUNK_TARGET_TOKENS: int = int(
     os.getenv("CHUNK_TARGET_TOKENS", str(int(LLM_MAX_CONTEXT_TOKENS * 0.75)))
 )
 # Chevauchement des tokens entre chunks
 CHUNK_OVERLAP_TOKENS: int = int(os.getenv("CHUNK_OVERLAP_TOKENS", "200"))
+# Stratégie de découpage : 'recursive' (budgets fixes) ou 'content-defined'
+# (frontières choisies par hash glissant -> chunks stables entre deux versions)
+CHUNKING_STRATEGY: str = os.getenv("CHUNKING_STRATEGY", "recursive")
+# Bornes (en tokens) du découpage 'content-defined'. Le max est la taille des chunks.
+# 0 = proportionnel à cette taille (max // 4 et max // 2).
+CDC_MIN_TOKENS: int = int(os.getenv("CDC_MIN_TOKENS", "0"))
+CDC_AVG_TOKENS: int = int(os.getenv("CDC_AVG_TOKENS", "0"))
+# Réutiliser les résumés MAP déjà calculés pour des chunks identiques
+MAP_CACHE_ENABLED: bool = _env_flag("MAP_CACHE_ENABLED", True)
+# Appels MAP simultanés. 0 = capacité totale des serveurs Ollama configurés.
+MAP_CONCURRENCY: int = int(os.getenv("MAP_CONCURRENCY", "0"))
+# Regrouper les chunks quasi identiques avant l'étape MAP (un seul appel par groupe)
+DEDUP_ENABLED: bool = _env_flag("DEDUP_ENABLED", True)
+# Similarité de Jaccard (estimée par MinHash) à partir de laquelle on fusionne
+DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+# Fichiers texte d'au moins cette taille (octets) : lecture et découpage en flux,
+# étape MAP par lots de STREAM_MAP_BATCH_CHUNKS chunks (mémoire bornée). 0 = jamais.
+TEXT_STREAM_MIN_BYTES: int = int(
+    os.getenv("TEXT_STREAM_MIN_BYTES", str(16 * 1024 * 1024))
+)
+STREAM_MAP_BATCH_CHUNKS: int = int(os.getenv("STREAM_MAP_BATCH_CHUNKS", "32"))
+# Chunk MAP en échec : nouvelles tentatives, délai initial (secondes, doublé à
+# chaque tentative). Après MAP_SPLIT_AFTER_TIMEOUTS délais dépassés, le chunk est
+# coupé en deux moitiés résumées séparément (au plus MAP_SPLIT_MAX_DEPTH fois).
+MAP_MAX_RETRIES: int = int(os.getenv("MAP_MAX_RETRIES", "2"))
+MAP_RETRY_BACKOFF: float = float(os.getenv("MAP_RETRY_BACKOFF", "2"))
+MAP_SPLIT_AFTER_TIMEOUTS: int = int(os.getenv("MAP_SPLIT_AFTER_TIMEOUTS", "2"))
+MAP_SPLIT_MAX_DEPTH: int = int(os.getenv("MAP_SPLIT_MAX_DEPTH", "2"))
+# Fraction maximale des chunks MAP en échec (omis du REDUCE) avant d'abandonner le job
+MAP_ERROR_BUDGET: float = float(os.getenv("MAP_ERROR_BUDGET", "0.25"))
+# Délai du job (secondes, 0 = illimité) : passé ce délai, les chunks restants ne
+# sont plus résumés et le résumé final est produit à partir des chunks terminés.
+JOB_DEADLINE: float = float(os.getenv("JOB_DEADLINE", "0"))
+
+# --- Pipeline Asynchrone (process_input_async) ---
+# Délai maximal de chaque étape, en secondes (0 = illimité). L'étape est annulée
+# (sous-processus ffmpeg/whisper.cpp tués) à l'expiration.
+ASYNC_DOWNLOAD_TIMEOUT: float = float(os.getenv("ASYNC_DOWNLOAD_TIMEOUT", "900"))
+ASYNC_TRANSCRIPTION_TIMEOUT: float = float(
+    os.getenv("ASYNC_TRANSCRIPTION_TIMEOUT", "3600")
+)
+ASYNC_SUMMARY_TIMEOUT: float = float(os.getenv("ASYNC_SUMMARY_TIMEOUT", "1800"))
+
+# --- Pré-compression Extractive (avant le LLM) ---
+# Fraction des tokens source conservée (ex: 0.4). 0 = désactivé.
+EXTRACTIVE_RATIO: float = float(os.getenv("EXTRACTIVE_RATIO", "0"))
+# Budget maximal de tokens après pré-compression. 0 = pas de budget.
+EXTRACTIVE_MAX_TOKENS: int = int(os.getenv("EXTRACTIVE_MAX_TOKENS", "0"))
+# Aperçu extractif émis avant l'étape MAP (résultats progressifs), en tokens
+PREVIEW_MAX_TOKENS: int = int(os.getenv("PREVIEW_MAX_TOKENS", "200"))
 
+# --- Budgets de Génération (num_predict) ---
+# MAP : sortie plafonnée à une fraction de la taille du chunk, entre MIN et MAX.
+# Borne le temps de décodage de chaque chunk ET la taille d'entrée du REDUCE.
+MAP_OUTPUT_RATIO: float = float(os.getenv("MAP_OUTPUT_RATIO", "0.1"))
+MAP_MIN_OUTPUT_TOKENS: int = int(os.getenv("MAP_MIN_OUTPUT_TOKENS", "96"))
+MAP_MAX_OUTPUT_TOKENS: int = int(os.getenv("MAP_MAX_OUTPUT_TOKENS", "384"))
+# Résumé final, par format (cf. PROMPT_TEMPLATES)
+FINAL_OUTPUT_TOKENS: dict[str, int] = {
+    "short": int(os.getenv("SHORT_MAX_OUTPUT_TOKENS", "256")),
+    "detailed": int(os.getenv("DETAILED_MAX_OUTPUT_TOKENS", "1024")),
+}
+# Séquences d'arrêt : le modèle ne doit pas enchaîner sur un nouveau tour de dialogue
+# (séparées par '|', '\n' littéral accepté dans le .env)
+LLM_STOP_SEQUENCES: list[str] = [
+    stop.replace("\\n", "\n")
+    for stop in os.getenv("LLM_STOP_SEQUENCES", "\\nUSER:|\\nSYSTEM:").split("|")
+    if stop
+]
 
 # --- Configuration Prompts LLM ---
 PROMPT_TEMPLATE_SHORT: str = """
@@ -64,12 +248,128 @@ USER: Voici le texte :
 {text}
 ASSISTANT:"""
 
-# Prompt pour l'étape "Map" du Map-Reduce
+# Formats de résumé disponibles (nom -> template final), cf. --formats
+PROMPT_TEMPLATES: dict[str, str] = {
+    "short": PROMPT_TEMPLATE_SHORT,
+    "detailed": PROMPT_TEMPLATE_DETAILED,
+}
+
+# Prompt pour l'étape "Map" du Map-Reduce.
+# Tous les templates gardent l'instruction (SYSTEM) avant le texte : en mode 'chat'
+# elle est envoyée comme message système, préfixe identique pour tous les chunks.
 PROMPT_TEMPLATE_MAP: str = os.getenv(
     "PROMPT_TEMPLATE_MAP",
-    """Résume CONCISEMENT le morceau de texte suivant en FRANÇAIS, en extrayant uniquement les informations et points clés essentiels. Ne fais pas d'introduction ou de conclusion, juste les faits clés du morceau. TEXTE DU MORCEAU : \n\n{text}\n\nRÉSUMÉ CONCIS DES POINTS CLÉS DU MORCEAU :""",
+    """
+SYSTEM: Résume CONCISEMENT le morceau de texte fourni en FRANÇAIS, en extrayant \
+uniquement les informations et points clés essentiels. Ne fais pas d'introduction \
+ou de conclusion, juste les faits clés du morceau.
+USER: TEXTE DU MORCEAU :
+
+{text}
+
+RÉSUMÉ CONCIS DES POINTS CLÉS DU MORCEAU :
+ASSISTANT:""",
 )
 
+# --- Sorties MAP structurées ---
+# 'prose' (PROMPT_TEMPLATE_MAP), 'bullets' ou 'json' : en mode structuré, chaque
+# résumé MAP est une liste de points clés, normalisés puis fusionnés d'un chunk à
+# l'autre (points quasi identiques, dus notamment au chevauchement des chunks)
+# avant le REDUCE.
+MAP_OUTPUT_FORMAT: str = os.getenv("MAP_OUTPUT_FORMAT", "prose")
+# Similarité de Jaccard (mots) à partir de laquelle deux points sont fusionnés
+POINT_DEDUP_THRESHOLD: float = float(os.getenv("POINT_DEDUP_THRESHOLD", "0.6"))
+
+PROMPT_TEMPLATE_MAP_BULLETS: str = os.getenv(
+    "PROMPT_TEMPLATE_MAP_BULLETS",
+    """
+SYSTEM: Extrais les points clés du morceau de texte fourni, en FRANÇAIS. Un fait par \
+ligne, chaque ligne commençant par '- ', en style télégraphique (pas de phrase \
+d'introduction ni de conclusion, pas de répétition).
+USER: TEXTE DU MORCEAU :
+
+{text}
+
+POINTS CLÉS :
+ASSISTANT:""",
+)
+
+PROMPT_TEMPLATE_MAP_JSON: str = os.getenv(
+    "PROMPT_TEMPLATE_MAP_JSON",
+    """
+SYSTEM: Extrais les points clés du morceau de texte fourni, en FRANÇAIS, en style \
+télégraphique. Réponds uniquement par un objet JSON dont la clé "points" contient la \
+liste des faits (une chaîne par fait), sans aucun autre texte.
+USER: TEXTE DU MORCEAU :
+
+{text}
+
+JSON :
+ASSISTANT:""",
+)
+
+# Templates MAP des formats structurés (voir MAP_OUTPUT_FORMAT)
+PROMPT_TEMPLATES_MAP_STRUCTURED: dict[str, str] = {
+    "bullets": PROMPT_TEMPLATE_MAP_BULLETS,
+    "json": PROMPT_TEMPLATE_MAP_JSON,
+}
+
+# --- Mode Question (--question) ---
+# Seuls les QUESTION_TOP_K chunks les plus pertinents (BM25, et similarité des
+# embeddings si EMBEDDING_MODEL est défini) passent par le LLM.
+QUESTION_TOP_K: int = int(os.getenv("QUESTION_TOP_K", "4"))
+# Modèle d'embeddings du serveur LLM (ex: 'nomic-embed-text'). Vide = BM25 seul.
+EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "")
+# Poids de la similarité des embeddings dans le score (le reste pour BM25)
+QUESTION_EMBEDDING_WEIGHT: float = float(os.getenv("QUESTION_EMBEDDING_WEIGHT", "0.5"))
+
+# Templates du mode question. La question ({question}) est placée dans la partie
+# USER, après le texte : l'instruction système reste un préfixe identique pour
+# tous les chunks et toutes les questions.
+PROMPT_TEMPLATE_QUESTION_MAP: str = os.getenv(
+    "PROMPT_TEMPLATE_QUESTION_MAP",
+    """
+SYSTEM: Extrais du morceau de texte fourni, en FRANÇAIS, uniquement les faits utiles \
+pour répondre à la question posée après le texte (décisions, chiffres, noms, dates), \
+un fait par ligne commençant par '- '. Ne réponds pas encore à la question. Si le \
+morceau ne contient rien d'utile, indique-le en une ligne.
+USER: TEXTE DU MORCEAU :
+
+{text}
+
+QUESTION : {question}
+
+FAITS UTILES DU MORCEAU :
+ASSISTANT:""",
+)
+
+PROMPT_TEMPLATE_QUESTION_SHORT: str = """
+SYSTEM: Tu es un assistant qui répond à des questions sur un document. En t'appuyant \
+uniquement sur le texte fourni, réponds à la question posée après le texte en 2 ou 3 \
+phrases maximum, en FRANÇAIS. Si le texte ne permet pas d'y répondre, dis-le.
+USER: Voici le texte :
+{text}
+
+QUESTION : {question}
+ASSISTANT:"""
+
+PROMPT_TEMPLATE_QUESTION_DETAILED: str = """
+SYSTEM: Tu es un assistant qui répond à des questions sur un document. En t'appuyant \
+uniquement sur le texte fourni, réponds à la question posée après le texte sous forme \
+de liste à puces (commençant par '- ' ou '* '), en FRANÇAIS, avec les détails utiles \
+(décisions, chiffres, responsables). Si le texte ne permet pas d'y répondre, dis-le.
+USER: Voici le texte :
+{text}
+
+QUESTION : {question}
+ASSISTANT:"""
+
+# Même clés que PROMPT_TEMPLATES
+PROMPT_TEMPLATES_QUESTION: dict[str, str] = {
+    "short": PROMPT_TEMPLATE_QUESTION_SHORT,
+    "detailed": PROMPT_TEMPLATE_QUESTION_DETAILED,
+}
+
 # --- Configuration Logging ---
 LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
 LOG_FILE: Path = BASE_DIR / "localsumm.log"
@@ -82,3 +382,18 @@ TOKENIZER_HF_IDENTIFIER: str = os.getenv(
     "TOKENIZER_HF_IDENTIFIER", "mistralai/Mistral-7B-Instruct-v0.2"
 )
 # Verifier que le model HuggingFace correspond a celui de OLLAMA
+
+# --- Modèles par étape (cascade) ---
+# Vide / 0 = OLLAMA_MODEL, TOKENIZER_HF_IDENTIFIER et LLM_MAX_CONTEXT_TOKENS.
+# MAP (résumé de chaque chunk, le gros du volume) : un petit modèle rapide suffit.
+MAP_MODEL: str = os.getenv("MAP_MODEL", "")
+MAP_TOKENIZER_HF_IDENTIFIER: str = os.getenv("MAP_TOKENIZER_HF_IDENTIFIER", "")
+MAP_MAX_CONTEXT_TOKENS: int = int(os.getenv("MAP_MAX_CONTEXT_TOKENS", "0"))
+# REDUCE (synthèse finale des résumés MAP)
+REDUCE_MODEL: str = os.getenv("REDUCE_MODEL", "")
+REDUCE_TOKENIZER_HF_IDENTIFIER: str = os.getenv("REDUCE_TOKENIZER_HF_IDENTIFIER", "")
+REDUCE_MAX_CONTEXT_TOKENS: int = int(os.getenv("REDUCE_MAX_CONTEXT_TOKENS", "0"))
+# Résumé direct d'un texte court (défaut : les valeurs du REDUCE)
+DIRECT_MODEL: str = os.getenv("DIRECT_MODEL", "")
+DIRECT_TOKENIZER_HF_IDENTIFIER: str = os.getenv("DIRECT_TOKENIZER_HF_IDENTIFIER", "")
+DIRECT_MAX_CONTEXT_TOKENS: int = int(os.getenv("DIRECT_MAX_CONTEXT_TOKENS", "0"))
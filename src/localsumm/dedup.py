@@ -0,0 +1,121 @@
+# src/localsumm/dedup.py
+
+import hashlib
+import re
+from collections.abc import Iterator
+
+import numpy as np
+
+# from loguru import logger
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Signature MinHash : NUM_BANDS x ROWS_PER_BAND permutations.
+# Avec 32 bandes de 4 lignes, deux textes de Jaccard 0.8 sont presque toujours
+# candidats ; les candidats sont ensuite vérifiés sur la signature complète.
+_NUM_BANDS: int = 32
+_ROWS_PER_BAND: int = 4
+_NUM_PERMUTATIONS: int = _NUM_BANDS * _ROWS_PER_BAND
+_MAX_HASH: int = (1 << 32) - 1
+
+# Permutations "multiply-shift" : h(x) = ((a * x + b) mod 2^64) >> 32, avec a impair.
+# Coefficients fixés (graine constante) pour des signatures reproductibles.
+_rng = np.random.default_rng(seed=1337)
+_PERM_A: np.ndarray = _rng.integers(
+    0, np.iinfo(np.uint64).max, size=_NUM_PERMUTATIONS, dtype=np.uint64
+) | np.uint64(1)
+_PERM_B: np.ndarray = _rng.integers(
+    0, np.iinfo(np.uint64).max, size=_NUM_PERMUTATIONS, dtype=np.uint64
+)
+
+
+def _shingles(text: str, size: int) -> set[str]:
+    """Ensemble des n-grammes de mots (normalisés) d'un texte."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def _minhash_signature(shingles: set[str]) -> np.ndarray:
+    """Signature MinHash (vectorisée NumPy) d'un ensemble de shingles."""
+    if not shingles:
+        return np.full(_NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    hashes = np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little"
+            )
+            for s in shingles
+        ),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    # Débordement modulo 2^64 voulu (arithmétique entière NumPy sur tableaux)
+    permuted: np.ndarray = (hashes[:, None] * _PERM_A + _PERM_B) >> np.uint64(32)
+    signature: np.ndarray = permuted.min(axis=0)
+    return signature
+
+
+def _candidate_pairs(signatures: np.ndarray) -> Iterator[tuple[int, int]]:
+    """
+    LSH : paires (i, j), i < j, partageant au moins une bande de signature
+    identique. Chaque paire n'est produite qu'une fois.
+    """
+    seen: set[tuple[int, int]] = set()
+    for band in range(_NUM_BANDS):
+        band_start = band * _ROWS_PER_BAND
+        band_slice = signatures[:, band_start : band_start + _ROWS_PER_BAND]
+        buckets: dict[bytes, list[int]] = {}
+        for index in range(len(signatures)):
+            buckets.setdefault(band_slice[index].tobytes(), []).append(index)
+        for members in buckets.values():
+            for position, i in enumerate(members):
+                for j in members[position + 1 :]:
+                    if (i, j) not in seen:
+                        seen.add((i, j))
+                        yield i, j
+
+
+def _find_root(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_near_duplicates(
+    texts: list[str], threshold: float = 0.85, shingle_size: int = 5
+) -> list[int]:
+    """
+    Regroupe les textes quasi identiques (MinHash + LSH sur des shingles de mots).
+
+    Args:
+        texts: Les textes à comparer (ex: les chunks avant l'étape MAP).
+        threshold: Similarité de Jaccard estimée minimale pour fusionner deux textes.
+        shingle_size: Taille des n-grammes de mots.
+
+    Returns:
+        Pour chaque texte, l'indice de son représentant (le premier texte de son
+        groupe). Un texte unique est son propre représentant.
+    """
+    if not 0.0 < threshold <= 1.0:
+        raise ValueError("Le seuil de similarité doit être compris entre 0 et 1.")
+
+    if not texts:
+        return []
+    signatures = np.stack(
+        [_minhash_signature(_shingles(text, shingle_size)) for text in texts]
+    )
+
+    parent = list(range(len(texts)))
+    for i, j in _candidate_pairs(signatures):
+        # Candidats vérifiés sur la signature complète
+        estimated_jaccard = float(np.mean(signatures[i] == signatures[j]))
+        if estimated_jaccard >= threshold:
+            root_i, root_j = _find_root(parent, i), _find_root(parent, j)
+            if root_i != root_j:
+                # Le plus petit indice reste le représentant
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    return [_find_root(parent, i) for i in range(len(texts))]
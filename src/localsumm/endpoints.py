@@ -0,0 +1,259 @@
+# src/localsumm/endpoints.py
+
+import threading
+import time
+from collections import deque
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+
+from .config import (
+    OLLAMA_HEALTH_CHECK_INTERVAL,
+    OLLAMA_HEDGE_MIN_SAMPLES,
+    OLLAMA_HEDGE_PERCENTILE,
+    OLLAMA_MAX_CONCURRENCY_PER_ENDPOINT,
+)
+from .exceptions import OllamaError
+from .llm_backends import get_llm_backend
+from .settings import Settings, get_default_settings
+
+# from loguru import logger
+
+# Délai maximal d'une sonde de santé (GET health_path)
+_HEALTH_PROBE_TIMEOUT: float = 2.0
+# Nombre de latences conservées par endpoint et par étape pour les percentiles
+_LATENCY_WINDOW: int = 200
+# Hôtes considérés comme la machine locale (CPU partagé avec la transcription)
+_LOCAL_HOSTS: frozenset[str] = frozenset(
+    # Simple comparaison avec l'hôte d'une URL configurée (aucun bind)
+    {"localhost", "127.0.0.1", "::1", "0.0.0.0"}  # noqa: S104
+)
+
+
+class OllamaEndpoint:
+    """Un serveur Ollama : état de santé, requêtes en cours et latences observées."""
+
+    def __init__(self, base_url: str, max_concurrency: int) -> None:
+        self.base_url: str = base_url.rstrip("/")
+        self.max_concurrency: int = max(1, max_concurrency)
+        self.outstanding: int = 0
+        self.healthy: bool = True
+        self.last_check: float = 0.0
+        # Latences par étape LLM ('map', 'reduce'...) : une synthèse longue ne
+        # doit pas fausser le délai de hedging des appels MAP
+        self.latencies: dict[str, deque[float]] = {}
+        self.is_local: bool = urlparse(self.base_url).hostname in _LOCAL_HOSTS
+        # Connexions HTTP réutilisées d'une requête à l'autre (keep-alive)
+        self.session: requests.Session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=max(2, 2 * self.max_concurrency)
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def has_free_slot(self) -> bool:
+        return self.outstanding < self.max_concurrency
+
+    def __repr__(self) -> str:
+        return (
+            f"OllamaEndpoint({self.base_url!r}, outstanding={self.outstanding}/"
+            f"{self.max_concurrency}, healthy={self.healthy})"
+        )
+
+
+class EndpointPool:
+    """
+    Répartit les requêtes entre plusieurs serveurs Ollama.
+
+    - Routage "least outstanding requests" : on choisit l'endpoint sain le moins
+      chargé (relativement à sa limite de concurrence).
+    - Limite de concurrence par endpoint : acquire() bloque tant qu'aucun slot n'est
+      libre.
+    - Sondes de santé périodiques (GET health_path : /api/version pour Ollama) ;
+      un endpoint en erreur de connexion est écarté jusqu'à la sonde suivante
+      réussie.
+    - Latences enregistrées par étape pour calculer le délai de "hedging"
+      (percentile).
+    """
+
+    def __init__(
+        self,
+        base_urls: list[str],
+        max_concurrency: int = OLLAMA_MAX_CONCURRENCY_PER_ENDPOINT,
+        health_check_interval: float = OLLAMA_HEALTH_CHECK_INTERVAL,
+        health_path: str = "/api/version",
+        headers: Optional[dict[str, str]] = None,
+    ) -> None:
+        if not base_urls:
+            raise OllamaError("Aucun endpoint Ollama configuré (OLLAMA_BASE_URLS).")
+        self.endpoints: list[OllamaEndpoint] = [
+            OllamaEndpoint(url, max_concurrency) for url in base_urls
+        ]
+        self.health_check_interval: float = health_check_interval
+        self.health_path: str = health_path
+        # En-têtes des sondes (authentification éventuelle du serveur)
+        self.headers: dict[str, str] = headers or {}
+        self._condition = threading.Condition()
+
+    @property
+    def total_capacity(self) -> int:
+        """Nombre total de requêtes simultanées admises par le pool."""
+        return sum(endpoint.max_concurrency for endpoint in self.endpoints)
+
+    # --- Santé ---
+
+    def _probe(self, endpoint: OllamaEndpoint) -> bool:
+        try:
+            response = endpoint.session.get(
+                f"{endpoint.base_url}{self.health_path}",
+                timeout=_HEALTH_PROBE_TIMEOUT,
+                headers=self.headers,
+            )
+            return response.ok
+        except requests.exceptions.RequestException:
+            return False
+
+    def refresh_health(self) -> None:
+        """Sonde les endpoints dont le dernier contrôle est trop ancien."""
+        now = time.monotonic()
+        with self._condition:
+            due = [
+                endpoint
+                for endpoint in self.endpoints
+                if now - endpoint.last_check >= self.health_check_interval
+            ]
+            for endpoint in due:
+                # Marquer tout de suite pour éviter des sondes concurrentes
+                endpoint.last_check = now
+        if not due:
+            return
+        results = {endpoint: self._probe(endpoint) for endpoint in due}
+        with self._condition:
+            for endpoint, healthy in results.items():
+                # if endpoint.healthy != healthy:
+                #     logger.info(f"{endpoint.base_url} -> sain={healthy}")
+                endpoint.healthy = healthy
+            self._condition.notify_all()
+
+    # --- Attribution des slots ---
+
+    def _pick(self, exclude: set[OllamaEndpoint]) -> Optional[OllamaEndpoint]:
+        candidates = [e for e in self.endpoints if e not in exclude]
+        healthy = [e for e in candidates if e.healthy]
+        # Si tout est marqué hors service, on tente quand même (la vraie erreur
+        # remontera de la requête elle-même)
+        pool = healthy or candidates
+        free = [e for e in pool if e.has_free_slot]
+        if not free:
+            return None
+        return min(
+            free, key=lambda e: (e.outstanding / e.max_concurrency, e.outstanding)
+        )
+
+    def acquire(
+        self,
+        exclude: Optional[set[OllamaEndpoint]] = None,
+        blocking: bool = True,
+    ) -> Optional[OllamaEndpoint]:
+        """
+        Réserve un slot sur l'endpoint le moins chargé.
+
+        Args:
+            exclude: Endpoints à ne pas utiliser (ex: celui de la requête d'origine
+                     lors d'un hedging).
+            blocking: Si False, retourne None immédiatement quand aucun slot
+                      n'est libre.
+
+        Returns:
+            L'endpoint réservé (à rendre avec release()), ou None (mode non bloquant).
+        """
+        exclude = exclude or set()
+        self.refresh_health()
+        with self._condition:
+            while True:
+                endpoint = self._pick(exclude)
+                if endpoint is not None:
+                    endpoint.outstanding += 1
+                    return endpoint
+                if not blocking or len(exclude) >= len(self.endpoints):
+                    return None
+                self._condition.wait(timeout=self.health_check_interval)
+
+    def release(
+        self,
+        endpoint: OllamaEndpoint,
+        latency: Optional[float] = None,
+        connection_failed: bool = False,
+        stage: Optional[str] = None,
+    ) -> None:
+        """
+        Libère le slot et enregistre la latence de l'étape 'stage' (requêtes
+        réussies uniquement ; rien n'est enregistré sans étape).
+        """
+        with self._condition:
+            endpoint.outstanding = max(0, endpoint.outstanding - 1)
+            if latency is not None and stage is not None:
+                endpoint.latencies.setdefault(
+                    stage, deque(maxlen=_LATENCY_WINDOW)
+                ).append(latency)
+            if connection_failed:
+                endpoint.healthy = False
+                endpoint.last_check = time.monotonic()
+            self._condition.notify_all()
+
+    # --- Hedging ---
+
+    def hedge_delay(self, stage: str) -> Optional[float]:
+        """
+        Délai après lequel une requête lente mérite d'être relancée ailleurs :
+        le percentile OLLAMA_HEDGE_PERCENTILE des latences de l'étape 'stage'
+        observées sur le pool.
+
+        Returns:
+            Le délai en secondes, ou None si trop peu de mesures ou un seul endpoint.
+        """
+        if len(self.endpoints) < 2:
+            return None
+        with self._condition:
+            samples = sorted(
+                latency
+                for endpoint in self.endpoints
+                for latency in endpoint.latencies.get(stage, ())
+            )
+        if len(samples) < OLLAMA_HEDGE_MIN_SAMPLES:
+            return None
+        rank = min(len(samples) - 1, int(len(samples) * OLLAMA_HEDGE_PERCENTILE / 100))
+        return samples[rank]
+
+
+# Pools partagés, par (serveurs, concurrence par serveur, backend, clé) : les jobs
+# qui ciblent les mêmes serveurs partagent le comptage des requêtes en cours.
+_pools: dict[tuple[tuple[str, ...], int, str, str], EndpointPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_endpoint_pool(settings: Optional[Settings] = None) -> EndpointPool:
+    """Retourne le pool d'endpoints des paramètres (créé au premier appel)."""
+    settings = settings or get_default_settings()
+    pool_key = (
+        settings.ollama_base_urls,
+        settings.ollama_max_concurrency_per_endpoint,
+        settings.llm_backend,
+        settings.llm_api_key,
+    )
+    pool = _pools.get(pool_key)
+    if pool is None:
+        backend = get_llm_backend(settings)
+        with _pools_lock:
+            pool = _pools.get(pool_key)
+            if pool is None:
+                pool = EndpointPool(
+                    list(pool_key[0]),
+                    max_concurrency=pool_key[1],
+                    health_path=backend.health_path,
+                    headers=backend.headers(settings),
+                )
+                _pools[pool_key] = pool
+    return pool
@@ -13,6 +13,12 @@ class OllamaError(LocalSummError):
     pass
 
 
+class OllamaTimeoutError(OllamaError):
+    """Le serveur LLM n'a pas répondu dans le délai imparti."""
+
+    pass
+
+
 class TranscriptionError(LocalSummError):
     """Erreur survenue lors de la transcription audio avec Whisper."""
 
@@ -36,3 +42,9 @@ class ConfigurationError(LocalSummError):
     """Erreur liée à une configuration invalide ou manquante."""
 
     pass
+
+
+class StageTimeoutError(LocalSummError):
+    """Une étape du pipeline a dépassé son délai maximal."""
+
+    pass
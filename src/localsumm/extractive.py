@@ -0,0 +1,227 @@
+# src/localsumm/extractive.py
+
+import math
+import re
+from typing import Optional
+
+import numpy as np
+
+from .settings import Settings
+from .utils import _split_into_units, count_tokens_batch
+
+# from loguru import logger
+
+# Mots vides (FR/EN) et tics de langage fréquents dans les transcriptions
+_STOPWORDS: frozenset[str] = frozenset(
+    """
+    alors avec avoir bah ben bon car ce cela ces cest comme dans des donc du elle
+    en est et euh être fait faut hein il ils je la le les leur lui mais me mes moi
+    mon ne nous on ou où par pas pour quand que quelque qui sa se ses si son sur
+    ta te tes toi ton tout très tu un une vous voilà voila y ça ouais quoi genre okay
+    about and are but for from have just know like not really right that the
+    their then there this what with yeah you your
+    """.split()
+)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Paramètres TextRank
+_DAMPING: float = 0.85
+_MAX_ITERATIONS: int = 50
+_TOLERANCE: float = 1e-6
+
+
+def _sentence_terms(sentence: str) -> list[str]:
+    return [
+        word
+        for word in _WORD_RE.findall(sentence.lower())
+        if len(word) > 2 and word not in _STOPWORDS and not word.isdigit()
+    ]
+
+
+def _tfidf_rows(
+    sentences_terms: list[list[str]],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Construit la matrice TF-IDF (phrases x termes) au format COO, lignes normalisées L2.
+
+    Returns:
+        (indices de ligne, indices de colonne, valeurs), en tableaux NumPy.
+    """
+    vocabulary: dict[str, int] = {}
+    rows: list[int] = []
+    cols: list[int] = []
+    counts: list[float] = []
+    for row, terms in enumerate(sentences_terms):
+        term_counts: dict[int, int] = {}
+        for term in terms:
+            col = vocabulary.setdefault(term, len(vocabulary))
+            term_counts[col] = term_counts.get(col, 0) + 1
+        for col, count in term_counts.items():
+            rows.append(row)
+            cols.append(col)
+            counts.append(float(count))
+
+    n_sentences = len(sentences_terms)
+    row_idx = np.asarray(rows, dtype=np.int64)
+    col_idx = np.asarray(cols, dtype=np.int64)
+    values = 1.0 + np.log(np.asarray(counts, dtype=np.float64))  # TF sous-linéaire
+
+    document_frequency = np.bincount(col_idx, minlength=len(vocabulary))
+    idf = np.log((1.0 + n_sentences) / (1.0 + document_frequency)) + 1.0
+    values *= idf[col_idx]
+
+    norms = np.sqrt(np.bincount(row_idx, weights=values**2, minlength=n_sentences))
+    values /= np.maximum(norms, 1e-12)[row_idx]
+    return row_idx, col_idx, values
+
+
+def _textrank_scores(
+    row_idx: np.ndarray, col_idx: np.ndarray, values: np.ndarray, n_sentences: int
+) -> np.ndarray:
+    """
+    Scores TextRank sur le graphe de similarité cosinus entre phrases.
+
+    La matrice de similarité S = X·Xᵀ (n x n) n'est jamais construite : chaque
+    produit S·v est calculé comme X·(Xᵀ·v) en O(nnz), ce qui reste linéaire même
+    pour des transcriptions de plusieurs milliers de phrases.
+    """
+    n_terms = int(col_idx.max()) + 1 if col_idx.size else 0
+    # Similarité de chaque phrase avec elle-même (diagonale de S), à retirer
+    self_similarity = np.bincount(row_idx, weights=values**2, minlength=n_sentences)
+
+    def similarity_dot(vector: np.ndarray) -> np.ndarray:
+        projected = np.bincount(
+            col_idx, weights=values * vector[row_idx], minlength=n_terms
+        )
+        product: np.ndarray = np.bincount(
+            row_idx, weights=values * projected[col_idx], minlength=n_sentences
+        )
+        without_self: np.ndarray = product - self_similarity * vector
+        return without_self
+
+    degree = similarity_dot(np.ones(n_sentences))
+    inverse_degree = np.where(degree > 1e-12, 1.0 / np.maximum(degree, 1e-12), 0.0)
+
+    scores = np.full(n_sentences, 1.0 / n_sentences)
+    for _ in range(_MAX_ITERATIONS):
+        updated = (1.0 - _DAMPING) / n_sentences + _DAMPING * similarity_dot(
+            scores * inverse_degree
+        )
+        # Masse des phrases isolées (sans voisin) redistribuée uniformément
+        updated += _DAMPING * scores[degree <= 1e-12].sum() / n_sentences
+        if np.abs(updated - scores).sum() < _TOLERANCE:
+            scores = updated
+            break
+        scores = updated
+    return scores
+
+
+def _select_sentences(
+    scores: np.ndarray, token_counts: np.ndarray, budget: int
+) -> np.ndarray:
+    """
+    Sélection gloutonne par score décroissant, en sautant les phrases qui ne
+    tiennent plus dans le budget.
+
+    Returns:
+        Masque booléen des phrases conservées.
+    """
+    selected = np.zeros(len(scores), dtype=bool)
+    used_tokens = 0
+    for index in np.argsort(-scores, kind="stable"):
+        if np.isinf(scores[index]):
+            break
+        if used_tokens + token_counts[index] <= budget:
+            selected[index] = True
+            used_tokens += int(token_counts[index])
+    return selected
+
+
+def _join_kept_units(units: list[str], keep: list[bool]) -> str:
+    """
+    Recolle les unités conservées avec les séparateurs d'origine : entre deux
+    phrases gardées, on reprend le séparateur le plus fort rencontré entre elles
+    (un saut de paragraphe ou de ligne d'une phrase retirée est conservé).
+    """
+    parts: list[str] = []
+    pending_separator = ""
+    for unit, kept in zip(units, keep):
+        body = unit.rstrip()
+        separator = unit[len(body) :]
+        if kept:
+            if parts:
+                parts.append(pending_separator or " ")
+            parts.append(body.lstrip() if not parts else body)
+            pending_separator = separator
+        elif separator.count("\n") > pending_separator.count("\n"):
+            pending_separator = separator
+    return "".join(parts)
+
+
+def extractive_compress(
+    text: str,
+    ratio: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    settings: Optional[Settings] = None,
+) -> str:
+    """
+    Pré-compression extractive : garde les phrases les plus centrales du texte
+    (TF-IDF + TextRank) jusqu'à un ratio ou un budget de tokens, dans l'ordre d'origine.
+
+    Args:
+        text: Le texte source.
+        ratio: Fraction des tokens à conserver (ex: 0.4), entre 0 et 1.
+        max_tokens: Budget maximal de tokens à conserver.
+                    Si ratio et max_tokens sont fournis, le plus petit l'emporte.
+        settings: Paramètres du job (tokenizer utilisé pour le budget).
+
+    Returns:
+        Le texte compressé (ou le texte d'origine s'il tient déjà dans le budget).
+
+    Raises:
+        ValueError: Si ni ratio ni max_tokens n'est fourni, ou si ratio est invalide.
+        ConfigurationError: Si le tokenizer ne peut pas être chargé.
+    """
+    if ratio is None and max_tokens is None:
+        raise ValueError("Il faut fournir ratio et/ou max_tokens.")
+    if ratio is not None and not 0.0 < ratio <= 1.0:
+        raise ValueError("Le ratio de compression doit être compris entre 0 et 1.")
+
+    units = [unit for unit, _ in _split_into_units(text)]
+    sentence_units = [i for i, unit in enumerate(units) if unit.strip()]
+    sentences = [units[i] for i in sentence_units]
+    if len(sentences) < 3:
+        return text
+
+    token_counts = np.asarray(count_tokens_batch(sentences, settings), dtype=np.int64)
+    total_tokens = int(token_counts.sum())
+    budget = total_tokens
+    if ratio is not None:
+        budget = min(budget, math.ceil(total_tokens * ratio))
+    if max_tokens is not None:
+        budget = min(budget, max_tokens)
+    if budget >= total_tokens:
+        return text
+
+    # logger.info(
+    #     f"Pré-compression extractive : {total_tokens} -> ~{budget} tokens "
+    #     f"({len(sentences)} phrases)."
+    # )
+    sentences_terms = [_sentence_terms(sentence) for sentence in sentences]
+    row_idx, col_idx, values = _tfidf_rows(sentences_terms)
+    if values.size == 0:
+        return text
+    scores = _textrank_scores(row_idx, col_idx, values, len(sentences))
+    # Phrases sans aucun terme porteur de sens ("Euh bon.", "Ouais.") : jamais gardées
+    scores[[not terms for terms in sentences_terms]] = -np.inf
+
+    selected = _select_sentences(scores, token_counts, budget)
+    keep = [False] * len(units)
+    for sentence_index, unit_index in enumerate(sentence_units):
+        keep[unit_index] = bool(selected[sentence_index])
+    compressed = _join_kept_units(units, keep)
+    # logger.success(
+    #     f"Pré-compression : {len(sentences)} -> {int(selected.sum())} phrases."
+    # )
+    return compressed or text
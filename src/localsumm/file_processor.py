@@ -3,14 +3,27 @@
 import mimetypes  # Pour deviner le type de fichier
 import subprocess  # Pour appeler ffmpeg
 import time
+import uuid
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 from .config import DOWNLOAD_DIR
 from .exceptions import FileProcessingError
+from .media_window import (
+    MediaWindow,
+    media_chapters,
+    record_window,
+    resolve_window,
+    window_requested,
+)
+from .resources import ffmpeg_threads, get_host_scheduler
+from .settings import Settings, get_default_settings
+from .text_reader import read_text_file
+from .transcript import Transcript, is_transcript_file
 from .transcription import (
     transcribe_audio,  # Fonction de transcription (qui utilise le backend configuré)
 )
+from .utils import _convert_audio_to_wav_mono16k, wav_mono16k_command
 
 # from loguru import logger # Décommentez si vous utilisez Loguru
 
@@ -37,26 +50,17 @@ def _extract_audio_from_video(video_path: Path, output_audio_path: Path) -> None
         FileProcessingError: Si ffmpeg n'est pas trouvé ou échoue.
     """
     # logger.info(f"Tentative d'extraction audio (WAV) de '{video_path.name}' vers '{output_audio_path.name}'...")
-    command: list[str] = [
-        "ffmpeg",
-        "-i",
-        str(video_path),  # Input
-        "-vn",  # Pas de vidéo
-        "-acodec",
-        "pcm_s16le",  # Codec standard pour WAV 16 bits
-        "-ar",
-        "16000",  # Échantillonnage 16kHz (préféré par Whisper)
-        "-ac",
-        "1",  # Mono (souvent suffisant pour la voix)
-        "-y",  # Écraser si existe
-        str(output_audio_path),
-    ]
+    threads = ffmpeg_threads()
+    # Même conversion que pour whisper.cpp : WAV 16 bits, 16kHz (préféré par
+    # Whisper), mono
+    command: list[str] = wav_mono16k_command(video_path, output_audio_path, threads)
     # logger.debug(f"Exécution ffmpeg: {' '.join(shlex.quote(arg) for arg in command)}")
 
     try:
-        result: subprocess.CompletedProcess = subprocess.run(
-            command, check=True, capture_output=True, text=True, encoding="utf-8"
-        )
+        with get_host_scheduler().reserve(threads):
+            result: subprocess.CompletedProcess = subprocess.run(
+                command, check=True, capture_output=True, text=True, encoding="utf-8"
+            )
         # logger.success(f"Audio extrait avec succès (WAV) via ffmpeg.")
     except FileNotFoundError as e:
         # logger.error("La commande 'ffmpeg' est introuvable...")
@@ -75,29 +79,13 @@ def _extract_audio_from_video(video_path: Path, output_audio_path: Path) -> None
         ) from e
 
 
-def process_file(file_path: Path) -> str:
+def detect_mime_type(file_path: Path) -> str:
     """
-    Traite un fichier local (texte, audio, vidéo) et retourne son contenu textuel.
-    Pour l'audio/vidéo, le contenu retourné est le texte transcrit.
-
-    Args:
-        file_path: Chemin vers le fichier local.
-
-    Returns:
-        Contenu textuel du fichier (lu directement ou transcrit).
+    Détermine le type MIME d'un fichier (avec repli sur l'extension).
 
     Raises:
-        FileNotFoundError: Si le fichier n'existe pas.
-        FileProcessingError: Si le type de fichier n'est pas supporté ou si une erreur survient.
-        TranscriptionError: Si la transcription échoue (remontée depuis transcribe_audio).
-        ConfigurationError: Si un backend de transcription est mal configuré.
+        FileProcessingError: Si le type ne peut pas être déterminé.
     """
-    if not file_path.is_file():
-        raise FileNotFoundError(
-            f"Le fichier d'entrée spécifié n'a pas été trouvé : {file_path}"
-        )
-
-    # logger.info(f"Traitement du fichier local : {file_path.name}")
     mime_type: Optional[str]
     mime_type, _ = mimetypes.guess_type(file_path)
     # logger.debug(f"Type MIME détecté pour '{file_path.name}': {mime_type}")
@@ -141,25 +129,133 @@ def process_file(file_path: Path) -> str:
         raise FileProcessingError(
             f"Type de fichier inconnu ou non supporté pour {file_path.name}"
         )
+    return mime_type
+
+
+def is_large_text_file(file_path: Path, settings: Settings) -> bool:
+    """
+    Vrai si le fichier est un texte assez volumineux pour être lu et découpé en
+    flux (settings.text_stream_min_bytes) plutôt que chargé en mémoire.
+    """
+    if settings.text_stream_min_bytes <= 0 or is_transcript_file(file_path):
+        return False
+    try:
+        if file_path.stat().st_size < settings.text_stream_min_bytes:
+            return False
+    except OSError:
+        return False
+    return detect_mime_type(file_path).startswith("text/")
+
+
+def load_transcript_file(
+    file_path: Path, settings: Settings, stats: Optional[dict[str, Any]]
+) -> str:
+    """
+    Relit une transcription sauvegardée, réduite à la fenêtre demandée le cas
+    échéant (ses instants sont déjà ceux de l'enregistrement complet).
+    """
+    transcript = Transcript.load(file_path)
+    window = resolve_window(settings, lambda: [])
+    if window is not None:
+        end = window.end if window.end is not None else float("inf")
+        transcript = transcript.window(window.start, end)
+        record_window(window, stats)
+    if stats is not None:
+        stats["transcript"] = transcript
+    return transcript.text
+
+
+def _transcribe_window(
+    file_path: Path,
+    mime_type: str,
+    settings: Settings,
+    stats: Optional[dict[str, Any]],
+) -> str:
+    """
+    Transcrit une portion d'un fichier audio/vidéo : ffmpeg n'en extrait que la
+    fenêtre (positionnement avant décodage), seule celle-ci passe par Whisper.
+
+    Raises:
+        ValueError: Si le fichier n'est pas un média, ou si la fenêtre est invalide.
+    """
+    if not mime_type.startswith(("audio/", "video/")):
+        raise ValueError(
+            "--start / --end / --chapter ne s'appliquent qu'aux fichiers "
+            f"audio/vidéo ({file_path.name})."
+        )
+    window = resolve_window(settings, lambda: media_chapters(file_path))
+    window = window or MediaWindow(start=0.0)
+    temp_audio_path = DOWNLOAD_DIR / f"window_{file_path.stem}_{uuid.uuid4().hex}.wav"
+    try:
+        _convert_audio_to_wav_mono16k(file_path, temp_audio_path, window=window)
+        record_window(window, stats)
+        return transcribe_audio(temp_audio_path, settings, stats)
+    finally:
+        temp_audio_path.unlink(missing_ok=True)
+
+
+def process_file(
+    file_path: Path,
+    settings: Optional[Settings] = None,
+    stats: Optional[dict[str, Any]] = None,
+) -> str:
+    """
+    Traite un fichier local (texte, audio, vidéo) et retourne son contenu textuel.
+    Pour l'audio/vidéo, le contenu retourné est le texte transcrit. Une transcription
+    sauvegardée (*.transcript.jsonl[.gz], voir Transcript.save) est relue telle
+    quelle, sans nouvelle transcription.
+
+    Si settings.media_start / media_end / media_chapter sont renseignés, seule
+    cette portion d'un fichier audio/vidéo (ou d'une transcription sauvegardée)
+    est traitée.
+
+    Args:
+        file_path: Chemin vers le fichier local.
+        settings: Paramètres du job (backend de transcription, fenêtre...).
+                  Défaut: config.py.
+        stats: Si fourni, reçoit les statistiques de transcription et la
+               transcription horodatée (voir transcribe_audio_segments).
+
+    Returns:
+        Contenu textuel du fichier (lu directement ou transcrit).
+
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas.
+        FileProcessingError: Si le type de fichier n'est pas supporté ou si une
+            erreur survient.
+        TranscriptionError: Si la transcription échoue (remontée depuis
+            transcribe_audio).
+        ConfigurationError: Si un backend de transcription est mal configuré.
+        ValueError: Si la fenêtre demandée est invalide (bornes, chapitre introuvable,
+                    fichier texte).
+    """
+    if not file_path.is_file():
+        raise FileNotFoundError(
+            f"Le fichier d'entrée spécifié n'a pas été trouvé : {file_path}"
+        )
+
+    # logger.info(f"Traitement du fichier local : {file_path.name}")
+    settings = settings or get_default_settings()
+    if is_transcript_file(file_path):
+        return load_transcript_file(file_path, settings, stats)
+
+    mime_type = detect_mime_type(file_path)
+    if window_requested(settings):
+        return _transcribe_window(file_path, mime_type, settings, stats)
 
     # --- Traitement basé sur le Type MIME ---
 
     if mime_type.startswith("text/"):
         # logger.info("Fichier texte détecté. Lecture du contenu.")
-        try:
-            # Lire le fichier texte en UTF-8 (le plus courant)
-            text_content: str = file_path.read_text(encoding="utf-8")
-            # logger.success(f"Lecture réussie du fichier texte '{file_path.name}'.")
-            return text_content
-        except Exception as e:
-            # logger.error(f"Erreur lors de la lecture du fichier texte {file_path.name}: {e}")
-            raise FileProcessingError(
-                f"Impossible de lire le fichier texte {file_path.name}: {e}"
-            ) from e
+        # Encodage détecté (UTF-8 le plus souvent, sinon cp1252, UTF-16...) ;
+        # une erreur de lecture lève FileProcessingError
+        text_content: str = read_text_file(file_path)
+        # logger.success(f"Lecture réussie du fichier texte '{file_path.name}'.")
+        return text_content
 
     elif mime_type.startswith("audio/"):
         # logger.info("Fichier audio détecté. Lancement de la transcription...")
-        return transcribe_audio(file_path)
+        return transcribe_audio(file_path, settings, stats)
 
     elif mime_type.startswith("video/"):
         # logger.info("Fichier vidéo détecté. Extraction de l'audio nécessaire...")
@@ -174,7 +270,7 @@ def process_file(file_path: Path) -> str:
 
             # Étape 2: Transcrire l'audio extrait
             # logger.info("Audio extrait. Lancement de la transcription...")
-            transcribed_text = transcribe_audio(temp_audio_path)
+            transcribed_text = transcribe_audio(temp_audio_path, settings, stats)
             # logger.success(f"Transcription réussie pour la vidéo '{file_path.name}'.")
             return transcribed_text
 
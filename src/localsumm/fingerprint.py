@@ -0,0 +1,671 @@
+# src/localsumm/fingerprint.py
+
+import tempfile
+import threading
+import uuid
+import wave
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from .cache import make_cache_key
+from .config import CACHE_DIR, DOWNLOAD_DIR
+from .exceptions import FileProcessingError
+from .settings import Settings
+from .transcript import Transcript
+from .utils import _convert_audio_to_wav_mono16k, is_wav_mono16k
+
+# from loguru import logger
+
+# Analyse spectrale du PCM 16 kHz : trames de 64 ms, pas de 32 ms
+_SAMPLE_RATE: int = 16000
+_FFT_SIZE: int = 1024
+_HOP: int = 512
+_FRAME_SECONDS: float = _HOP / _SAMPLE_RATE
+# Bande analysée (bins de 15,6 Hz) : ~250 Hz - 4 kHz, l'essentiel de la voix
+_MIN_BIN: int = 16
+_MAX_BIN: int = 272
+# Pic retenu : maximum local sur ±_PEAK_BINS bins et ±_PEAK_FRAMES trames, et
+# au-dessus de la moyenne du bloc (les silences ne produisent aucun pic)
+_PEAK_BINS: int = 10
+_PEAK_FRAMES: int = 10
+# Trames analysées par bloc (≈ 30 s) : la mémoire reste bornée quelle que soit la durée
+_BLOCK_FRAMES: int = 1000
+# Chaque pic est apparié aux _FAN_OUT pics suivants, à moins de _MAX_DT trames
+_FAN_OUT: int = 5
+_MAX_DT: int = 63
+# Paires de même décalage séparées de plus de _MAX_MATCH_GAP s : zones distinctes
+_MAX_MATCH_GAP: float = 10.0
+# Recherche tolérante : chaque paire est aussi cherchée avec des bins et un écart
+# décalés de ±_HASH_TOLERANCE (pics déplacés d'un bin ou d'une trame par le bruit,
+# le codec ou un décalage qui n'est pas un multiple du pas d'analyse)
+_HASH_TOLERANCE: int = 1
+# En deçà de ce nombre de paires alignées, pas de correspondance (hasard)
+_MIN_MATCHED_PAIRS: int = 40
+# Bords non couverts par une correspondance plus courts que ceci : ignorés
+_MIN_GAP_SECONDS: float = 2.0
+
+
+@dataclass
+class AudioFingerprint:
+    """
+    Empreinte perceptive d'un enregistrement : hachages de paires de pics
+    spectraux (fréquences des deux pics et écart en trames), indépendants du
+    conteneur et du codec.
+
+    hashes: Hachages (uint32), un par paire de pics.
+    times: Trame du premier pic de chaque paire (int32).
+    duration: Durée de l'enregistrement (secondes).
+    """
+
+    hashes: np.ndarray
+    times: np.ndarray
+    duration: float
+
+    def within(self, spans: Sequence[tuple[float, float]]) -> "AudioFingerprint":
+        """
+        Empreinte restreinte aux paires dont le premier pic tombe dans l'une des
+        portions (début, fin), en secondes.
+        """
+        seconds = self.times * _FRAME_SECONDS
+        keep = np.zeros(len(self.times), bool)
+        for start, end in spans:
+            keep |= (seconds >= start) & (seconds < end)
+        return AudioFingerprint(
+            hashes=self.hashes[keep], times=self.times[keep], duration=self.duration
+        )
+
+
+@dataclass
+class FingerprintMatch:
+    """
+    Enregistrement déjà transcrit retrouvé dans l'index.
+
+    entry_id: Identifiant de l'entrée de l'index.
+    score: Part des paires de la zone commune retrouvées au même décalage
+           (rapportée au moins fourni des deux enregistrements : le bruit
+           ajouté à l'un ne fait pas baisser le score).
+    start, end: Zone commune, en secondes dans l'enregistrement à transcrire.
+    transcript: Segments de la transcription mémorisée couvrant cette zone,
+                aux instants de l'enregistrement à transcrire.
+    entry_covered: Vrai si la zone commune couvre toute la transcription
+                   mémorisée (l'entrée est un extrait de cet enregistrement).
+    """
+
+    entry_id: str
+    score: float
+    start: float
+    end: float
+    transcript: Transcript
+    entry_covered: bool = False
+
+    def gaps(self, duration: float) -> list[tuple[float, float]]:
+        """
+        Portions (début, fin) de l'enregistrement non couvertes par la
+        transcription retrouvée (recouvrement partiel), à transcrire.
+        """
+        covered_start = self.transcript[0].start if len(self.transcript) else self.start
+        covered_end = self.transcript.duration or self.end
+        gaps = [(0.0, covered_start), (covered_end, duration)]
+        return [(start, end) for start, end in gaps if end - start >= _MIN_GAP_SECONDS]
+
+    def merged(self, parts: Sequence[tuple[float, Transcript]]) -> Transcript:
+        """
+        Transcription complète : segments retrouvés, et transcriptions des
+        portions manquantes (chacune avec l'instant où elle commence).
+        """
+        segments = [
+            (segment.start, segment.end, segment.text) for segment in self.transcript
+        ]
+        for offset, part in parts:
+            segments.extend(
+                (segment.start + offset, segment.end + offset, segment.text)
+                for segment in part
+            )
+        return Transcript(sorted(segments))
+
+
+def _max_filter(values: np.ndarray, radius: int, axis: int) -> np.ndarray:
+    """Maximum glissant sur 2 * radius + 1 valeurs le long d'un axe."""
+    pad = [(0, 0)] * values.ndim
+    pad[axis] = (radius, radius)
+    padded = np.pad(values, pad, constant_values=-np.inf)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * radius + 1, axis)
+    maxima: np.ndarray = windows.max(axis=-1)
+    return maxima
+
+
+def _spectrogram_db(samples: np.ndarray) -> np.ndarray:
+    """Spectrogramme (dB) de la bande analysée, une ligne par trame."""
+    frames = np.lib.stride_tricks.sliding_window_view(samples, _FFT_SIZE)[::_HOP]
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(_FFT_SIZE), axis=1))
+    return 20.0 * np.log10(spectrum[:, _MIN_BIN:_MAX_BIN] + 1e-6)
+
+
+def _block_peaks(spectrogram: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(trames, bins) des pics d'un bloc de spectrogramme."""
+    local_max = _max_filter(
+        _max_filter(spectrogram, _PEAK_FRAMES, axis=0), _PEAK_BINS, axis=1
+    )
+    is_peak = (spectrogram == local_max) & (spectrogram > spectrogram.mean())
+    frames, bins = np.nonzero(is_peak)
+    return frames, bins
+
+
+def _wav_peaks(wav_file: wave.Wave_read) -> tuple[np.ndarray, np.ndarray, float]:
+    """
+    Pics spectraux d'un WAV PCM 16 bits mono, analysé bloc par bloc (chaque
+    bloc est relu avec _PEAK_FRAMES trames de contexte de part et d'autre).
+
+    Returns:
+        (trames, bins, durée en secondes).
+    """
+    total_samples = wav_file.getnframes()
+    total_frames = max(0, (total_samples - _FFT_SIZE) // _HOP + 1)
+    all_frames: list[np.ndarray] = []
+    all_bins: list[np.ndarray] = []
+    for first in range(0, total_frames, _BLOCK_FRAMES):
+        last = min(first + _BLOCK_FRAMES, total_frames)
+        context_first = max(0, first - _PEAK_FRAMES)
+        context_last = min(total_frames, last + _PEAK_FRAMES)
+        wav_file.setpos(context_first * _HOP)
+        data = wav_file.readframes(
+            (context_last - context_first - 1) * _HOP + _FFT_SIZE
+        )
+        samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+        frames, bins = _block_peaks(_spectrogram_db(samples))
+        frames += context_first
+        inside = (frames >= first) & (frames < last)
+        all_frames.append(frames[inside])
+        all_bins.append(bins[inside])
+    if not all_frames:
+        return (
+            np.zeros(0, np.int64),
+            np.zeros(0, np.int64),
+            total_samples / _SAMPLE_RATE,
+        )
+    return (
+        np.concatenate(all_frames),
+        np.concatenate(all_bins),
+        total_samples / _SAMPLE_RATE,
+    )
+
+
+def _pair_hashes(frames: np.ndarray, bins: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Hachages des paires (pic, l'un des _FAN_OUT pics suivants) et leurs trames."""
+    order = np.lexsort((bins, frames))
+    frames, bins = frames[order], bins[order]
+    hashes: list[np.ndarray] = []
+    times: list[np.ndarray] = []
+    for shift in range(1, _FAN_OUT + 1):
+        if shift >= len(frames):
+            break
+        dt = frames[shift:] - frames[:-shift]
+        valid = (dt > 0) & (dt <= _MAX_DT)
+        anchor_bins = bins[:-shift][valid].astype(np.uint32)
+        target_bins = bins[shift:][valid].astype(np.uint32)
+        hashes.append(
+            (anchor_bins << 14) | (target_bins << 6) | dt[valid].astype(np.uint32)
+        )
+        times.append(frames[:-shift][valid].astype(np.int32))
+    if not hashes:
+        return np.zeros(0, np.uint32), np.zeros(0, np.int32)
+    return np.concatenate(hashes), np.concatenate(times)
+
+
+def fingerprint_wav(wav_path: Path) -> AudioFingerprint:
+    """
+    Empreinte d'un WAV 16 kHz PCM 16 bits mono.
+
+    Raises:
+        FileProcessingError: Si le fichier n'est pas un WAV 16 kHz mono lisible.
+    """
+    try:
+        with wave.open(str(wav_path), "rb") as wav_file:
+            if (
+                wav_file.getsampwidth() != 2
+                or wav_file.getnchannels() != 1
+                or wav_file.getframerate() != _SAMPLE_RATE
+            ):
+                raise FileProcessingError(
+                    "Empreinte audio : WAV 16 kHz PCM 16 bits mono attendu "
+                    f"({wav_path.name})."
+                )
+            frames, bins, duration = _wav_peaks(wav_file)
+    except (wave.Error, EOFError, OSError) as e:
+        raise FileProcessingError(f"WAV illisible {wav_path.name}: {e}") from e
+    hashes, times = _pair_hashes(frames, bins)
+    return AudioFingerprint(hashes=hashes, times=times, duration=duration)
+
+
+def fingerprint_audio(audio_path: Path) -> AudioFingerprint:
+    """
+    Empreinte d'un fichier audio/vidéo quelconque (converti au préalable en WAV
+    16 kHz mono si besoin).
+
+    Raises:
+        FileProcessingError: Si la conversion ou la lecture échoue.
+    """
+    if is_wav_mono16k(audio_path):
+        return fingerprint_wav(audio_path)
+    with tempfile.NamedTemporaryFile(
+        prefix="fingerprint_", suffix=".wav", delete=False, dir=str(DOWNLOAD_DIR)
+    ) as tmp_file:
+        wav_path = Path(tmp_file.name)
+    try:
+        _convert_audio_to_wav_mono16k(audio_path, wav_path)
+        return fingerprint_wav(wav_path)
+    finally:
+        wav_path.unlink(missing_ok=True)
+
+
+def _tolerant_hashes(fingerprint: AudioFingerprint) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Hachages cherchés pour une empreinte : ceux de chaque paire et leurs variantes
+    à ±_HASH_TOLERANCE près (bins des deux pics et écart), avec le rang de la
+    paire d'origine.
+    """
+    hashes = fingerprint.hashes.astype(np.int64)
+    anchor_bins, target_bins, dt = hashes >> 14, (hashes >> 6) & 0xFF, hashes & 0x3F
+    steps = range(-_HASH_TOLERANCE, _HASH_TOLERANCE + 1)
+    variants: list[np.ndarray] = []
+    pairs: list[np.ndarray] = []
+    for anchor_step in steps:
+        for target_step in steps:
+            for dt_step in steps:
+                anchor = anchor_bins + anchor_step
+                target = target_bins + target_step
+                gap = dt + dt_step
+                valid = (
+                    (anchor >= 0)
+                    & (anchor <= 0xFF)
+                    & (target >= 0)
+                    & (target <= 0xFF)
+                    & (gap > 0)
+                    & (gap <= _MAX_DT)
+                )
+                variants.append(
+                    ((anchor << 14) | (target << 6) | gap)[valid].astype(np.uint32)
+                )
+                pairs.append(np.flatnonzero(valid))
+    return np.concatenate(variants), np.concatenate(pairs)
+
+
+def _densest_run(times: np.ndarray) -> tuple[float, float]:
+    """
+    (début, fin) de la plus longue suite d'instants triés séparés d'au plus
+    _MAX_MATCH_GAP secondes.
+    """
+    breaks = np.flatnonzero(np.diff(times) > _MAX_MATCH_GAP)
+    starts = np.concatenate(([0], breaks + 1))
+    ends = np.concatenate((breaks, [len(times) - 1]))
+    best = int(np.argmax(ends - starts))
+    return float(times[starts[best]]), float(times[ends[best]])
+
+
+class FingerprintIndex:
+    """
+    Index local des empreintes audio des enregistrements déjà transcrits, chacune
+    associée à sa transcription et au profil de transcription qui l'a produite
+    (CACHE_DIR/<namespace> : <id>.npz et <id>.transcript.jsonl.gz).
+
+    Les entrées écrites ou supprimées par d'autres processus sont prises en
+    compte à la recherche suivante. Les écritures sont atomiques (fichier
+    temporaire puis renommage).
+    """
+
+    def __init__(self, namespace: str, base_dir: Optional[Path] = None) -> None:
+        self.directory: Path = (base_dir or CACHE_DIR) / namespace
+        self._lock = threading.Lock()
+        self._loaded: set[str] = set()
+        self._entry_ids: list[str] = []
+        self._entry_profiles: list[str] = []
+        # Hachages de toutes les entrées, triés, avec trame et entrée de chacun
+        self._hashes = np.zeros(0, np.uint32)
+        self._times = np.zeros(0, np.int32)
+        self._entries = np.zeros(0, np.int32)
+
+    def _transcript_path(self, entry_id: str) -> Path:
+        return self.directory / f"{entry_id}.transcript.jsonl.gz"
+
+    def _forget(self, indices: Sequence[int]) -> None:
+        """Retire de l'index en mémoire les entrées de rangs indices."""
+        kept = np.ones(len(self._entry_ids), bool)
+        kept[list(indices)] = False
+        renumbered = (np.cumsum(kept) - 1).astype(np.int32)
+        kept_pairs = kept[self._entries]
+        self._hashes = self._hashes[kept_pairs]
+        self._times = self._times[kept_pairs]
+        self._entries = renumbered[self._entries[kept_pairs]]
+        for index in indices:
+            self._loaded.discard(self._entry_ids[index])
+        self._entry_ids = [
+            entry_id for entry_id, keep in zip(self._entry_ids, kept) if keep
+        ]
+        self._entry_profiles = [
+            profile for profile, keep in zip(self._entry_profiles, kept) if keep
+        ]
+
+    def _refresh(self) -> None:
+        """
+        Met l'index en mémoire à jour : entrées apparues depuis la dernière
+        recherche, et entrées supprimées entre-temps (remplacement, éviction).
+        La mémoire occupée suit ainsi les limites de taille de l'index sur disque.
+        """
+        on_disk = {path.stem for path in self.directory.glob("*.npz")}
+        removed = [
+            index
+            for index, entry_id in enumerate(self._entry_ids)
+            if entry_id not in on_disk
+        ]
+        if removed:
+            self._forget(removed)
+        new_hashes: list[np.ndarray] = [self._hashes]
+        new_times: list[np.ndarray] = [self._times]
+        new_entries: list[np.ndarray] = [self._entries]
+        for entry_id in sorted(on_disk - self._loaded):
+            path = self.directory / f"{entry_id}.npz"
+            try:
+                with np.load(path) as data:
+                    hashes, times = data["hashes"], data["times"]
+                    # Entrées sans profil (versions antérieures) : jamais reprises
+                    profile = str(data["profile"]) if "profile" in data.files else ""
+            except (OSError, ValueError, KeyError):
+                # logger.warning(f"Entrée d'empreinte illisible ignorée : {path}")
+                continue
+            self._loaded.add(entry_id)
+            new_hashes.append(hashes.astype(np.uint32))
+            new_times.append(times.astype(np.int32))
+            new_entries.append(np.full(len(hashes), len(self._entry_ids), np.int32))
+            self._entry_ids.append(entry_id)
+            self._entry_profiles.append(profile)
+        if len(new_hashes) == 1:
+            return
+        hashes = np.concatenate(new_hashes)
+        order = np.argsort(hashes, kind="stable")
+        self._hashes = hashes[order]
+        self._times = np.concatenate(new_times)[order]
+        self._entries = np.concatenate(new_entries)[order]
+
+    def add(
+        self,
+        fingerprint: AudioFingerprint,
+        transcript: Transcript,
+        profile: str,
+        max_entries: int = 0,
+        max_bytes: int = 0,
+    ) -> str:
+        """
+        Mémorise l'empreinte et la transcription (instants de l'enregistrement
+        lui-même) pour un profil de transcription (voir transcription_profile),
+        puis supprime les entrées les plus anciennes au-delà de max_entries
+        entrées ou de max_bytes octets sur disque (0 = pas de limite). Les
+        erreurs d'E/S sont ignorées.
+
+        Returns:
+            L'identifiant de l'entrée.
+        """
+        entry_id = uuid.uuid4().hex
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            transcript.save(self._transcript_path(entry_id))
+            # Suffixe distinct de .npz : une entrée en cours d'écriture est invisible
+            with tempfile.NamedTemporaryFile(
+                suffix=".tmp", dir=str(self.directory), delete=False
+            ) as tmp:
+                np.savez(
+                    tmp,
+                    hashes=fingerprint.hashes,
+                    times=fingerprint.times,
+                    profile=np.array(profile),
+                )
+                tmp_path = Path(tmp.name)
+            tmp_path.replace(self.directory / f"{entry_id}.npz")
+            self._evict(max_entries, max_bytes, keep=entry_id)
+        except (OSError, FileProcessingError):
+            # logger.warning(f"Impossible d'écrire l'entrée d'empreinte {entry_id}")
+            pass
+        return entry_id
+
+    def remove(self, entry_id: str) -> None:
+        """Supprime une entrée (sans effet si elle n'existe plus)."""
+        try:
+            (self.directory / f"{entry_id}.npz").unlink(missing_ok=True)
+            self._transcript_path(entry_id).unlink(missing_ok=True)
+        except OSError:
+            # logger.warning(f"Impossible de supprimer l'entrée d'empreinte {entry_id}")
+            pass
+
+    def _evict(self, max_entries: int, max_bytes: int, keep: str) -> None:
+        """
+        Supprime les entrées les plus anciennes (date d'écriture) tant que
+        l'index dépasse max_entries entrées ou max_bytes octets, sauf keep.
+        """
+        if max_entries <= 0 and max_bytes <= 0:
+            return
+        entries: list[tuple[float, str, int]] = []
+        for path in self.directory.glob("*.npz"):
+            try:
+                stat = path.stat()
+                size = stat.st_size + self._transcript_path(path.stem).stat().st_size
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, size))
+        count = len(entries)
+        total_bytes = sum(size for _, _, size in entries)
+        for _, entry_id, size in sorted(entries):
+            if (max_entries <= 0 or count <= max_entries) and (
+                max_bytes <= 0 or total_bytes <= max_bytes
+            ):
+                break
+            if entry_id == keep:
+                continue
+            # logger.debug(f"Index d'empreintes plein, entrée {entry_id} supprimée")
+            self.remove(entry_id)
+            count -= 1
+            total_bytes -= size
+
+    def find(
+        self,
+        fingerprint: AudioFingerprint,
+        profile: str,
+        threshold: float,
+        min_overlap_seconds: float,
+    ) -> Optional[FingerprintMatch]:
+        """
+        Cherche un enregistrement déjà transcrit avec le même profil, qui partage
+        une zone commune avec celui-ci, quel que soit le décalage : chaque
+        hachage commun vote pour un décalage (instant mémorisé - instant de
+        l'enregistrement), et le décalage le plus voté délimite la zone commune.
+
+        Args:
+            fingerprint: Empreinte de l'enregistrement à transcrire.
+            profile: Profil de transcription du job (voir transcription_profile) :
+                     seules les entrées du même profil sont candidates.
+            threshold: Part minimale des paires de la zone commune retrouvées au
+                       même décalage.
+            min_overlap_seconds: Durée minimale de la zone commune (ramenée à
+                                 90 % de l'enregistrement s'il est plus court).
+
+        Returns:
+            La meilleure correspondance, ou None.
+        """
+        if not len(fingerprint.hashes):
+            return None
+        with self._lock:
+            self._refresh()
+            hashes, times, entries = self._hashes, self._times, self._entries
+            entry_ids = list(self._entry_ids)
+            same_profile = np.array(
+                [entry_profile == profile for entry_profile in self._entry_profiles],
+                bool,
+            )
+        if not same_profile.any():
+            return None
+
+        # Toutes les paires (hachage de l'enregistrement, hachage mémorisé égal),
+        # variantes tolérantes comprises
+        query_hashes, query_pairs = _tolerant_hashes(fingerprint)
+        first = np.searchsorted(hashes, query_hashes, side="left")
+        counts = np.searchsorted(hashes, query_hashes, side="right") - first
+        if not counts.sum():
+            return None
+        query_index = query_pairs[np.repeat(np.arange(len(counts)), counts)]
+        rank = np.arange(len(query_index)) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        stored_index = np.repeat(first, counts) + rank
+        candidate = same_profile[entries[stored_index]]
+        if not candidate.any():
+            return None
+        query_index, stored_index = query_index[candidate], stored_index[candidate]
+        offsets = times[stored_index].astype(np.int64) - fingerprint.times[query_index]
+        pair_entries = entries[stored_index].astype(np.int64)
+
+        # Décalage le plus voté, à une trame près (léger décalage du codec)
+        span = int(np.abs(offsets).max()) + 2
+        keys, votes = np.unique(
+            pair_entries * (2 * span) + offsets + span, return_counts=True
+        )
+        smoothed = votes.copy()
+        for neighbour in (-1, 1):
+            position = np.searchsorted(keys, keys + neighbour)
+            found = position < len(keys)
+            found[found] = keys[position[found]] == keys[found] + neighbour
+            smoothed[found] += votes[position[found]]
+        best_key = int(keys[int(np.argmax(smoothed))])
+        best_entry, best_offset = divmod(best_key, 2 * span)
+        best_offset -= span
+
+        aligned = (pair_entries == best_entry) & (np.abs(offsets - best_offset) <= 1)
+        aligned_times = (
+            np.unique(fingerprint.times[query_index[aligned]]) * _FRAME_SECONDS
+        )
+        start, end = _densest_run(aligned_times)
+        if end - start < min(min_overlap_seconds, 0.9 * fingerprint.duration):
+            return None
+        query_seconds = fingerprint.times * _FRAME_SECONDS
+        in_zone = (query_seconds >= start) & (query_seconds <= end)
+        stored_seconds = (times[entries == best_entry] - best_offset) * _FRAME_SECONDS
+        stored_in_zone = int(
+            ((stored_seconds >= start) & (stored_seconds <= end)).sum()
+        )
+        matched = np.unique(query_index[aligned & in_zone[query_index]])
+        score = len(matched) / max(1, min(int(in_zone.sum()), stored_in_zone))
+        if len(matched) < _MIN_MATCHED_PAIRS or score < threshold:
+            return None
+
+        entry_id = entry_ids[best_entry]
+        try:
+            stored = Transcript.load(self._transcript_path(entry_id))
+        except FileProcessingError:
+            return None
+        shift = best_offset * _FRAME_SECONDS
+        transcript = stored.window(start + shift, end + shift)
+        transcript.remap_times(lambda seconds: max(0.0, seconds - shift))
+        if not len(transcript):
+            return None
+        return FingerprintMatch(
+            entry_id=entry_id,
+            score=score,
+            start=start,
+            end=end,
+            transcript=transcript,
+            entry_covered=len(transcript) == len(stored),
+        )
+
+
+fingerprint_index = FingerprintIndex("audio_fingerprints")
+
+
+def transcription_profile(settings: Settings) -> str:
+    """
+    Profil de transcription d'un job : backend, modèle, langue, taille du
+    faisceau et délai cible (qui choisit le modèle). Une transcription mémorisée
+    n'est reprise que par un job de même profil.
+    """
+    if settings.transcription_backend == "whisper-cpp":
+        model = settings.whisper_cpp_model_path or ""
+    else:
+        model = settings.whisper_model_size
+    return make_cache_key(
+        settings.transcription_backend,
+        model,
+        settings.whisper_cpp_language,
+        str(settings.whisper_beam_size),
+        str(settings.transcription_deadline),
+    )
+
+
+def find_transcript(
+    audio_path: Path, settings: Settings, stats: Optional[dict[str, Any]] = None
+) -> tuple[AudioFingerprint, Optional[FingerprintMatch]]:
+    """
+    Empreinte d'un fichier audio et, si elle recoupe un enregistrement déjà
+    transcrit avec le même profil (voir transcription_profile ; seuil
+    settings.fingerprint_match_threshold, zone commune d'au moins
+    settings.fingerprint_min_overlap secondes), la transcription de la zone
+    commune.
+
+    Args:
+        stats: Si fourni et qu'une correspondance est trouvée, reçoit son score
+               ("fingerprint_score") et la durée reprise
+               ("fingerprint_reused_seconds").
+
+    Raises:
+        FileProcessingError: Si le fichier ne peut pas être converti ou lu.
+    """
+    fingerprint = fingerprint_audio(audio_path)
+    match = fingerprint_index.find(
+        fingerprint,
+        transcription_profile(settings),
+        settings.fingerprint_match_threshold,
+        settings.fingerprint_min_overlap,
+    )
+    if match is not None and stats is not None:
+        stats["fingerprint_score"] = round(match.score, 3)
+        stats["fingerprint_reused_seconds"] = round(match.end - match.start, 1)
+    return fingerprint, match
+
+
+def remember_transcript(
+    fingerprint: AudioFingerprint,
+    transcript: Transcript,
+    settings: Settings,
+    match: Optional[FingerprintMatch] = None,
+) -> None:
+    """
+    Mémorise la transcription d'un enregistrement dans l'index, pour le profil
+    de transcription de settings, dans les limites de taille de l'index.
+
+    Après une correspondance partielle (match), rien n'est mémorisé en double :
+    si l'enregistrement englobe toute l'entrée retrouvée, il la remplace ;
+    sinon seules les portions nouvellement transcrites (match.gaps) sont
+    mémorisées, et seulement si l'index ne les connaît pas déjà.
+    """
+    profile = transcription_profile(settings)
+    if match is not None and not match.entry_covered:
+        gaps = match.gaps(fingerprint.duration)
+        transcript = Transcript(
+            (segment.start, segment.end, segment.text)
+            for segment in transcript
+            if any(segment.end > start and segment.start < end for start, end in gaps)
+        )
+        fingerprint = fingerprint.within(gaps)
+        known = fingerprint_index.find(
+            fingerprint, profile, settings.fingerprint_match_threshold, 0.0
+        )
+        if not len(transcript) or known is not None:
+            return
+    fingerprint_index.add(
+        fingerprint,
+        transcript,
+        profile,
+        settings.fingerprint_index_max_entries,
+        settings.fingerprint_index_max_bytes,
+    )
+    if match is not None and match.entry_covered:
+        fingerprint_index.remove(match.entry_id)
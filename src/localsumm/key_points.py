@@ -0,0 +1,140 @@
+# src/localsumm/key_points.py
+
+import json
+import re
+from typing import Any
+
+from .config import PROMPT_TEMPLATES_MAP_STRUCTURED
+from .dedup import find_near_duplicates
+from .exceptions import ConfigurationError
+from .settings import Settings
+
+# from loguru import logger
+
+MAP_OUTPUT_FORMATS: tuple[str, ...] = ("prose", *PROMPT_TEMPLATES_MAP_STRUCTURED)
+
+# Marqueur de liste en début de ligne : '-', '*', '•', '1.', '2)'...
+_BULLET_RE = re.compile(r"^\s*(?:[-*•·\u2013]|\d+[.)])\s*")
+_SPACES_RE = re.compile(r"\s+")
+# En deçà (caractères), une ligne n'est pas un point (ex: '---', 'Ok.')
+_MIN_POINT_CHARS: int = 4
+
+
+def is_structured(settings: Settings) -> bool:
+    """
+    Vrai si les résumés MAP sont des listes de points (format 'bullets' ou
+    'json', ou mode question : son template demande un fait par ligne).
+
+    Raises:
+        ConfigurationError: Si le format de sortie MAP est inconnu.
+    """
+    if settings.map_output_format not in MAP_OUTPUT_FORMATS:
+        raise ConfigurationError(
+            f"Format de sortie MAP invalide : '{settings.map_output_format}'. "
+            f"Choisissez parmi : {', '.join(MAP_OUTPUT_FORMATS)}."
+        )
+    return settings.map_output_format != "prose" or bool(settings.question)
+
+
+def map_prompt_template(settings: Settings) -> str:
+    """
+    Template de l'étape MAP : celui du format structuré demandé
+    (PROMPT_TEMPLATE_MAP_BULLETS / _JSON), sinon settings.prompt_template_map
+    (prose, ou template du mode question).
+    """
+    if is_structured(settings) and not settings.question:
+        return PROMPT_TEMPLATES_MAP_STRUCTURED[settings.map_output_format]
+    return settings.prompt_template_map
+
+
+def normalize_point(point: str) -> str:
+    """Point clé nettoyé : marqueur de liste, gras markdown et espaces superflus."""
+    point = _BULLET_RE.sub("", point.replace("**", ""))
+    return _SPACES_RE.sub(" ", point).strip(" ;,")
+
+
+def _json_points(text: str) -> list[str]:
+    """
+    Points d'une réponse JSON ({"points": [...]} ou liste), éventuellement
+    entourée de texte ou d'une balise de code.
+
+    Raises:
+        ValueError: Si aucun JSON exploitable n'est trouvé.
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("Aucun JSON dans la réponse.")
+    start = min(starts)
+    end = max(text.rfind("}"), text.rfind("]"))
+    data: Any = json.loads(text[start : end + 1])
+    if isinstance(data, dict):
+        data = data.get("points", data.get("key_points"))
+    if not isinstance(data, list):
+        raise ValueError("Liste de points absente du JSON.")
+    points: list[str] = []
+    for item in data:
+        if isinstance(item, dict):
+            item = item.get("point") or item.get("text") or ""
+        points.append(str(item))
+    return points
+
+
+def parse_key_points(text: str, output_format: str = "bullets") -> list[str]:
+    """
+    Points clés normalisés d'un résumé MAP. Une réponse JSON invalide est lue
+    comme une liste à puces ; une ligne sans puce compte comme un point, sauf
+    une ligne d'introduction ("Voici les points clés :").
+    """
+    raw_points: list[str]
+    if output_format == "json":
+        try:
+            raw_points = _json_points(text)
+        except ValueError:
+            # logger.debug("Sortie MAP JSON invalide, lecture ligne à ligne.")
+            raw_points = text.splitlines()
+    else:
+        raw_points = text.splitlines()
+    points = [normalize_point(point) for point in raw_points]
+    return [
+        point
+        for point in points
+        if len(point) >= _MIN_POINT_CHARS and not point.endswith(":")
+    ]
+
+
+def merge_key_points(points: list[str], threshold: float) -> list[str]:
+    """
+    Fusionne les points quasi identiques (Jaccard estimé sur les mots, voir
+    dedup.find_near_duplicates) : chaque groupe est remplacé par son point le plus
+    long, à la place de sa première occurrence.
+    """
+    if len(points) < 2:
+        return list(points)
+    representatives = find_near_duplicates(
+        [point.lower() for point in points], threshold=threshold, shingle_size=1
+    )
+    best: dict[int, str] = {}
+    for point, representative in zip(points, representatives):
+        if len(point) > len(best.get(representative, "")):
+            best[representative] = point
+    return [best[i] for i in sorted(best)]
+
+
+def compact_map_summaries(
+    chunk_summaries: list[str], settings: Settings
+) -> tuple[str, int, int]:
+    """
+    Entrée compacte du REDUCE : les points clés de tous les résumés MAP, sans
+    doublon d'un chunk à l'autre, un par ligne ('- ').
+
+    Returns:
+        (texte combiné, nombre de points extraits, nombre de points conservés).
+    """
+    output_format = "bullets" if settings.question else settings.map_output_format
+    points = [
+        point
+        for summary in chunk_summaries
+        for point in parse_key_points(summary, output_format)
+    ]
+    merged = merge_key_points(points, settings.point_dedup_threshold)
+    return "\n".join(f"- {point}" for point in merged), len(points), len(merged)
@@ -0,0 +1,448 @@
+# src/localsumm/llm_backends.py
+
+import json
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from .exceptions import ConfigurationError, OllamaError
+from .resources import ollama_request_threads
+from .settings import Settings
+
+if TYPE_CHECKING:
+    from .endpoints import OllamaEndpoint
+
+# from loguru import logger
+
+_SYSTEM_MARKER = "SYSTEM:"
+_USER_MARKER = "USER:"
+_ASSISTANT_MARKER = "ASSISTANT:"
+
+# Statistiques renvoyées par Ollama, recopiées dans le dict 'stats' si fourni
+_OLLAMA_STATS_KEYS: tuple[str, ...] = (
+    "prompt_eval_count",
+    "prompt_eval_duration",
+    "eval_count",
+    "eval_duration",
+    "load_duration",
+    "total_duration",
+    "done_reason",  # 'length' si la sortie a été coupée par num_predict
+)
+
+# Préfixe des lignes de données d'un flux SSE (API OpenAI)
+_SSE_DATA_PREFIX = "data:"
+_SSE_DONE = "[DONE]"
+
+
+def split_prompt_template(prompt_template: str) -> tuple[str, str]:
+    """
+    Sépare un template de prompt en (instruction système statique, template
+    utilisateur).
+
+    Deux formes sont reconnues :
+      - "SYSTEM: ... USER: ... {text} ... ASSISTANT:" (templates court/détaillé) ;
+      - un template libre : tout ce qui précède {text} devient l'instruction système,
+        le reste (le texte et un éventuel suffixe) forme le message utilisateur.
+
+    L'instruction système est ainsi un préfixe identique d'un appel à l'autre, que
+    le runtime peut garder en cache (KV-cache) au lieu de le réévaluer à chaque chunk.
+
+    Returns:
+        (system, user_template) ; user_template contient toujours {text}.
+    """
+    template = prompt_template.strip()
+    if template.startswith(_SYSTEM_MARKER) and _USER_MARKER in template:
+        system_part, user_part = template[len(_SYSTEM_MARKER) :].split(_USER_MARKER, 1)
+        if user_part.rstrip().endswith(_ASSISTANT_MARKER):
+            user_part = user_part.rstrip()[: -len(_ASSISTANT_MARKER)]
+        return system_part.strip(), user_part.strip()
+
+    prefix, separator, suffix = template.partition("{text}")
+    if not separator:
+        return "", template
+    return prefix.strip(), ("{text}" + suffix).strip()
+
+
+def chat_messages(text: str, prompt_template: str) -> list[dict[str, str]]:
+    """
+    Messages 'chat' : instruction statique en message système (préfixe stable,
+    réutilisable d'un appel à l'autre), texte variable en message utilisateur.
+    """
+    system_prompt, user_template = split_prompt_template(prompt_template)
+    messages: list[dict[str, str]] = []
+    if system_prompt:
+        messages.append({"role": "system", "content": system_prompt})
+    messages.append({"role": "user", "content": user_template.format(text=text)})
+    return messages
+
+
+def _check_api_mode(api_mode: str) -> None:
+    if api_mode not in ("chat", "generate"):
+        raise ConfigurationError(
+            f"Mode d'API invalide : '{api_mode}'. Choisissez 'chat' ou 'generate'."
+        )
+
+
+class LLMBackend(ABC):
+    """
+    Format des échanges avec un type de serveur LLM : construction des requêtes,
+    lecture des réponses (complètes ou en flux), sonde de santé, préchargement.
+
+    Le transport (pool d'endpoints, hedging, budget CPU, sessions HTTP) est
+    commun à tous les backends (voir llm_interaction).
+
+    Les statistiques sont normalisées sur les clés d'Ollama (prompt_eval_count,
+    eval_count, done_reason...), utilisées par les mesures du pipeline.
+    """
+
+    name: str = ""
+    # GET de la sonde de santé (réponse 2xx = serveur disponible)
+    health_path: str = ""
+    # Vrai si le serveur regroupe les requêtes simultanées (continuous batching) :
+    # elles se partagent ses threads au lieu d'en consommer chacune autant
+    batches_requests: bool = False
+
+    def request_threads(self, endpoint: "OllamaEndpoint", settings: Settings) -> int:
+        """Threads de cette machine réservés pour une requête vers l'endpoint."""
+        slots = endpoint.max_concurrency if self.batches_requests else 1
+        return ollama_request_threads(
+            endpoint.is_local, settings.ollama_num_thread, slots
+        )
+
+    @abstractmethod
+    def build_request(
+        self,
+        text: str,
+        prompt_template: str,
+        api_mode: str,
+        num_predict: Optional[int],
+        settings: Settings,
+    ) -> tuple[str, dict[str, Any]]:
+        """(chemin d'API, payload) d'une génération non streamée."""
+
+    @abstractmethod
+    def parse_response(
+        self, payload: dict[str, Any], response_data: dict[str, Any]
+    ) -> tuple[str, dict[str, Any]]:
+        """
+        (texte généré, statistiques) d'une réponse complète.
+
+        Raises:
+            OllamaError: Si le serveur a retourné une erreur ou une réponse incomplète.
+        """
+
+    @abstractmethod
+    def stream_payload(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Payload de la même requête, en streaming."""
+
+    @abstractmethod
+    def parse_stream_line(
+        self, payload: dict[str, Any], line: str
+    ) -> tuple[str, dict[str, Any]]:
+        """
+        (fragment de texte, statistiques) d'une ligne du flux ; ("", {}) pour une
+        ligne sans contenu (ligne vide, commentaire, fin de flux).
+
+        Raises:
+            OllamaError: Si la ligne signale une erreur ou n'est pas du JSON valide.
+        """
+
+    def warmup_request(
+        self, settings: Settings
+    ) -> Optional[tuple[str, dict[str, Any]]]:
+        """(chemin, payload) du préchargement du modèle, ou None si sans objet."""
+        return None
+
+    @abstractmethod
+    def embedding_request(
+        self, texts: list[str], model: str
+    ) -> tuple[str, dict[str, Any]]:
+        """(chemin d'API, payload) du calcul des embeddings de plusieurs textes."""
+
+    @abstractmethod
+    def parse_embeddings(self, response_data: dict[str, Any]) -> list[list[float]]:
+        """
+        Embeddings d'une réponse, dans l'ordre des textes envoyés.
+
+        Raises:
+            OllamaError: Si la réponse ne contient pas les embeddings.
+        """
+
+    def headers(self, settings: Settings) -> dict[str, str]:
+        """En-têtes HTTP supplémentaires (authentification)."""
+        return {}
+
+
+def _keep_alive_value(settings: Settings) -> Union[str, int]:
+    """
+    Valeur 'keep_alive' envoyée à Ollama : un entier (secondes) si la configuration
+    est numérique ("-1", "600"), sinon la durée telle quelle ("30m", "2h").
+    """
+    try:
+        return int(settings.ollama_keep_alive)
+    except ValueError:
+        return settings.ollama_keep_alive
+
+
+def _json_line(line: str, server: str) -> dict[str, Any]:
+    try:
+        data: dict[str, Any] = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise OllamaError(f"Réponse JSON invalide reçue de {server} : {e}") from e
+    if "error" in data:
+        raise OllamaError(f"{server} a retourné une erreur : {data['error']}")
+    return data
+
+
+class OllamaBackend(LLMBackend):
+    """API native d'Ollama (/api/chat ou /api/generate)."""
+
+    name = "ollama"
+    health_path = "/api/version"
+
+    def build_request(
+        self,
+        text: str,
+        prompt_template: str,
+        api_mode: str,
+        num_predict: Optional[int],
+        settings: Settings,
+    ) -> tuple[str, dict[str, Any]]:
+        _check_api_mode(api_mode)
+        payload: dict[str, Any] = {
+            "model": settings.ollama_model,  # Modèle du job (défaut: config.py)
+            "stream": False,  # On veut la réponse complète, pas en streaming
+            "keep_alive": _keep_alive_value(
+                settings
+            ),  # Garder le modèle chargé entre les jobs
+            "options": {  # Quelques options possibles pour l'inférence
+                # Contrôle le caractère aléatoire (plus bas = plus déterministe)
+                "temperature": 0.5,
+                # "top_p": 0.9,          # Autre méthode de contrôle (nucleus sampling)
+                # Fenêtre explicite : sinon Ollama applique son défaut (souvent 2048)
+                # et tronque silencieusement les chunks longs
+                "num_ctx": settings.llm_max_context_tokens,
+                "stop": list(settings.llm_stop_sequences),
+            },
+        }
+        if num_predict is not None and num_predict > 0:
+            payload["options"]["num_predict"] = num_predict  # Plafond de tokens générés
+        if settings.ollama_num_thread > 0:
+            # Threads d'un Ollama local, comptés dans le budget de la machine
+            payload["options"]["num_thread"] = settings.ollama_num_thread
+
+        if api_mode == "chat":
+            payload["messages"] = chat_messages(text, prompt_template)
+            return "/api/chat", payload
+        payload["prompt"] = prompt_template.format(text=text)
+        return "/api/generate", payload
+
+    def parse_response(
+        self, payload: dict[str, Any], response_data: dict[str, Any]
+    ) -> tuple[str, dict[str, Any]]:
+        if "error" in response_data:
+            # logger.error(f"Ollama a retourné une erreur : {response_data['error']}")
+            raise OllamaError(
+                f"Ollama a retourné une erreur : {response_data['error']}"
+            )
+        content: Optional[str]
+        if "messages" in payload:
+            content = response_data.get("message", {}).get("content")
+        else:
+            content = response_data.get("response")
+        if content is None:
+            # logger.error(
+            #     "La réponse d'Ollama ne contient pas le texte généré. "
+            #     f"Réponse reçue : {response_data}"
+            # )
+            raise OllamaError(
+                "Réponse invalide reçue d'Ollama (champ 'response'/'message' manquant)."
+            )
+        return content.strip(), self._stats(response_data)
+
+    def stream_payload(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return {**payload, "stream": True}
+
+    def parse_stream_line(
+        self, payload: dict[str, Any], line: str
+    ) -> tuple[str, dict[str, Any]]:
+        # Flux NDJSON : un objet par ligne, statistiques dans le dernier ('done')
+        if not line.strip():
+            return "", {}
+        message = _json_line(line, "Ollama")
+        if "messages" in payload:
+            text = message.get("message", {}).get("content", "")
+        else:
+            text = message.get("response", "")
+        return text, self._stats(message)
+
+    def warmup_request(
+        self, settings: Settings
+    ) -> Optional[tuple[str, dict[str, Any]]]:
+        payload: dict[str, Any] = {
+            "model": settings.ollama_model,
+            "keep_alive": _keep_alive_value(settings),
+            # Même fenêtre que les requêtes, sinon Ollama recharge le modèle
+            "options": {"num_ctx": settings.llm_max_context_tokens},
+        }
+        if settings.ollama_num_thread > 0:
+            payload["options"]["num_thread"] = settings.ollama_num_thread
+        return "/api/generate", payload
+
+    def embedding_request(
+        self, texts: list[str], model: str
+    ) -> tuple[str, dict[str, Any]]:
+        # /api/embed accepte une liste de textes (un seul aller-retour)
+        return "/api/embed", {"model": model, "input": texts}
+
+    def parse_embeddings(self, response_data: dict[str, Any]) -> list[list[float]]:
+        embeddings = response_data.get("embeddings")
+        if not isinstance(embeddings, list):
+            raise OllamaError(
+                "Réponse invalide reçue d'Ollama (champ 'embeddings' manquant)."
+            )
+        return embeddings
+
+    @staticmethod
+    def _stats(data: dict[str, Any]) -> dict[str, Any]:
+        return {key: data[key] for key in _OLLAMA_STATS_KEYS if key in data}
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    API compatible OpenAI (/v1/chat/completions, /v1/completions) : serveur de
+    llama.cpp, vLLM, LM Studio... Ces serveurs regroupent les requêtes
+    simultanées (continuous batching) : régler OLLAMA_MAX_CONCURRENCY_PER_ENDPOINT
+    sur leur nombre de slots (ex: llama-server --parallel 4).
+
+    La fenêtre de contexte et le maintien en mémoire du modèle se règlent côté
+    serveur (pas de num_ctx ni de keep_alive par requête).
+    """
+
+    name = "openai"
+    health_path = "/v1/models"
+    batches_requests = True
+
+    def build_request(
+        self,
+        text: str,
+        prompt_template: str,
+        api_mode: str,
+        num_predict: Optional[int],
+        settings: Settings,
+    ) -> tuple[str, dict[str, Any]]:
+        _check_api_mode(api_mode)
+        payload: dict[str, Any] = {
+            "model": settings.ollama_model,
+            "stream": False,
+            "temperature": 0.5,
+            "stop": list(settings.llm_stop_sequences),
+        }
+        if num_predict is not None and num_predict > 0:
+            payload["max_tokens"] = num_predict
+        if api_mode == "chat":
+            payload["messages"] = chat_messages(text, prompt_template)
+            return "/v1/chat/completions", payload
+        payload["prompt"] = prompt_template.format(text=text)
+        return "/v1/completions", payload
+
+    def parse_response(
+        self, payload: dict[str, Any], response_data: dict[str, Any]
+    ) -> tuple[str, dict[str, Any]]:
+        if "error" in response_data:
+            raise OllamaError(
+                f"Le serveur LLM a retourné une erreur : {response_data['error']}"
+            )
+        choices = response_data.get("choices") or [{}]
+        text, finish_reason = self._choice_text(payload, choices[0], "message")
+        if text is None:
+            raise OllamaError(
+                "Réponse invalide reçue du serveur LLM (champ 'choices' manquant)."
+            )
+        stats = self._usage_stats(response_data.get("usage"))
+        if finish_reason:
+            stats["done_reason"] = finish_reason
+        return text.strip(), stats
+
+    def stream_payload(self, payload: dict[str, Any]) -> dict[str, Any]:
+        # include_usage : nombre de tokens dans le dernier événement du flux
+        return {**payload, "stream": True, "stream_options": {"include_usage": True}}
+
+    def parse_stream_line(
+        self, payload: dict[str, Any], line: str
+    ) -> tuple[str, dict[str, Any]]:
+        # Flux SSE : "data: {...}" par événement, "data: [DONE]" à la fin
+        line = line.strip()
+        if not line.startswith(_SSE_DATA_PREFIX):
+            return "", {}  # Ligne vide, commentaire (": ping") ou champ SSE ignoré
+        data = line[len(_SSE_DATA_PREFIX) :].strip()
+        if data == _SSE_DONE:
+            return "", {}
+        event = _json_line(data, "Le serveur LLM")
+        stats = self._usage_stats(event.get("usage"))
+        choices = event.get("choices") or []
+        if not choices:
+            return "", stats
+        text, finish_reason = self._choice_text(payload, choices[0], "delta")
+        if finish_reason:
+            stats["done_reason"] = finish_reason
+        return text or "", stats
+
+    def embedding_request(
+        self, texts: list[str], model: str
+    ) -> tuple[str, dict[str, Any]]:
+        return "/v1/embeddings", {"model": model, "input": texts}
+
+    def parse_embeddings(self, response_data: dict[str, Any]) -> list[list[float]]:
+        data = response_data.get("data")
+        if not isinstance(data, list):
+            raise OllamaError(
+                "Réponse invalide reçue du serveur LLM (champ 'data' manquant)."
+            )
+        # 'index' donne la position du texte (l'ordre des réponses n'est pas garanti)
+        items = sorted(data, key=lambda item: item.get("index", 0))
+        return [item["embedding"] for item in items]
+
+    def headers(self, settings: Settings) -> dict[str, str]:
+        if not settings.llm_api_key:
+            return {}
+        return {"Authorization": f"Bearer {settings.llm_api_key}"}
+
+    @staticmethod
+    def _choice_text(
+        payload: dict[str, Any], choice: dict[str, Any], message_key: str
+    ) -> tuple[Optional[str], Optional[str]]:
+        if "messages" in payload:
+            text = (choice.get(message_key) or {}).get("content")
+        else:
+            text = choice.get("text")
+        return text, choice.get("finish_reason")
+
+    @staticmethod
+    def _usage_stats(usage: Optional[dict[str, Any]]) -> dict[str, Any]:
+        if not usage:
+            return {}
+        return {
+            "prompt_eval_count": usage.get("prompt_tokens", 0),
+            "eval_count": usage.get("completion_tokens", 0),
+        }
+
+
+_BACKENDS: dict[str, LLMBackend] = {
+    backend.name: backend for backend in (OllamaBackend(), OpenAIBackend())
+}
+
+
+def get_llm_backend(settings: Settings) -> LLMBackend:
+    """
+    Backend LLM des paramètres (settings.llm_backend : 'ollama' ou 'openai').
+
+    Raises:
+        ConfigurationError: Si le backend configuré est inconnu.
+    """
+    backend = _BACKENDS.get(settings.llm_backend)
+    if backend is None:
+        raise ConfigurationError(
+            f"Backend LLM non valide : '{settings.llm_backend}'. "
+            f"Choisissez parmi : {', '.join(_BACKENDS)}."
+        )
+    return backend
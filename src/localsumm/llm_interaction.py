@@ -1,85 +1,615 @@
 # src/localsumm/llm_interaction.py
 
 import json
-from typing import Any
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Optional
 
 import requests
 
-from .config import OLLAMA_API_GENERATE_URL, OLLAMA_MODEL
-from .exceptions import OllamaError
+from .endpoints import EndpointPool, OllamaEndpoint, get_endpoint_pool
+from .exceptions import OllamaError, OllamaTimeoutError
+from .llm_backends import LLMBackend, get_llm_backend
+from .resources import get_host_scheduler
+from .settings import Settings, get_default_settings
 
 # from loguru import logger # Décommentez si vous utilisez Loguru pour le logging
 
 
-def generate_summary_with_ollama(text: str, prompt_template: str) -> str:
+def build_request(
+    text: str,
+    prompt_template: str,
+    api_mode: str,
+    num_predict: Optional[int] = None,
+    settings: Optional[Settings] = None,
+) -> tuple[str, dict[str, Any]]:
     """
-    Génère un résumé en utilisant un template de prompt spécifique via l'API Ollama.
+    Construit (chemin d'API, payload) pour le backend LLM des paramètres
+    (Ollama 'chat' / 'generate', ou API compatible OpenAI).
+    """
+    settings = settings or get_default_settings()
+    return get_llm_backend(settings).build_request(
+        text, prompt_template, api_mode, num_predict, settings
+    )
 
-    Args:
-        text: Le texte à résumer.
-        prompt_template: Le template de prompt (chaîne de caractères)
-                         contenant la placeholder {text}.
 
-    Returns:
-        Le texte du résumé généré.
+def extract_content(
+    payload: dict[str, Any],
+    response_data: dict[str, Any],
+    stats: Optional[dict[str, Any]] = None,
+    settings: Optional[Settings] = None,
+) -> str:
+    """
+    Extrait le texte généré d'une réponse complète du backend LLM et recopie
+    les statistiques dans 'stats' si fourni.
 
     Raises:
-        OllamaError: Si la requête API échoue ou si Ollama retourne une erreur.
+        OllamaError: Si la réponse ne contient pas le texte généré.
     """
+    settings = settings or get_default_settings()
+    content, response_stats = get_llm_backend(settings).parse_response(
+        payload, response_data
+    )
+    if stats is not None:
+        stats.update(response_stats)
+    return content
+
+
+@dataclass(frozen=True)
+class _LLMRequest:
+    """Une requête prête à envoyer sur n'importe quel endpoint du pool."""
+
+    backend: LLMBackend
+    path: str
+    payload: dict[str, Any]
+    timeout: float
+    headers: dict[str, str]
+    settings: Settings
+    # Étape LLM sous laquelle la latence est enregistrée (None = non enregistrée)
+    stage: Optional[str] = None
+
+
+# Intervalle entre deux tentatives de réservation d'un slot pour la copie "hedgée"
+_HEDGE_POLL_INTERVAL: float = 0.05
+
+# Threads dédiés aux requêtes "hedgées", par pool. Chaque requête en cours tient
+# un slot du pool : avec autant de threads que de slots, une requête soumise
+# démarre aussitôt (le délai de hedging ne court pas pendant une attente).
+_hedge_executors: dict[EndpointPool, ThreadPoolExecutor] = {}
+_hedge_executors_lock = threading.Lock()
+
+
+class _RequestCancelledError(OllamaError):
+    """Requête abandonnée : une autre copie a déjà répondu."""
 
-    full_prompt = prompt_template.format(text=text)
-    # logger.debug(f"Envoi requête à Ollama. Prompt début: {full_prompt[:150]}...") # Log du début du prompt
 
+def _hedge_executor(pool: EndpointPool) -> ThreadPoolExecutor:
+    with _hedge_executors_lock:
+        executor = _hedge_executors.get(pool)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=pool.total_capacity, thread_name_prefix="ollama-hedge"
+            )
+            _hedge_executors[pool] = executor
+        return executor
+
+
+def _post_json(
+    url: str,
+    payload: dict[str, Any],
+    timeout: float,
+    session: Optional[requests.Session] = None,
+    headers: Optional[dict[str, str]] = None,
+) -> dict[str, Any]:
+    """
+    Envoie la requête (via la session de l'endpoint si fournie, pour réutiliser
+    les connexions) et retourne la réponse JSON décodée.
+
+    Raises:
+        OllamaError: Si la requête échoue ou si le serveur retourne une erreur.
+    """
     try:
-        # Préparer les données à envoyer à l'API Ollama
-        payload: dict[str, Any] = {
-            "model": OLLAMA_MODEL,  # Utiliser le modèle défini dans config.py
-            "prompt": full_prompt,
-            "stream": False,  # On veut la réponse complète, pas en streaming
-            "options": {  # Quelques options possibles pour l'inférence
-                "temperature": 0.5,  # Contrôle le caractère aléatoire (plus bas = plus déterministe)
-                # "top_p": 0.9,          # Autre méthode de contrôle (nucleus sampling)
-                # "num_predict": 512     # Limite max de tokens à générer si besoin
-            },
-        }
-
-        # logger.info(f"Appel de l'API Ollama : {OLLAMA_API_GENERATE_URL}")
-
-        response = requests.post(OLLAMA_API_GENERATE_URL, json=payload, timeout=300)
+        # logger.info(f"Appel de l'API LLM : {url}")
+
+        response = (session or requests).post(
+            url, json=payload, timeout=timeout, headers=headers
+        )
         response.raise_for_status()
-        # logger.info(f"Ollama a répondu avec le statut : {response.status_code}")
+        # logger.info(
+        #     f"Le serveur LLM a répondu avec le statut : {response.status_code}"
+        # )
 
         response_data: dict[str, Any] = response.json()
 
         if "error" in response_data:
-            # logger.error(f"Ollama a retourné une erreur : {response_data['error']}")
+            # logger.error(
+            #     f"Le serveur LLM a retourné une erreur : {response_data['error']}"
+            # )
             raise OllamaError(
-                f"Ollama a retourné une erreur : {response_data['error']}"
+                f"Le serveur LLM a retourné une erreur : {response_data['error']}"
             )
+        return response_data
 
-        if "response" not in response_data:
-            # logger.error("La réponse d'Ollama ne contient pas la clé 'response'. Réponse reçue : {response_data}")
-            raise OllamaError(
-                "Réponse invalide reçue d'Ollama (champ 'response' manquant)."
-            )
-
-        summary: str = response_data["response"].strip()
-        # logger.success("Résumé reçu avec succès d'Ollama.")
-        return summary
-
-    # Gérer les erreurs de connexion ou de timeout
-    except requests.exceptions.RequestException as e:
-        # logger.error(f"Échec de la requête API vers Ollama : {e}")
-        raise OllamaError(
-            f"Impossible de contacter l'API Ollama à {OLLAMA_API_GENERATE_URL}: {e}"
+    except OllamaError:
+        raise
+    except requests.exceptions.Timeout as e:
+        raise OllamaTimeoutError(
+            f"Pas de réponse de l'API LLM à {url} en {timeout:.0f}s : {e}"
         ) from e
+    # Gérer les erreurs de connexion
+    except requests.exceptions.RequestException as e:
+        # logger.error(f"Échec de la requête API vers le serveur LLM : {e}")
+        raise OllamaError(f"Impossible de contacter l'API LLM à {url}: {e}") from e
     # Gérer les erreurs de décodage JSON (si la réponse n'est pas du JSON valide)
     except json.JSONDecodeError as e:
-        # logger.error(f"Échec du décodage de la réponse JSON d'Ollama : {e}. Réponse brute: {response.text[:500]}")
-        raise OllamaError(f"Réponse JSON invalide reçue d'Ollama : {e}") from e
+        # logger.error(
+        #     f"Échec du décodage de la réponse JSON : {e}. "
+        #     f"Réponse brute: {response.text[:500]}"
+        # )
+        raise OllamaError(f"Réponse JSON invalide reçue du serveur LLM : {e}") from e
     # Gérer d'autres erreurs potentielles (ex: raise_for_status)
     except Exception as e:
-        # logger.opt(exception=True).error("Erreur inattendue durant l'interaction avec Ollama.")
+        # logger.opt(exception=True).error(
+        #     "Erreur inattendue durant l'interaction avec le serveur LLM."
+        # )
         raise OllamaError(
-            f"Une erreur inattendue est survenue durant l'interaction avec Ollama : {e}"
+            "Une erreur inattendue est survenue durant l'interaction avec le "
+            f"serveur LLM : {e}"
         ) from e
+
+
+def _iter_stream(
+    url: str,
+    request: _LLMRequest,
+    session: requests.Session,
+    stats: dict[str, Any],
+    cancel: Optional[threading.Event] = None,
+) -> Iterator[str]:
+    """
+    Envoie la requête en streaming et produit les fragments de texte au fil de
+    la génération ; 'stats' reçoit les statistiques du flux. La connexion est
+    fermée dès que 'cancel' est positionné (ou que le générateur est fermé), ce
+    qui interrompt la génération côté serveur (et libère son slot et ses threads).
+
+    Raises:
+        OllamaError: Si la requête échoue ou si le serveur retourne une erreur.
+        _RequestCancelledError: Si la requête a été abandonnée.
+    """
+    payload = request.backend.stream_payload(request.payload)
+    try:
+        with session.post(
+            url,
+            json=payload,
+            timeout=request.timeout,
+            headers=request.headers,
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if cancel is not None and cancel.is_set():
+                    raise _RequestCancelledError(
+                        "Requête abandonnée (copie plus rapide)."
+                    )
+                text, line_stats = request.backend.parse_stream_line(
+                    request.payload, line.decode("utf-8", errors="replace")
+                )
+                stats.update(line_stats)
+                if text:
+                    yield text
+    except requests.exceptions.Timeout as e:
+        raise OllamaTimeoutError(
+            f"Pas de réponse de l'API LLM à {url} en {request.timeout:.0f}s : {e}"
+        ) from e
+    except requests.exceptions.RequestException as e:
+        raise OllamaError(f"Impossible de contacter l'API LLM à {url}: {e}") from e
+
+
+def _post_stream(
+    url: str,
+    request: _LLMRequest,
+    session: requests.Session,
+    cancel: threading.Event,
+) -> tuple[str, dict[str, Any]]:
+    """
+    Comme _post_json, mais en streaming (voir _iter_stream) : la requête peut être
+    abandonnée en cours de route.
+
+    Returns:
+        (texte complet, statistiques du flux).
+    """
+    stats: dict[str, Any] = {}
+    text = "".join(_iter_stream(url, request, session, stats, cancel))
+    return text.strip(), stats
+
+
+def _post_on_endpoint(
+    pool: EndpointPool,
+    endpoint: OllamaEndpoint,
+    request: _LLMRequest,
+    cancel: Optional[threading.Event] = None,
+) -> tuple[tuple[str, dict[str, Any]], OllamaEndpoint]:
+    """
+    Envoie la requête sur un endpoint déjà réservé, puis libère son slot.
+
+    Pour un serveur local, les threads CPU de la requête sont d'abord réservés
+    auprès de l'ordonnanceur de la machine (partagé avec whisper et ffmpeg).
+    Si 'cancel' est fourni, la requête peut être abandonnée en cours de route
+    (voir _post_stream).
+
+    Returns:
+        ((texte généré, statistiques), endpoint).
+    """
+    url = f"{endpoint.base_url}{request.path}"
+    try:
+        with get_host_scheduler().reserve(
+            request.backend.request_threads(endpoint, request.settings)
+        ):
+            if cancel is not None and cancel.is_set():
+                raise _RequestCancelledError("Requête abandonnée (copie plus rapide).")
+            # Latence mesurée hors attente du budget CPU (percentile de hedging)
+            start = time.perf_counter()
+            if cancel is None:
+                response_data = _post_json(
+                    url,
+                    request.payload,
+                    request.timeout,
+                    endpoint.session,
+                    request.headers,
+                )
+                result = request.backend.parse_response(request.payload, response_data)
+            else:
+                result = _post_stream(url, request, endpoint.session, cancel)
+    except OllamaError as e:
+        connection_failed = isinstance(e.__cause__, requests.exceptions.ConnectionError)
+        pool.release(endpoint, connection_failed=connection_failed)
+        raise
+    pool.release(endpoint, latency=time.perf_counter() - start, stage=request.stage)
+    return result, endpoint
+
+
+def _post_hedged(
+    pool: EndpointPool,
+    request: _LLMRequest,
+    delay: float,
+) -> tuple[tuple[str, dict[str, Any]], OllamaEndpoint, bool]:
+    """
+    Envoie la requête ; si elle n'a pas répondu après 'delay' secondes, en lance une
+    copie sur un autre endpoint disposant d'un slot libre, et garde la première
+    réponse réussie. La requête perdante est interrompue (connexion fermée).
+
+    Returns:
+        ((texte généré, statistiques), endpoint ayant répondu, True si la copie
+        a été lancée).
+
+    Raises:
+        OllamaError: Si toutes les copies lancées ont échoué.
+    """
+    executor = _hedge_executor(pool)
+    cancel = threading.Event()
+    primary_endpoint = pool.acquire()
+    if primary_endpoint is None:
+        raise OllamaError("Aucun endpoint LLM disponible.")
+    futures: list[Future] = [
+        executor.submit(_post_on_endpoint, pool, primary_endpoint, request, cancel)
+    ]
+    done, _ = wait(futures, timeout=delay)
+    hedged = False
+    # Passé le délai, la copie part dès qu'un autre serveur a un slot libre
+    while not done:
+        secondary_endpoint = pool.acquire(exclude={primary_endpoint}, blocking=False)
+        if secondary_endpoint is not None:
+            # logger.info(
+            #     f"Requête lente sur {primary_endpoint.base_url} : copie envoyée "
+            #     f"à {secondary_endpoint.base_url}"
+            # )
+            hedged = True
+            futures.append(
+                executor.submit(
+                    _post_on_endpoint, pool, secondary_endpoint, request, cancel
+                )
+            )
+            break
+        done, _ = wait(futures, timeout=_HEDGE_POLL_INTERVAL)
+
+    last_error: Optional[BaseException] = None
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    result, endpoint = future.result()
+                    return result, endpoint, hedged
+                last_error = error
+    finally:
+        # La copie perdante (ou encore en cours) est interrompue
+        cancel.set()
+    if last_error is None:
+        raise OllamaError("Aucune réponse reçue du serveur LLM.")
+    raise last_error
+
+
+def _prepare_request(
+    text: str,
+    prompt_template: str,
+    api_mode: Optional[str],
+    num_predict: Optional[int],
+    settings: Settings,
+    stage: Optional[str] = None,
+) -> _LLMRequest:
+    backend = get_llm_backend(settings)
+    path, payload = backend.build_request(
+        text,
+        prompt_template,
+        api_mode or settings.ollama_api_mode,
+        num_predict,
+        settings,
+    )
+    return _LLMRequest(
+        backend=backend,
+        path=path,
+        payload=payload,
+        timeout=settings.ollama_timeout,
+        headers=backend.headers(settings),
+        settings=settings,
+        stage=stage,
+    )
+
+
+def generate_summary_with_ollama(
+    text: str,
+    prompt_template: str,
+    *,
+    api_mode: Optional[str] = None,
+    stats: Optional[dict[str, Any]] = None,
+    hedge: bool = False,
+    num_predict: Optional[int] = None,
+    settings: Optional[Settings] = None,
+    stage: Optional[str] = None,
+) -> str:
+    """
+    Génère un résumé en utilisant un template de prompt spécifique via le backend
+    LLM des paramètres (Ollama par défaut, ou serveur compatible OpenAI).
+
+    La requête est envoyée au serveur le moins chargé parmi les serveurs
+    des paramètres (OLLAMA_BASE_URLS par défaut).
+
+    Args:
+        text: Le texte à résumer.
+        prompt_template: Le template de prompt (chaîne de caractères)
+                         contenant la placeholder {text}.
+        api_mode: 'chat' (instruction en message système) ou 'generate' (prompt
+                  brut). Défaut: settings.ollama_api_mode.
+        stats: Si fourni, reçoit les statistiques renvoyées par le serveur
+               (prompt_eval_count, eval_count, durées...), l'endpoint utilisé et
+               'hedged' si une copie de la requête a été lancée.
+        hedge: Autorise la relance sur un second serveur si la requête est lente
+               (si settings.ollama_hedge_enabled et plusieurs serveurs configurés).
+               Le délai de relance est tiré des latences de la même étape.
+        num_predict: Nombre maximal de tokens générés (None = pas de plafond).
+        settings: Paramètres du job (modèle, serveurs, contexte...). Défaut: config.py.
+        stage: Étape LLM ('map', 'reduce', 'direct') sous laquelle la latence est
+               enregistrée pour le hedging. None = latence non enregistrée.
+
+    Returns:
+        Le texte du résumé généré.
+
+    Raises:
+        OllamaError: Si la requête API échoue ou si le serveur retourne une erreur.
+        ConfigurationError: Si le backend ou le mode d'API configuré est invalide.
+    """
+    settings = settings or get_default_settings()
+    request = _prepare_request(
+        text, prompt_template, api_mode, num_predict, settings, stage
+    )
+    # logger.debug(
+    #     f"Envoi requête ({request.path}). "
+    #     f"Payload début: {str(request.payload)[:150]}..."
+    # )
+
+    pool = get_endpoint_pool(settings)
+    hedge_delay = (
+        pool.hedge_delay(stage)
+        if hedge and stage is not None and settings.ollama_hedge_enabled
+        else None
+    )
+    hedged = False
+    if hedge_delay is not None:
+        (summary, response_stats), endpoint, hedged = _post_hedged(
+            pool, request, hedge_delay
+        )
+    else:
+        acquired = pool.acquire()
+        if acquired is None:
+            raise OllamaError("Aucun endpoint LLM disponible.")
+        (summary, response_stats), endpoint = _post_on_endpoint(pool, acquired, request)
+
+    if stats is not None:
+        stats.update(response_stats)
+        stats["endpoint"] = endpoint.base_url
+        stats["hedged"] = hedged
+    # logger.success("Résumé reçu avec succès du serveur LLM.")
+    return summary
+
+
+def stream_summary(
+    text: str,
+    prompt_template: str,
+    *,
+    api_mode: Optional[str] = None,
+    stats: Optional[dict[str, Any]] = None,
+    num_predict: Optional[int] = None,
+    settings: Optional[Settings] = None,
+    stage: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Comme generate_summary_with_ollama (sans hedging), mais produit le texte au
+    fil de la génération. Le slot de l'endpoint et les threads CPU restent
+    réservés jusqu'à la fin du flux ; fermer le générateur avant la fin
+    interrompt la génération.
+
+    Yields:
+        Les fragments de texte successifs (leur concaténation est le résumé).
+
+    Raises:
+        OllamaError: Si la requête API échoue ou si le serveur retourne une erreur.
+        ConfigurationError: Si le backend ou le mode d'API configuré est invalide.
+    """
+    settings = settings or get_default_settings()
+    request = _prepare_request(
+        text, prompt_template, api_mode, num_predict, settings, stage
+    )
+    pool = get_endpoint_pool(settings)
+    endpoint = pool.acquire()
+    if endpoint is None:
+        raise OllamaError("Aucun endpoint LLM disponible.")
+    url = f"{endpoint.base_url}{request.path}"
+    stream_stats: dict[str, Any] = {}
+    latency: Optional[float] = None
+    connection_failed = False
+    try:
+        with get_host_scheduler().reserve(
+            request.backend.request_threads(endpoint, request.settings)
+        ):
+            start = time.perf_counter()
+            yield from _iter_stream(url, request, endpoint.session, stream_stats)
+            latency = time.perf_counter() - start
+    except OllamaError as e:
+        connection_failed = isinstance(e.__cause__, requests.exceptions.ConnectionError)
+        raise
+    finally:
+        pool.release(
+            endpoint,
+            latency=latency,
+            connection_failed=connection_failed,
+            stage=request.stage,
+        )
+    if stats is not None:
+        stats.update(stream_stats)
+        stats["endpoint"] = endpoint.base_url
+
+
+def embed_texts(
+    texts: list[str],
+    model: str,
+    settings: Optional[Settings] = None,
+) -> list[list[float]]:
+    """
+    Calcule les embeddings de plusieurs textes en une requête, sur le serveur le
+    moins chargé (Ollama /api/embed, ou /v1/embeddings d'un serveur compatible
+    OpenAI).
+
+    Args:
+        texts: Les textes (une requête pour tous).
+        model: Le modèle d'embeddings (ex: 'nomic-embed-text').
+        settings: Paramètres du job (serveurs, backend...). Défaut: config.py.
+
+    Returns:
+        Un vecteur par texte, dans l'ordre des textes.
+
+    Raises:
+        OllamaError: Si la requête échoue ou si la réponse est incomplète.
+        ConfigurationError: Si le backend configuré est invalide.
+    """
+    settings = settings or get_default_settings()
+    backend = get_llm_backend(settings)
+    path, payload = backend.embedding_request(texts, model)
+    pool = get_endpoint_pool(settings)
+    endpoint = pool.acquire()
+    if endpoint is None:
+        raise OllamaError("Aucun endpoint LLM disponible.")
+    try:
+        with get_host_scheduler().reserve(backend.request_threads(endpoint, settings)):
+            response_data = _post_json(
+                f"{endpoint.base_url}{path}",
+                payload,
+                settings.ollama_timeout,
+                endpoint.session,
+                backend.headers(settings),
+            )
+    except OllamaError as e:
+        connection_failed = isinstance(e.__cause__, requests.exceptions.ConnectionError)
+        pool.release(endpoint, connection_failed=connection_failed)
+        raise
+    # Pas de latence enregistrée : elle fausserait le percentile du hedging
+    pool.release(endpoint)
+    embeddings = backend.parse_embeddings(response_data)
+    if len(embeddings) != len(texts):
+        raise OllamaError(
+            f"Nombre d'embeddings reçus ({len(embeddings)}) différent du nombre "
+            f"de textes ({len(texts)})."
+        )
+    return embeddings
+
+
+def warmup_ollama_model(
+    model: Optional[str] = None, settings: Optional[Settings] = None
+) -> None:
+    """
+    Précharge un modèle dans Ollama (requête sans prompt) et le garde en mémoire
+    pour la durée keep_alive, sur chaque serveur des paramètres. Le
+    chargement du modèle sort ainsi du chemin critique de la première requête.
+    Sans objet pour un serveur compatible OpenAI (modèle chargé au démarrage du
+    serveur) : aucune requête n'est envoyée.
+
+    Args:
+        model: Le modèle à charger (défaut: settings.ollama_model).
+        settings: Paramètres du job (défaut: config.py).
+
+    Raises:
+        OllamaError: Si aucun serveur n'a pu charger le modèle.
+    """
+    settings = settings or get_default_settings()
+    if model:
+        settings = settings.replace(ollama_model=model)
+    backend = get_llm_backend(settings)
+    warmup = backend.warmup_request(settings)
+    if warmup is None:
+        return
+    path, payload = warmup
+    errors: list[str] = []
+    endpoints = get_endpoint_pool(settings).endpoints
+    for endpoint in endpoints:
+        # logger.info(
+        #     f"Préchargement du modèle '{payload['model']}' sur {endpoint.base_url}..."
+        # )
+        try:
+            _post_json(
+                f"{endpoint.base_url}{path}",
+                payload,
+                settings.ollama_timeout,
+                endpoint.session,
+                backend.headers(settings),
+            )
+        except OllamaError as e:
+            errors.append(f"{endpoint.base_url}: {e}")
+    if len(errors) == len(endpoints):
+        raise OllamaError("Impossible de précharger le modèle : " + " | ".join(errors))
+    # logger.success(f"Modèle '{payload['model']}' chargé et maintenu en mémoire.")
+
+
+def start_background_warmup(
+    model: Optional[str] = None, settings: Optional[Settings] = None
+) -> threading.Thread:
+    """
+    Lance warmup_ollama_model dans un thread d'arrière-plan (ex: pendant la
+    transcription). Les erreurs sont ignorées : la vraie requête les signalera.
+
+    Returns:
+        Le thread démarré (daemon), que l'appelant peut joindre s'il le souhaite.
+    """
+
+    def _warmup() -> None:
+        try:
+            warmup_ollama_model(model, settings)
+        except OllamaError:
+            # logger.warning("Préchargement du modèle Ollama impossible, on continue.")
+            pass
+
+    thread = threading.Thread(target=_warmup, name="ollama-warmup", daemon=True)
+    thread.start()
+    return thread
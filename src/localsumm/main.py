@@ -1,170 +1,1150 @@
 # src/localsumm/main.py
 
 import time
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from itertools import chain, islice
 from pathlib import Path
-from typing import Optional
-
-from .config import (
-    CHUNK_OVERLAP_TOKENS,
-    CHUNK_TARGET_TOKENS,
-    PROMPT_TEMPLATE_DETAILED,
-    PROMPT_TEMPLATE_MAP,
-    PROMPT_TEMPLATE_SHORT,
-)
+from typing import Any, Callable, Optional, TypeVar
+
+from .cache import DiskCache, make_cache_key
+from .config import PROMPT_TEMPLATES
+from .dedup import find_near_duplicates
+from .endpoints import get_endpoint_pool
 from .exceptions import (
     ConfigurationError,
     LocalSummError,
     OllamaError,
+    OllamaTimeoutError,
+)
+from .extractive import extractive_compress
+from .file_processor import is_large_text_file, process_file
+from .key_points import compact_map_summaries, is_structured, map_prompt_template
+from .llm_interaction import (
+    generate_summary_with_ollama,
+    start_background_warmup,
+    stream_summary,
+)
+from .map_retry import (
+    attempt_settings,
+    check_map_error_budget,
+    job_deadline,
+    retry_delay,
+    should_split,
+)
+from .media_window import window_requested
+from .metrics import PipelineMetrics
+from .progress import (
+    FINAL,
+    FRAGMENT,
+    MAP,
+    PREVIEW,
+    ProgressCallback,
+    ProgressEvent,
+    serialized,
 )
-from .file_processor import process_file
-from .llm_interaction import generate_summary_with_ollama
+from .relevance import ChunkRanker, focus_on_question
+from .remote_media import is_direct_media_url, transcribe_remote_media
+from .settings import Settings, get_default_settings
+from .singleflight import SingleFlight, source_identity
+from .text_reader import iter_text_file
+from .transcript import Transcript
 from .transcription import transcribe_audio
-from .utils import chunk_text, count_tokens
+from .utils import (
+    chunk_text,
+    count_tokens,
+    count_tokens_batch,
+    iter_chunks,
+    split_in_half,
+)
 from .youtube_processor import download_youtube_audio
 
 # from loguru import logger
 
 # --- Helper pour Map-Reduce ---
 
+# Résumés MAP déjà calculés, indexés par (modèle, prompt, contenu du chunk)
+map_cache = DiskCache("map_summaries")
+
+# Jobs identiques en cours (même source, mêmes formats, mêmes paramètres)
+_jobs_in_flight = SingleFlight()
+
+T = TypeVar("T")
+
+
+def map_cache_key(chunk: str, num_predict: int, settings: Settings) -> str:
+    return make_cache_key(
+        settings.ollama_model, map_prompt_template(settings), str(num_predict), chunk
+    )
+
+
+def _map_output_budget(chunk_tokens: int, settings: Settings) -> int:
+    """Plafond de tokens générés pour le résumé MAP d'un chunk de cette taille."""
+    budget = int(chunk_tokens * settings.map_output_ratio)
+    return max(
+        settings.map_min_output_tokens, min(settings.map_max_output_tokens, budget)
+    )
+
 
-def _summarize_map_reduce(chunks: list[str], final_prompt_template: str) -> str:
+def record_llm_stats(
+    metrics: PipelineMetrics, stage: str, stats: dict[str, Any]
+) -> None:
+    """Cumule les statistiques d'un appel LLM dans les mesures de l'étape."""
+    metrics.increment(f"{stage}_llm_calls")
+    metrics.increment(f"{stage}_prompt_eval_tokens", stats.get("prompt_eval_count", 0))
+    metrics.increment(f"{stage}_eval_tokens", stats.get("eval_count", 0))
+    if stats.get("hedged"):
+        metrics.increment("hedged_requests")
+    if stats.get("done_reason") == "length":
+        # Sortie coupée par num_predict : budget peut-être trop serré
+        metrics.increment(f"{stage}_truncated_outputs")
+
+
+def _generate(
+    text: str,
+    prompt_template: str,
+    metrics: Optional[PipelineMetrics],
+    stage: str,
+    hedge: bool = False,
+    num_predict: Optional[int] = None,
+    settings: Optional[Settings] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> str:
     """
-    Effectue la partie Map-Reduce de la summarisation pour les textes longs.
+    Appelle le LLM et cumule ses statistiques de tokens dans les mesures. Avec
+    on_token, la réponse est lue en flux (sans hedging) et chaque fragment lui
+    est transmis dès sa réception.
+    """
+    stats: dict[str, Any] = {}
+    if on_token is None:
+        summary = generate_summary_with_ollama(
+            text,
+            prompt_template,
+            stats=stats,
+            hedge=hedge,
+            num_predict=num_predict,
+            settings=settings,
+            stage=stage,
+        )
+    else:
+        fragments: list[str] = []
+        for fragment in stream_summary(
+            text,
+            prompt_template,
+            stats=stats,
+            num_predict=num_predict,
+            settings=settings,
+            stage=stage,
+        ):
+            fragments.append(fragment)
+            on_token(fragment)
+        summary = "".join(fragments).strip()
+    if metrics is not None:
+        record_llm_stats(metrics, stage, stats)
+    return summary
+
+
+def _attempt_map(
+    chunk: str,
+    num_predict: int,
+    metrics: PipelineMetrics,
+    settings: Settings,
+    deadline: Optional[float],
+    depth: int,
+) -> tuple[Optional[str], int]:
+    """
+    Appels MAP sur un texte, retentés après un délai croissant (voir
+    map_retry.retry_delay) ; s'arrête dès que le texte doit être coupé en deux
+    (map_retry.should_split).
+
+    Returns:
+        (résumé, ou None en cas d'échec ; nombre de délais dépassés).
+
+    Raises:
+        ConfigurationError: Erreur de configuration (inutile de réessayer).
+    """
+    timeouts = 0
+    attempts = 0
+    while (call_settings := attempt_settings(settings, deadline)) is not None:
+        attempts += 1
+        try:
+            summary = _generate(
+                chunk,
+                map_prompt_template(settings),
+                metrics,
+                "map",
+                hedge=settings.ollama_hedge_enabled,
+                num_predict=num_predict,
+                settings=call_settings,
+            )
+            return summary, timeouts
+        except ConfigurationError:
+            raise
+        except Exception as e:
+            # logger.warning(f"Échec de l'appel MAP (tentative {attempts}) : {e}")
+            if isinstance(e, OllamaTimeoutError):
+                timeouts += 1
+                metrics.increment("map_timeouts")
+            metrics.set("map_last_error", f"{type(e).__name__}: {e}")
+        if should_split(timeouts, depth, settings):
+            break
+        delay = retry_delay(attempts, settings, deadline)
+        if delay is None:
+            break
+        metrics.increment("map_retries")
+        time.sleep(delay)
+    return None, timeouts
+
+
+def _map_halves(
+    chunk: str,
+    metrics: PipelineMetrics,
+    settings: Settings,
+    deadline: Optional[float],
+    depth: int,
+) -> Optional[str]:
+    """
+    Résume séparément les deux moitiés d'un texte trop lent à résumer (coupées
+    de nouveau si besoin) ; les résumés obtenus sont mis bout à bout.
+    """
+    halves = split_in_half(chunk)
+    if len(halves) < 2:
+        return None
+    metrics.increment("map_split_chunks")
+    summaries: list[str] = []
+    for half in halves:
+        num_predict = _map_output_budget(count_tokens(half, settings), settings)
+        summary, timeouts = _attempt_map(
+            half, num_predict, metrics, settings, deadline, depth
+        )
+        if summary is None and should_split(timeouts, depth, settings):
+            summary = _map_halves(half, metrics, settings, deadline, depth + 1)
+        if summary:
+            summaries.append(summary)
+    if len(summaries) < len(halves):
+        metrics.increment("map_incomplete_chunks")
+    return "\n\n".join(summaries) or None
+
+
+def _map_chunk(
+    index: int,
+    chunk: str,
+    num_predict: int,
+    metrics: PipelineMetrics,
+    settings: Settings,
+    deadline: Optional[float] = None,
+) -> Optional[str]:
+    """
+    Résume un chunk (ou reprend son résumé du cache).
+
+    Un appel en échec est retenté ; si le LLM dépasse plusieurs fois son délai,
+    le chunk est coupé en deux moitiés résumées séparément.
+
+    Returns:
+        Le résumé, ou None si le chunk n'a pas pu être résumé : il est alors
+        compté dans map_failed_chunks, ou dans map_skipped_chunks si l'échéance
+        du job est atteinte.
+    """
+    # logger.info(f"Résumé du chunk {index+1}...")
+    cache_key = (
+        map_cache_key(chunk, num_predict, settings)
+        if settings.map_cache_enabled
+        else None
+    )
+    cached_summary = map_cache.get(cache_key) if cache_key else None
+    if isinstance(cached_summary, str):
+        # logger.debug(f"Chunk {index+1} inchangé : résumé MAP repris du cache.")
+        metrics.increment("map_cache_hits")
+        return cached_summary
+    chunk_summary, timeouts = _attempt_map(
+        chunk, num_predict, metrics, settings, deadline, depth=0
+    )
+    if chunk_summary is not None:
+        if cache_key:
+            map_cache.set(cache_key, chunk_summary)
+        # logger.debug(f"Résumé Chunk {index+1}: {chunk_summary[:100]}...")
+        return chunk_summary
+    if should_split(timeouts, 0, settings):
+        # logger.info(f"Chunk {index+1} trop lent : découpage en deux moitiés.")
+        chunk_summary = _map_halves(chunk, metrics, settings, deadline, depth=1)
+    if chunk_summary is None:
+        record_map_failure(metrics, settings, deadline)
+    return chunk_summary
+
+
+def record_map_failure(
+    metrics: PipelineMetrics, settings: Settings, deadline: Optional[float]
+) -> None:
+    """Compte un chunk non résumé : échec, ou échéance du job atteinte."""
+    if attempt_settings(settings, deadline) is None:
+        metrics.increment("map_skipped_chunks")
+        metrics.set("partial", True)
+    else:
+        metrics.increment("map_failed_chunks")
+
+
+def plan_map_stage(
+    chunks: list[str],
+    metrics: Optional[PipelineMetrics] = None,
+    settings: Optional[Settings] = None,
+) -> tuple[list[int], dict[int, int]]:
+    """
+    Prépare l'étape MAP : regroupe les chunks quasi identiques et calcule le
+    budget de sortie (num_predict) de chaque chunk à résumer.
+
+    Returns:
+        (représentant de chaque chunk, {indice à résumer: num_predict}) ; les
+        indices à résumer sont dans l'ordre croissant.
+    """
+    settings = settings or get_default_settings()
+    if settings.dedup_enabled and len(chunks) > 1:
+        representatives = find_near_duplicates(
+            chunks, threshold=settings.dedup_threshold
+        )
+    else:
+        representatives = list(range(len(chunks)))
+    unique_indices: list[int] = sorted(set(representatives))
+
+    if metrics is not None:
+        # Cumulés : en lecture en flux, l'étape MAP est planifiée lot par lot
+        metrics.increment("map_chunks_total", len(chunks))
+        metrics.increment("map_chunks_unique", len(unique_indices))
+        values = metrics.as_dict()["values"]
+        total = values["map_chunks_total"]
+        metrics.set(
+            "dedup_ratio",
+            round(1 - values["map_chunks_unique"] / total, 4) if total else 0.0,
+        )
+
+    budgets = {
+        i: _map_output_budget(tokens, settings)
+        for i, tokens in zip(
+            unique_indices,
+            count_tokens_batch([chunks[i] for i in unique_indices], settings),
+        )
+    }
+    return representatives, budgets
+
+
+def effective_map_concurrency(settings: Settings) -> int:
+    """Nombre d'appels MAP simultanés (map_concurrency ou capacité du pool)."""
+    return max(
+        1, settings.map_concurrency or get_endpoint_pool(settings).total_capacity
+    )
+
+
+def _run_map_stage(
+    chunks: list[str],
+    metrics: Optional[PipelineMetrics] = None,
+    settings: Optional[Settings] = None,
+    deadline: Optional[float] = None,
+    on_event: Optional[ProgressCallback] = None,
+) -> list[str]:
+    """
+    Étape MAP : résume chaque chunk individuellement.
+
+    Les chunks quasi identiques (passages répétés, boucles de livestream...) sont
+    regroupés : un seul appel LLM par groupe, et un seul résumé par groupe en
+    entrée du REDUCE.
+
+    La sortie de chaque appel est plafonnée (num_predict) proportionnellement à la
+    taille du chunk, ce qui borne aussi la taille d'entrée du REDUCE.
+
+    Les appels sont envoyés en parallèle (MAP_CONCURRENCY, ou capacité totale des
+    serveurs Ollama) ; le pool d'endpoints limite la charge de chaque serveur.
 
     Args:
         chunks: Liste des morceaux de texte.
-        final_prompt_template: Le template de prompt final (court ou détaillé).
+        metrics: Si fourni, reçoit les compteurs de l'étape (dédup, cache, appels,
+                 tentatives et échecs).
+        settings: Paramètres du job (défaut: config.py) ; le modèle de l'étape
+                  MAP (MAP_MODEL) est utilisé s'il est configuré.
+        deadline: Échéance du job (voir map_retry.job_deadline) : passé ce
+                  moment, les chunks restants ne sont plus résumés.
+        on_event: Si fourni, reçoit chaque résumé MAP dès qu'il est terminé.
 
     Returns:
-        Le résumé final combiné.
+        Un résumé intermédiaire par groupe de chunks, dans l'ordre du texte (deux
+        chunks distincts aux résumés identiques restent deux entrées). Les chunks
+        qui n'ont pas pu être résumés sont omis.
 
     Raises:
-        OllamaError: Si une erreur survient lors de l'appel à Ollama.
-        ConfigurationError: Si le tokenizer ou Ollama est mal configuré.
+        LocalSummError: Si trop de chunks sont en échec (MAP_ERROR_BUDGET).
     """
-    # logger.info(f"Démarrage Map-Reduce sur {len(chunks)} chunks.")
-    intermediate_summaries: list[str] = []
+    settings = (settings or get_default_settings()).for_stage("map")
+    metrics = metrics if metrics is not None else PipelineMetrics()
+    metrics.set("map_model", settings.ollama_model)
+    _, budgets = plan_map_stage(chunks, metrics, settings)
+    unique_indices = list(budgets)
+    max_workers = effective_map_concurrency(settings)
+    summaries_by_index: dict[int, Optional[str]] = {}
 
-    # Étape MAP : Résumer chaque chunk individuellement
-    # logger.info("--- Étape MAP ---")
-    for i, chunk in enumerate(chunks):
-        # logger.info(f"Résumé du chunk {i+1}/{len(chunks)}...")
-        try:
-            chunk_summary: str = generate_summary_with_ollama(
-                chunk, PROMPT_TEMPLATE_MAP
+    def completed(i: int, summary: Optional[str]) -> None:
+        summaries_by_index[i] = summary
+        if on_event is not None and summary is not None:
+            on_event(
+                ProgressEvent(
+                    MAP,
+                    summary,
+                    index=unique_indices.index(i),
+                    total=len(unique_indices),
+                )
             )
-            intermediate_summaries.append(chunk_summary)
-            # logger.debug(f"Résumé Chunk {i+1}: {chunk_summary[:100]}...")
-            time.sleep(0.5)
-        except (OllamaError, ConfigurationError):
-            # logger.warning(f"Échec du résumé pour le chunk {i+1}. Erreur: {e}. On continue...")
-            # Décision: soit on lève l'erreur, soit on continue sans ce chunk.
-            # Pour l'instant, on continue, mais on pourrait vouloir arrêter.
-            intermediate_summaries.append(f"[Erreur lors du résumé du chunk {i+1}]")
-        except Exception as e:
-            intermediate_summaries.append(
-                f"[Erreur inattendue chunk {i+1}: {type(e).__name__}]"
+
+    if max_workers == 1 or len(unique_indices) <= 1:
+        for i in unique_indices:
+            completed(
+                i, _map_chunk(i, chunks[i], budgets[i], metrics, settings, deadline)
             )
+    else:
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(unique_indices))
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _map_chunk, i, chunks[i], budgets[i], metrics, settings, deadline
+                ): i
+                for i in unique_indices
+            }
+            # Résumés transmis à on_event dans l'ordre où ils se terminent
+            for future in as_completed(futures):
+                completed(futures[future], future.result())
 
-    # logger.info("--- Fin Étape MAP ---")
+    check_map_error_budget(metrics, settings)
+    return [
+        summary
+        for summary in (summaries_by_index[i] for i in unique_indices)
+        if summary is not None
+    ]
 
-    # Étape COMBINE/REDUCE : Combiner les résumés intermédiaires et faire un résumé final
-    # logger.info("--- Étape REDUCE ---")
-    combined_intermediate_summary: str = "\n\n".join(intermediate_summaries).strip()
+
+def _run_for_formats(
+    text: str,
+    prompt_templates: dict[str, str],
+    metrics: PipelineMetrics,
+    stage: str,
+    settings: Optional[Settings] = None,
+    on_event: Optional[ProgressCallback] = None,
+) -> dict[str, str]:
+    """
+    Génère un résumé par format à partir du même texte, en parallèle.
+
+    Args:
+        text: Le texte à résumer (texte source ou résumés intermédiaires combinés).
+        prompt_templates: Les templates finaux, indexés par nom de format.
+        metrics: Reçoit la durée de chaque génération ("<stage>:<format>").
+        stage: L'étape ("direct" ou "reduce") : choisit son modèle (voir
+               Settings.for_stage) et nomme ses mesures.
+        settings: Paramètres du job (défaut: config.py).
+        on_event: Si fourni, les résumés sont générés en flux : il reçoit chaque
+                  fragment (FRAGMENT), puis le résumé complet (FINAL) de chaque format.
+
+    Returns:
+        Les résumés, indexés par nom de format (même ordre que prompt_templates).
+    """
+    settings = (settings or get_default_settings()).for_stage(stage)
+    metrics.set(f"{stage}_model", settings.ollama_model)
+
+    def generate(format_name: str) -> str:
+        on_token: Optional[Callable[[str], None]] = None
+        if on_event is not None:
+            emit = on_event
+
+            def on_token(fragment: str) -> None:
+                emit(ProgressEvent(FRAGMENT, fragment, format_name=format_name))
+
+        with metrics.timer(f"{stage}:{format_name}"):
+            summary = _generate(
+                text,
+                prompt_templates[format_name],
+                metrics,
+                stage,
+                num_predict=settings.final_output_budget(format_name),
+                settings=settings,
+                on_token=on_token,
+            )
+        if on_event is not None:
+            on_event(ProgressEvent(FINAL, summary, format_name=format_name))
+        return summary
+
+    if len(prompt_templates) == 1:
+        format_name = next(iter(prompt_templates))
+        return {format_name: generate(format_name)}
+
+    with ThreadPoolExecutor(max_workers=len(prompt_templates)) as executor:
+        futures = {name: executor.submit(generate, name) for name in prompt_templates}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def combine_map_summaries(
+    chunk_summaries: list[str],
+    metrics: PipelineMetrics,
+    settings: Optional[Settings] = None,
+) -> str:
+    """
+    Assemble les résumés intermédiaires en entrée du REDUCE.
+
+    Si les résumés MAP sont structurés (voir key_points.is_structured), leurs
+    points clés sont normalisés et les points quasi identiques d'un chunk à
+    l'autre fusionnés ; la réduction obtenue est mesurée
+    (reduce_input_tokens_raw -> reduce_input_tokens).
+
+    Raises:
+        LocalSummError: Si aucun résumé intermédiaire n'a été produit.
+    """
+    settings = settings or get_default_settings()
+    reduce_settings = settings.for_stage("reduce")
+    combined_intermediate_summary: str = "\n\n".join(chunk_summaries).strip()
 
     if not combined_intermediate_summary:
         # logger.error("Aucun résumé intermédiaire n'a pu être généré.")
         raise LocalSummError("Aucun résumé intermédiaire généré pendant le Map-Reduce.")
 
+    raw_tokens: Optional[int] = None
+    if is_structured(settings):
+        compacted, points_total, points_kept = compact_map_summaries(
+            chunk_summaries, settings
+        )
+        # Aucun point reconnu : les résumés sont gardés tels quels
+        if compacted:
+            metrics.set("map_points_total", points_total)
+            metrics.set("map_points_unique", points_kept)
+            raw_tokens = count_tokens(combined_intermediate_summary, reduce_settings)
+            combined_intermediate_summary = compacted
+
     # Vérifier si les résumés combinés sont eux-mêmes trop longs
     # logger.info("Vérification de la taille des résumés combinés...")
-    combined_tokens: int = count_tokens(combined_intermediate_summary)
-    # logger.debug(f"Nombre de tokens des résumés intermédiaires combinés: {combined_tokens}")
+    combined_tokens: int = count_tokens(combined_intermediate_summary, reduce_settings)
+    metrics.set("reduce_input_tokens", combined_tokens)
+    if raw_tokens:
+        metrics.set("reduce_input_tokens_raw", raw_tokens)
+        metrics.set(
+            "reduce_token_reduction", round(1 - combined_tokens / raw_tokens, 4)
+        )
+    # logger.debug(
+    #     f"Nombre de tokens des résumés intermédiaires combinés: {combined_tokens}"
+    # )
+    return combined_intermediate_summary
+
+
+def _summarize_map_reduce_formats(
+    chunks: list[str],
+    prompt_templates: dict[str, str],
+    metrics: Optional[PipelineMetrics] = None,
+    settings: Optional[Settings] = None,
+    deadline: Optional[float] = None,
+    on_event: Optional[ProgressCallback] = None,
+) -> dict[str, str]:
+    """
+    Map-Reduce avec plusieurs sorties : une seule étape MAP, puis une étape REDUCE
+    par format demandé (exécutées en parallèle).
+
+    Args:
+        chunks: Liste des morceaux de texte.
+        prompt_templates: Les templates finaux, indexés par nom de format.
+        metrics: Si fourni, reçoit les mesures des étapes MAP et REDUCE.
+        settings: Paramètres du job (défaut: config.py).
+        deadline: Échéance du job pour l'étape MAP (voir _run_map_stage).
+        on_event: Si fourni, reçoit les résumés MAP puis les résumés finaux en
+                  flux (voir progress.ProgressEvent).
+
+    Returns:
+        Les résumés finaux, indexés par nom de format.
+
+    Raises:
+        OllamaError: Si une erreur survient lors de l'appel à Ollama.
+        ConfigurationError: Si le tokenizer ou Ollama est mal configuré.
+    """
+    metrics = metrics if metrics is not None else PipelineMetrics()
+    # logger.info(f"Démarrage Map-Reduce sur {len(chunks)} chunks.")
+
+    # logger.info("--- Étape MAP ---")
+    with metrics.timer("map"):
+        chunk_summaries = _run_map_stage(chunks, metrics, settings, deadline, on_event)
+    # logger.info("--- Fin Étape MAP ---")
+    return _reduce_formats(
+        chunk_summaries, prompt_templates, metrics, settings, on_event
+    )
+
+
+def _summarize_stream_formats(
+    chunks: Iterator[str],
+    prompt_templates: dict[str, str],
+    metrics: PipelineMetrics,
+    settings: Settings,
+    deadline: Optional[float] = None,
+    on_event: Optional[ProgressCallback] = None,
+) -> dict[str, str]:
+    """
+    Map-Reduce sur des chunks produits au fil de la lecture (gros fichiers) :
+    l'étape MAP traite les chunks par lots de settings.stream_map_batch_chunks
+    (déduplication à l'intérieur de chaque lot), seuls les résumés MAP sont
+    conservés jusqu'au REDUCE.
+    """
+    chunk_summaries: list[str] = []
+    with metrics.timer("map"):
+        for batch in iter_batches(chunks, settings.stream_map_batch_chunks):
+            chunk_summaries.extend(
+                _run_map_stage(batch, metrics, settings, deadline, on_event)
+            )
+    return _reduce_formats(
+        chunk_summaries, prompt_templates, metrics, settings, on_event
+    )
+
+
+def iter_batches(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    """Lots successifs d'au plus `size` éléments (au moins 1)."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, max(1, size))):
+        yield batch
+
+
+def _reduce_formats(
+    chunk_summaries: list[str],
+    prompt_templates: dict[str, str],
+    metrics: PipelineMetrics,
+    settings: Optional[Settings],
+    on_event: Optional[ProgressCallback] = None,
+) -> dict[str, str]:
+    """Étape REDUCE : un résumé final par format à partir des résumés MAP."""
+    # Étape COMBINE/REDUCE : Combiner les résumés intermédiaires et faire un résumé final
+    # logger.info("--- Étape REDUCE ---")
+    combined_intermediate_summary = combine_map_summaries(
+        chunk_summaries, metrics, settings
+    )
 
     # logger.info("Génération du résumé final (Reduce) à partir des résumés intermédiaires...")
-    final_summary: str = generate_summary_with_ollama(
-        combined_intermediate_summary, final_prompt_template
+    final_summaries = _run_for_formats(
+        combined_intermediate_summary,
+        prompt_templates,
+        metrics,
+        stage="reduce",
+        settings=settings,
+        on_event=on_event,
     )
 
     # logger.success("Fin Étape REDUCE.")
-    return final_summary
+    return final_summaries
 
 
-# --- Fonction Principale (Mise à jour) ---
+def _summarize_map_reduce(
+    chunks: list[str],
+    final_prompt_template: str,
+    metrics: Optional[PipelineMetrics] = None,
+    settings: Optional[Settings] = None,
+) -> str:
+    """
+    Effectue la partie Map-Reduce de la summarisation pour les textes longs.
 
+    Args:
+        chunks: Liste des morceaux de texte.
+        final_prompt_template: Le template de prompt final (court ou détaillé).
+        metrics: Si fourni, reçoit les mesures des étapes MAP et REDUCE.
+        settings: Paramètres du job (défaut: config.py).
 
-def process_input(
-    *,
-    text_input: Optional[str] = None,
-    file_input: Optional[Path] = None,
-    url_input: Optional[str] = None,
-    detailed: bool = False,
-) -> str:
+    Returns:
+        Le résumé final combiné.
+
+    Raises:
+        OllamaError: Si une erreur survient lors de l'appel à Ollama.
+        ConfigurationError: Si le tokenizer ou Ollama est mal configuré.
     """
-    Fonction principale orchestrant le traitement et gérant les textes longs.
-    (Docstring précédent reste valide)
+    return _summarize_map_reduce_formats(
+        chunks, {"final": final_prompt_template}, metrics, settings
+    )["final"]
+
+
+# --- Fonction Principale (Mise à jour) ---
+
+
+@dataclass
+class SummaryResult:
+    """Résultat structuré d'un traitement produisant un ou plusieurs formats."""
+
+    summaries: dict[str, str]
+    source_description: str
+    metrics: PipelineMetrics = field(default_factory=PipelineMetrics)
+    # Transcription horodatée de la source audio/vidéo (None pour du texte)
+    transcript: Optional[Transcript] = None
+
+
+def _acquire_text(
+    text_input: Optional[str],
+    file_input: Optional[Path],
+    url_input: Optional[str],
+    metrics: PipelineMetrics,
+    settings: Settings,
+) -> tuple[str, str, Optional[Transcript]]:
     """
-    input_sources = sum(p is not None for p in [text_input, file_input, url_input])
-    if input_sources != 1:
-        raise ValueError(
-            "Erreur interne: La fonction process_input doit recevoir exactement une source d'entrée."
-        )
+    Étape 1 : obtient le texte source (direct, fichier, média distant ou URL
+    YouTube transcrits).
 
+    Returns:
+        (texte obtenu, description de la source, transcription horodatée si la
+        source est audio/vidéo ou une transcription sauvegardée).
+    """
     text_to_summarize: str = ""
     source_description: str = ""
     downloaded_file_path: Optional[Path] = None
+    transcription_stats: dict[str, Any] = {}
 
-    # --- Étape 1: Obtenir le Texte Source (reste identique) ---
     # logger.info("Étape 1: Récupération du texte source...")
+    if settings.ollama_warmup_enabled and not text_input:
+        # Charger les modèles LLM pendant le téléchargement / la transcription
+        for stage_settings in settings.stage_settings():
+            start_background_warmup(settings=stage_settings)
     try:
+        acquisition_start = time.perf_counter()
         if text_input:
             source_description = "texte direct"
             text_to_summarize = text_input
+            check_no_window(settings)
+        elif url_input and is_direct_media_url(url_input):
+            source_description = f"URL: {url_input}"
+            text_to_summarize = transcribe_remote_media(
+                url_input, settings, transcription_stats
+            )
         elif url_input:
             source_description = f"URL YouTube: {url_input}"
-            downloaded_file_path = download_youtube_audio(url_input)
-            text_to_summarize = transcribe_audio(downloaded_file_path)
+            downloaded_file_path = download_youtube_audio(
+                url_input, settings, transcription_stats
+            )
+            text_to_summarize = transcribe_audio(
+                downloaded_file_path, settings, transcription_stats
+            )
         elif file_input:
             source_description = f"fichier local: {file_input.name}"
-            text_to_summarize = process_file(file_input)
+            text_to_summarize = process_file(file_input, settings, transcription_stats)
+        metrics.add_time("acquisition", time.perf_counter() - acquisition_start)
+        record_transcription_stats(metrics, transcription_stats)
     except (ValueError, LocalSummError) as e:
         raise e
     except Exception as e:
         raise LocalSummError(
             f"Erreur inattendue lors du traitement de l'entrée {source_description}: {e}"
         ) from e
+    return (
+        text_to_summarize,
+        source_description,
+        transcription_stats.get("transcript"),
+    )
+
+
+def check_no_window(settings: Settings) -> None:
+    """
+    Raises:
+        ValueError: Si une fenêtre temporelle est demandée pour du texte direct.
+    """
+    if window_requested(settings):
+        raise ValueError(
+            "--start / --end / --chapter ne s'appliquent qu'aux sources audio/vidéo."
+        )
+
+
+def record_transcription_stats(metrics: PipelineMetrics, stats: dict[str, Any]) -> None:
+    """
+    Recopie le modèle Whisper retenu, la durée audio, les RTF et la durée de
+    silence retirée dans les mesures (valeurs scalaires uniquement).
+    """
+    for key, value in stats.items():
+        if isinstance(value, (int, float, str, bool)):
+            metrics.set(key, value)
+
+
+def validate_request(
+    text_input: Optional[str],
+    file_input: Optional[Path],
+    url_input: Optional[str],
+    formats: Sequence[str],
+) -> dict[str, str]:
+    """
+    Vérifie la source (exactement une) et les formats demandés.
+
+    Returns:
+        Les templates finaux, indexés par nom de format.
+
+    Raises:
+        ValueError: Si la source est invalide ou si un format est inconnu.
+    """
+    input_sources = sum(p is not None for p in [text_input, file_input, url_input])
+    if input_sources != 1:
+        raise ValueError(
+            "Erreur interne: La fonction process_input doit recevoir exactement "
+            "une source d'entrée."
+        )
+    unknown_formats = [name for name in formats if name not in PROMPT_TEMPLATES]
+    if not formats or unknown_formats:
+        unknown = ", ".join(unknown_formats) or "(aucun)"
+        raise ValueError(
+            f"Format(s) de résumé inconnu(s) : {unknown}. "
+            f"Formats disponibles : {', '.join(PROMPT_TEMPLATES)}."
+        )
+    return {name: PROMPT_TEMPLATES[name] for name in formats}
+
+
+def empty_result(
+    prompt_templates: dict[str, str],
+    source_description: str,
+    metrics: PipelineMetrics,
+) -> SummaryResult:
+    """Résultat retourné quand la source ne contient aucun texte."""
+    message = (
+        f"Aucun contenu textuel trouvé ou transcrit depuis '{source_description}'. "
+        "Impossible de générer un résumé."
+    )
+    return SummaryResult(
+        summaries=dict.fromkeys(prompt_templates, message),
+        source_description=source_description,
+        metrics=metrics,
+    )
+
+
+def make_job_key(
+    text_input: Optional[str],
+    file_input: Optional[Path],
+    url_input: Optional[str],
+    formats: Sequence[str],
+    compression_ratio: Optional[float],
+    settings: Settings,
+) -> tuple[Any, ...]:
+    """Clé des jobs interchangeables : identité de la source + paramètres du job."""
+    return (
+        source_identity(text_input, file_input, url_input),
+        tuple(formats),
+        compression_ratio,
+        settings,
+    )
+
+
+def shared_result(
+    result: SummaryResult, metrics: Optional[PipelineMetrics]
+) -> SummaryResult:
+    """Copie, pour un appelant regroupé, du résultat produit par un autre job."""
+    metrics = metrics if metrics is not None else PipelineMetrics()
+    metrics.update_from(result.metrics)
+    metrics.set("coalesced", True)
+    return SummaryResult(
+        summaries=dict(result.summaries),
+        source_description=result.source_description,
+        metrics=metrics,
+        transcript=result.transcript,
+    )
+
+
+def prepare_text(
+    text_to_summarize: str,
+    compression_ratio: Optional[float],
+    metrics: PipelineMetrics,
+    settings: Settings,
+    transcript: Optional[Transcript] = None,
+) -> tuple[str, Optional[list[str]]]:
+    """
+    Étapes CPU avant le LLM : pré-compression extractive optionnelle, comptage des
+    tokens (tokenizer du résumé direct) et, si le texte dépasse la taille de chunk
+    de cette étape, découpage pour l'étape MAP (tokenizer et taille du MAP).
+
+    Si la transcription horodatée du texte est fournie (et qu'il n'a pas été
+    pré-compressé), le découpage suit les frontières de ses segments.
+
+    Returns:
+        (texte à résumer, chunks) ; chunks vaut None si le texte est assez court
+        pour un résumé direct.
+    """
+    # Pré-compression extractive optionnelle (réduit le prefill et le nombre de chunks)
+    ratio = (
+        settings.extractive_ratio if compression_ratio is None else compression_ratio
+    )
+    # Un ratio explicite de 0 désactive aussi le budget EXTRACTIVE_MAX_TOKENS
+    max_tokens = 0 if compression_ratio == 0 else settings.extractive_max_tokens
+    if ratio > 0 or max_tokens > 0:
+        metrics.set("source_tokens", count_tokens(text_to_summarize, settings))
+        with metrics.timer("extractive"):
+            text_to_summarize = extractive_compress(
+                text_to_summarize,
+                ratio=ratio if ratio > 0 else None,
+                max_tokens=max_tokens or None,
+                settings=settings,
+            )
+        # Le texte compressé ne correspond plus aux segments
+        transcript = None
+
+    direct_settings = settings.for_stage("direct")
+    num_tokens: int = count_tokens(text_to_summarize, direct_settings)
+    metrics.set("input_tokens", num_tokens)
+    # logger.info(f"Nombre de tokens détectés dans le texte source: {num_tokens}")
+    if num_tokens <= direct_settings.chunk_target_tokens:
+        return text_to_summarize, None
+
+    # logger.info(
+    #     f"Le texte est trop long ({num_tokens} tokens > "
+    #     f"{direct_settings.chunk_target_tokens}). Utilisation de Map-Reduce."
+    # )
+    map_settings = settings.for_stage("map")
+    with metrics.timer("chunking"):
+        chunks = chunk_text(
+            transcript if transcript is not None else text_to_summarize,
+            map_settings.chunk_target_tokens,
+            map_settings.chunk_overlap_tokens,
+            settings=map_settings,
+        )
+    return text_to_summarize, chunks
+
+
+def stream_chunks(
+    file_path: Path, compression_ratio: Optional[float], settings: Settings
+) -> Iterator[str]:
+    """
+    Chunks d'un gros fichier texte, produits au fil de la lecture (encodage
+    détecté, mémoire bornée). La pré-compression extractive éventuelle est
+    appliquée chunk par chunk (le budget global EXTRACTIVE_MAX_TOKENS, qui
+    suppose le texte entier, est ignoré).
+    """
+    map_settings = settings.for_stage("map")
+    chunks = iter_chunks(
+        iter_text_file(file_path),
+        map_settings.chunk_target_tokens,
+        map_settings.chunk_overlap_tokens,
+        map_settings,
+    )
+    ratio = (
+        settings.extractive_ratio if compression_ratio is None else compression_ratio
+    )
+    if ratio <= 0:
+        return chunks
+    return (
+        extractive_compress(chunk, ratio=ratio, settings=settings) for chunk in chunks
+    )
+
+
+def _rank_chunks(
+    ranker: ChunkRanker, metrics: PipelineMetrics, settings: Settings
+) -> list[int]:
+    """Indices des chunks retenus pour la question ; mesures du classement."""
+    indices = ranker.top_indices(settings.question_top_k)
+    metrics.set("question_chunks_total", len(ranker))
+    metrics.set("question_chunks_selected", len(indices))
+    metrics.set("question_ranking", ranker.method)
+    if ranker.embedding_error:
+        metrics.set("embedding_error", ranker.embedding_error)
+    return indices
+
+
+def select_question_chunks(
+    chunks: list[str], metrics: PipelineMetrics, settings: Settings
+) -> list[str]:
+    """
+    Mode question : garde les settings.question_top_k chunks les plus pertinents
+    pour settings.question (BM25, et embeddings si configurés), dans l'ordre du
+    texte. Seuls ces chunks passent ensuite par le LLM.
+    """
+    if len(chunks) <= settings.question_top_k:
+        # Tout est retenu : ni classement ni embeddings
+        metrics.set("question_chunks_total", len(chunks))
+        metrics.set("question_chunks_selected", len(chunks))
+        return chunks
+    with metrics.timer("ranking"):
+        ranker = ChunkRanker(settings.question or "", settings)
+        ranker.add(chunks)
+        indices = _rank_chunks(ranker, metrics, settings)
+    return [chunks[i] for i in indices]
+
+
+def select_streamed_chunks(
+    file_path: Path,
+    compression_ratio: Optional[float],
+    metrics: PipelineMetrics,
+    settings: Settings,
+) -> list[str]:
+    """
+    Mode question sur un gros fichier texte : une première lecture classe les
+    chunks (seules leurs statistiques sont gardées, voir ChunkRanker), une seconde
+    ne conserve que le texte des chunks retenus (le découpage est déterministe).
+    """
+    with metrics.timer("ranking"):
+        ranker = ChunkRanker(settings.question or "", settings)
+        for batch in iter_batches(
+            stream_chunks(file_path, compression_ratio, settings),
+            settings.stream_map_batch_chunks,
+        ):
+            ranker.add(batch)
+        indices = set(_rank_chunks(ranker, metrics, settings))
+        if not indices:
+            return []
+        chunks = stream_chunks(file_path, compression_ratio, settings)
+        return [
+            chunk
+            for index, chunk in enumerate(islice(chunks, max(indices) + 1))
+            if index in indices
+        ]
+
+
+def process_input_formats(
+    *,
+    text_input: Optional[str] = None,
+    file_input: Optional[Path] = None,
+    url_input: Optional[str] = None,
+    formats: Sequence[str] = ("short",),
+    compression_ratio: Optional[float] = None,
+    metrics: Optional[PipelineMetrics] = None,
+    settings: Optional[Settings] = None,
+    coalesce: bool = True,
+    on_event: Optional[ProgressCallback] = None,
+) -> SummaryResult:
+    """
+    Produit plusieurs formats de résumé (ex: 'short' et 'detailed') en une passe.
+
+    L'acquisition (téléchargement, transcription), le découpage et l'étape MAP ne
+    sont exécutés qu'une fois ; seule la génération finale (REDUCE, ou résumé direct
+    pour les textes courts) est lancée pour chaque format, en parallèle.
+
+    Args:
+        text_input / file_input / url_input: La source (exactement une).
+        formats: Noms des formats voulus, parmi les clés de config.PROMPT_TEMPLATES.
+        compression_ratio: Voir process_input.
+        metrics: Voir process_input.
+        settings: Voir process_input.
+        coalesce: Voir process_input.
+        on_event: Voir process_input.
+
+    Returns:
+        Un SummaryResult contenant un résumé par format demandé.
+
+    Raises:
+        ValueError: Si la source est invalide ou si un format est inconnu.
+        LocalSummError: (et sous-classes) en cas d'échec d'une étape.
+    """
+    settings = settings or get_default_settings()
+    prompt_templates = validate_request(text_input, file_input, url_input, formats)
+    settings, prompt_templates = focus_on_question(settings, prompt_templates)
+
+    def run(emit: Optional[ProgressCallback]) -> SummaryResult:
+        return _run_job(
+            text_input,
+            file_input,
+            url_input,
+            prompt_templates,
+            compression_ratio,
+            metrics if metrics is not None else PipelineMetrics(),
+            settings,
+            emit,
+        )
+
+    subscriber = serialized(on_event) if on_event is not None else None
+    if not coalesce:
+        return run(subscriber)
+    # Un job suivi (on_event) n'est partagé qu'avec d'autres jobs suivis : ses
+    # événements sont diffusés à chacun de leurs appelants
+    job_key = (
+        *make_job_key(
+            text_input, file_input, url_input, formats, compression_ratio, settings
+        ),
+        on_event is not None,
+    )
+
+    def broadcast(event: ProgressEvent) -> None:
+        _jobs_in_flight.publish(job_key, event)
+
+    result, shared = _jobs_in_flight.do(
+        job_key,
+        lambda: run(broadcast if on_event is not None else None),
+        subscriber=subscriber,
+    )
+    return shared_result(result, metrics) if shared else result
+
+
+def emit_preview(
+    text: str,
+    metrics: PipelineMetrics,
+    settings: Settings,
+    on_event: ProgressCallback,
+) -> None:
+    """
+    Aperçu immédiat d'un texte long, avant tout appel au LLM (PREVIEW) : ses
+    phrases les plus centrales (extractive_compress), dans la limite de
+    settings.preview_max_tokens. Rien n'est émis si le texte ne peut pas être
+    condensé (ex: transcription sans ponctuation).
+    """
+    if settings.preview_max_tokens <= 0:
+        return
+    with metrics.timer("preview"):
+        preview = extractive_compress(
+            text, max_tokens=settings.preview_max_tokens, settings=settings
+        )
+    if len(preview) < len(text):
+        on_event(ProgressEvent(PREVIEW, preview))
+
+
+def _run_job(
+    text_input: Optional[str],
+    file_input: Optional[Path],
+    url_input: Optional[str],
+    prompt_templates: dict[str, str],
+    compression_ratio: Optional[float],
+    metrics: PipelineMetrics,
+    settings: Settings,
+    on_event: Optional[ProgressCallback] = None,
+) -> SummaryResult:
+    """Exécute le pipeline complet d'un job déjà validé (voir process_input_formats)."""
+    deadline = job_deadline(settings)
+    if file_input is not None and is_large_text_file(file_input, settings):
+        return _run_streaming_job(
+            file_input,
+            prompt_templates,
+            compression_ratio,
+            metrics,
+            settings,
+            deadline,
+            on_event,
+        )
+
+    # --- Étape 1: Obtenir le Texte Source ---
+    text_to_summarize, source_description, transcript = _acquire_text(
+        text_input, file_input, url_input, metrics, settings
+    )
 
     # --- Étape 2: Vérifier si on a du Texte (reste identique) ---
     # logger.info("Étape 2: Vérification du texte obtenu...")
     if not text_to_summarize or text_to_summarize.isspace():
-        return f"Aucun contenu textuel trouvé ou transcrit depuis '{source_description}'. Impossible de générer un résumé."
+        return empty_result(prompt_templates, source_description, metrics)
 
     # --- Étape 3: Générer le Résumé (MODIFIÉ pour gérer textes longs) ---
     # logger.info("Étape 3: Génération du résumé via LLM (gestion des textes longs)...")
     try:
-        num_tokens: int = count_tokens(text_to_summarize)
-        # logger.info(f"Nombre de tokens détectés dans le texte source: {num_tokens}")
-
-        final_prompt_template = (
-            PROMPT_TEMPLATE_DETAILED if detailed else PROMPT_TEMPLATE_SHORT
+        text_to_summarize, chunks = prepare_text(
+            text_to_summarize, compression_ratio, metrics, settings, transcript
         )
-
-        if num_tokens <= CHUNK_TARGET_TOKENS:
+        if chunks is not None and settings.question:
+            chunks = select_question_chunks(chunks, metrics, settings)
+        if chunks is None:
             # logger.info("Le texte est assez court. Génération directe du résumé.")
-            summary = generate_summary_with_ollama(
-                text_to_summarize, final_prompt_template
+            summaries = _run_for_formats(
+                text_to_summarize,
+                prompt_templates,
+                metrics,
+                stage="direct",
+                settings=settings,
+                on_event=on_event,
             )
         else:
-            # logger.info(f"Le texte est trop long ({num_tokens} tokens > {CHUNK_TARGET_TOKENS}). Utilisation de Map-Reduce.")
-            chunks = chunk_text(
-                text_to_summarize, CHUNK_TARGET_TOKENS, CHUNK_OVERLAP_TOKENS
+            if on_event is not None:
+                emit_preview(
+                    "\n\n".join(chunks) if settings.question else text_to_summarize,
+                    metrics,
+                    settings,
+                    on_event,
+                )
+            summaries = _summarize_map_reduce_formats(
+                chunks, prompt_templates, metrics, settings, deadline, on_event
             )
 
-            summary = _summarize_map_reduce(chunks, final_prompt_template)
-        # summary = generate_summary_with_ollama(text_to_summarize, final_prompt_template)
-
         # logger.success("Résumé final généré.")
-        return summary
+        return SummaryResult(
+            summaries=summaries,
+            source_description=source_description,
+            metrics=metrics,
+            transcript=transcript,
+        )
 
     except (
         OllamaError,
@@ -179,3 +1159,110 @@ def process_input(
         raise LocalSummError(
             f"Erreur inattendue lors de la génération du résumé: {e}"
         ) from e
+
+
+def _run_streaming_job(
+    file_input: Path,
+    prompt_templates: dict[str, str],
+    compression_ratio: Optional[float],
+    metrics: PipelineMetrics,
+    settings: Settings,
+    deadline: Optional[float] = None,
+    on_event: Optional[ProgressCallback] = None,
+) -> SummaryResult:
+    """
+    Variante de _run_job pour un gros fichier texte : lecture, découpage et étape
+    MAP au fil de l'eau, sans jamais charger le fichier entier en mémoire.
+    """
+    source_description = f"fichier local: {file_input.name}"
+    check_no_window(settings)
+    metrics.set("streamed", True)
+    chunks: Iterator[str] = (
+        iter(select_streamed_chunks(file_input, compression_ratio, metrics, settings))
+        if settings.question
+        else stream_chunks(file_input, compression_ratio, settings)
+    )
+    try:
+        first_chunks = list(islice(chunks, 2))
+        if not first_chunks:
+            return empty_result(prompt_templates, source_description, metrics)
+        if len(first_chunks) == 1:
+            summaries = _run_for_formats(
+                first_chunks[0],
+                prompt_templates,
+                metrics,
+                stage="direct",
+                settings=settings,
+                on_event=on_event,
+            )
+        else:
+            summaries = _summarize_stream_formats(
+                chain(first_chunks, chunks),
+                prompt_templates,
+                metrics,
+                settings,
+                deadline,
+                on_event,
+            )
+    except (OllamaError, ConfigurationError, ValueError, LocalSummError):
+        raise
+    except Exception as e:
+        raise LocalSummError(
+            f"Erreur inattendue lors de la génération du résumé: {e}"
+        ) from e
+    return SummaryResult(
+        summaries=summaries, source_description=source_description, metrics=metrics
+    )
+
+
+def process_input(
+    *,
+    text_input: Optional[str] = None,
+    file_input: Optional[Path] = None,
+    url_input: Optional[str] = None,
+    detailed: bool = False,
+    compression_ratio: Optional[float] = None,
+    metrics: Optional[PipelineMetrics] = None,
+    settings: Optional[Settings] = None,
+    coalesce: bool = True,
+    on_event: Optional[ProgressCallback] = None,
+) -> str:
+    """
+    Fonction principale orchestrant le traitement et gérant les textes longs.
+    (Docstring précédent reste valide)
+
+    compression_ratio: Si fourni (0 < ratio <= 1), applique une pré-compression
+    extractive avant le LLM (défaut: config.EXTRACTIVE_RATIO). 0 désactive toute
+    pré-compression, budget EXTRACTIVE_MAX_TOKENS compris.
+    metrics: Si fourni, est rempli avec les mesures du traitement (durées par
+    étape, nombre de chunks, ratio de déduplication, etc.).
+    settings: Paramètres immuables du job (modèle, backend de transcription,
+    taille des chunks...). Défaut: valeurs de config.py. Permet à un même
+    processus de traiter en parallèle des jobs aux paramètres différents.
+    Avec settings.question, le résultat est une réponse à la question : seuls
+    les chunks les plus pertinents (settings.question_top_k) passent par le LLM.
+    coalesce: Si True (défaut), un appel identique à un job déjà en cours (même
+    vidéo, même contenu de fichier ou même texte, mêmes formats et paramètres)
+    attend ce job et en partage le résultat au lieu de tout recalculer ; ses
+    mesures sont alors une copie de celles du job partagé ("coalesced": True).
+    on_event: Si fourni, reçoit les résultats intermédiaires au fil du traitement
+    (voir progress.ProgressEvent) : un aperçu extractif du texte long (PREVIEW),
+    chaque résumé MAP dès qu'il est terminé (MAP), puis le résumé final en flux
+    (FRAGMENT, puis FINAL). Il est appelé un événement à la fois, éventuellement
+    depuis un autre thread. Un job suivi n'est partagé qu'avec d'autres appels
+    suivis ; un appelant qui rejoint le job en cours reçoit les événements émis
+    à partir de son arrivée.
+    """
+    format_name = "detailed" if detailed else "short"
+    result = process_input_formats(
+        text_input=text_input,
+        file_input=file_input,
+        url_input=url_input,
+        formats=(format_name,),
+        compression_ratio=compression_ratio,
+        metrics=metrics,
+        settings=settings,
+        coalesce=coalesce,
+        on_event=on_event,
+    )
+    return result.summaries[format_name]
@@ -0,0 +1,91 @@
+# src/localsumm/map_retry.py
+
+import time
+from typing import Optional
+
+from .exceptions import LocalSummError
+from .metrics import PipelineMetrics
+from .settings import Settings
+
+# from loguru import logger
+
+# En deçà (secondes) du temps restant avant l'échéance, un appel MAP n'est plus lancé
+_MIN_CALL_SECONDS: float = 1.0
+
+
+def job_deadline(settings: Settings) -> Optional[float]:
+    """Échéance du job (horloge time.monotonic) d'après settings.job_deadline."""
+    if settings.job_deadline <= 0:
+        return None
+    return time.monotonic() + settings.job_deadline
+
+
+def attempt_settings(
+    settings: Settings, deadline: Optional[float]
+) -> Optional[Settings]:
+    """
+    Paramètres d'un appel MAP : son délai est ramené au temps restant avant
+    l'échéance du job.
+
+    Returns:
+        None si l'échéance est (presque) atteinte : l'appel n'est pas lancé.
+    """
+    if deadline is None:
+        return settings
+    remaining = deadline - time.monotonic()
+    if remaining < _MIN_CALL_SECONDS:
+        return None
+    if remaining >= settings.ollama_timeout:
+        return settings
+    return settings.replace(ollama_timeout=remaining)
+
+
+def retry_delay(
+    attempts: int, settings: Settings, deadline: Optional[float]
+) -> Optional[float]:
+    """
+    Attente avant une nouvelle tentative, après `attempts` appels en échec :
+    settings.map_retry_backoff, doublé à chaque tentative.
+
+    Returns:
+        None si les tentatives sont épuisées ou si l'attente dépasserait
+        l'échéance du job.
+    """
+    if attempts > settings.map_max_retries:
+        return None
+    delay = max(0.0, settings.map_retry_backoff) * 2.0 ** (attempts - 1)
+    if deadline is not None and time.monotonic() + delay + _MIN_CALL_SECONDS > deadline:
+        return None
+    return delay
+
+
+def should_split(timeouts: int, depth: int, settings: Settings) -> bool:
+    """
+    Vrai si un texte dont les appels MAP ont dépassé `timeouts` fois leur délai
+    doit être coupé en deux (depth : nombre de découpages déjà subis).
+    """
+    return (
+        settings.map_split_after_timeouts > 0
+        and timeouts >= settings.map_split_after_timeouts
+        and depth < settings.map_split_max_depth
+    )
+
+
+def check_map_error_budget(metrics: PipelineMetrics, settings: Settings) -> None:
+    """
+    Vérifie la part des chunks MAP en échec (map_failed_chunks, cumulé sur le
+    job) parmi les chunks à résumer (map_chunks_unique).
+
+    Raises:
+        LocalSummError: Si elle dépasse settings.map_error_budget.
+    """
+    values = metrics.as_dict()["values"]
+    failed = values.get("map_failed_chunks", 0)
+    total = values.get("map_chunks_unique", 0)
+    if failed and total and failed / total > settings.map_error_budget:
+        # logger.error(f"Budget d'erreurs MAP dépassé : {failed}/{total}")
+        raise LocalSummError(
+            f"Étape MAP : {failed} chunk(s) sur {total} n'ont pas pu être résumés "
+            f"(budget d'erreurs : {settings.map_error_budget:.0%}). "
+            f"Dernière erreur : {values.get('map_last_error', 'inconnue')}"
+        )
@@ -0,0 +1,191 @@
+# src/localsumm/media_window.py
+
+import json
+import re
+import subprocess
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .settings import Settings
+
+# from loguru import logger
+
+_FFPROBE_TIMEOUT: float = 30.0
+# "SS", "MM:SS" ou "HH:MM:SS", secondes décimales acceptées ("1:02:03.5")
+_TIMESTAMP_RE = re.compile(r"^(?:(\d+):)?(?:(\d+):)?(\d+(?:[.,]\d+)?)$")
+
+# Chapitre : (titre, début, fin) en secondes (fin None si inconnue)
+Chapter = tuple[str, float, Optional[float]]
+
+
+@dataclass(frozen=True)
+class MediaWindow:
+    """Portion d'un enregistrement à traiter (instants de l'original, en secondes)."""
+
+    start: float
+    end: Optional[float] = None  # None = jusqu'à la fin
+    chapter: Optional[str] = None  # Titre du chapitre retenu, le cas échéant
+
+    def ffmpeg_input_args(self) -> list[str]:
+        """Options ffmpeg de positionnement, à placer avant -i (seek rapide)."""
+        args = ["-ss", f"{self.start:.3f}"] if self.start > 0 else []
+        if self.end is not None:
+            args += ["-to", f"{self.end:.3f}"]
+        return args
+
+    def describe(self) -> str:
+        end = format_timestamp(self.end) if self.end is not None else "fin"
+        span = f"{format_timestamp(self.start)}-{end}"
+        return f"chapitre '{self.chapter}' ({span})" if self.chapter else span
+
+
+def format_timestamp(seconds: float) -> str:
+    """Instant au format HH:MM:SS."""
+    total = int(seconds)
+    return f"{total // 3600:02d}:{total % 3600 // 60:02d}:{total % 60:02d}"
+
+
+def parse_timestamp(value: str) -> float:
+    """
+    Convertit "SS", "MM:SS" ou "HH:MM:SS" (secondes décimales acceptées) en secondes.
+
+    Raises:
+        ValueError: Si le format n'est pas reconnu.
+    """
+    match = _TIMESTAMP_RE.match(value.strip())
+    if match is None:
+        raise ValueError(
+            f"Instant invalide : '{value}'. Formats acceptés : SS, MM:SS ou HH:MM:SS."
+        )
+    first, second, seconds = match.groups()
+    hours, minutes = (first, second) if second is not None else (None, first)
+    return (
+        int(hours or 0) * 3600
+        + int(minutes or 0) * 60
+        + float(seconds.replace(",", "."))
+    )
+
+
+def window_requested(settings: Settings) -> bool:
+    """Vrai si le job ne porte que sur une portion de l'enregistrement."""
+    return (
+        settings.media_start > 0
+        or settings.media_end is not None
+        or bool(settings.media_chapter)
+    )
+
+
+def find_chapter(chapters: Sequence[Chapter], name: str) -> Chapter:
+    """
+    Chapitre dont le titre correspond à `name` (égalité sans tenir compte de la
+    casse, sinon premier titre qui le contient).
+
+    Raises:
+        ValueError: Si aucun chapitre ne correspond.
+    """
+    wanted = name.strip().casefold()
+    for chapter in chapters:
+        if chapter[0].strip().casefold() == wanted:
+            return chapter
+    for chapter in chapters:
+        if wanted in chapter[0].casefold():
+            return chapter
+    available = ", ".join(f"'{title}'" for title, _, _ in chapters) or "(aucun)"
+    raise ValueError(f"Chapitre '{name}' introuvable. Chapitres : {available}.")
+
+
+def resolve_window(
+    settings: Settings, load_chapters: Callable[[], Sequence[Chapter]]
+) -> Optional[MediaWindow]:
+    """
+    Fenêtre à traiter d'après settings.media_start / media_end / media_chapter.
+    Les chapitres ne sont chargés (load_chapters) que si un chapitre est demandé.
+
+    Returns:
+        La fenêtre, ou None si tout l'enregistrement est à traiter.
+
+    Raises:
+        ValueError: Si les bornes sont incohérentes ou le chapitre introuvable.
+    """
+    if not window_requested(settings):
+        return None
+    if settings.media_chapter:
+        if settings.media_start > 0 or settings.media_end is not None:
+            raise ValueError("Un chapitre ne se combine pas avec --start / --end.")
+        title, start, end = find_chapter(load_chapters(), settings.media_chapter)
+        return MediaWindow(start=start, end=end, chapter=title)
+    if settings.media_start < 0 or (
+        settings.media_end is not None and settings.media_end <= settings.media_start
+    ):
+        raise ValueError(
+            "Fenêtre invalide : il faut 0 <= début < fin "
+            f"(début: {settings.media_start}, fin: {settings.media_end})."
+        )
+    return MediaWindow(start=settings.media_start, end=settings.media_end)
+
+
+def chapters_from_info(info: dict[str, Any]) -> list[Chapter]:
+    """Chapitres d'un dictionnaire d'informations yt-dlp ('chapters')."""
+    return [
+        (
+            str(chapter.get("title") or ""),
+            float(chapter.get("start_time") or 0.0),
+            float(chapter["end_time"]) if chapter.get("end_time") is not None else None,
+        )
+        for chapter in info.get("chapters") or []
+    ]
+
+
+def media_chapters(media_path: Path) -> list[Chapter]:
+    """
+    Chapitres d'un fichier local (métadonnées lues par ffprobe).
+
+    Raises:
+        ValueError: Si ffprobe est absent ou ne peut pas lire le fichier.
+    """
+    command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_chapters",
+        "-of",
+        "json",
+        str(media_path),
+    ]
+    try:
+        # Liste d'arguments fixe (ffprobe + chemin du média), sans shell
+        result = subprocess.run(  # noqa: S603
+            command,
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=_FFPROBE_TIMEOUT,
+        )
+        data = json.loads(result.stdout or "{}")
+    except (OSError, subprocess.SubprocessError, ValueError) as e:
+        raise ValueError(
+            f"Impossible de lire les chapitres de {media_path.name} (ffprobe): {e}"
+        ) from e
+    return [
+        (
+            str((chapter.get("tags") or {}).get("title") or ""),
+            float(chapter.get("start_time") or 0.0),
+            float(chapter["end_time"]) if chapter.get("end_time") is not None else None,
+        )
+        for chapter in data.get("chapters") or []
+    ]
+
+
+def record_window(
+    window: Optional[MediaWindow], stats: Optional[dict[str, Any]]
+) -> None:
+    """
+    Ajoute la fenêtre aux stats ; la transcription (finish_transcript) la lit
+    pour exprimer ses instants dans l'enregistrement complet.
+    """
+    if window is None or stats is None:
+        return
+    stats["media_window"] = window
+    stats["window"] = window.describe()
@@ -0,0 +1,60 @@
+# src/localsumm/metrics.py
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class PipelineMetrics:
+    """
+    Mesures collectées pendant un traitement (compteurs, ratios, durées par étape).
+
+    Un objet est passé (optionnellement) à process_input et rempli au fil du
+    pipeline. Les méthodes sont thread-safe : l'étape MAP peut s'exécuter en parallèle.
+    """
+
+    values: dict[str, Any] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def set(self, key: str, value: Any) -> None:
+        """Enregistre (ou remplace) une valeur."""
+        with self._lock:
+            self.values[key] = value
+
+    def increment(self, key: str, amount: float = 1) -> None:
+        """Incrémente un compteur (créé à 0 s'il n'existe pas)."""
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        """Ajoute une durée (en secondes) au cumul d'une étape."""
+        with self._lock:
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Mesure la durée du bloc et l'ajoute au cumul de l'étape."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def update_from(self, other: "PipelineMetrics") -> None:
+        """Recopie les mesures d'un autre objet (ex: celles d'un job partagé)."""
+        data = other.as_dict()
+        with self._lock:
+            self.values.update(data["values"])
+            self.timings.update(data["timings"])
+
+    def as_dict(self) -> dict[str, Any]:
+        """Copie sérialisable des mesures."""
+        with self._lock:
+            return {"values": dict(self.values), "timings": dict(self.timings)}
@@ -0,0 +1,51 @@
+# src/localsumm/progress.py
+
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# from loguru import logger
+
+# Types d'événements, dans l'ordre où ils surviennent au cours d'un job
+PREVIEW = "preview"  # aperçu extractif du texte source (sans LLM)
+MAP = "map"  # résumé MAP d'un chunk, dès qu'il est terminé
+FRAGMENT = "fragment"  # fragment du résumé final (REDUCE ou direct) d'un format
+FINAL = "final"  # résumé final complet d'un format
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """
+    Résultat intermédiaire d'un job (voir process_input_formats, on_event).
+
+    Attributes:
+        kind: PREVIEW, MAP, FRAGMENT ou FINAL.
+        text: Le texte de l'événement (aperçu, résumé MAP, fragment ou résumé final).
+        format_name: Le format concerné (FRAGMENT et FINAL).
+        index: Rang du chunk parmi ceux à résumer dans l'étape MAP (MAP ; en
+               lecture en flux, rang dans le lot).
+        total: Nombre de chunks à résumer dans l'étape (ou le lot) MAP (MAP).
+    """
+
+    kind: str
+    text: str
+    format_name: Optional[str] = None
+    index: Optional[int] = None
+    total: Optional[int] = None
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+def serialized(on_event: ProgressCallback) -> ProgressCallback:
+    """
+    Callback appelé un événement à la fois, même depuis plusieurs threads (les
+    formats finaux sont générés en parallèle).
+    """
+    lock = threading.Lock()
+
+    def emit(event: ProgressEvent) -> None:
+        with lock:
+            on_event(event)
+
+    return emit
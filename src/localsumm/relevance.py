@@ -0,0 +1,214 @@
+# src/localsumm/relevance.py
+
+from collections import Counter
+from typing import Optional
+
+import numpy as np
+
+from .cache import DiskCache, make_cache_key
+from .config import PROMPT_TEMPLATES_QUESTION
+from .exceptions import ConfigurationError, OllamaError
+from .extractive import _WORD_RE, _sentence_terms
+from .llm_interaction import embed_texts
+from .settings import Settings
+
+# from loguru import logger
+
+# Paramètres BM25 (valeurs usuelles) : saturation de la fréquence d'un terme et
+# normalisation par la longueur du chunk
+_BM25_K1: float = 1.2
+_BM25_B: float = 0.75
+# Racine approximative : les mots sont tronqués à cette longueur, pour que
+# "budget" / "budgets" ou "décidé" / "décider" se correspondent
+_STEM_LENGTH: int = 6
+# Textes envoyés par requête d'embeddings
+_EMBEDDING_BATCH_SIZE: int = 16
+
+# Embeddings déjà calculés, indexés par (backend, modèle, contenu du texte)
+embedding_cache = DiskCache("embeddings")
+
+
+def _stems(text: str) -> list[str]:
+    return [term[:_STEM_LENGTH] for term in _sentence_terms(text)]
+
+
+def focus_on_question(
+    settings: Settings, prompt_templates: dict[str, str]
+) -> tuple[Settings, dict[str, str]]:
+    """
+    Paramètres et templates finaux du mode question : la question est insérée
+    dans le template MAP (extraction des faits utiles) et dans chaque format
+    final (réponse courte ou détaillée au lieu d'un résumé).
+
+    Returns:
+        (paramètres, templates) inchangés si aucune question n'est posée.
+    """
+    if not settings.question:
+        return settings, prompt_templates
+    # Accolades doublées : les templates passent ensuite par str.format(text=...)
+    question = settings.question.strip().replace("{", "{{").replace("}", "}}")
+
+    def with_question(template: str) -> str:
+        return template.replace("{question}", question)
+
+    templates = {
+        name: with_question(
+            PROMPT_TEMPLATES_QUESTION.get(name, PROMPT_TEMPLATES_QUESTION["short"])
+        )
+        for name in prompt_templates
+    }
+    return (
+        settings.replace(
+            prompt_template_map=with_question(settings.prompt_template_question_map)
+        ),
+        templates,
+    )
+
+
+def bm25_scores(term_counts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Scores BM25 de chaque chunk pour la question (vectorisé NumPy).
+
+    Args:
+        term_counts: Matrice (chunks x termes de la question) des occurrences.
+        lengths: Nombre de termes de chaque chunk.
+    """
+    n_chunks = term_counts.shape[0]
+    if n_chunks == 0 or term_counts.shape[1] == 0:
+        return np.zeros(n_chunks)
+    document_frequency = (term_counts > 0).sum(axis=0)
+    idf = np.log1p((n_chunks - document_frequency + 0.5) / (document_frequency + 0.5))
+    average_length = max(float(lengths.mean()), 1.0)
+    norm = _BM25_K1 * (1.0 - _BM25_B + _BM25_B * lengths / average_length)
+    saturated = term_counts * (_BM25_K1 + 1.0) / (term_counts + norm[:, None])
+    scores: np.ndarray = saturated @ idf
+    return scores
+
+
+def cosine_scores(vectors: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Similarité cosinus de chaque ligne de `vectors` avec `query`."""
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+    scores: np.ndarray = (vectors @ query) / np.maximum(norms, 1e-12)
+    return scores
+
+
+def _min_max(scores: np.ndarray) -> np.ndarray:
+    spread = scores.max() - scores.min() if scores.size else 0.0
+    if spread <= 0:
+        return np.zeros_like(scores)
+    normalized: np.ndarray = (scores - scores.min()) / spread
+    return normalized
+
+
+def cached_embeddings(texts: list[str], settings: Settings) -> np.ndarray:
+    """
+    Embeddings (settings.embedding_model) de plusieurs textes ; seuls les textes
+    absents du cache sont envoyés au serveur, par lots.
+
+    Raises:
+        OllamaError: Si le calcul des embeddings échoue.
+    """
+    keys = [
+        make_cache_key(settings.llm_backend, settings.embedding_model, text)
+        for text in texts
+    ]
+    vectors: list[Optional[list[float]]] = [embedding_cache.get(key) for key in keys]
+    missing = [i for i, vector in enumerate(vectors) if not isinstance(vector, list)]
+    for start in range(0, len(missing), _EMBEDDING_BATCH_SIZE):
+        batch = missing[start : start + _EMBEDDING_BATCH_SIZE]
+        computed = embed_texts(
+            [texts[i] for i in batch], settings.embedding_model, settings
+        )
+        for i, vector in zip(batch, computed):
+            vectors[i] = vector
+            embedding_cache.set(keys[i], vector)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+class ChunkRanker:
+    """
+    Classe les chunks d'un texte selon leur pertinence pour une question.
+
+    Les chunks sont ajoutés par lots (add), éventuellement au fil de la lecture
+    d'un gros fichier : seules les occurrences des termes de la question, la
+    longueur de chaque chunk et, si un modèle d'embeddings est configuré, son
+    vecteur sont conservés (pas le texte).
+
+    Score : BM25 sur les termes de la question, combiné (poids
+    settings.question_embedding_weight) à la similarité cosinus des embeddings.
+    Si les embeddings ne peuvent pas être calculés, le classement se poursuit
+    avec BM25 seul.
+    """
+
+    def __init__(self, question: str, settings: Settings) -> None:
+        self.settings: Settings = settings
+        self.question: str = question
+        # Termes distincts de la question ; à défaut (mots vides uniquement), ses mots
+        self.terms: list[str] = list(
+            dict.fromkeys(
+                _stems(question)
+                or [word[:_STEM_LENGTH] for word in _WORD_RE.findall(question.lower())]
+            )
+        )
+        self._term_counts: list[list[int]] = []
+        self._lengths: list[int] = []
+        self._vectors: list[np.ndarray] = []
+        self._query_vector: Optional[np.ndarray] = None
+        self.use_embeddings: bool = bool(settings.embedding_model)
+        self.embedding_error: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    @property
+    def method(self) -> str:
+        return "bm25+embeddings" if self.use_embeddings else "bm25"
+
+    def _embed_chunks(self, chunks: list[str]) -> None:
+        if self._query_vector is None:
+            self._query_vector = cached_embeddings([self.question], self.settings)[0]
+        self._vectors.extend(cached_embeddings(chunks, self.settings))
+
+    def add(self, chunks: list[str]) -> None:
+        """Ajoute des chunks (à la suite des précédents)."""
+        for chunk in chunks:
+            counts = Counter(_stems(chunk))
+            self._term_counts.append([counts[term] for term in self.terms])
+            self._lengths.append(sum(counts.values()))
+        if self.use_embeddings and chunks:
+            try:
+                self._embed_chunks(chunks)
+            except (OllamaError, ConfigurationError) as e:
+                # logger.warning(
+                #     f"Embeddings indisponibles, classement BM25 seul : {e}"
+                # )
+                self.use_embeddings = False
+                self.embedding_error = str(e)
+                self._vectors = []
+
+    def scores(self) -> np.ndarray:
+        """Score de pertinence de chaque chunk ajouté (plus haut = plus pertinent)."""
+        lexical = bm25_scores(
+            np.asarray(self._term_counts, dtype=np.float64).reshape(
+                len(self._lengths), len(self.terms)
+            ),
+            np.asarray(self._lengths, dtype=np.float64),
+        )
+        if not self.use_embeddings or self._query_vector is None:
+            return lexical
+        semantic = cosine_scores(np.vstack(self._vectors), self._query_vector)
+        weight = min(1.0, max(0.0, self.settings.question_embedding_weight))
+        combined: np.ndarray = (1.0 - weight) * _min_max(lexical) + weight * _min_max(
+            semantic
+        )
+        return combined
+
+    def top_indices(self, k: int) -> list[int]:
+        """
+        Indices des k chunks les plus pertinents, dans l'ordre du texte (à score
+        égal, le premier chunk l'emporte).
+        """
+        if len(self) <= k:
+            return list(range(len(self)))
+        order = np.argsort(-self.scores(), kind="stable")[: max(1, k)]
+        return sorted(int(i) for i in order)
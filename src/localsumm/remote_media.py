@@ -0,0 +1,435 @@
+# src/localsumm/remote_media.py
+
+import subprocess
+import threading
+import time
+import uuid
+from collections.abc import Iterable, Iterator
+from itertools import chain
+from pathlib import Path
+from typing import IO, Any, Optional, cast
+from urllib.parse import urlparse
+
+import requests
+
+from .config import DOWNLOAD_DIR
+from .exceptions import FileProcessingError
+from .file_processor import detect_mime_type
+from .media_window import record_window, resolve_window
+from .resources import ffmpeg_threads, get_host_scheduler
+from .settings import Settings, get_default_settings
+from .transcription import transcribe_audio
+from .utils import _convert_audio_to_wav_mono16k, wav_mono16k_command
+
+# from loguru import logger
+
+# Hôtes confiés à yt-dlp (pages vidéo, pas des fichiers média)
+_YOUTUBE_HOSTS: tuple[str, ...] = ("youtube.com", "youtu.be", "youtube-nocookie.com")
+# Types servis par les liens directs vers un fichier média
+_MEDIA_CONTENT_TYPES: tuple[str, ...] = ("audio/", "video/", "application/ogg")
+# Délai (secondes) de la requête HEAD qui identifie un lien sans extension
+_HEAD_TIMEOUT: float = 10.0
+# Taille des blocs lus sur le réseau et passés à ffmpeg
+_BLOCK_BYTES: int = 64 * 1024
+
+
+def is_youtube_url(url: str) -> bool:
+    """Vrai si l'URL désigne une page YouTube (téléchargée par yt-dlp)."""
+    host = (urlparse(url).hostname or "").lower()
+    return any(host == name or host.endswith(f".{name}") for name in _YOUTUBE_HOSTS)
+
+
+def is_direct_media_url(url: str) -> bool:
+    """
+    Vrai si l'URL HTTP(S) pointe directement vers un fichier audio/vidéo (hors
+    YouTube) : d'après l'extension du chemin, sinon d'après le Content-Type d'une
+    requête HEAD. Les autres URL (pages vidéo) restent confiées à yt-dlp.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or is_youtube_url(url):
+        return False
+    try:
+        mime_type = detect_mime_type(Path(Path(parsed.path).name or "index"))
+        return mime_type.startswith(_MEDIA_CONTENT_TYPES)
+    except FileProcessingError:
+        pass
+    try:
+        response = requests.head(url, allow_redirects=True, timeout=_HEAD_TIMEOUT)
+    except requests.exceptions.RequestException:
+        # logger.debug(f"HEAD impossible sur {url}, URL confiée à yt-dlp.")
+        return False
+    content_type = response.headers.get("Content-Type", "").lower()
+    return response.ok and content_type.startswith(_MEDIA_CONTENT_TYPES)
+
+
+class _IncompleteBodyError(Exception):
+    """Réponse terminée avant la taille annoncée (connexion fermée en cours)."""
+
+
+def _range_validator(response: requests.Response) -> Optional[str]:
+    """
+    Valideur de la ressource pour If-Range : ETag fort, sinon Last-Modified
+    (un ETag faible n'est pas accepté dans If-Range).
+    """
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+class RangeReader:
+    """
+    Lecture par blocs d'une ressource HTTP(S). Après une coupure de connexion
+    (ou une réponse tronquée), la lecture reprend à l'octet près avec un en-tête
+    Range ; le serveur doit alors répondre 206. L'en-tête If-Range (ETag ou
+    Last-Modified de la première réponse) garantit que la suite provient de la
+    même version de la ressource.
+
+    Attributes:
+        position: Nombre d'octets déjà lus.
+        total: Taille annoncée de la ressource (None si inconnue).
+        reconnections: Nombre de reprises effectuées.
+        validator: Valeur envoyée dans If-Range (None si le serveur n'en fournit pas).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        settings: Settings,
+        cancel: Optional[threading.Event] = None,
+        end: Optional[int] = None,
+        validator: Optional[str] = None,
+    ) -> None:
+        """
+        Args:
+            end: Si fourni, seuls les octets [0, end) sont lus (requête Range dès
+                 le départ).
+            validator: Valeur If-Range d'une lecture précédente de la ressource.
+        """
+        self.url = url
+        self.settings = settings
+        self.cancel = cancel
+        self.end = end
+        self.validator = validator
+        self.position = 0
+        self.total: Optional[int] = None
+        self.reconnections = 0
+        self._session = requests.Session()
+        self._response: Optional[requests.Response] = None
+
+    def _open(self) -> requests.Response:
+        """
+        Raises:
+            FileProcessingError: Si le serveur ne permet pas la reprise, ou si la
+                ressource a changé depuis la première lecture.
+            requests.exceptions.RequestException: Si la requête échoue.
+        """
+        # Octets bruts : une réponse compressée fausserait les positions de reprise
+        headers = {"Accept-Encoding": "identity"}
+        partial = bool(self.position) or self.end is not None
+        if partial:
+            last = "" if self.end is None else str(self.end - 1)
+            headers["Range"] = f"bytes={self.position}-{last}"
+            if self.validator is not None:
+                headers["If-Range"] = self.validator
+        response = self._session.get(
+            self.url,
+            headers=headers,
+            stream=True,
+            timeout=self.settings.remote_media_timeout,
+        )
+        if partial and response.status_code != 206:
+            response.close()
+            if response.status_code == 200 and "If-Range" in headers:
+                raise FileProcessingError(
+                    f"Reprise impossible : {self.url} a changé depuis le début du "
+                    f"téléchargement (If-Range: {self.validator}), ou le serveur "
+                    f"ignore les requêtes partielles (HTTP 200)"
+                )
+            raise FileProcessingError(
+                f"Reprise impossible après coupure : le serveur ignore les requêtes "
+                f"partielles (HTTP {response.status_code}) pour {self.url}"
+            )
+        content_range = response.headers.get("Content-Range", "")
+        if partial and not content_range.startswith(f"bytes {self.position}-"):
+            response.close()
+            raise FileProcessingError(
+                f"Reprise impossible : réponse partielle inattendue "
+                f"({content_range or 'sans Content-Range'}) pour {self.url}"
+            )
+        response.raise_for_status()
+        if self.validator is None:
+            self.validator = _range_validator(response)
+        if self.total is None:
+            if response.status_code == 206:
+                size = content_range.rpartition("/")[2]
+            else:
+                size = response.headers.get("Content-Length", "")
+            self.total = int(size) if size.isdigit() else None
+        return response
+
+    def _wait_before_retry(self, failures: int, error: Exception) -> None:
+        """
+        Raises:
+            FileProcessingError: Si les reprises sont épuisées ou la lecture annulée.
+        """
+        if failures > self.settings.remote_media_max_retries:
+            raise FileProcessingError(
+                f"Téléchargement de {self.url} interrompu après {failures - 1} "
+                f"reprise(s) sans progression (octet {self.position}): {error}"
+            ) from error
+        delay = max(0.0, self.settings.remote_media_retry_backoff) * 2.0 ** (
+            failures - 1
+        )
+        # logger.warning(f"Coupure à l'octet {self.position}, reprise dans {delay:g}s")
+        if self.cancel is not None:
+            if self.cancel.wait(delay):
+                raise FileProcessingError(f"Téléchargement de {self.url} annulé.")
+        else:
+            time.sleep(delay)
+        self.reconnections += 1
+
+    def iter_blocks(self) -> Iterator[bytes]:
+        """
+        Blocs successifs de la ressource, reprises comprises.
+
+        Raises:
+            FileProcessingError: Si la ressource est inaccessible, ou si la
+                connexion ne peut pas être rétablie.
+        """
+        failures = 0
+        while True:
+            try:
+                if self._response is None:
+                    self._response = self._open()
+                for block in self._response.iter_content(_BLOCK_BYTES):
+                    self.position += len(block)
+                    failures = 0
+                    yield block
+                self.close()
+                limit = self.total if self.end is None else self.end
+                if limit is None or self.position >= limit:
+                    return
+                raise _IncompleteBodyError(
+                    f"réponse tronquée ({self.position}/{self.total} octets)"
+                )
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout,
+                _IncompleteBodyError,
+            ) as e:
+                self.close()
+                failures += 1
+                self._wait_before_retry(failures, e)
+            except requests.exceptions.RequestException as e:
+                self.close()
+                raise FileProcessingError(
+                    f"Impossible de télécharger {self.url}: {e}"
+                ) from e
+
+    def close(self) -> None:
+        if self._response is not None:
+            self._response.close()
+            self._response = None
+
+
+def _write_blocks(
+    blocks: Iterable[bytes],
+    spool_path: Path,
+    offset: int,
+    url: str,
+    cancel: Optional[threading.Event],
+) -> None:
+    """
+    Écrit les blocs dans spool_path à partir de l'octet offset (le fichier est
+    créé si besoin ; les octets qui précèdent sont écrits plus tard).
+
+    Raises:
+        FileProcessingError: Si la lecture est annulée.
+    """
+    with spool_path.open("r+b" if spool_path.exists() else "wb") as spool:
+        spool.seek(offset)
+        for block in blocks:
+            if cancel is not None and cancel.is_set():
+                raise FileProcessingError(f"Téléchargement de {url} annulé.")
+            spool.write(block)
+
+
+def _pipe_to_ffmpeg(
+    reader: RangeReader,
+    command: list[str],
+    spool_path: Path,
+    cancel: Optional[threading.Event],
+) -> Optional[int]:
+    """
+    Passe les blocs lus à ffmpeg (entrée standard) au fil du téléchargement,
+    sans copie sur disque. Si ffmpeg s'arrête sans erreur avant la fin (fin de
+    fenêtre atteinte), le téléchargement s'arrête aussi ; s'il échoue, la suite
+    de la ressource est écrite dans spool_path à partir du premier bloc refusé.
+
+    Returns:
+        None si ffmpeg a converti le flux ; sinon l'offset à partir duquel
+        spool_path contient la ressource (le début reste à relire, voir
+        _fetch_prefix).
+
+    Raises:
+        FileProcessingError: Si ffmpeg est absent, le téléchargement impossible
+            ou la lecture annulée.
+    """
+    try:
+        # Liste d'arguments fixe (ffmpeg + chemin du WAV produit), sans shell
+        process = subprocess.Popen(  # noqa: S603
+            command,
+            bufsize=0,  # Chaque bloc est transmis à ffmpeg dès sa réception
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    except FileNotFoundError:
+        raise FileProcessingError(
+            "ffmpeg n'est pas installé ou n'est pas dans le PATH système."
+        ) from None
+    stdin = cast(IO[bytes], process.stdin)  # stdin=PIPE
+    spool_from: Optional[int] = None
+    try:
+        blocks = reader.iter_blocks()
+        for block in blocks:
+            if cancel is not None and cancel.is_set():
+                raise FileProcessingError(f"Téléchargement de {reader.url} annulé.")
+            try:
+                stdin.write(block)
+            except BrokenPipeError:
+                if process.wait() == 0:
+                    break  # Fin de la fenêtre atteinte : inutile de poursuivre
+                # logger.warning(
+                #     "ffmpeg n'a pas pu lire le flux, conversion du fichier complet"
+                # )
+                spool_from = reader.position - len(block)
+                _write_blocks(
+                    chain([block], blocks), spool_path, spool_from, reader.url, cancel
+                )
+                break
+        stdin.close()
+        returncode = process.wait()
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        stdin.close()
+    if returncode == 0:
+        return None
+    # ffmpeg a tout reçu puis échoué (ex: index MP4 en fin de fichier)
+    return reader.position if spool_from is None else spool_from
+
+
+def _fetch_prefix(
+    reader: RangeReader,
+    end: int,
+    spool_path: Path,
+    cancel: Optional[threading.Event],
+) -> int:
+    """
+    Relit les octets [0, end) de la ressource de reader (Range et If-Range :
+    même version que la première lecture) au début de spool_path.
+
+    Returns:
+        Le nombre d'octets relus.
+
+    Raises:
+        FileProcessingError: Si la ressource a changé ou ne peut pas être relue.
+    """
+    spool_path.touch()
+    if end <= 0:
+        return 0
+    prefix = RangeReader(
+        reader.url, reader.settings, cancel, end=end, validator=reader.validator
+    )
+    try:
+        _write_blocks(prefix.iter_blocks(), spool_path, 0, reader.url, cancel)
+    finally:
+        prefix.close()
+    reader.reconnections += prefix.reconnections
+    return prefix.position
+
+
+def stream_remote_media_to_wav(
+    url: str,
+    output_wav_path: Path,
+    settings: Optional[Settings] = None,
+    stats: Optional[dict[str, Any]] = None,
+    cancel: Optional[threading.Event] = None,
+) -> None:
+    """
+    Convertit un média distant (HTTP(S)) en WAV 16kHz mono pendant son
+    téléchargement : ffmpeg décode le flux au fur et à mesure, avec reprise
+    (Range) sur coupure. Les conteneurs illisibles en flux (ex: MP4 dont l'index
+    est en fin de fichier) sont convertis une fois le téléchargement terminé.
+
+    Seuls les octets que ffmpeg n'a pas pu lire sont écrits sur disque : après
+    un échec de ffmpeg, la suite de la ressource est copiée dans un fichier
+    temporaire, puis le début est relu (Range), et le fichier est converti.
+
+    Une fenêtre temporelle (settings.media_start / media_end) est appliquée par
+    ffmpeg ; le téléchargement s'arrête à la fin de la fenêtre. Les chapitres
+    d'un média distant ne sont pas disponibles.
+
+    Args:
+        url: URL HTTP(S) du fichier audio/vidéo.
+        output_wav_path: Chemin du WAV produit.
+        settings: Paramètres du job (fenêtre, délais et reprises). Défaut: config.py.
+        stats: Si fourni, reçoit la fenêtre, les octets lus ("remote_bytes"), le
+               nombre de reprises ("remote_reconnections"), le mode de
+               conversion ("remote_streamed") et les octets relus après un
+               échec de ffmpeg ("remote_refetched_bytes").
+        cancel: Si fourni et positionné, le téléchargement est interrompu.
+
+    Raises:
+        FileProcessingError: Si le téléchargement ou la conversion échoue.
+        ValueError: Si la fenêtre demandée est invalide ou le chapitre introuvable.
+    """
+    settings = settings or get_default_settings()
+    window = resolve_window(settings, lambda: [])
+    threads = ffmpeg_threads()
+    command = wav_mono16k_command("pipe:0", output_wav_path, threads, window=window)
+    spool_path = DOWNLOAD_DIR / f"remote_{uuid.uuid4().hex}.part"
+    reader = RangeReader(url, settings, cancel)
+    refetched = 0
+    try:
+        with get_host_scheduler().reserve(threads):
+            spool_from = _pipe_to_ffmpeg(reader, command, spool_path, cancel)
+        streamed = spool_from is None
+        if spool_from is not None:
+            refetched = _fetch_prefix(reader, spool_from, spool_path, cancel)
+            _convert_audio_to_wav_mono16k(spool_path, output_wav_path, window=window)
+    finally:
+        reader.close()
+        spool_path.unlink(missing_ok=True)
+    record_window(window, stats)
+    if stats is not None:
+        stats["remote_bytes"] = reader.position
+        stats["remote_reconnections"] = reader.reconnections
+        stats["remote_streamed"] = streamed
+        stats["remote_refetched_bytes"] = refetched
+
+
+def transcribe_remote_media(
+    url: str,
+    settings: Optional[Settings] = None,
+    stats: Optional[dict[str, Any]] = None,
+) -> str:
+    """
+    Transcrit un média distant, converti en WAV pendant son téléchargement
+    (voir stream_remote_media_to_wav).
+
+    Raises:
+        FileProcessingError, TranscriptionError, ConfigurationError, ValueError:
+        voir stream_remote_media_to_wav et transcribe_audio.
+    """
+    wav_path = DOWNLOAD_DIR / f"remote_{uuid.uuid4().hex}.wav"
+    try:
+        stream_remote_media_to_wav(url, wav_path, settings, stats)
+        return transcribe_audio(wav_path, settings, stats)
+    finally:
+        wav_path.unlink(missing_ok=True)
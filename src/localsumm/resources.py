@@ -0,0 +1,174 @@
+# src/localsumm/resources.py
+
+import threading
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from .config import FFMPEG_THREADS, HOST_CPU_THREADS, HOST_SCHEDULER_ENABLED
+from .settings import Settings
+
+# from loguru import logger
+
+
+class ResourceScheduler:
+    """
+    Budget de threads CPU partagé par les étapes lourdes d'une même machine
+    (whisper.cpp / faster-whisper, ffmpeg, requêtes vers un Ollama local).
+
+    Chaque étape réserve ses threads avant de démarrer et les rend en fin
+    d'exécution : la machine reste occupée sans surcharge (pas de transcription
+    de 8 threads lancée pendant que 2 requêtes Ollama en utilisent déjà 8).
+
+    L'admission est FIFO : une étape gourmande (whisper) n'est pas doublée
+    indéfiniment par une suite de petites réservations (appels MAP). Une
+    réservation plus grande que le budget est ramenée au budget : elle s'exécute
+    seule plutôt que jamais.
+    """
+
+    def __init__(self, total_threads: int, enabled: bool = True) -> None:
+        self.total_threads: int = max(1, total_threads)
+        self.enabled: bool = enabled
+        self.in_use: int = 0
+        self._queue: deque[tuple[object, int]] = deque()
+        self._condition = threading.Condition()
+
+    def clamp(self, threads: int) -> int:
+        """Nombre de threads effectivement attribuable (entre 0 et le budget)."""
+        return max(0, min(threads, self.total_threads))
+
+    # --- Admission (utilisée aussi par le pipeline asyncio) ---
+
+    def enqueue(self, threads: int) -> object:
+        """Prend un ticket dans la file d'attente ; à suivre de try_admit()."""
+        ticket = object()
+        with self._condition:
+            self._queue.append((ticket, self.clamp(threads)))
+        return ticket
+
+    def _admissible(self, ticket: object) -> bool:
+        head_ticket, threads = self._queue[0]
+        return head_ticket is ticket and self.in_use + threads <= self.total_threads
+
+    def try_admit(self, ticket: object) -> Optional[int]:
+        """
+        Admet le ticket s'il est en tête de file et que le budget le permet.
+
+        Returns:
+            Le nombre de threads réservés (à rendre avec release()), ou None.
+        """
+        with self._condition:
+            if not self._admissible(ticket):
+                return None
+            _, threads = self._queue.popleft()
+            self.in_use += threads
+            self._condition.notify_all()
+            return threads
+
+    def _remove(self, ticket: object) -> None:
+        for entry in self._queue:
+            if entry[0] is ticket:
+                self._queue.remove(entry)
+                break
+        self._condition.notify_all()
+
+    def withdraw(self, ticket: object) -> None:
+        """Retire un ticket non admis (ex: tâche annulée pendant l'attente)."""
+        with self._condition:
+            self._remove(ticket)
+
+    def release(self, threads: int) -> None:
+        """Rend des threads réservés."""
+        with self._condition:
+            self.in_use = max(0, self.in_use - threads)
+            self._condition.notify_all()
+
+    # --- API bloquante ---
+
+    @contextmanager
+    def reserve(self, threads: int) -> Iterator[int]:
+        """
+        Bloque jusqu'à obtenir `threads` threads, puis les rend en sortie de bloc.
+
+        Yields:
+            Le nombre de threads réservés (0 si l'ordonnanceur est désactivé ou
+            si l'étape ne consomme pas de CPU local).
+        """
+        if not self.enabled or threads <= 0:
+            yield 0
+            return
+        ticket = self.enqueue(threads)
+        with self._condition:
+            try:
+                while not self._admissible(ticket):
+                    self._condition.wait()
+            except BaseException:
+                self._remove(ticket)
+                raise
+            _, granted = self._queue.popleft()
+            self.in_use += granted
+            self._condition.notify_all()
+        try:
+            yield granted
+        finally:
+            self.release(granted)
+
+    def snapshot(self) -> dict[str, Any]:
+        """État courant (supervision) : budget, threads réservés, étapes en attente."""
+        with self._condition:
+            return {
+                "total_threads": self.total_threads,
+                "in_use": self.in_use,
+                "waiting": len(self._queue),
+            }
+
+
+_host_scheduler: Optional[ResourceScheduler] = None
+_host_scheduler_lock = threading.Lock()
+
+
+def get_host_scheduler() -> ResourceScheduler:
+    """Ordonnanceur partagé par tous les jobs du processus (HOST_CPU_THREADS)."""
+    global _host_scheduler
+    if _host_scheduler is None:
+        with _host_scheduler_lock:
+            if _host_scheduler is None:
+                _host_scheduler = ResourceScheduler(
+                    HOST_CPU_THREADS, enabled=HOST_SCHEDULER_ENABLED
+                )
+    return _host_scheduler
+
+
+# --- Threads attribués à chaque étape ---
+
+
+def whisper_threads(settings: Settings) -> int:
+    """Threads de transcription (WHISPER_CPP_THREADS, borné par le budget machine)."""
+    try:
+        requested = int(settings.whisper_cpp_threads)
+    except ValueError:
+        requested = 4
+    return max(1, get_host_scheduler().clamp(requested))
+
+
+def ffmpeg_threads() -> int:
+    """Threads de décodage ffmpeg (FFMPEG_THREADS, borné par le budget machine)."""
+    return max(1, get_host_scheduler().clamp(FFMPEG_THREADS))
+
+
+def ollama_request_threads(is_local: bool, num_thread: int, slots: int = 1) -> int:
+    """
+    Threads consommés sur cette machine par une requête Ollama : 0 pour un
+    serveur distant, sinon num_thread (settings.ollama_num_thread ; 0 = la
+    moitié du budget, ordre de grandeur du réglage par défaut d'Ollama : un
+    thread par cœur physique).
+
+    slots: Requêtes traitées ensemble par un serveur à "continuous batching",
+           qui partagent ses threads : chacune n'en compte que sa part.
+    """
+    if not is_local:
+        return 0
+    scheduler = get_host_scheduler()
+    server_threads = num_thread or max(1, scheduler.total_threads // 2)
+    return scheduler.clamp(-(-server_threads // max(1, slots)))
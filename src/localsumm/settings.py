@@ -0,0 +1,233 @@
+# src/localsumm/settings.py
+
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from . import config
+
+# from loguru import logger
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Paramètres d'un job, immuables et hachables.
+
+    Les valeurs par défaut sont celles de config.py (lues une fois depuis
+    l'environnement / le .env). Un worker de longue durée peut ainsi traiter des
+    jobs avec des modèles, backends ou tailles de chunks différents en parallèle :
+    chaque job reçoit son propre objet Settings, et les ressources coûteuses
+    (modèle Whisper, tokenizer, pool de connexions Ollama) sont mises en cache par
+    clé de paramètres.
+
+    Exemple :
+        settings = Settings().replace(ollama_model="llama3:instruct",
+                                      tokenizer_hf_identifier="meta-llama/Meta-Llama-3-8B-Instruct")
+    """
+
+    # --- Ollama / LLM ---
+    llm_backend: str = config.LLM_BACKEND
+    llm_api_key: str = field(default=config.LLM_API_KEY, repr=False)
+    ollama_model: str = config.OLLAMA_MODEL
+    ollama_base_urls: tuple[str, ...] = tuple(config.OLLAMA_BASE_URLS)
+    ollama_api_mode: str = config.OLLAMA_API_MODE
+    ollama_timeout: float = config.OLLAMA_TIMEOUT
+    ollama_keep_alive: str = config.OLLAMA_KEEP_ALIVE
+    ollama_warmup_enabled: bool = config.OLLAMA_WARMUP_ENABLED
+    ollama_max_concurrency_per_endpoint: int = (
+        config.OLLAMA_MAX_CONCURRENCY_PER_ENDPOINT
+    )
+    ollama_hedge_enabled: bool = config.OLLAMA_HEDGE_ENABLED
+    # Threads par requête d'un Ollama local (0 = choix d'Ollama)
+    ollama_num_thread: int = config.OLLAMA_NUM_THREAD
+    tokenizer_hf_identifier: str = config.TOKENIZER_HF_IDENTIFIER
+    llm_max_context_tokens: int = config.LLM_MAX_CONTEXT_TOKENS
+    llm_stop_sequences: tuple[str, ...] = tuple(config.LLM_STOP_SEQUENCES)
+    # Modèle, tokenizer et fenêtre par étape ("" / 0 = valeurs ci-dessus)
+    map_model: str = config.MAP_MODEL
+    map_tokenizer_hf_identifier: str = config.MAP_TOKENIZER_HF_IDENTIFIER
+    map_max_context_tokens: int = config.MAP_MAX_CONTEXT_TOKENS
+    reduce_model: str = config.REDUCE_MODEL
+    reduce_tokenizer_hf_identifier: str = config.REDUCE_TOKENIZER_HF_IDENTIFIER
+    reduce_max_context_tokens: int = config.REDUCE_MAX_CONTEXT_TOKENS
+    direct_model: str = config.DIRECT_MODEL
+    direct_tokenizer_hf_identifier: str = config.DIRECT_TOKENIZER_HF_IDENTIFIER
+    direct_max_context_tokens: int = config.DIRECT_MAX_CONTEXT_TOKENS
+
+    # --- Transcription ---
+    transcription_backend: str = config.TRANSCRIPTION_BACKEND
+    whisper_model_size: str = config.WHISPER_MODEL_SIZE
+    faster_whisper_compute_type: str = config.FASTER_WHISPER_COMPUTE_TYPE
+    faster_whisper_device: str = config.FASTER_WHISPER_DEVICE
+    whisper_cpp_executable_path: Optional[str] = config.WHISPER_CPP_EXECUTABLE_PATH
+    whisper_cpp_model_path: Optional[str] = config.WHISPER_CPP_MODEL_PATH
+    whisper_cpp_language: str = config.WHISPER_CPP_LANGUAGE
+    whisper_cpp_threads: str = config.WHISPER_CPP_THREADS
+    whisper_beam_size: int = config.WHISPER_BEAM_SIZE
+    silence_trim_enabled: bool = config.SILENCE_TRIM_ENABLED
+    silence_min_seconds: float = config.SILENCE_MIN_SECONDS
+    silence_threshold_db: float = config.SILENCE_THRESHOLD_DB
+    audio_tempo: float = config.AUDIO_TEMPO
+    fingerprint_enabled: bool = config.FINGERPRINT_ENABLED
+    fingerprint_match_threshold: float = config.FINGERPRINT_MATCH_THRESHOLD
+    fingerprint_min_overlap: float = config.FINGERPRINT_MIN_OVERLAP
+    # 0 = pas de limite
+    fingerprint_index_max_entries: int = config.FINGERPRINT_INDEX_MAX_ENTRIES
+    fingerprint_index_max_bytes: int = config.FINGERPRINT_INDEX_MAX_BYTES
+    # Délai cible (secondes) : choix du modèle selon la durée du média (0 = fixe)
+    transcription_deadline: float = config.TRANSCRIPTION_DEADLINE
+    # Portion de l'enregistrement à traiter (propre à chaque job, pas de valeur
+    # dans le .env) : début / fin en secondes, ou titre de chapitre
+    media_start: float = 0.0
+    media_end: Optional[float] = None
+    media_chapter: Optional[str] = None
+    # Médias distants (--url hors YouTube) : délai de lecture, reprises (Range)
+    remote_media_timeout: float = config.REMOTE_MEDIA_TIMEOUT
+    remote_media_max_retries: int = config.REMOTE_MEDIA_MAX_RETRIES
+    remote_media_retry_backoff: float = config.REMOTE_MEDIA_RETRY_BACKOFF
+
+    # --- Découpage ---
+    chunk_target_tokens: int = config.CHUNK_TARGET_TOKENS
+    chunk_overlap_tokens: int = config.CHUNK_OVERLAP_TOKENS
+    chunking_strategy: str = config.CHUNKING_STRATEGY
+    # 0 = proportionnel à la taille max des chunks (max // 4, max // 2)
+    cdc_min_tokens: int = config.CDC_MIN_TOKENS
+    cdc_avg_tokens: int = config.CDC_AVG_TOKENS
+
+    # --- Étape MAP ---
+    map_cache_enabled: bool = config.MAP_CACHE_ENABLED
+    map_concurrency: int = config.MAP_CONCURRENCY
+    dedup_enabled: bool = config.DEDUP_ENABLED
+    dedup_threshold: float = config.DEDUP_THRESHOLD
+    text_stream_min_bytes: int = config.TEXT_STREAM_MIN_BYTES
+    stream_map_batch_chunks: int = config.STREAM_MAP_BATCH_CHUNKS
+    map_max_retries: int = config.MAP_MAX_RETRIES
+    map_retry_backoff: float = config.MAP_RETRY_BACKOFF
+    map_split_after_timeouts: int = config.MAP_SPLIT_AFTER_TIMEOUTS
+    map_split_max_depth: int = config.MAP_SPLIT_MAX_DEPTH
+    map_error_budget: float = config.MAP_ERROR_BUDGET
+    # 0 = illimité
+    job_deadline: float = config.JOB_DEADLINE
+    prompt_template_map: str = config.PROMPT_TEMPLATE_MAP
+    # 'prose', 'bullets' ou 'json' (points clés fusionnés avant le REDUCE)
+    map_output_format: str = config.MAP_OUTPUT_FORMAT
+    point_dedup_threshold: float = config.POINT_DEDUP_THRESHOLD
+
+    # --- Mode question ---
+    # Question posée sur la source (propre à chaque job, pas de valeur dans le
+    # .env) : seuls les chunks les plus pertinents sont envoyés au LLM
+    question: Optional[str] = None
+    question_top_k: int = config.QUESTION_TOP_K
+    embedding_model: str = config.EMBEDDING_MODEL
+    question_embedding_weight: float = config.QUESTION_EMBEDDING_WEIGHT
+    prompt_template_question_map: str = config.PROMPT_TEMPLATE_QUESTION_MAP
+
+    # --- Budgets de génération ---
+    map_output_ratio: float = config.MAP_OUTPUT_RATIO
+    map_min_output_tokens: int = config.MAP_MIN_OUTPUT_TOKENS
+    map_max_output_tokens: int = config.MAP_MAX_OUTPUT_TOKENS
+    # Paires (format, num_predict) : un tuple plutôt qu'un dict pour rester hachable
+    final_output_tokens: tuple[tuple[str, int], ...] = tuple(
+        config.FINAL_OUTPUT_TOKENS.items()
+    )
+
+    # --- Pré-compression extractive ---
+    extractive_ratio: float = config.EXTRACTIVE_RATIO
+    extractive_max_tokens: int = config.EXTRACTIVE_MAX_TOKENS
+    preview_max_tokens: int = config.PREVIEW_MAX_TOKENS
+
+    def replace(self, **changes: Any) -> "Settings":
+        """Retourne une copie modifiée (l'objet d'origine reste inchangé)."""
+        for name in ("ollama_base_urls", "llm_stop_sequences"):
+            if isinstance(changes.get(name), list):
+                changes[name] = tuple(changes[name])
+        if isinstance(changes.get("final_output_tokens"), dict):
+            changes["final_output_tokens"] = tuple(
+                changes["final_output_tokens"].items()
+            )
+        return dataclasses.replace(self, **changes)
+
+    def final_output_budget(self, format_name: str) -> Optional[int]:
+        """Plafond de tokens générés pour un format final (None = pas de plafond)."""
+        return dict(self.final_output_tokens).get(format_name)
+
+    def for_stage(self, stage: str) -> "Settings":
+        """
+        Paramètres d'une étape LLM ('map', 'reduce' ou 'direct') : le modèle, le
+        tokenizer et la fenêtre de contexte propres à l'étape remplacent les
+        valeurs générales (le résumé direct reprend à défaut ceux du REDUCE).
+        La taille des chunks est ramenée à 75 % de la fenêtre de l'étape si
+        celle-ci est plus petite.
+
+        Raises:
+            ValueError: Si l'étape est inconnue.
+        """
+        stages = {
+            "map": (
+                self.map_model,
+                self.map_tokenizer_hf_identifier,
+                self.map_max_context_tokens,
+            ),
+            "reduce": (
+                self.reduce_model,
+                self.reduce_tokenizer_hf_identifier,
+                self.reduce_max_context_tokens,
+            ),
+            "direct": (
+                self.direct_model or self.reduce_model,
+                self.direct_tokenizer_hf_identifier
+                or self.reduce_tokenizer_hf_identifier,
+                self.direct_max_context_tokens or self.reduce_max_context_tokens,
+            ),
+        }
+        if stage not in stages:
+            raise ValueError(f"Étape LLM inconnue : '{stage}'.")
+        model, tokenizer, context_tokens = stages[stage]
+        if not (model or tokenizer or context_tokens):
+            return self
+        context_tokens = context_tokens or self.llm_max_context_tokens
+        return self.replace(
+            ollama_model=model or self.ollama_model,
+            tokenizer_hf_identifier=tokenizer or self.tokenizer_hf_identifier,
+            llm_max_context_tokens=context_tokens,
+            chunk_target_tokens=min(
+                self.chunk_target_tokens, int(context_tokens * 0.75)
+            ),
+        )
+
+    def stage_settings(self) -> list["Settings"]:
+        """
+        Paramètres des étapes MAP, REDUCE et directe, sans doublon (même modèle et
+        même fenêtre) : un préchargement par modèle réellement utilisé.
+        """
+        distinct: dict[tuple[str, int], Settings] = {}
+        for stage in ("map", "reduce", "direct"):
+            stage_settings = self.for_stage(stage)
+            key = (stage_settings.ollama_model, stage_settings.llm_max_context_tokens)
+            distinct.setdefault(key, stage_settings)
+        return list(distinct.values())
+
+    def cdc_bounds(self, max_chunk_tokens: int) -> tuple[int, int]:
+        """
+        Bornes (min, moyenne) du découpage 'content-defined' pour ce max, avec
+        repli sur max // 4 et max // 2 si non configurées ou incompatibles.
+        """
+        min_tokens, avg_tokens = self.cdc_min_tokens, self.cdc_avg_tokens
+        if not 0 < min_tokens < avg_tokens <= max_chunk_tokens:
+            min_tokens, avg_tokens = max_chunk_tokens // 4, max_chunk_tokens // 2
+        return min_tokens, avg_tokens
+
+
+_default_settings: Optional[Settings] = None
+
+
+def get_default_settings() -> Settings:
+    """
+    Paramètres par défaut du processus (config.py), utilisés si aucun n'est
+    fourni.
+    """
+    global _default_settings
+    if _default_settings is None:
+        _default_settings = Settings()
+    return _default_settings
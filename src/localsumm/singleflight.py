@@ -0,0 +1,213 @@
+# src/localsumm/singleflight.py
+
+import asyncio
+import hashlib
+import re
+import threading
+from collections.abc import Coroutine, Hashable
+from pathlib import Path
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+# from loguru import logger
+
+T = TypeVar("T")
+
+# Identifiant de vidéo YouTube (11 caractères) dans les formes d'URL courantes :
+# watch?v=, youtu.be/, /shorts/, /embed/, /live/
+_YOUTUBE_ID_PATTERN = re.compile(
+    r"(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])"
+)
+# Taille des blocs lus pour l'empreinte d'un fichier
+_HASH_BLOCK_SIZE: int = 1024 * 1024
+
+
+def _file_digest(file_path: Path) -> str:
+    """
+    Empreinte du contenu complet d'un fichier, lu par blocs (mémoire bornée).
+    Deux fichiers distincts de même taille ne partagent jamais de traitement.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with file_path.open("rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_identity(
+    text_input: Optional[str] = None,
+    file_input: Optional[Path] = None,
+    url_input: Optional[str] = None,
+) -> str:
+    """
+    Identité normalisée d'une source, pour reconnaître deux demandes identiques.
+
+    - URL YouTube : l'ID de la vidéo (youtu.be/X et watch?v=X&t=30 sont la même
+      source) ;
+    - fichier : empreinte du contenu (deux copies du même enregistrement coïncident) ;
+    - texte : empreinte du texte.
+
+    Un fichier illisible est identifié par son chemin absolu : l'erreur remontera
+    du pipeline lui-même.
+    """
+    if url_input is not None:
+        match = _YOUTUBE_ID_PATTERN.search(url_input)
+        return f"youtube:{match.group(1)}" if match else f"url:{url_input.strip()}"
+    if file_input is not None:
+        try:
+            return f"file:{_file_digest(file_input)}"
+        except OSError:
+            return f"path:{file_input.resolve()}"
+    text_digest = hashlib.sha256((text_input or "").encode("utf-8")).hexdigest()
+    return f"text:{text_digest}"
+
+
+class _Call(Generic[T]):
+    """Un traitement en cours, partagé par tous les appelants de même clé."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Optional[T] = None
+        self.error: Optional[BaseException] = None
+        # Callbacks des appelants qui suivent la progression du traitement
+        self.subscribers: list[Callable[[Any], None]] = []
+
+
+class SingleFlight:
+    """
+    Regroupe les appels identiques simultanés ("single-flight").
+
+    Le premier appelant d'une clé exécute la fonction ; ceux qui arrivent pendant
+    l'exécution attendent et reçoivent le même résultat (ou la même exception).
+    Les événements publiés pendant le traitement (publish) parviennent à tous les
+    appelants abonnés, y compris ceux arrivés en cours de route (à partir de leur
+    arrivée). Rien n'est conservé une fois le traitement terminé : ce n'est pas un cache.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call[Any]] = {}
+
+    def in_flight(self) -> int:
+        """Nombre de traitements actuellement en cours."""
+        with self._lock:
+            return len(self._calls)
+
+    def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], T],
+        subscriber: Optional[Callable[[Any], None]] = None,
+    ) -> tuple[T, bool]:
+        """
+        Exécute fn(), ou attend le traitement déjà lancé pour la même clé.
+
+        Args:
+            key: Clé des traitements interchangeables.
+            fn: Le traitement, exécuté par le premier appelant.
+            subscriber: Si fourni, reçoit les événements publiés pour key jusqu'à
+                        la fin du traitement (voir publish).
+
+        Returns:
+            (résultat, partagé) ; partagé vaut True si le résultat provient du
+            traitement lancé par un autre appelant.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+            if subscriber is not None:
+                call.subscribers.append(subscriber)
+
+        if not is_leader:
+            # logger.debug(
+            #     f"Traitement identique déjà en cours, attente du résultat ({key})"
+            # )
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True  # type: ignore[return-value]
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def publish(self, key: Hashable, event: Any) -> None:
+        """
+        Transmet event à chaque abonné du traitement en cours pour key (appelé
+        depuis ce traitement). Sans traitement en cours, l'événement est ignoré.
+        Comme sans regroupement, une exception levée par un abonné interrompt le
+        traitement.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            subscribers = list(call.subscribers) if call is not None else []
+        for subscriber in subscribers:
+            subscriber(event)
+
+
+class _AsyncCall:
+    def __init__(self, task: "asyncio.Task[Any]") -> None:
+        self.task = task
+        self.waiters: int = 0
+
+
+class AsyncSingleFlight:
+    """
+    Équivalent asyncio de SingleFlight.
+
+    Le traitement tourne dans une tâche partagée. Un appelant annulé n'interrompt
+    pas les autres ; la tâche n'est annulée que lorsque plus personne ne l'attend.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[tuple[asyncio.AbstractEventLoop, Hashable], _AsyncCall] = {}
+
+    def in_flight(self) -> int:
+        """Nombre de traitements actuellement en cours."""
+        return len(self._calls)
+
+    async def do(
+        self, key: Hashable, factory: Callable[[], Coroutine[Any, Any, T]]
+    ) -> tuple[T, bool]:
+        """
+        Attend factory(), ou le traitement déjà lancé pour la même clé.
+
+        Returns:
+            (résultat, partagé) : voir SingleFlight.do.
+        """
+        loop = asyncio.get_running_loop()
+        # Une tâche n'est utilisable que dans sa boucle d'événements
+        call_key = (loop, key)
+        entry = self._calls.get(call_key)
+        shared = entry is not None
+        if entry is None:
+            new_entry = _AsyncCall(loop.create_task(factory()))
+
+            def forget(_task: "asyncio.Task[Any]") -> None:
+                if self._calls.get(call_key) is new_entry:
+                    del self._calls[call_key]
+
+            new_entry.task.add_done_callback(forget)
+            self._calls[call_key] = new_entry
+            entry = new_entry
+
+        entry.waiters += 1
+        try:
+            result: T = await asyncio.shield(entry.task)
+            return result, shared
+        except asyncio.CancelledError:
+            if entry.waiters == 1 and not entry.task.done():
+                # Dernier appelant annulé : plus personne n'attend le résultat
+                entry.task.cancel()
+            raise
+        finally:
+            entry.waiters -= 1
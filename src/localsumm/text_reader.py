@@ -0,0 +1,146 @@
+# src/localsumm/text_reader.py
+
+import codecs
+import shutil
+import sys
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from .config import DOWNLOAD_DIR
+from .exceptions import FileProcessingError
+
+try:
+    from charset_normalizer import from_bytes
+except ImportError:  # Dépendance optionnelle : détection des encodages non UTF-8
+    from_bytes = None  # type: ignore[assignment]
+
+# from loguru import logger
+
+# Taille des blocs lus (la mémoire de lecture ne dépend pas de la taille du fichier)
+_READ_BLOCK_BYTES: int = 1024 * 1024
+# Octets examinés pour détecter l'encodage
+_SAMPLE_BYTES: int = 64 * 1024
+# Encodage de repli (aucune séquence d'octets invalide avec errors="replace")
+_FALLBACK_ENCODING: str = "cp1252"
+# Écart de "chaos" (charset-normalizer) en deçà duquel cp1252 est préféré : sur
+# un échantillon court, plusieurs pages de codes 8 bits sont jugées équivalentes
+_FALLBACK_CHAOS_MARGIN: float = 0.1
+# En deçà, l'échantillon est trop court pour une détection statistique fiable
+_MIN_DETECTION_BYTES: int = 32
+
+_BOMS: tuple[tuple[bytes, str], ...] = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+def detect_encoding(sample: bytes, complete: bool = False) -> str:
+    """
+    Encodage probable d'un texte d'après ses premiers octets : BOM, sinon UTF-8
+    s'il décode sans erreur, sinon détection statistique (charset-normalizer,
+    si installé) avec préférence pour cp1252 quand il est aussi plausible,
+    sinon cp1252.
+
+    complete: Vrai si l'échantillon est le texte entier (un caractère multi-octets
+              inachevé à la fin n'est alors pas admis).
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    try:
+        # Échantillon partiel : un caractère multi-octets coupé à la fin est admis
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=complete)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    if from_bytes is not None and len(sample) >= _MIN_DETECTION_BYTES:
+        matches = list(from_bytes(sample))
+        if matches and not any(
+            match.encoding == _FALLBACK_ENCODING
+            and match.chaos <= matches[0].chaos + _FALLBACK_CHAOS_MARGIN
+            for match in matches
+        ):
+            return str(matches[0].encoding)
+    return _FALLBACK_ENCODING
+
+
+def iter_text(stream: BinaryIO, block_size: int = _READ_BLOCK_BYTES) -> Iterator[str]:
+    """
+    Décode un flux binaire bloc par bloc (encodage détecté sur le premier bloc,
+    caractères invalides remplacés), fins de ligne normalisées en '\\n'.
+
+    Un caractère multi-octets ou un '\\r\\n' à cheval sur deux blocs est recollé :
+    la concaténation des blocs produits est le texte complet.
+    """
+    first = stream.read(max(block_size, _SAMPLE_BYTES))
+    encoding = detect_encoding(
+        first[:_SAMPLE_BYTES], complete=len(first) < max(block_size, _SAMPLE_BYTES)
+    )
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    # logger.debug(f"Encodage détecté : {encoding}")
+    pending_cr = False
+    block = first
+    while True:
+        final = not block
+        text = decoder.decode(block, final=final)
+        if pending_cr:
+            text = "\r" + text
+        pending_cr = not final and text.endswith("\r")
+        if pending_cr:
+            text = text[:-1]
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        if text:
+            yield text
+        if final:
+            return
+        block = stream.read(block_size)
+
+
+def iter_text_file(file_path: Path) -> Iterator[str]:
+    """
+    Blocs de texte d'un fichier (voir iter_text).
+
+    Raises:
+        FileProcessingError: Si le fichier ne peut pas être lu.
+    """
+    try:
+        with file_path.open("rb") as f:
+            yield from iter_text(f)
+    except OSError as e:
+        raise FileProcessingError(
+            f"Impossible de lire le fichier texte {file_path.name}: {e}"
+        ) from e
+
+
+def read_text_file(file_path: Path) -> str:
+    """Contenu complet d'un fichier texte, quel que soit son encodage."""
+    return "".join(iter_text_file(file_path))
+
+
+def spool_stdin(stream: Optional[BinaryIO] = None) -> Path:
+    """
+    Copie l'entrée standard (par blocs) dans un fichier temporaire de
+    DOWNLOAD_DIR, traité ensuite comme un fichier texte local (lecture en flux
+    pour les gros volumes). Le fichier est à supprimer par l'appelant.
+
+    Raises:
+        FileProcessingError: Si la copie échoue.
+    """
+    stream = stream or sys.stdin.buffer
+    with tempfile.NamedTemporaryFile(
+        prefix="stdin_", suffix=".txt", delete=False, dir=str(DOWNLOAD_DIR)
+    ) as tmp_file:
+        target = Path(tmp_file.name)
+        try:
+            shutil.copyfileobj(stream, tmp_file, _READ_BLOCK_BYTES)
+        except OSError as e:
+            target.unlink(missing_ok=True)
+            raise FileProcessingError(
+                f"Impossible de lire l'entrée standard : {e}"
+            ) from e
+    return target
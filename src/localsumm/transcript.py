@@ -0,0 +1,176 @@
+# src/localsumm/transcript.py
+
+import gzip
+import json
+from array import array
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO, Callable, cast
+
+from .exceptions import FileProcessingError
+
+# from loguru import logger
+
+# Version du format JSONL (première ligne du fichier)
+_FORMAT_VERSION: int = 1
+
+
+class Segment:
+    """Un segment de transcription : instants de début et de fin (s) et texte."""
+
+    __slots__ = ("end", "start", "text")
+
+    def __init__(self, start: float, end: float, text: str) -> None:
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def __repr__(self) -> str:
+        return f"Segment({self.start:.2f}, {self.end:.2f}, {self.text!r})"
+
+
+class Transcript:
+    """
+    Transcription horodatée, stockée de façon compacte : les instants dans deux
+    tableaux de flottants, les textes dans une liste (pas d'objet par segment).
+    Une transcription de 10 heures (~10 000 segments) tient en quelques Mo.
+
+    Les segments sont itérés à la demande (objets Segment créés au vol), et
+    str(transcript) donne le texte plat, comme l'ancienne sortie de transcribe_audio.
+    """
+
+    __slots__ = ("_ends", "_starts", "_texts")
+
+    def __init__(self, segments: Iterable[tuple[float, float, str]] = ()) -> None:
+        self._starts: array[float] = array("d")
+        self._ends: array[float] = array("d")
+        self._texts: list[str] = []
+        for start, end, text in segments:
+            self.append(start, end, text)
+
+    def append(self, start: float, end: float, text: str) -> None:
+        """Ajoute un segment (texte nettoyé des espaces ; segments vides ignorés)."""
+        text = text.strip()
+        if not text:
+            return
+        self._starts.append(start)
+        self._ends.append(max(start, end))
+        self._texts.append(text)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __iter__(self) -> Iterator[Segment]:
+        for start, end, text in zip(self._starts, self._ends, self._texts):
+            yield Segment(start, end, text)
+
+    def __getitem__(self, index: int) -> Segment:
+        return Segment(self._starts[index], self._ends[index], self._texts[index])
+
+    def __str__(self) -> str:
+        return self.text
+
+    @property
+    def text(self) -> str:
+        """Texte plat (segments séparés par une espace)."""
+        return " ".join(self._texts)
+
+    @property
+    def texts(self) -> list[str]:
+        """Textes des segments (liste interne, à ne pas modifier)."""
+        return self._texts
+
+    @property
+    def duration(self) -> float:
+        """Instant de fin du dernier segment (0 si vide)."""
+        return self._ends[-1] if self._ends else 0.0
+
+    def window(self, start: float, end: float) -> "Transcript":
+        """Segments qui chevauchent l'intervalle [start, end] (en secondes)."""
+        return Transcript(
+            (segment.start, segment.end, segment.text)
+            for segment in self
+            if segment.end > start and segment.start < end
+        )
+
+    def span(self, first: int, last: int) -> tuple[float, float]:
+        """Instants (début, fin) couverts par les segments first..last inclus."""
+        return self._starts[first], self._ends[last]
+
+    def remap_times(self, to_original: Callable[[float], float]) -> None:
+        """Convertit tous les instants (ex: audio prétraité -> original), en place."""
+        for index in range(len(self._texts)):
+            self._starts[index] = to_original(self._starts[index])
+            self._ends[index] = to_original(self._ends[index])
+
+    # --- Sérialisation (JSONL, compressé en gzip si le nom finit par .gz) ---
+
+    def save(self, path: Path) -> None:
+        """
+        Écrit la transcription en JSONL (une ligne d'en-tête, puis une ligne par
+        segment), compressé en gzip si le fichier se termine par '.gz'.
+
+        Raises:
+            FileProcessingError: Si le fichier ne peut pas être écrit.
+        """
+        try:
+            with _open_text(path, "w") as f:
+                f.write(json.dumps({"version": _FORMAT_VERSION}) + "\n")
+                for start, end, text in zip(self._starts, self._ends, self._texts):
+                    f.write(
+                        json.dumps(
+                            {
+                                "start": round(start, 3),
+                                "end": round(end, 3),
+                                "text": text,
+                            },
+                            ensure_ascii=False,
+                        )
+                        + "\n"
+                    )
+        except OSError as e:
+            raise FileProcessingError(
+                f"Impossible d'écrire la transcription {path}: {e}"
+            ) from e
+
+    @classmethod
+    def load(cls, path: Path) -> "Transcript":
+        """
+        Relit une transcription écrite par save() (lecture ligne à ligne).
+
+        Raises:
+            FileProcessingError: Si le fichier est illisible ou mal formé.
+        """
+        transcript = cls()
+        try:
+            with _open_text(path, "r") as f:
+                header = json.loads(f.readline() or "{}")
+                if header.get("version") != _FORMAT_VERSION:
+                    raise FileProcessingError(
+                        f"Format de transcription non reconnu : {path.name}"
+                    )
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        transcript.append(
+                            float(record["start"]),
+                            float(record["end"]),
+                            record["text"],
+                        )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise FileProcessingError(
+                f"Impossible de lire la transcription {path}: {e}"
+            ) from e
+        return transcript
+
+
+def is_transcript_file(path: Path) -> bool:
+    """Vrai si le nom du fichier est celui d'une transcription sauvegardée."""
+    name = path.name.lower()
+    return name.endswith(".transcript.jsonl") or name.endswith(".transcript.jsonl.gz")
+
+
+def _open_text(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return cast(IO[str], gzip.open(path, mode + "t", encoding="utf-8"))
+    return path.open(mode, encoding="utf-8")
@@ -1,53 +1,62 @@
 # src/localsumm/transcription.py
 
+import re
 import subprocess
 import tempfile
 import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
 
-from .config import (
-    DOWNLOAD_DIR,
-    FASTER_WHISPER_COMPUTE_TYPE,
-    FASTER_WHISPER_DEVICE,
-    TRANSCRIPTION_BACKEND,
-    WHISPER_CPP_EXECUTABLE_PATH,
-    WHISPER_CPP_LANGUAGE,
-    WHISPER_CPP_MODEL_PATH,
-    WHISPER_CPP_THREADS,
-    WHISPER_MODEL_SIZE,
-)
+from .audio_preprocessing import PreprocessedAudio, preprocess_audio
+from .config import DOWNLOAD_DIR
 from .exceptions import (
     ConfigurationError,
     FileProcessingError,
     TranscriptionError,
 )
+from .fingerprint import (
+    AudioFingerprint,
+    FingerprintMatch,
+    find_transcript,
+    remember_transcript,
+)
+from .media_window import MediaWindow
+from .resources import get_host_scheduler, whisper_threads
+from .settings import Settings, get_default_settings
+from .transcript import Transcript
+from .transcription_policy import plan_transcription
+
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
 
 try:
-    from .utils import _convert_audio_to_wav_mono16k
+    from .utils import _convert_audio_to_wav_mono16k, is_wav_mono16k
 except ImportError as e:
     raise ImportError(
         f"Impossible d'importer la fonction de conversion depuis '.utils': {e}"
     ) from e
 
-if TRANSCRIPTION_BACKEND == "faster-whisper":
-    try:
-        from faster_whisper import WhisperModel
-    except ImportError:
-        print(
-            "AVERTISSEMENT: Backend 'faster-whisper' sélectionné mais la bibliothèque n'est pas installée (`pip install faster-whisper ctranslate2`)."
-        )
 # from loguru import logger
 
 # --- Backend Faster-Whisper ---
 
-_faster_whisper_model = None
+# Modèles chargés, par (taille, device, compute_type, threads) : plusieurs jobs
+# aux paramètres différents partagent le processus sans recharger à chaque appel.
+# Le choix du modèle selon le délai (transcription_policy) peut en solliciter
+# plusieurs : seuls les plus récemment utilisés restent en mémoire.
+_MAX_LOADED_FASTER_WHISPER_MODELS: int = 2
+_faster_whisper_models: "OrderedDict[tuple[str, str, str, int], Any]" = OrderedDict()
 _faster_whisper_model_lock = threading.Lock()
 
 
-def _load_faster_whisper_model() -> "WhisperModel":
-    """Charge et retourne le modèle Faster-Whisper (thread-safe)."""
-    global _faster_whisper_model
+def _load_faster_whisper_model(settings: Settings) -> "WhisperModel":
+    """
+    Charge et retourne le modèle Faster-Whisper des paramètres (thread-safe).
+
+    La bibliothèque n'est importée qu'à la première utilisation du backend.
+    """
     try:
         from faster_whisper import WhisperModel
     except ImportError as e:
@@ -56,42 +65,81 @@ def _load_faster_whisper_model() -> "WhisperModel":
             "Bibliothèque 'faster-whisper' non installée. Installez-la avec 'pip install faster-whisper ctranslate2'"
         ) from e
 
-    if _faster_whisper_model is None:
-        with _faster_whisper_model_lock:
-            if _faster_whisper_model is None:
-                model_name = WHISPER_MODEL_SIZE
-                # logger.info(f"Chargement du modèle Faster-Whisper: {model_name} (Device: {FASTER_WHISPER_DEVICE}, Compute: {FASTER_WHISPER_COMPUTE_TYPE})")
-                try:
-                    _faster_whisper_model = WhisperModel(
-                        model_name,
-                        device=FASTER_WHISPER_DEVICE,
-                        compute_type=FASTER_WHISPER_COMPUTE_TYPE,
-                    )
-                    # logger.success(f"Modèle Faster-Whisper '{model_name}' chargé.")
-                except Exception as e:
-                    # logger.error(f"Échec du chargement du modèle Faster-Whisper: {e}")
-                    raise TranscriptionError(
-                        f"Impossible de charger le modèle Faster-Whisper '{model_name}': {e}"
-                    ) from e
-    return _faster_whisper_model
-
-
-def _transcribe_with_faster_whisper(audio_path: Path) -> str:
-    """Effectue la transcription en utilisant le backend Faster-Whisper."""
-    model = _load_faster_whisper_model()
+    model_key = (
+        settings.whisper_model_size,
+        settings.faster_whisper_device,
+        settings.faster_whisper_compute_type,
+        whisper_threads(settings),
+    )
+    with _faster_whisper_model_lock:
+        model = _faster_whisper_models.get(model_key)
+        if model is not None:
+            _faster_whisper_models.move_to_end(model_key)
+            return model
+        model_name = settings.whisper_model_size
+        # logger.info(
+        #     f"Chargement du modèle Faster-Whisper: {model_name} "
+        #     f"(Device: {settings.faster_whisper_device}, "
+        #     f"Compute: {settings.faster_whisper_compute_type})"
+        # )
+        try:
+            model = WhisperModel(
+                model_name,
+                device=settings.faster_whisper_device,
+                compute_type=settings.faster_whisper_compute_type,
+                cpu_threads=model_key[3],
+            )
+        except Exception as e:
+            # logger.error(f"Échec du chargement du modèle Faster-Whisper: {e}")
+            raise TranscriptionError(
+                f"Impossible de charger le modèle Faster-Whisper '{model_name}': {e}"
+            ) from e
+        _faster_whisper_models[model_key] = model
+        # Un modèle évincé encore utilisé par un job est libéré à la fin de celui-ci
+        while len(_faster_whisper_models) > _MAX_LOADED_FASTER_WHISPER_MODELS:
+            _faster_whisper_models.popitem(last=False)
+        # logger.success(f"Modèle Faster-Whisper '{model_name}' chargé.")
+    return model
+
+
+def _transcribe_with_faster_whisper(
+    audio_path: Path, settings: Settings
+) -> tuple[Transcript, float]:
+    """
+    Effectue la transcription en utilisant le backend Faster-Whisper.
+
+    Returns:
+        (segments horodatés, durée du seul décodage en secondes, hors chargement
+        du modèle et attente de threads : base du RTF mesuré).
+    """
+    model = _load_faster_whisper_model(settings)
     # logger.info(f"Début transcription (Faster-Whisper) pour: {audio_path.name}")
-    start_time = time.time()
     try:
-        segments, info = model.transcribe(
-            str(audio_path),
-            beam_size=5,
-            language=WHISPER_CPP_LANGUAGE if WHISPER_CPP_LANGUAGE != "auto" else None,
-        )
-        # logger.info(f"Langue détectée (faster-whisper): {info.language} ({info.language_probability:.2f})")
-        transcribed_text: str = "".join(segment.text for segment in segments).strip()
-        duration = time.time() - start_time
-        # logger.success(f"Transcription Faster-Whisper réussie en {duration:.2f}s.")
-        return transcribed_text
+        # Les threads du modèle sont réservés pendant tout le décodage (les
+        # segments sont produits à la demande, lors de la jointure)
+        with get_host_scheduler().reserve(whisper_threads(settings)):
+            start_time = time.perf_counter()
+            segments, info = model.transcribe(
+                str(audio_path),
+                beam_size=settings.whisper_beam_size,
+                language=(
+                    settings.whisper_cpp_language
+                    if settings.whisper_cpp_language != "auto"
+                    else None
+                ),
+            )
+            # logger.info(
+            #     f"Langue détectée (faster-whisper): {info.language} "
+            #     f"({info.language_probability:.2f})"
+            # )
+            transcript = Transcript(
+                (segment.start, segment.end, segment.text) for segment in segments
+            )
+            decode_seconds = time.perf_counter() - start_time
+        # logger.success(
+        #     f"Transcription Faster-Whisper réussie en {decode_seconds:.2f}s."
+        # )
+        return transcript, decode_seconds
     except Exception as e:
         # logger.opt(exception=True).error(f"Transcription Faster-Whisper échouée pour {audio_path.name}.")
         raise TranscriptionError(f"Transcription Faster-Whisper échouée: {e}") from e
@@ -100,10 +148,10 @@ def _transcribe_with_faster_whisper(audio_path: Path) -> str:
 # --- Backend Whisper.cpp ---
 
 
-def _check_whisper_cpp_paths() -> tuple[str, str]:
+def check_whisper_cpp_paths(settings: Settings) -> tuple[str, str]:
     """Vérifie si les chemins whisper.cpp sont configurés et existent."""
-    exec_path_str = WHISPER_CPP_EXECUTABLE_PATH
-    model_path_str = WHISPER_CPP_MODEL_PATH
+    exec_path_str = settings.whisper_cpp_executable_path
+    model_path_str = settings.whisper_cpp_model_path
 
     # 1. Vérifier si les variables ont été définies (dans .env ou l'environnement)
     if not exec_path_str:
@@ -133,55 +181,108 @@ def _check_whisper_cpp_paths() -> tuple[str, str]:
     return str(exec_path), str(model_path)
 
 
-def _transcribe_with_whisper_cpp(audio_path: Path) -> str:
+def whisper_cpp_command(
+    exec_path: str, model_path: str, wav_path: Path, settings: Settings
+) -> list[str]:
+    """
+    Commande whisper.cpp (segments horodatés sur stdout) pour un WAV 16kHz Mono,
+    avec le nombre de threads attribué par l'ordonnanceur de la machine.
+    """
+    return [
+        exec_path,
+        "-m",
+        model_path,
+        "-f",
+        str(wav_path),
+        "-l",
+        settings.whisper_cpp_language,
+        "-t",
+        str(whisper_threads(settings)),
+        "-bs",
+        str(settings.whisper_beam_size),
+    ]
+
+
+# Ligne de sortie whisper.cpp : "[00:01:02.500 --> 00:01:05.000]  texte"
+_WHISPER_CPP_SEGMENT_RE = re.compile(
+    r"^\[(\d+):(\d{2}):(\d{2})[.,](\d{3}) --> "
+    r"(\d+):(\d{2}):(\d{2})[.,](\d{3})\]\s?(.*)$"
+)
+
+
+def _seconds(hours: str, minutes: str, seconds: str, millis: str) -> float:
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds) + int(millis) / 1000
+
+
+def parse_whisper_cpp_output(stdout: str) -> Transcript:
+    """
+    Segments horodatés de la sortie standard de whisper.cpp. Une ligne sans
+    horodatage est rattachée au dernier instant connu.
+    """
+    transcript = Transcript()
+    last_end = 0.0
+    for line in stdout.splitlines():
+        match = _WHISPER_CPP_SEGMENT_RE.match(line.strip())
+        if match is None:
+            transcript.append(last_end, last_end, line)
+            continue
+        groups = match.groups()
+        start, last_end = _seconds(*groups[0:4]), _seconds(*groups[4:8])
+        transcript.append(start, last_end, groups[8])
+    return transcript
+
+
+def _transcribe_with_whisper_cpp(
+    audio_path: Path, settings: Settings
+) -> tuple[Transcript, float]:
     """
     Effectue la transcription via whisper.cpp après avoir CONVERTI l'entrée en WAV 16kHz Mono.
+
+    Returns:
+        (segments horodatés, durée de l'exécution de whisper.cpp en secondes, hors
+        conversion et attente de threads : base du RTF mesuré).
     """
-    exec_path, model_path = _check_whisper_cpp_paths()
+    exec_path, model_path = check_whisper_cpp_paths(settings)
     # logger.info(f"Préparation pour transcription (whisper.cpp) de: {audio_path.name}")
 
-    with tempfile.NamedTemporaryFile(
-        suffix=".wav", delete=False, dir=str(DOWNLOAD_DIR)
-    ) as tmp_wav_file:
-        temp_wav_path = Path(tmp_wav_file.name)
-
-    # logger.debug(f"Chemin WAV temporaire généré: {temp_wav_path}")
+    # Un WAV 16kHz Mono (ex: sortie du prétraitement) est transcrit tel quel
+    temp_wav_path: Optional[Path] = None
+    if not is_wav_mono16k(audio_path):
+        with tempfile.NamedTemporaryFile(
+            suffix=".wav", delete=False, dir=str(DOWNLOAD_DIR)
+        ) as tmp_wav_file:
+            temp_wav_path = Path(tmp_wav_file.name)
+        # logger.debug(f"Chemin WAV temporaire généré: {temp_wav_path}")
 
-    converted_audio_path_for_whisper: Path = Path("")
-    start_time = time.time()
+    converted_audio_path_for_whisper: Path = temp_wav_path or audio_path
 
     try:
         # Étape 1: Convertir l'audio d'entrée en WAV 16kHz Mono temporaire
-        _convert_audio_to_wav_mono16k(audio_path, temp_wav_path)
-        converted_audio_path_for_whisper = (
-            temp_wav_path  # Utiliser ce chemin pour whisper.cpp
-        )
+        if temp_wav_path is not None:
+            _convert_audio_to_wav_mono16k(audio_path, temp_wav_path)
 
         # Étape 2: Construire et exécuter la commande whisper.cpp sur le fichier WAV converti
         # logger.info(f"Lancement de whisper.cpp sur le fichier converti: {converted_audio_path_for_whisper.name}")
-        command: list[str] = [
+        command = whisper_cpp_command(
             exec_path,
-            "-m",
             model_path,
-            "-f",
-            str(converted_audio_path_for_whisper),  # Utiliser le fichier WAV converti !
-            "-l",
-            WHISPER_CPP_LANGUAGE,
-            "-otxt",
-            "-nt",
-            "-t",
-            WHISPER_CPP_THREADS,
-        ]
+            converted_audio_path_for_whisper,  # Utiliser le fichier WAV converti !
+            settings,
+        )
         # logger.debug(f"Exécution whisper.cpp: {' '.join(shlex.quote(arg) for arg in command)}")
 
-        result: subprocess.CompletedProcess = subprocess.run(
-            command, capture_output=True, text=True, check=True, encoding="utf-8"
-        )
-        duration = time.time() - start_time
-        transcribed_text = result.stdout.strip()
-        # logger.success(f"Transcription whisper.cpp (via WAV converti) réussie en {duration:.2f}s.")
+        with get_host_scheduler().reserve(whisper_threads(settings)):
+            start_time = time.perf_counter()
+            result: subprocess.CompletedProcess[str] = subprocess.run(
+                command, capture_output=True, text=True, check=True, encoding="utf-8"
+            )
+            decode_seconds = time.perf_counter() - start_time
+        # logger.success(
+        #     "Transcription whisper.cpp (via WAV converti) réussie en "
+        #     f"{decode_seconds:.2f}s."
+        # )
         # logger.debug(f"Sortie stderr whisper.cpp: {result.stderr.strip()}")
-        return transcribed_text
+        return parse_whisper_cpp_output(result.stdout), decode_seconds
 
     except FileProcessingError as e:  # Erreur venant de la conversion ffmpeg
         # logger.error(f"Erreur lors de la conversion audio préalable pour whisper.cpp: {e}")
@@ -200,10 +301,12 @@ def _transcribe_with_whisper_cpp(audio_path: Path) -> str:
         ) from e
 
     finally:
-        if converted_audio_path_for_whisper.exists():
+        if temp_wav_path is not None and temp_wav_path.exists():
             try:
-                converted_audio_path_for_whisper.unlink()
-                # logger.debug(f"Fichier WAV temporaire '{converted_audio_path_for_whisper.name}' supprimé.")
+                temp_wav_path.unlink()
+                # logger.debug(
+                #     f"Fichier WAV temporaire '{temp_wav_path.name}' supprimé."
+                # )
             except OSError:
                 # logger.warning(f"Impossible de supprimer le fichier WAV temporaire {converted_audio_path_for_whisper}: {e}")
                 pass
@@ -212,15 +315,54 @@ def _transcribe_with_whisper_cpp(audio_path: Path) -> str:
 # --- Fonction Principale (Dispatcher) ---
 
 
-def transcribe_audio(audio_path: Path) -> str:
+def transcribe_audio(
+    audio_path: Path,
+    settings: Optional[Settings] = None,
+    stats: Optional[dict[str, Any]] = None,
+) -> str:
     """
     Transcrire un fichier audio en utilisant le backend configuré ('faster-whisper' ou 'whisper-cpp').
 
+    Texte plat de transcribe_audio_segments (voir ce dernier pour les détails).
+
+    Returns:
+        Le texte transcrit.
+
+    Raises:
+        ConfigurationError: Si le backend configuré est invalide ou mal configuré.
+        TranscriptionError: Si la transcription échoue.
+        FileNotFoundError: Si le fichier audio n'existe pas.
+    """
+    return transcribe_audio_segments(audio_path, settings, stats).text
+
+
+def transcribe_audio_segments(
+    audio_path: Path,
+    settings: Optional[Settings] = None,
+    stats: Optional[dict[str, Any]] = None,
+) -> Transcript:
+    """
+    Transcrit un fichier audio en segments horodatés (instants de l'original).
+
+    Si settings.transcription_deadline est défini, le modèle et le profil de
+    décodage sont choisis selon la durée du fichier (voir plan_transcription).
+    Si settings.fingerprint_enabled, un enregistrement déjà transcrit (même
+    réencodé ou en partie, voir fingerprint.find_transcript) reprend la
+    transcription mémorisée ; seules les portions nouvelles sont transcrites.
+    Les silences longs sont retirés et l'audio accéléré au préalable si la
+    configuration le demande (voir preprocess_audio) ; les instants des segments
+    sont alors ramenés à ceux de l'original.
+
     Args:
         audio_path: Chemin vers le fichier audio (objet Path).
+        settings: Paramètres du job (backend, modèle, threads...). Défaut: config.py.
+        stats: Si fourni, reçoit le modèle retenu, la durée audio, les RTF
+               attendu et réel, la durée de silence retirée, le score et la
+               durée d'une transcription reprise de l'index d'empreintes, et la
+               transcription elle-même ("transcript").
 
     Returns:
-        Le texte transcrit.
+        La transcription horodatée.
 
     Raises:
         ConfigurationError: Si le backend configuré est invalide ou mal configuré.
@@ -232,15 +374,111 @@ def transcribe_audio(audio_path: Path) -> str:
             f"Le fichier audio spécifié n'a pas été trouvé : {audio_path}"
         )
 
-    # logger.info(f"Backend de transcription sélectionné: {TRANSCRIPTION_BACKEND}")
+    settings = settings or get_default_settings()
+    backend = settings.transcription_backend
+    # logger.info(f"Backend de transcription sélectionné: {backend}")
 
-    if TRANSCRIPTION_BACKEND == "faster-whisper":
-        return _transcribe_with_faster_whisper(audio_path)
-    elif TRANSCRIPTION_BACKEND == "whisper-cpp":
-        return _transcribe_with_whisper_cpp(audio_path)
+    if backend == "faster-whisper":
+        transcribe = _transcribe_with_faster_whisper
+    elif backend == "whisper-cpp":
+        transcribe = _transcribe_with_whisper_cpp
     else:
-        # logger.error(f"Backend de transcription non valide configuré: {TRANSCRIPTION_BACKEND}")
+        # logger.error(f"Backend de transcription non valide configuré: {backend}")
         raise ConfigurationError(
-            f"Backend de transcription non valide : '{TRANSCRIPTION_BACKEND}'. "
+            f"Backend de transcription non valide : '{backend}'. "
             f"Choisissez 'faster-whisper' ou 'whisper-cpp' dans la configuration."
         )
+
+    fingerprint: Optional[AudioFingerprint] = None
+    if settings.fingerprint_enabled:
+        fingerprint, match = find_transcript(audio_path, settings, stats)
+        if match is not None:
+            # Déjà transcrit : seules les portions non couvertes passent par Whisper
+            gaps = match.gaps(fingerprint.duration)
+            transcript = match.merged(
+                [
+                    (start, _transcribe_gap(audio_path, start, end, settings))
+                    for start, end in gaps
+                ]
+            )
+            finish_transcript(
+                transcript,
+                None,
+                stats,
+                fingerprint if gaps else None,
+                settings,
+                match,
+            )
+            return transcript
+
+    preprocessed = preprocess_audio(audio_path, settings)
+    try:
+        source_path = preprocessed.path if preprocessed else audio_path
+        plan = plan_transcription(source_path, settings)
+        transcript, decode_seconds = transcribe(source_path, plan.settings)
+        plan.report(decode_seconds, stats)
+        finish_transcript(transcript, preprocessed, stats, fingerprint, settings)
+        return transcript
+    finally:
+        if preprocessed is not None:
+            preprocessed.path.unlink(missing_ok=True)
+
+
+def _transcribe_gap(
+    audio_path: Path, start: float, end: float, settings: Settings
+) -> Transcript:
+    """
+    Transcrit la portion [start, end] d'un fichier (instants relatifs à start),
+    sans recherche d'empreinte.
+    """
+    with tempfile.NamedTemporaryFile(
+        prefix="gap_", suffix=".wav", delete=False, dir=str(DOWNLOAD_DIR)
+    ) as tmp_file:
+        gap_path = Path(tmp_file.name)
+    try:
+        _convert_audio_to_wav_mono16k(
+            audio_path, gap_path, window=MediaWindow(start=start, end=end)
+        )
+        return transcribe_audio_segments(
+            gap_path, settings.replace(fingerprint_enabled=False)
+        )
+    finally:
+        gap_path.unlink(missing_ok=True)
+
+
+def finish_transcript(
+    transcript: Transcript,
+    preprocessed: Optional[PreprocessedAudio],
+    stats: Optional[dict[str, Any]],
+    fingerprint: Optional[AudioFingerprint] = None,
+    settings: Optional[Settings] = None,
+    match: Optional[FingerprintMatch] = None,
+) -> None:
+    """
+    Ramène les instants des segments à ceux de l'original (audio prétraité, puis
+    enregistrement complet si stats["media_window"] est renseigné), et ajoute aux
+    stats la transcription et la durée de silence retirée. Avec son empreinte, la
+    transcription est mémorisée dans l'index (instants du fichier transcrit ;
+    voir fingerprint.remember_transcript, match : correspondance partielle
+    complétée par cette transcription).
+    """
+    if preprocessed is not None:
+        transcript.remap_times(preprocessed.timestamp_map.to_original)
+    if fingerprint is not None:
+        remember_transcript(
+            fingerprint, transcript, settings or get_default_settings(), match
+        )
+    if stats is None:
+        return
+    window: Optional[MediaWindow] = stats.get("media_window")
+    if window is not None and window.start > 0:
+        offset = window.start
+        transcript.remap_times(lambda seconds: seconds + offset)
+    stats["transcript"] = transcript
+    if preprocessed is None:
+        return
+    timestamp_map = preprocessed.timestamp_map
+    stats["original_audio_seconds"] = round(timestamp_map.original_seconds, 1)
+    stats["silence_removed_seconds"] = round(timestamp_map.removed_seconds, 1)
+    stats["audio_tempo"] = timestamp_map.tempo
+    stats["timestamp_map"] = timestamp_map
@@ -0,0 +1,252 @@
+# src/localsumm/transcription_policy.py
+
+import dataclasses
+import subprocess
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from .cache import DiskCache, make_cache_key
+from .config import WHISPER_RTF_DEFAULTS
+from .exceptions import ConfigurationError
+from .settings import Settings
+
+# from loguru import logger
+
+# Taille de faisceau de chaque profil de décodage, du plus précis au plus rapide
+DECODING_PROFILES: dict[str, int] = {"accurate": 5, "fast": 1}
+# Coût relatif du décodage glouton (beam 1) par rapport au beam search, tant
+# qu'aucune mesure n'existe pour ce profil
+_FAST_PROFILE_RTF_FACTOR: float = 0.6
+# Tailles de modèles, de la plus grande à la plus petite
+_MODEL_TIERS: tuple[str, ...] = ("large", "medium", "small", "base", "tiny")
+# Poids de la nouvelle mesure dans la moyenne glissante des RTF
+_RTF_SMOOTHING: float = 0.3
+_FFPROBE_TIMEOUT: float = 30.0
+
+# RTF mesurés (durée de calcul / durée audio), par (backend, modèle, profil)
+_rtf_store = DiskCache("transcription_rtf")
+
+
+# --- Durée des médias ---
+
+
+def probe_media_duration(media_path: Path) -> Optional[float]:
+    """
+    Durée d'un fichier audio/vidéo en secondes : en-tête WAV lu directement,
+    sinon ffprobe. Retourne None si la durée ne peut pas être déterminée.
+    """
+    if media_path.suffix.lower() == ".wav":
+        try:
+            with wave.open(str(media_path), "rb") as wav_file:
+                return wav_file.getnframes() / float(wav_file.getframerate())
+        except (wave.Error, EOFError, OSError):
+            pass  # WAV non PCM (ex: float) : ffprobe sait le lire
+    command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-show_entries",
+        "format=duration",
+        "-of",
+        "default=noprint_wrappers=1:nokey=1",
+        str(media_path),
+    ]
+    try:
+        # Liste d'arguments fixe (ffprobe + chemin du média), sans shell
+        result = subprocess.run(  # noqa: S603
+            command,
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=_FFPROBE_TIMEOUT,
+        )
+        return float(result.stdout.strip())
+    except (OSError, subprocess.SubprocessError, ValueError):
+        # logger.warning(
+        #     f"Durée de {media_path.name} inconnue (ffprobe absent ou en échec)"
+        # )
+        return None
+
+
+# --- Facteurs temps réel ---
+
+
+def _model_tier(model_name: str) -> Optional[str]:
+    name = model_name.lower()
+    return next((tier for tier in _MODEL_TIERS if name.startswith(tier)), None)
+
+
+def _default_rtf(model_name: str) -> Optional[float]:
+    name = model_name.lower()
+    # Clé la plus spécifique d'abord ("large-v3" avant "large")
+    for key in sorted(WHISPER_RTF_DEFAULTS, key=len, reverse=True):
+        if name.startswith(key):
+            return WHISPER_RTF_DEFAULTS[key]
+    return None
+
+
+def _rtf_key(backend: str, model_name: str, profile: str) -> str:
+    return make_cache_key(backend, model_name, profile)
+
+
+def expected_rtf(backend: str, model_name: str, profile: str) -> Optional[float]:
+    """RTF attendu : moyenne des mesures passées, sinon valeur par défaut du modèle."""
+    measured = _rtf_store.get(_rtf_key(backend, model_name, profile))
+    if isinstance(measured, (int, float)):
+        return float(measured)
+    rtf = _default_rtf(model_name)
+    if rtf is not None and profile == "fast":
+        rtf *= _FAST_PROFILE_RTF_FACTOR
+    return rtf
+
+
+def record_rtf(backend: str, model_name: str, profile: str, rtf: float) -> None:
+    """Intègre une mesure dans la moyenne glissante du modèle et du profil."""
+    key = _rtf_key(backend, model_name, profile)
+    previous = _rtf_store.get(key)
+    if isinstance(previous, (int, float)):
+        rtf = (1 - _RTF_SMOOTHING) * previous + _RTF_SMOOTHING * rtf
+    _rtf_store.set(key, round(rtf, 4))
+
+
+# --- Choix du modèle ---
+
+
+def _model_name(settings: Settings) -> str:
+    """Nom du modèle configuré (taille faster-whisper, ou fichier ggml sans préfixe)."""
+    if settings.transcription_backend == "whisper-cpp":
+        stem = Path(settings.whisper_cpp_model_path or "").stem
+        return stem[len("ggml-") :] if stem.startswith("ggml-") else stem
+    return settings.whisper_model_size
+
+
+def _candidate_settings(settings: Settings) -> list[tuple[str, Settings]]:
+    """
+    Modèles envisageables, du configuré (le plus précis accepté) au plus petit.
+    Pour whisper.cpp, seuls les modèles ggml présents à côté du modèle configuré
+    sont proposés.
+    """
+    configured = _model_name(settings)
+    candidates = [(configured, settings)]
+    tier = _model_tier(configured)
+    if tier is None:
+        return candidates
+    english_only = ".en" in configured
+    for smaller in _MODEL_TIERS[_MODEL_TIERS.index(tier) + 1 :]:
+        name = f"{smaller}.en" if english_only and smaller != "large" else smaller
+        if settings.transcription_backend == "whisper-cpp":
+            model_path = Path(settings.whisper_cpp_model_path or "").with_name(
+                f"ggml-{name}.bin"
+            )
+            if model_path.is_file():
+                candidates.append(
+                    (name, settings.replace(whisper_cpp_model_path=str(model_path)))
+                )
+        else:
+            candidates.append((name, settings.replace(whisper_model_size=name)))
+    return candidates
+
+
+@dataclass(frozen=True)
+class TranscriptionPlan:
+    """Modèle et profil de décodage retenus pour une transcription."""
+
+    settings: Settings
+    model_name: str
+    profile: str
+    audio_seconds: Optional[float]
+    expected_rtf: Optional[float]
+    deadline_met: Optional[bool]
+
+    def report(self, elapsed_seconds: float, stats: Optional[dict[str, Any]]) -> None:
+        """Enregistre le RTF réel (pour les prochains choix) et remplit stats."""
+        actual_rtf: Optional[float] = None
+        if self.audio_seconds:
+            actual_rtf = elapsed_seconds / self.audio_seconds
+            record_rtf(
+                self.settings.transcription_backend,
+                self.model_name,
+                self.profile,
+                actual_rtf,
+            )
+        if stats is None:
+            return
+        stats["whisper_model"] = self.model_name
+        stats["decoding_profile"] = self.profile
+        stats["audio_seconds"] = (
+            round(self.audio_seconds, 1) if self.audio_seconds else None
+        )
+        stats["expected_rtf"] = (
+            round(self.expected_rtf, 3) if self.expected_rtf is not None else None
+        )
+        stats["actual_rtf"] = round(actual_rtf, 3) if actual_rtf is not None else None
+        if self.deadline_met is not None:
+            stats["transcription_deadline_met"] = (
+                self.deadline_met
+                and elapsed_seconds <= self.settings.transcription_deadline
+            )
+
+
+def _profile_for_beam_size(beam_size: int) -> str:
+    for profile, profile_beam_size in DECODING_PROFILES.items():
+        if beam_size >= profile_beam_size:
+            return profile
+    return "fast"
+
+
+def plan_transcription(audio_path: Path, settings: Settings) -> TranscriptionPlan:
+    """
+    Choisit le modèle Whisper et le profil de décodage d'un fichier.
+
+    Sans délai cible (settings.transcription_deadline = 0), le modèle configuré
+    est conservé ; la durée et le RTF attendu sont tout de même calculés pour le
+    rapport. Avec un délai, on retient la première combinaison (du modèle le plus
+    grand au plus petit, décodage précis puis rapide) dont la durée estimée
+    (durée audio x RTF) tient dans le délai ; à défaut, la plus rapide. Une
+    combinaison sans RTF connu (ni mesuré, ni dans WHISPER_RTF_DEFAULTS) n'est
+    jamais considérée comme tenant le délai.
+    """
+    audio_seconds = probe_media_duration(audio_path)
+    backend = settings.transcription_backend
+    configured_name = _model_name(settings)
+
+    if settings.transcription_deadline <= 0 or not audio_seconds:
+        profile = _profile_for_beam_size(settings.whisper_beam_size)
+        return TranscriptionPlan(
+            settings=settings,
+            model_name=configured_name,
+            profile=profile,
+            audio_seconds=audio_seconds,
+            expected_rtf=expected_rtf(backend, configured_name, profile),
+            deadline_met=None,
+        )
+
+    fallback: Optional[TranscriptionPlan] = None
+    for model_name, candidate in _candidate_settings(settings):
+        for profile, beam_size in DECODING_PROFILES.items():
+            rtf = expected_rtf(backend, model_name, profile)
+            plan = TranscriptionPlan(
+                settings=candidate.replace(whisper_beam_size=beam_size),
+                model_name=model_name,
+                profile=profile,
+                audio_seconds=audio_seconds,
+                expected_rtf=rtf,
+                deadline_met=True,
+            )
+            if (
+                rtf is not None
+                and audio_seconds * rtf <= settings.transcription_deadline
+            ):
+                # logger.info(
+                #     f"Transcription: {model_name}/{profile}, RTF attendu {rtf}"
+                # )
+                return plan
+            fallback = plan
+    if fallback is None:
+        raise ConfigurationError("Aucun modèle Whisper candidat pour la transcription.")
+    # logger.warning(
+    #     "Aucun modèle ne tient dans le délai : modèle le plus rapide retenu."
+    # )
+    return dataclasses.replace(fallback, deadline_met=False)
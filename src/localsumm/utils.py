@@ -1,14 +1,21 @@
 # src/localsumm/utils.py
 
+import hashlib
+import re
 import subprocess
 
 # from loguru import logger # Si vous utilisez loguru
 import threading
+import wave
+from collections.abc import Iterable, Iterator
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
-from .config import TOKENIZER_HF_IDENTIFIER
 from .exceptions import FileProcessingError
+from .media_window import MediaWindow
+from .resources import ffmpeg_threads, get_host_scheduler
+from .settings import Settings, get_default_settings
+from .transcript import Transcript
 
 try:
     from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -28,33 +35,38 @@ from .exceptions import ConfigurationError
 
 # from loguru import logger
 
-# --- Gestion du Tokenizer (Singleton Thread-Safe) ---
-_tokenizer: Optional[PreTrainedTokenizerBase] = None
+# --- Gestion du Tokenizer (cache thread-safe, un tokenizer par identifiant) ---
+_tokenizers: dict[str, PreTrainedTokenizerBase] = {}
 _tokenizer_lock = threading.Lock()
-_tokenizer_model_name: Optional[str] = None
 
 
-def get_tokenizer() -> PreTrainedTokenizerBase:
+def get_tokenizer(settings: Optional[Settings] = None) -> PreTrainedTokenizerBase:
     """
-    Charge et retourne le tokenizer correspondant à l'ID Hugging Face configuré (thread-safe).
-    Utilise l'identifiant défini dans config.TOKENIZER_HF_IDENTIFIER.
+    Charge et retourne le tokenizer correspondant à l'ID Hugging Face des paramètres
+    (thread-safe). Chaque tokenizer est chargé une seule fois puis gardé en cache :
+    des jobs utilisant des modèles différents peuvent cohabiter dans le processus.
+
+    Args:
+        settings: Paramètres du job (défaut: config.TOKENIZER_HF_IDENTIFIER).
     """
-    global _tokenizer, _tokenizer_model_name
-    current_hf_id = TOKENIZER_HF_IDENTIFIER
+    settings = settings or get_default_settings()
+    current_hf_id = settings.tokenizer_hf_identifier
     if not current_hf_id:
         raise ConfigurationError(
             "L'identifiant Hugging Face du Tokenizer (TOKENIZER_HF_IDENTIFIER) n'est pas configuré."
         )
 
-    if _tokenizer is None or _tokenizer_model_name != current_hf_id:
+    tokenizer = _tokenizers.get(current_hf_id)
+    if tokenizer is None:
         with _tokenizer_lock:
-            if _tokenizer is None or _tokenizer_model_name != current_hf_id:
+            tokenizer = _tokenizers.get(current_hf_id)
+            if tokenizer is None:
                 # logger.info(f"Chargement du tokenizer pour le modèle : {current_hf_id}...")
                 try:
                     # Utiliser trust_remote_code=True peut être nécessaire pour certains modèles, pas pour laama 3 ni pour mistral officiels
 
-                    _tokenizer = AutoTokenizer.from_pretrained(current_hf_id)
-                    _tokenizer_model_name = current_hf_id
+                    tokenizer = AutoTokenizer.from_pretrained(current_hf_id)
+                    _tokenizers[current_hf_id] = tokenizer
                     # logger.success(f"Tokenizer pour '{current_hf_id}' chargé.")
                 except OSError as e:
                     # logger.error(f"Impossible de télécharger/trouver le tokenizer pour {current_hf_id}. Modèle Ollama mal orthographié ou non disponible sur Hugging Face Hub ? Erreur: {e}")
@@ -68,19 +80,19 @@ def get_tokenizer() -> PreTrainedTokenizerBase:
                         f"Erreur inattendue lors du chargement du tokenizer: {e}"
                     ) from e
 
-    if _tokenizer is None:
+    if tokenizer is None:
         raise ConfigurationError("Le tokenizer n'a pas pu être initialisé.")
 
-    return _tokenizer
+    return tokenizer
 
 
 # --- Fonction de Comptage de Tokens ---
-def count_tokens(text: str) -> int:
+def count_tokens(text: str, settings: Optional[Settings] = None) -> int:
     """Compte le nombre de tokens dans un texte avec le tokenizer approprié."""
     if not text:
         return 0
     try:
-        tokenizer = get_tokenizer()
+        tokenizer = get_tokenizer(settings)
         return len(tokenizer.encode(text))
     except ConfigurationError as e:
         # logger.error(f"Impossible de compter les tokens car le tokenizer n'a pas pu être chargé: {e}")
@@ -90,16 +102,44 @@ def count_tokens(text: str) -> int:
         raise RuntimeError(f"Erreur inattendue lors du comptage des tokens: {e}") from e
 
 
+def count_tokens_batch(
+    texts: list[str], settings: Optional[Settings] = None
+) -> list[int]:
+    """
+    Compte les tokens de plusieurs textes en un seul appel au tokenizer
+    (sans tokens spéciaux), beaucoup plus rapide qu'une boucle sur count_tokens.
+    """
+    if not texts:
+        return []
+    tokenizer = get_tokenizer(settings)
+    try:
+        encoded = tokenizer(texts, add_special_tokens=False)["input_ids"]
+    except Exception as e:
+        raise RuntimeError(f"Erreur inattendue lors du comptage des tokens: {e}") from e
+    return [len(ids) for ids in encoded]
+
+
 # --- Fonction de Découpage (Chunking) ---
-def chunk_text(text: str, max_chunk_tokens: int, overlap_tokens: int) -> list[str]:
+def chunk_text(
+    text: Union[str, Transcript],
+    max_chunk_tokens: int,
+    overlap_tokens: int,
+    strategy: Optional[str] = None,
+    settings: Optional[Settings] = None,
+) -> list[str]:
     """
     Découpe un texte en morceaux (chunks) basés sur un nombre maximum de tokens,
     en utilisant le tokenizer approprié et en gérant le chevauchement.
 
     Args:
-        text: Le texte à découper.
+        text: Le texte à découper, ou une transcription horodatée (avec la stratégie
+              'recursive', les chunks suivent alors les frontières des segments :
+              voir chunk_transcript).
         max_chunk_tokens: Le nombre maximum de tokens par chunk.
         overlap_tokens: Le nombre de tokens de chevauchement entre les chunks.
+        strategy: 'recursive' ou 'content-defined' (défaut: settings.chunking_strategy).
+                  La stratégie 'content-defined' ignore overlap_tokens.
+        settings: Paramètres du job (tokenizer, stratégie, bornes 'content-defined').
 
     Returns:
         Une liste de chaînes de caractères (les chunks).
@@ -113,10 +153,31 @@ def chunk_text(text: str, max_chunk_tokens: int, overlap_tokens: int) -> list[st
     if not text:
         return []
 
+    settings = settings or get_default_settings()
+    strategy = strategy or settings.chunking_strategy
+    if isinstance(text, Transcript):
+        if strategy == "recursive":
+            return chunk_transcript(text, max_chunk_tokens, overlap_tokens, settings)
+        text = text.text
+    if strategy == "content-defined":
+        min_tokens, avg_tokens = settings.cdc_bounds(max_chunk_tokens)
+        return chunk_text_content_defined(
+            text,
+            min_chunk_tokens=min_tokens,
+            avg_chunk_tokens=avg_tokens,
+            max_chunk_tokens=max_chunk_tokens,
+            settings=settings,
+        )
+    if strategy != "recursive":
+        raise ValueError(
+            f"Stratégie de découpage inconnue : '{strategy}'. "
+            "Choisissez 'recursive' ou 'content-defined'."
+        )
+
     # logger.info(f"Découpage du texte (longueur: {len(text)}) en chunks de ~{max_chunk_tokens} tokens avec {overlap_tokens} tokens de chevauchement.")
 
     try:
-        tokenizer = get_tokenizer()
+        tokenizer = get_tokenizer(settings)
     except ConfigurationError as e:
         # logger.error(f"Impossible de découper le texte car le tokenizer n'a pas pu être chargé: {e}")
         raise e
@@ -133,29 +194,325 @@ def chunk_text(text: str, max_chunk_tokens: int, overlap_tokens: int) -> list[st
     return chunks
 
 
-def _convert_audio_to_wav_mono16k(input_path: Path, output_wav_path: Path) -> None:
+# Découpage incrémental : longueur maximale (en caractères par token du chunk)
+# d'une unité en attente de sa fin de phrase avant coupure forcée
+_MAX_PENDING_TOKEN_CHARS: int = 8
+
+
+class _ChunkPacker:
     """
-    Convertit un fichier audio en WAV, 16kHz, 16-bit PCM, Mono en utilisant ffmpeg.
-    (C'est la fonction qui était DANS file_processor.py avant)
+    Assemble des unités de texte (segments, phrases) en chunks d'au plus
+    max_chunk_tokens. Le chevauchement reprend les dernières unités entières du
+    chunk précédent, dans la limite de overlap_tokens. Une unité plus longue que
+    max_chunk_tokens est découpée à part (récursif).
+    """
+
+    def __init__(
+        self,
+        max_chunk_tokens: int,
+        overlap_tokens: int,
+        separator: str,
+        settings: Optional[Settings],
+    ) -> None:
+        self.max_chunk_tokens = max_chunk_tokens
+        self.overlap_tokens = overlap_tokens
+        self.separator = separator
+        self.settings = settings
+        self._units: list[tuple[str, int]] = []
+        self._tokens = 0
+        # Unités du chunk courant qui ne viennent pas du chevauchement
+        self._fresh = 0
+
+    def add(self, text: str, tokens: int) -> list[str]:
+        """Ajoute une unité ; retourne les chunks terminés de ce fait."""
+        if tokens > self.max_chunk_tokens:
+            done = self._flush(keep_overlap=False)
+            done.extend(
+                chunk_text(text, self.max_chunk_tokens, 0, "recursive", self.settings)
+            )
+            return done
+        done = []
+        if self._tokens + tokens > self.max_chunk_tokens:
+            done = self._flush(keep_overlap=True)
+            # Le chevauchement ne doit pas empêcher l'unité d'entrer
+            while self._units and self._tokens + tokens > self.max_chunk_tokens:
+                self._tokens -= self._units.pop(0)[1]
+        self._units.append((text, tokens))
+        self._tokens += tokens
+        self._fresh += 1
+        return done
+
+    def finish(self) -> list[str]:
+        """Retourne le dernier chunk (s'il reste des unités)."""
+        return self._flush(keep_overlap=False)
+
+    def _flush(self, keep_overlap: bool) -> list[str]:
+        chunk = self.separator.join(text for text, _ in self._units).strip()
+        done = [chunk] if self._fresh and chunk else []
+        kept: list[tuple[str, int]] = []
+        kept_tokens = 0
+        for text, tokens in reversed(self._units if keep_overlap else []):
+            if kept_tokens + tokens > self.overlap_tokens:
+                break
+            kept.insert(0, (text, tokens))
+            kept_tokens += tokens
+        self._units, self._tokens, self._fresh = kept, kept_tokens, 0
+        return done
+
+
+def chunk_transcript(
+    transcript: Transcript,
+    max_chunk_tokens: int,
+    overlap_tokens: int,
+    settings: Optional[Settings] = None,
+) -> list[str]:
+    """
+    Découpe une transcription en chunks formés de segments entiers (jamais de
+    coupure au milieu d'une phrase de Whisper), avec chevauchement par segments
+    entiers (voir _ChunkPacker).
+
+    Returns:
+        Une liste de chunks (textes des segments séparés par une espace).
+    """
+    texts = transcript.texts
+    # Espace de séparation comprise : somme des segments ≈ tokens du chunk
+    token_counts = count_tokens_batch([" " + text for text in texts], settings)
+    packer = _ChunkPacker(max_chunk_tokens, overlap_tokens, " ", settings)
+    chunks: list[str] = []
+    for text, tokens in zip(texts, token_counts):
+        chunks.extend(packer.add(text, tokens))
+    chunks.extend(packer.finish())
+    # logger.success(f"Transcription découpée en {len(chunks)} chunks.")
+    return chunks
+
+
+def iter_chunks(
+    blocks: Iterable[str],
+    max_chunk_tokens: int,
+    overlap_tokens: int,
+    settings: Optional[Settings] = None,
+) -> Iterator[str]:
+    """
+    Découpage incrémental d'un texte reçu par blocs (voir text_reader.iter_text) :
+    les chunks sont produits au fil de la lecture, formés de phrases/paragraphes
+    entiers, avec chevauchement par unités entières.
+
+    La mémoire utilisée dépend de la taille des blocs et des chunks, pas de celle
+    du texte : seuls le bloc courant et l'unité en cours sont conservés, et une
+    unité sans ponctuation (ex: lignes de log) est coupée à un saut de ligne
+    dès qu'elle dépasse une longueur proportionnelle à max_chunk_tokens.
+
+    Raises:
+        ConfigurationError: Si le tokenizer ne peut pas être chargé.
+        ValueError: Si max_chunk_tokens <= overlap_tokens.
+    """
+    if max_chunk_tokens <= overlap_tokens:
+        raise ValueError("max_chunk_tokens doit être supérieur à overlap_tokens")
+    packer = _ChunkPacker(max_chunk_tokens, overlap_tokens, "", settings)
+    max_pending = max_chunk_tokens * _MAX_PENDING_TOKEN_CHARS
+    pending = ""
+    for block in blocks:
+        units = [unit for unit, _ in _split_into_units(pending + block)]
+        # La dernière unité peut se poursuivre dans le bloc suivant
+        pending = units.pop() if units else ""
+        while len(pending) > max_pending:
+            cut = pending.rfind("\n", 0, max_pending) + 1 or max_pending
+            units.append(pending[:cut])
+            pending = pending[cut:]
+        for unit, tokens in zip(units, count_tokens_batch(units, settings)):
+            yield from packer.add(unit, tokens)
+    if pending:
+        yield from packer.add(pending, count_tokens_batch([pending], settings)[0])
+    yield from packer.finish()
+
+
+# --- Découpage défini par le contenu (Content-Defined Chunking) ---
+
+# Fin de paragraphe (ligne vide) ou fin de phrase suivie d'espaces
+_UNIT_BREAK_RE = re.compile(r"(\n[ \t]*\n\s*)|((?<=[.!?…])[\"'»)\]]*\s+)")
+
+# Une fin de paragraphe est une frontière plus naturelle qu'une fin de phrase
+_PARAGRAPH_BOUNDARY_WEIGHT: int = 4
+
+# Taille (en caractères) de la fenêtre glissante hachée à chaque frontière candidate
+_BOUNDARY_HASH_WINDOW: int = 256
+
+
+def _split_into_units(text: str) -> list[tuple[str, bool]]:
+    """
+    Découpe le texte en unités (phrases/paragraphes) en conservant les séparateurs,
+    de sorte que "".join(unités) == text.
+
+    Returns:
+        Liste de tuples (texte de l'unité, True si l'unité termine un paragraphe).
+    """
+    units: list[tuple[str, bool]] = []
+    start = 0
+    for match in _UNIT_BREAK_RE.finditer(text):
+        end = match.end()
+        if end > start:
+            units.append((text[start:end], match.group(1) is not None))
+            start = end
+    if start < len(text):
+        units.append((text[start:], True))
+    return units
+
+
+def split_in_half(text: str) -> list[str]:
+    """
+    Coupe un texte en deux moitiés, à la fin de phrase (ou de paragraphe) la
+    plus proche du milieu, à défaut à l'espace le plus proche.
+
+    Returns:
+        Les deux moitiés non vides, ou [text] si le texte ne peut pas être coupé.
+    """
+    middle = len(text) // 2
+    boundaries: list[int] = []
+    position = 0
+    for unit, _ in _split_into_units(text)[:-1]:
+        position += len(unit)
+        boundaries.append(position)
+    if not boundaries:
+        boundaries = [match.end() for match in re.finditer(r"\s+", text)]
+    cut = min(boundaries, key=lambda boundary: abs(boundary - middle), default=0)
+    halves = [text[:cut].strip(), text[cut:].strip()]
+    if not all(halves):
+        return [text]
+    return halves
+
+
+def chunk_text_content_defined(
+    text: str,
+    min_chunk_tokens: int,
+    avg_chunk_tokens: int,
+    max_chunk_tokens: int,
+    settings: Optional[Settings] = None,
+) -> list[str]:
+    """
+    Découpe un texte avec des frontières définies par le contenu (hash glissant).
+
+    Les frontières candidates sont les fins de phrase et de paragraphe. Une frontière
+    est retenue quand le hash des 256 caractères qui la précèdent tombe dans une plage
+    dont la taille est proportionnelle au nombre de tokens de l'unité (probabilité
+    calibrée pour une taille moyenne ~avg_chunk_tokens), une fois min_chunk_tokens
+    atteint.
+    Le découpage est forcé avant de dépasser max_chunk_tokens.
+
+    Comme la décision ne dépend que du contenu local, insérer ou modifier un passage
+    ne change que les chunks voisins : les régions inchangées produisent des chunks
+    identiques à l'octet près (et réutilisent donc les résumés MAP en cache).
 
     Args:
-        input_path: Chemin du fichier audio d'entrée.
-        output_wav_path: Chemin où sauvegarder le fichier WAV de sortie.
+        text: Le texte à découper.
+        min_chunk_tokens: Taille minimale d'un chunk (sauf le dernier).
+        avg_chunk_tokens: Taille moyenne visée.
+        max_chunk_tokens: Taille maximale d'un chunk.
+        settings: Paramètres du job (tokenizer).
+
+    Returns:
+        Une liste de chunks, sans chevauchement.
 
     Raises:
-        FileProcessingError: Si ffmpeg échoue.
-        FileNotFoundError: Si le fichier d'entrée n'existe pas.
+        ConfigurationError: Si le tokenizer ne peut pas être chargé.
+        ValueError: Si les bornes sont incohérentes.
     """
-    if not input_path.is_file():
-        raise FileNotFoundError(
-            f"Fichier audio d'entrée pour conversion introuvable: {input_path}"
+    if not 0 <= min_chunk_tokens < avg_chunk_tokens <= max_chunk_tokens:
+        raise ValueError(
+            "Bornes de découpage invalides : il faut "
+            "0 <= min_chunk_tokens < avg_chunk_tokens <= max_chunk_tokens"
         )
+    if not text:
+        return []
 
-    # logger.info(f"Conversion (utils) de '{input_path.name}' en WAV vers '{output_wav_path.name}'...")
-    command = [
+    tokenizer = get_tokenizer(settings)
+    units = _split_into_units(text)
+    unit_token_counts: list[int] = count_tokens_batch(
+        [unit for unit, _ in units], settings
+    )
+    divisor: int = avg_chunk_tokens - min_chunk_tokens
+
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens: int = 0
+    position: int = 0
+
+    def flush() -> None:
+        nonlocal current, current_tokens
+        if current:
+            chunks.append("".join(current))
+        current = []
+        current_tokens = 0
+
+    for (unit, ends_paragraph), unit_tokens in zip(units, unit_token_counts):
+        position += len(unit)
+        window = text[max(0, position - _BOUNDARY_HASH_WINDOW) : position]
+        boundary_hash = int.from_bytes(
+            hashlib.blake2b(window.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+
+        if unit_tokens > max_chunk_tokens:
+            # Unité trop longue (ex: log sans ponctuation) : découpage récursif dédié
+            flush()
+            splitter = RecursiveCharacterTextSplitter.from_huggingface_tokenizer(
+                tokenizer=tokenizer, chunk_size=max_chunk_tokens, chunk_overlap=0
+            )
+            chunks.extend(splitter.split_text(unit))
+            continue
+
+        if current and current_tokens + unit_tokens > max_chunk_tokens:
+            flush()
+
+        current.append(unit)
+        current_tokens += unit_tokens
+
+        weight = unit_tokens * (_PARAGRAPH_BOUNDARY_WEIGHT if ends_paragraph else 1)
+        if current_tokens >= min_chunk_tokens and boundary_hash % divisor < weight:
+            flush()
+
+    flush()
+    # logger.success(f"Texte découpé (content-defined) en {len(chunks)} chunks.")
+    return chunks
+
+
+def is_wav_mono16k(audio_path: Path) -> bool:
+    """Vrai si le fichier est déjà un WAV 16kHz 16-bit PCM Mono (conversion inutile)."""
+    if audio_path.suffix.lower() != ".wav":
+        return False
+    try:
+        with wave.open(str(audio_path), "rb") as wav_file:
+            return (
+                wav_file.getframerate() == 16000
+                and wav_file.getnchannels() == 1
+                and wav_file.getsampwidth() == 2
+            )
+    except (wave.Error, EOFError, OSError):
+        return False
+
+
+def wav_mono16k_command(
+    input_path: Union[Path, str],
+    output_wav_path: Path,
+    threads: int,
+    tempo: float = 1.0,
+    window: Optional[MediaWindow] = None,
+) -> list[str]:
+    """
+    Commande ffmpeg de conversion en WAV 16kHz 16-bit PCM Mono, accélérée d'un
+    facteur `tempo` (filtre atempo, hauteur de voix conservée) si différent de 1.
+    Avec une fenêtre, seule cette portion est décodée (-ss/-to avant -i : ffmpeg
+    se positionne directement, sans décoder le début du fichier).
+    input_path peut être "pipe:0" (flux lu sur l'entrée standard).
+    """
+    tempo_filter = ["-af", f"atempo={tempo:g}"] if tempo != 1.0 else []
+    seek_args = window.ffmpeg_input_args() if window is not None else []
+    return [
         "ffmpeg",
+        "-threads",  # Avant -i : threads de décodage de l'entrée
+        str(threads),
+        *seek_args,
         "-i",
         str(input_path),
+        *tempo_filter,
         "-vn",
         "-acodec",
         "pcm_s16le",
@@ -166,12 +523,43 @@ def _convert_audio_to_wav_mono16k(input_path: Path, output_wav_path: Path) -> No
         "-y",
         str(output_wav_path),
     ]
+
+
+def _convert_audio_to_wav_mono16k(
+    input_path: Path,
+    output_wav_path: Path,
+    tempo: float = 1.0,
+    window: Optional[MediaWindow] = None,
+) -> None:
+    """
+    Convertit un fichier audio en WAV, 16kHz, 16-bit PCM, Mono en utilisant ffmpeg.
+    (C'est la fonction qui était DANS file_processor.py avant)
+
+    Args:
+        input_path: Chemin du fichier audio d'entrée.
+        output_wav_path: Chemin où sauvegarder le fichier WAV de sortie.
+        tempo: Facteur d'accélération (1.0 = durée inchangée).
+        window: Portion du fichier à convertir (défaut: tout le fichier).
+
+    Raises:
+        FileProcessingError: Si ffmpeg échoue.
+        FileNotFoundError: Si le fichier d'entrée n'existe pas.
+    """
+    if not input_path.is_file():
+        raise FileNotFoundError(
+            f"Fichier audio d'entrée pour conversion introuvable: {input_path}"
+        )
+
+    # logger.info(f"Conversion (utils) de '{input_path.name}' en WAV vers '{output_wav_path.name}'...")
+    threads = ffmpeg_threads()
+    command = wav_mono16k_command(input_path, output_wav_path, threads, tempo, window)
     # logger.debug(f"Exécution ffmpeg (conversion utils): {' '.join(shlex.quote(arg) for arg in command)}")
 
     try:
-        result = subprocess.run(
-            command, check=True, capture_output=True, text=True, encoding="utf-8"
-        )
+        with get_host_scheduler().reserve(threads):
+            result = subprocess.run(
+                command, check=True, capture_output=True, text=True, encoding="utf-8"
+            )
         # logger.success(f"Conversion en WAV (utils) réussie.")
     except FileNotFoundError:
         # logger.error("La commande 'ffmpeg' est introuvable...")
@@ -1,5 +1,6 @@
 # src/localsumm/youtube_processor.py
 
+import math
 import uuid
 from pathlib import Path
 from typing import Any, Optional
@@ -8,23 +9,68 @@ import yt_dlp  # Bibliothèque pour télécharger depuis YouTube
 
 from .config import DOWNLOAD_DIR
 from .exceptions import YoutubeDownloadError
+from .media_window import (
+    MediaWindow,
+    chapters_from_info,
+    record_window,
+    resolve_window,
+    window_requested,
+)
+from .settings import Settings, get_default_settings
 
 # from loguru import logger # Décommentez si vous utilisez Loguru
 
 
-def download_youtube_audio(url: str) -> Path:
+def _download(
+    ydl: yt_dlp.YoutubeDL, url: str, settings: Settings
+) -> Optional[MediaWindow]:
+    """
+    Télécharge l'audio, ou seulement la fenêtre demandée : celle-ci est résolue
+    d'après les métadonnées de la vidéo (chapitres), puis passée à yt-dlp
+    ('download_ranges') pour ne récupérer que cette portion.
+
+    Returns:
+        La fenêtre téléchargée, ou None pour la vidéo entière.
+    """
+    if not window_requested(settings):
+        ydl.download([url])
+        return None
+    info = ydl.extract_info(url, download=False)
+    window = resolve_window(settings, lambda: chapters_from_info(info))
+    if window is not None:
+        end = window.end if window.end is not None else math.inf
+        ydl.params["download_ranges"] = yt_dlp.utils.download_range_func(
+            None, [(window.start, end)]
+        )
+    ydl.process_ie_result(info, download=True)
+    return window
+
+
+def download_youtube_audio(
+    url: str,
+    settings: Optional[Settings] = None,
+    stats: Optional[dict[str, Any]] = None,
+) -> Path:
     """
     Télécharge la meilleure piste audio d'une URL YouTube dans le dossier configuré.
 
+    Si settings.media_start / media_end / media_chapter sont renseignés, seule
+    cette portion est téléchargée (et donc transcrite).
+
     Args:
         url: L'URL de la vidéo YouTube.
+        settings: Paramètres du job (fenêtre temporelle). Défaut: config.py.
+        stats: Si fourni, reçoit la fenêtre téléchargée ("media_window"), qui
+               permet à la transcription de dater ses segments dans la vidéo.
 
     Returns:
         L'objet Path vers le fichier audio téléchargé (ex: .mp3, .m4a, .opus).
 
     Raises:
         YoutubeDownloadError: Si le téléchargement échoue.
+        ValueError: Si la fenêtre demandée est invalide ou le chapitre introuvable.
     """
+    settings = settings or get_default_settings()
     # logger.info(f"Tentative de téléchargement audio depuis l'URL YouTube : {url}")
 
     unique_id = uuid.uuid4()
@@ -52,7 +98,7 @@ def download_youtube_audio(url: str) -> Path:
     try:
         # logger.debug(f"Options yt-dlp : {ydl_opts}")
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
+            record_window(_download(ydl, url, settings), stats)
             potential_files = list(DOWNLOAD_DIR.glob(f"youtube_{unique_id}*"))
 
             if not potential_files:
@@ -64,6 +110,8 @@ def download_youtube_audio(url: str) -> Path:
             # logger.success(f"Audio téléchargé et extrait avec succès vers : {final_path}")
             return final_path
 
+    except ValueError:
+        raise
     except yt_dlp.utils.DownloadError as e:
         # logger.error(f"Erreur de téléchargement yt-dlp pour {url}: {e}")
         raise YoutubeDownloadError(
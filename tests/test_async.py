@@ -0,0 +1,144 @@
+# test_async.py
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+project_root = Path(__file__).resolve().parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+try:
+    from localsumm.async_pipeline import (
+        _run_subprocess,
+        _with_timeout,
+        process_input_async,
+    )
+    from localsumm.config import OLLAMA_MODEL
+    from localsumm.exceptions import LocalSummError, StageTimeoutError
+except ImportError as e:
+    print(f"Erreur d'importation. Structure src/localsumm/ correcte ? Détail: {e}")
+    sys.exit(1)
+
+
+TEXTS = [
+    "L'équipe a présenté l'avancement du projet et les risques identifiés. "
+    "Le budget du trimestre a été revu à la baisse de dix pour cent.",
+    "Deux recrutements sont prévus pour renforcer l'équipe infrastructure. "
+    "La date de livraison de la version 2 est maintenue à fin juin.",
+    "Un audit de sécurité externe sera lancé le mois prochain. "
+    "Les résultats seront présentés au comité de direction.",
+]
+
+
+async def run_jobs() -> None:
+    print(
+        f"\n{len(TEXTS)} jobs lancés en parallèle sur une seule boucle d'événements..."
+    )
+    start = time.perf_counter()
+    summaries = await asyncio.gather(
+        *(process_input_async(text_input=text) for text in TEXTS)
+    )
+    print(f"Terminés en {time.perf_counter() - start:.2f}s.")
+    for index, summary in enumerate(summaries, start=1):
+        print(f"  Job {index} : {summary}")
+
+    print("\nAnnulation d'un job après 0.1s...")
+    task = asyncio.create_task(process_input_async(text_input=TEXTS[0]))
+    await asyncio.sleep(0.1)
+    task.cancel()
+    try:
+        await task
+        print("Le job s'est terminé avant l'annulation.")
+    except asyncio.CancelledError:
+        print("Job annulé proprement.")
+
+
+def _sleeper_command(pid_file: Path) -> list[str]:
+    """Processus qui écrit son pid dans pid_file puis attend 30 s."""
+    script = (
+        "import os, sys, time; "
+        "open(sys.argv[1], 'w').write(str(os.getpid())); "
+        "time.sleep(30)"
+    )
+    return [sys.executable, "-c", script, str(pid_file)]
+
+
+def _read_pid(pid_file: Path) -> Optional[int]:
+    content = pid_file.read_text() if pid_file.exists() else ""
+    return int(content) if content else None
+
+
+async def _wait_for_pid(pid_file: Path) -> int:
+    for _ in range(500):
+        pid = _read_pid(pid_file)
+        if pid is not None:
+            return pid
+        await asyncio.sleep(0.01)
+    raise AssertionError("Le sous-processus n'a pas démarré.")
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_cancelled_job_kills_its_subprocess(tmp_path: Path) -> None:
+    pid_file = tmp_path / "pid"
+
+    async def scenario() -> int:
+        task = asyncio.create_task(_run_subprocess(_sleeper_command(pid_file)))
+        pid = await _wait_for_pid(pid_file)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return pid
+
+    start = time.perf_counter()
+    pid = asyncio.run(scenario())
+    assert time.perf_counter() - start < 10
+    assert not _is_running(pid)
+
+
+def test_stage_timeout_raises_and_kills_subprocess(tmp_path: Path) -> None:
+    pid_file = tmp_path / "pid"
+
+    async def scenario() -> None:
+        await _with_timeout(
+            _run_subprocess(_sleeper_command(pid_file)), 1.0, "transcription"
+        )
+
+    with pytest.raises(StageTimeoutError, match="transcription"):
+        asyncio.run(scenario())
+    pid = _read_pid(pid_file)
+    assert pid is not None
+    assert not _is_running(pid)
+
+
+def test_stage_without_timeout_returns_result() -> None:
+    command = [sys.executable, "-c", "print('ok')"]
+    returncode, stdout, _ = asyncio.run(_with_timeout(_run_subprocess(command), 0, "x"))
+    assert returncode == 0
+    assert stdout.strip() == "ok"
+
+
+if __name__ == "__main__":
+    print("--- Test du Pipeline Asynchrone ---")
+    print(f"Modèle configuré : {OLLAMA_MODEL}")
+
+    try:
+        asyncio.run(run_jobs())
+    except LocalSummError as e:
+        print("\n--- Erreur ---")
+        print(f"{type(e).__name__} : {e}")
+        print("Vérifiez que Ollama est lancé et que 'httpx' est installé.")
+
+    print("\n--- Fin du Test ---")
@@ -0,0 +1,101 @@
+# test_chunking.py
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).resolve().parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+try:
+    from localsumm.config import TOKENIZER_HF_IDENTIFIER
+    from localsumm.exceptions import ConfigurationError
+    from localsumm.utils import _split_into_units, chunk_text, count_tokens_batch
+except ImportError as e:
+    print(f"Erreur d'importation. Structure src/localsumm/ correcte ? Détail: {e}")
+    sys.exit(1)
+
+
+PARAGRAPH = (
+    "La réunion a porté sur le budget du prochain trimestre. "
+    "L'équipe a validé le recrutement de deux personnes. "
+    "Le calendrier de livraison reste inchangé pour le moment."
+)
+# Texte sans paragraphes, comme une transcription
+ORIGINAL_TEXT = " ".join(f"Point {i}. {PARAGRAPH}" for i in range(400))
+# Même document avec une phrase insérée près du début
+EDITED_TEXT = ORIGINAL_TEXT.replace(
+    " Point 3. ", " Phrase ajoutée lors de la relecture. Point 3. ", 1
+)
+MAX_CHUNK_TOKENS = 1024
+OVERLAP_TOKENS = 100
+STRATEGIES = ("recursive", "content-defined")
+
+
+def _chunks(text: str, strategy: str) -> list[str]:
+    """Découpe text, ou saute le test si le tokenizer n'est pas disponible."""
+    try:
+        return chunk_text(text, MAX_CHUNK_TOKENS, OVERLAP_TOKENS, strategy=strategy)
+    except ConfigurationError as e:
+        pytest.skip(f"Tokenizer indisponible : {e}")
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_chunks_respect_token_budget(strategy: str) -> None:
+    chunks = _chunks(ORIGINAL_TEXT, strategy)
+    assert len(chunks) > 1
+    for tokens in count_tokens_batch(chunks):
+        assert 0 < tokens <= MAX_CHUNK_TOKENS
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_every_source_unit_is_chunked(strategy: str) -> None:
+    chunks = _chunks(ORIGINAL_TEXT, strategy)
+    # Les mots du texte se retrouvent dans l'ordre (le chevauchement les répète)
+    chunk_words = iter(" ".join(chunks).split())
+    for unit, _ in _split_into_units(ORIGINAL_TEXT):
+        assert all(word in chunk_words for word in unit.split()), unit
+    if strategy == "content-defined":
+        # Sans chevauchement, les chunks recomposent exactement le texte
+        assert "".join(chunks) == ORIGINAL_TEXT
+
+
+def test_content_defined_cut_points_survive_early_insertion() -> None:
+    original_chunks = _chunks(ORIGINAL_TEXT, "content-defined")
+    edited_chunks = _chunks(EDITED_TEXT, "content-defined")
+    assert len(original_chunks) > 4
+    # Seuls les chunks voisins de l'insertion changent ; la suite est identique
+    changed = [chunk for chunk in original_chunks if chunk not in edited_chunks]
+    assert 1 <= len(changed) <= 2
+    assert original_chunks[0] in changed
+    assert edited_chunks[len(changed) :] == original_chunks[len(changed) :]
+
+
+if __name__ == "__main__":
+    print("--- Test du Découpage Défini par le Contenu ---")
+    print(f"Tokenizer configuré : {TOKENIZER_HF_IDENTIFIER}")
+
+    try:
+        for strategy in STRATEGIES:
+            original_chunks = chunk_text(
+                ORIGINAL_TEXT, MAX_CHUNK_TOKENS, OVERLAP_TOKENS, strategy=strategy
+            )
+            edited_chunks = chunk_text(
+                EDITED_TEXT, MAX_CHUNK_TOKENS, OVERLAP_TOKENS, strategy=strategy
+            )
+            reused = len(set(original_chunks) & set(edited_chunks))
+            print(
+                f"{strategy:>16} : {len(original_chunks)} chunks -> "
+                f"{len(edited_chunks)} après édition, {reused} identiques réutilisables"
+            )
+
+    except ConfigurationError as e:
+        print("\n--- Erreur de Configuration ---")
+        print(e)
+    except Exception as e:
+        print("\n--- Erreur Inattendue ---")
+        print(f"Type: {type(e).__name__}, Détails: {e}")
+
+    print("\n--- Fin du Test ---")
@@ -0,0 +1,243 @@
+# test_fingerprint.py
+
+import os
+import sys
+import wave
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).resolve().parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+try:
+    import numpy as np
+
+    import localsumm.fingerprint as fingerprint_module
+    from localsumm.fingerprint import (
+        AudioFingerprint,
+        FingerprintIndex,
+        fingerprint_wav,
+        remember_transcript,
+        transcription_profile,
+    )
+    from localsumm.settings import Settings
+    from localsumm.transcript import Transcript
+except ImportError as e:
+    print(f"Erreur d'importation. Structure src/localsumm/ correcte ? Détail: {e}")
+    sys.exit(1)
+
+
+SAMPLE_RATE = 16000
+SETTINGS = Settings()
+PROFILE = transcription_profile(SETTINGS)
+THRESHOLD = SETTINGS.fingerprint_match_threshold
+MIN_OVERLAP = SETTINGS.fingerprint_min_overlap
+
+
+def _speech_like(seconds: float, seed: int) -> np.ndarray:
+    """
+    Signal proche de la voix : syllabes harmoniques (fondamentale et formants
+    tirés au hasard) séparées de courtes pauses.
+    """
+    rng = np.random.default_rng(seed)
+    samples = np.zeros(int(seconds * SAMPLE_RATE), np.float32)
+    position = 0
+    while position < len(samples):
+        length = int(rng.uniform(0.12, 0.3) * SAMPLE_RATE)
+        f0 = rng.uniform(100, 240) * (
+            1 + 0.1 * rng.uniform(-1, 1) * np.linspace(0, 1, length)
+        )
+        phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+        formants = rng.uniform([300, 900, 2000], [900, 2200, 3500])
+        syllable = np.zeros(length)
+        for harmonic in range(1, int(4000 / f0.mean()) + 1):
+            frequency = f0.mean() * harmonic
+            gain = np.exp(-(((frequency - formants) / 150) ** 2)).sum() + 0.02
+            syllable += gain * np.sin(harmonic * phase)
+        syllable *= np.hanning(length)
+        samples[position : position + length] = syllable[: len(samples) - position]
+        pause = rng.uniform(0.3, 0.8) if rng.random() < 0.15 else 0.02
+        position += length + int(pause * SAMPLE_RATE)
+    return samples / np.abs(samples).max() * 0.5
+
+
+def _degraded(samples: np.ndarray, snr_db: float, seed: int) -> np.ndarray:
+    """Copie bruitée (bruit blanc au rapport signal/bruit donné) et filtrée."""
+    rng = np.random.default_rng(seed)
+    noise_power = np.mean(samples**2) / 10 ** (snr_db / 10)
+    noisy = samples + rng.normal(0, np.sqrt(noise_power), len(samples))
+    # Passe-bas grossier et gain réduit, comme après un réencodage
+    return 0.7 * np.convolve(noisy, np.ones(5) / 5, mode="same")
+
+
+def _fingerprint(samples: np.ndarray, path: Path) -> AudioFingerprint:
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SAMPLE_RATE)
+        pcm = np.clip(samples, -1, 1) * 32767
+        wav_file.writeframes(pcm.astype("<i2").tobytes())
+    return fingerprint_wav(path)
+
+
+def _segments(first: int, last: int) -> Transcript:
+    """Un segment de 4 s toutes les 5 s, numérotés first..last - 1."""
+    return Transcript(
+        (index * 5.0, index * 5.0 + 4.0, f"segment {index}")
+        for index in range(first, last)
+    )
+
+
+@pytest.fixture(scope="module")
+def recording() -> np.ndarray:
+    return _speech_like(120, seed=1)
+
+
+@pytest.fixture
+def index(tmp_path: Path, recording: np.ndarray) -> FingerprintIndex:
+    """Index contenant les 90 premières secondes de l'enregistrement."""
+    index = FingerprintIndex("fingerprints", tmp_path)
+    stored = _fingerprint(recording[: 90 * SAMPLE_RATE], tmp_path / "stored.wav")
+    index.add(stored, _segments(0, 18), PROFILE)
+    return index
+
+
+@pytest.mark.parametrize(
+    "snr_db",
+    [None, 10.0],
+    ids=["clean", "noisy"],
+)
+def test_shifted_extended_copy_matches(
+    index: FingerprintIndex, recording: np.ndarray, tmp_path: Path, snr_db: float
+) -> None:
+    # Copie commençant 20 s (et une demi-trame) plus tard, 30 s au-delà de l'entrée
+    copy = recording[20 * SAMPLE_RATE + 256 :]
+    if snr_db is not None:
+        copy = _degraded(copy, snr_db, seed=7)
+    fingerprint = _fingerprint(copy, tmp_path / "copy.wav")
+
+    match = index.find(fingerprint, PROFILE, THRESHOLD, MIN_OVERLAP)
+
+    assert match is not None
+    assert match.score >= THRESHOLD
+    assert match.start < 1.0
+    assert 68.0 < match.end <= 70.0
+    # Segments de l'entrée ramenés aux instants de la copie (décalage de 20 s)
+    first = match.transcript[0]
+    assert first.text == "segment 4"
+    assert first.start == pytest.approx(0.0, abs=0.05)
+    assert match.transcript[1].start == pytest.approx(5.0 - 0.016, abs=0.05)
+    assert match.transcript.texts[-1] == "segment 17"
+    assert not match.entry_covered
+    # Seule la fin de la copie, absente de l'entrée, reste à transcrire
+    [(gap_start, gap_end)] = match.gaps(fingerprint.duration)
+    assert gap_start == pytest.approx(70.0, abs=1.0)
+    assert gap_end == pytest.approx(fingerprint.duration)
+
+
+def test_unrelated_recording_does_not_match(
+    index: FingerprintIndex, tmp_path: Path
+) -> None:
+    for seed in (2, 3, 4):
+        unrelated = _fingerprint(_speech_like(100, seed), tmp_path / "other.wav")
+        assert index.find(unrelated, PROFILE, THRESHOLD, MIN_OVERLAP) is None
+
+
+def test_other_transcription_profile_does_not_match(
+    index: FingerprintIndex, recording: np.ndarray, tmp_path: Path
+) -> None:
+    fingerprint = _fingerprint(recording[: 90 * SAMPLE_RATE], tmp_path / "copy.wav")
+    other = transcription_profile(SETTINGS.replace(whisper_cpp_language="en"))
+    assert other != PROFILE
+    assert index.find(fingerprint, other, THRESHOLD, MIN_OVERLAP) is None
+    assert index.find(fingerprint, PROFILE, THRESHOLD, MIN_OVERLAP) is not None
+
+
+def test_covering_recording_replaces_entry(
+    monkeypatch: pytest.MonkeyPatch, recording: np.ndarray, tmp_path: Path
+) -> None:
+    index = FingerprintIndex("fingerprints", tmp_path)
+    monkeypatch.setattr(fingerprint_module, "fingerprint_index", index)
+    # Entrée : extrait de 20 s à 90 s (instants de l'extrait)
+    excerpt = recording[20 * SAMPLE_RATE : 90 * SAMPLE_RATE]
+    excerpt_id = index.add(
+        _fingerprint(excerpt, tmp_path / "excerpt.wav"), _segments(0, 14), PROFILE
+    )
+    full = _fingerprint(recording, tmp_path / "full.wav")
+
+    match = index.find(full, PROFILE, THRESHOLD, MIN_OVERLAP)
+    assert match is not None
+    assert match.entry_covered
+    gaps = match.gaps(full.duration)
+    assert len(gaps) == 2
+    parts = [
+        (start, Transcript([(0.0, end - start, "portion transcrite")]))
+        for start, end in gaps
+    ]
+    remember_transcript(full, match.merged(parts), SETTINGS, match)
+
+    # L'extrait est remplacé par l'enregistrement complet : une seule entrée
+    entries = sorted(path.stem for path in index.directory.glob("*.npz"))
+    assert len(entries) == 1
+    assert excerpt_id not in entries
+    rematch = index.find(full, PROFILE, THRESHOLD, MIN_OVERLAP)
+    assert rematch is not None
+    assert rematch.entry_id == entries[0]
+    assert rematch.gaps(full.duration) == []
+
+
+def test_partial_match_stores_only_the_gap(
+    monkeypatch: pytest.MonkeyPatch,
+    index: FingerprintIndex,
+    recording: np.ndarray,
+    tmp_path: Path,
+) -> None:
+    monkeypatch.setattr(fingerprint_module, "fingerprint_index", index)
+    copy = _fingerprint(recording[20 * SAMPLE_RATE :], tmp_path / "copy.wav")
+    match = index.find(copy, PROFILE, THRESHOLD, MIN_OVERLAP)
+    assert match is not None
+    [(gap_start, gap_end)] = match.gaps(copy.duration)
+    gap = Transcript([(gap_start, gap_end, "fin de la copie")])
+    transcript = match.merged([(0.0, gap)])
+
+    remember_transcript(copy, transcript, SETTINGS, match)
+    remember_transcript(copy, transcript, SETTINGS, match)
+
+    # Une seule nouvelle entrée, limitée à la portion transcrite
+    new_entries = [
+        path for path in index.directory.glob("*.npz") if path.stem != match.entry_id
+    ]
+    assert len(new_entries) == 1
+    with np.load(new_entries[0]) as data:
+        seconds = data["times"] * fingerprint_module._FRAME_SECONDS
+    assert seconds.min() >= gap_start
+    stored = Transcript.load(index._transcript_path(new_entries[0].stem))
+    assert stored.texts == ["fin de la copie"]
+
+
+def test_oldest_entries_are_evicted(tmp_path: Path, recording: np.ndarray) -> None:
+    index = FingerprintIndex("fingerprints", tmp_path)
+    parts = [
+        _fingerprint(recording[start * SAMPLE_RATE : (start + 40) * SAMPLE_RATE], path)
+        for start, path in ((0, tmp_path / "a.wav"), (40, tmp_path / "b.wav"))
+    ]
+    first_id = index.add(parts[0], _segments(0, 8), PROFILE)
+    second_id = index.add(parts[1], _segments(8, 16), PROFILE)
+    assert index.find(parts[0], PROFILE, THRESHOLD, MIN_OVERLAP) is not None
+    first_npz = index.directory / f"{first_id}.npz"
+    os.utime(first_npz, (1, 1))
+
+    third = _fingerprint(recording[80 * SAMPLE_RATE :], tmp_path / "c.wav")
+    third_id = index.add(third, _segments(16, 24), PROFILE, max_entries=2)
+
+    assert not first_npz.exists()
+    assert not index._transcript_path(first_id).exists()
+    # L'entrée supprimée disparaît aussi de l'index en mémoire
+    assert index.find(parts[0], PROFILE, THRESHOLD, MIN_OVERLAP) is None
+    assert sorted(index._entry_ids) == sorted([second_id, third_id])
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q", "--no-cov"]))
@@ -0,0 +1,157 @@
+# test_llm_backends.py
+
+import json
+import sys
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, ClassVar
+
+import pytest
+
+project_root = Path(__file__).resolve().parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+try:
+    from localsumm.config import PROMPT_TEMPLATE_SHORT
+    from localsumm.llm_interaction import generate_summary_with_ollama, stream_summary
+    from localsumm.settings import Settings
+except ImportError as e:
+    print(f"Erreur d'importation. Structure src/localsumm/ correcte ? Détail: {e}")
+    sys.exit(1)
+
+
+API_KEY = "cle-de-test"
+TEXT = "La réunion a validé le budget du trimestre et deux recrutements."
+# Événements SSE renvoyés en streaming : deux fragments, fin, puis les usages
+SSE_EVENTS: list[dict[str, Any]] = [
+    {"choices": [{"delta": {"role": "assistant", "content": "Budget "}}]},
+    {"choices": [{"delta": {"content": "validé."}, "finish_reason": None}]},
+    {"choices": [{"delta": {}, "finish_reason": "length"}]},
+    {"choices": [], "usage": {"prompt_tokens": 31, "completion_tokens": 2}},
+]
+
+
+class _OpenAIStubHandler(BaseHTTPRequestHandler):
+    """Serveur compatible OpenAI minimal : /v1/models et /v1/chat/completions."""
+
+    received: ClassVar[list[dict[str, Any]]] = []
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self._send_json({"data": [{"id": "stub"}]})
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.received.append(
+            {
+                "path": self.path,
+                "authorization": self.headers.get("Authorization"),
+                "body": body,
+            }
+        )
+        if self.path != "/v1/chat/completions":
+            self.send_error(404)
+            return
+        if not body.get("stream"):
+            self._send_json(
+                {
+                    "choices": [
+                        {
+                            "message": {"role": "assistant", "content": " Résumé. "},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {"prompt_tokens": 30, "completion_tokens": 3},
+                }
+            )
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        self.wfile.write(b": ping\n\n")
+        for event in SSE_EVENTS:
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _send_json(self, data: dict[str, Any]) -> None:
+        content = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+@pytest.fixture
+def openai_settings() -> Iterator[Settings]:
+    """Paramètres pointant vers un serveur compatible OpenAI local (stub)."""
+    _OpenAIStubHandler.received = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OpenAIStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield Settings().replace(
+            llm_backend="openai",
+            llm_api_key=API_KEY,
+            ollama_base_urls=(f"http://127.0.0.1:{server.server_port}",),
+            ollama_api_mode="chat",
+            ollama_hedge_enabled=False,
+            ollama_timeout=10.0,
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _completion_request() -> dict[str, Any]:
+    posts = [
+        request
+        for request in _OpenAIStubHandler.received
+        if request["path"] == "/v1/chat/completions"
+    ]
+    assert len(posts) == 1
+    assert posts[0]["authorization"] == f"Bearer {API_KEY}"
+    return posts[0]["body"]
+
+
+def test_chat_completion(openai_settings: Settings) -> None:
+    stats: dict[str, Any] = {}
+    summary = generate_summary_with_ollama(
+        TEXT, PROMPT_TEMPLATE_SHORT, stats=stats, settings=openai_settings
+    )
+    assert summary == "Résumé."
+    assert stats["prompt_eval_count"] == 30
+    assert stats["eval_count"] == 3
+    assert stats["done_reason"] == "stop"
+    assert stats["endpoint"] == openai_settings.ollama_base_urls[0]
+
+    body = _completion_request()
+    assert body["stream"] is False
+    assert [message["role"] for message in body["messages"]] == ["system", "user"]
+    assert TEXT in body["messages"][1]["content"]
+
+
+def test_streamed_chat_completion(openai_settings: Settings) -> None:
+    stats: dict[str, Any] = {}
+    fragments = list(
+        stream_summary(
+            TEXT, PROMPT_TEMPLATE_SHORT, stats=stats, settings=openai_settings
+        )
+    )
+    assert fragments == ["Budget ", "validé."]
+    assert stats["prompt_eval_count"] == 31
+    assert stats["eval_count"] == 2
+    assert stats["done_reason"] == "length"
+
+    body = _completion_request()
+    assert body["stream"] is True
+    assert body["stream_options"] == {"include_usage": True}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q", "--no-cov"]))
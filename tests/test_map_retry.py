@@ -0,0 +1,141 @@
+# test_map_retry.py
+
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+project_root = Path(__file__).resolve().parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+try:
+    import localsumm.main as pipeline
+    from localsumm.exceptions import LocalSummError, OllamaError, OllamaTimeoutError
+    from localsumm.metrics import PipelineMetrics
+    from localsumm.settings import Settings
+except ImportError as e:
+    print(f"Erreur d'importation. Structure src/localsumm/ correcte ? Détail: {e}")
+    sys.exit(1)
+
+
+NORMAL_CHUNKS = [
+    "Premier passage sur le budget du trimestre.",
+    "Dernier passage sur le calendrier de livraison.",
+]
+# Résumé trop lent en entier, chaque moitié passe dans le délai
+SLOW_CHUNK = "LENT partie A sur les recrutements. LENT partie B sur les locaux."
+# Toujours en erreur (serveur indisponible)
+BROKEN_CHUNK = "CASSÉ passage que le serveur refuse."
+
+
+class _StubLLM:
+    """Remplace main._generate : délais dépassés et erreurs scriptés par texte."""
+
+    def __init__(self) -> None:
+        self.map_calls: list[str] = []
+        self.reduce_inputs: list[str] = []
+
+    def __call__(
+        self,
+        text: str,
+        prompt_template: str,
+        metrics: Optional[PipelineMetrics],
+        stage: str,
+        **kwargs: Any,
+    ) -> str:
+        if stage != "map":
+            self.reduce_inputs.append(text)
+            return "Résumé final."
+        self.map_calls.append(text)
+        if "partie A" in text and "partie B" in text:
+            raise OllamaTimeoutError("Pas de réponse de l'API LLM en 1s")
+        if "CASSÉ" in text:
+            raise OllamaError("Impossible de contacter l'API LLM")
+        return f"résumé({text})"
+
+
+@pytest.fixture
+def stub_llm(monkeypatch: pytest.MonkeyPatch) -> _StubLLM:
+    stub = _StubLLM()
+    monkeypatch.setattr(pipeline, "_generate", stub)
+    # Comptage des tokens sans tokenizer Hugging Face : un token par mot
+    monkeypatch.setattr(
+        pipeline, "count_tokens", lambda text, settings=None: len(text.split())
+    )
+    monkeypatch.setattr(
+        pipeline,
+        "count_tokens_batch",
+        lambda texts, settings=None: [len(text.split()) for text in texts],
+    )
+    return stub
+
+
+def _settings(map_error_budget: float) -> Settings:
+    return Settings().replace(
+        map_concurrency=1,
+        map_cache_enabled=False,
+        dedup_enabled=False,
+        map_output_format="prose",
+        map_max_retries=2,
+        map_retry_backoff=0.0,
+        map_split_after_timeouts=2,
+        map_split_max_depth=2,
+        map_error_budget=map_error_budget,
+        job_deadline=0.0,
+    )
+
+
+def test_slow_chunk_is_split_and_failures_are_counted(stub_llm: _StubLLM) -> None:
+    chunks = [NORMAL_CHUNKS[0], SLOW_CHUNK, BROKEN_CHUNK, NORMAL_CHUNKS[1]]
+    metrics = PipelineMetrics()
+
+    summaries = pipeline._summarize_map_reduce_formats(
+        chunks, {"short": "{text}"}, metrics, _settings(0.5)
+    )
+
+    assert summaries == {"short": "Résumé final."}
+    # Deux délais dépassés sur le chunk entier, puis une moitié par appel
+    assert stub_llm.map_calls.count(SLOW_CHUNK) == 2
+    assert "LENT partie A sur les recrutements." in stub_llm.map_calls
+    assert "LENT partie B sur les locaux." in stub_llm.map_calls
+    # Chunk en erreur : un appel puis map_max_retries nouvelles tentatives
+    assert stub_llm.map_calls.count(BROKEN_CHUNK) == 3
+
+    values = metrics.as_dict()["values"]
+    assert values["map_timeouts"] == 2
+    assert values["map_split_chunks"] == 1
+    assert values["map_retries"] == 3
+    assert values["map_failed_chunks"] == 1
+    assert "map_incomplete_chunks" not in values
+    assert "map_skipped_chunks" not in values
+    assert values["map_last_error"].startswith("OllamaError")
+
+    # Le REDUCE ne reçoit que les résumés obtenus, sans texte de remplacement
+    # pour le chunk en échec
+    assert stub_llm.reduce_inputs == [
+        "\n\n".join(
+            [
+                f"résumé({NORMAL_CHUNKS[0]})",
+                "résumé(LENT partie A sur les recrutements.)",
+                "résumé(LENT partie B sur les locaux.)",
+                f"résumé({NORMAL_CHUNKS[1]})",
+            ]
+        )
+    ]
+
+
+def test_error_budget_exceeded_fails_the_job(stub_llm: _StubLLM) -> None:
+    chunks = [NORMAL_CHUNKS[0], BROKEN_CHUNK, BROKEN_CHUNK + " Bis."]
+    metrics = PipelineMetrics()
+
+    with pytest.raises(LocalSummError, match="2 chunk\\(s\\) sur 3"):
+        pipeline._summarize_map_reduce_formats(
+            chunks, {"short": "{text}"}, metrics, _settings(0.5)
+        )
+    assert stub_llm.reduce_inputs == []
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q", "--no-cov"]))
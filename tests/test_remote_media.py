@@ -0,0 +1,188 @@
+# test_remote_media.py
+
+import re
+import sys
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, ClassVar, Optional
+
+import pytest
+
+project_root = Path(__file__).resolve().parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+try:
+    from localsumm.exceptions import FileProcessingError
+    from localsumm.remote_media import RangeReader, _fetch_prefix, _pipe_to_ffmpeg
+    from localsumm.settings import Settings
+except ImportError as e:
+    print(f"Erreur d'importation. Structure src/localsumm/ correcte ? Détail: {e}")
+    sys.exit(1)
+
+
+# Contenu servi : 256 Kio reproductibles, coupés après DROP_AFTER octets
+MEDIA = bytes(range(256)) * 1024
+DROP_AFTER = 100_000
+ETAG = '"v1"'
+
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    """
+    Serveur de fichier minimal : Range et If-Range (ETag), première réponse
+    complète interrompue après DROP_AFTER octets.
+    """
+
+    etag: ClassVar[str] = ETAG
+    ranges_supported: ClassVar[bool] = True
+    drop_first_response: ClassVar[bool] = True
+    received: ClassVar[list[dict[str, Optional[str]]]] = []
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        self.received.append({"range": range_header, "if_range": if_range})
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", range_header or "")
+        honor_range = (
+            match is not None
+            and self.ranges_supported
+            and (if_range is None or if_range == self.etag)
+        )
+        if match is None or not honor_range:
+            self._send(200, MEDIA, drop=self._take_drop())
+            return
+        start = int(match.group(1))
+        end = int(match.group(2)) + 1 if match.group(2) else len(MEDIA)
+        self._send(
+            206,
+            MEDIA[start:end],
+            content_range=f"bytes {start}-{end - 1}/{len(MEDIA)}",
+        )
+
+    def _take_drop(self) -> bool:
+        drop = type(self).drop_first_response
+        type(self).drop_first_response = False
+        return drop
+
+    def _send(
+        self,
+        status: int,
+        body: bytes,
+        content_range: Optional[str] = None,
+        drop: bool = False,
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", self.etag)
+        if content_range is not None:
+            self.send_header("Content-Range", content_range)
+        self.end_headers()
+        # Coupure : connexion fermée avant la taille annoncée
+        self.wfile.write(body[:DROP_AFTER] if drop else body)
+        self.close_connection = True
+
+
+@pytest.fixture
+def media_url() -> Iterator[str]:
+    _MediaHandler.etag = ETAG
+    _MediaHandler.ranges_supported = True
+    _MediaHandler.drop_first_response = True
+    _MediaHandler.received = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MediaHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/episode.mp3"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+SETTINGS = Settings().replace(
+    remote_media_timeout=10.0,
+    remote_media_max_retries=2,
+    remote_media_retry_backoff=0.0,
+)
+
+
+def test_resumes_after_dropped_connection(media_url: str) -> None:
+    reader = RangeReader(media_url, SETTINGS)
+    data = b"".join(reader.iter_blocks())
+
+    assert data == MEDIA
+    assert reader.reconnections == 1
+    assert reader.total == len(MEDIA)
+    first, resumed = _MediaHandler.received
+    assert first == {"range": None, "if_range": None}
+    # Reprise après le dernier bloc complet reçu avant la coupure
+    match = re.fullmatch(r"bytes=(\d+)-", resumed["range"] or "")
+    assert match is not None
+    assert 0 < int(match.group(1)) <= DROP_AFTER
+    assert resumed["if_range"] == ETAG
+
+
+def test_server_without_range_support_is_refused(media_url: str) -> None:
+    _MediaHandler.ranges_supported = False
+    reader = RangeReader(media_url, SETTINGS)
+    with pytest.raises(FileProcessingError, match="requêtes partielles"):
+        b"".join(reader.iter_blocks())
+
+
+def test_resource_changed_before_resume_is_refused(media_url: str) -> None:
+    reader = RangeReader(media_url, SETTINGS)
+    blocks = reader.iter_blocks()
+    next(blocks)
+    # Nouvelle version publiée pendant le téléchargement : If-Range échoue
+    _MediaHandler.etag = '"v2"'
+    with pytest.raises(FileProcessingError, match="a changé"):
+        b"".join(blocks)
+
+
+def test_prefix_is_refetched_after_ffmpeg_failure(
+    media_url: str, tmp_path: Path
+) -> None:
+    _MediaHandler.drop_first_response = False
+    spool_path = tmp_path / "remote.part"
+    # Décodeur qui refuse le flux après en avoir lu une partie
+    command = [
+        sys.executable,
+        "-c",
+        "import sys; sys.stdin.buffer.read(70000); sys.exit(1)",
+    ]
+    reader = RangeReader(media_url, SETTINGS)
+
+    spool_from = _pipe_to_ffmpeg(reader, command, spool_path, None)
+
+    assert spool_from is not None
+    assert 0 < spool_from < len(MEDIA)
+    assert reader.position == len(MEDIA)
+    refetched = _fetch_prefix(reader, spool_from, spool_path, None)
+    assert refetched == spool_from
+    assert spool_path.read_bytes() == MEDIA
+    assert _MediaHandler.received[-1] == {
+        "range": f"bytes=0-{spool_from - 1}",
+        "if_range": ETAG,
+    }
+
+
+def test_nothing_is_spooled_when_stream_is_decoded(
+    media_url: str, tmp_path: Path
+) -> None:
+    _MediaHandler.drop_first_response = False
+    spool_path = tmp_path / "remote.part"
+    command = [sys.executable, "-c", "import sys; sys.stdin.buffer.read()"]
+    reader = RangeReader(media_url, SETTINGS)
+
+    assert _pipe_to_ffmpeg(reader, command, spool_path, None) is None
+    assert reader.position == len(MEDIA)
+    assert not spool_path.exists()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q", "--no-cov"]))
@@ -0,0 +1,70 @@
+# test_singleflight.py
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).resolve().parent
+src_path = project_root / "src"
+sys.path.insert(0, str(src_path))
+
+try:
+    from localsumm.singleflight import SingleFlight
+except ImportError as e:
+    print(f"Erreur d'importation. Structure src/localsumm/ correcte ? Détail: {e}")
+    sys.exit(1)
+
+
+KEY = ("youtube:dQw4w9WgXcQ", ("short",))
+
+
+def _wait_for_subscribers(flight: SingleFlight, count: int) -> None:
+    deadline = time.monotonic() + 5
+    while len(flight._calls[KEY].subscribers) < count:
+        assert time.monotonic() < deadline, "Abonné jamais enregistré"
+        time.sleep(0.01)
+
+
+def test_events_reach_every_waiter_of_a_shared_call() -> None:
+    flight = SingleFlight()
+    leader_events: list[str] = []
+    follower_events: list[str] = []
+    follower_result: list[tuple[str, bool]] = []
+
+    def job() -> str:
+        flight.publish(KEY, "avant")
+        follower.start()
+        _wait_for_subscribers(flight, 2)
+        flight.publish(KEY, "après")
+        return "résumé"
+
+    def never_run() -> str:
+        raise AssertionError("Le traitement partagé a été relancé")
+
+    follower = threading.Thread(
+        target=lambda: follower_result.append(
+            flight.do(KEY, never_run, subscriber=follower_events.append)
+        )
+    )
+
+    assert flight.do(KEY, job, subscriber=leader_events.append) == ("résumé", False)
+    follower.join(timeout=5)
+
+    assert follower_result == [("résumé", True)]
+    assert leader_events == ["avant", "après"]
+    # L'appelant arrivé en cours de route reçoit les événements suivants
+    assert follower_events == ["après"]
+    assert flight.in_flight() == 0
+
+
+def test_publish_without_call_in_flight_is_ignored() -> None:
+    flight = SingleFlight()
+    flight.publish(KEY, "perdu")
+    assert flight.in_flight() == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q", "--no-cov"]))